@@ -1,10 +1,96 @@
+import time
+# Início desta execução do script, antes dos imports: base do tempo até a primeira pintura
+INICIO_SCRIPT = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import numpy as np
 from math import log
-import locale
+import hashlib
+import importlib
+import json
+import functools
+from contextlib import contextmanager
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from indicadores import (
+    AgendadorTarefas,
+    BANCOS,
+    CATEGORIA_CACHE,
+    COLUNAS_FILTRO_INVENTARIO,
+    FATOR_IQR,
+    FORMATOS_EXPORTACAO,
+    LIMITE_RESIDUO_PADRONIZADO,
+    MIN_OBSERVACOES_GRUPO,
+    MODELOS_HIPSOMETRICOS,
+    ajustar_modelo_hipsometrico,
+    ajustar_modelos_hipsometricos,
+    analisar_nomes_especies,
+    analisar_propriedades_por_tecnica,
+    arquivo_rastro,
+    atualizar_armazem_compartilhado,
+    aviso_leitor_excel,
+    aviso_motor_agregacao,
+    calcular_fitossociologia_censo,
+    calcular_fitossociologia_parcelas,
+    calcular_indices_diversidade,
+    calcular_limites_iqr,
+    calcular_outliers_por_grupo,
+    carregar_banco_compartilhado,
+    chrome_trace,
+    como_texto,
+    consultar_cubo,
+    contar_valores,
+    converter_colunas_numericas,
+    criar_executor,
+    detectar_tecnicas,
+    encontrar_coluna,
+    estimar_memoria,
+    eventos_perfil,
+    exportar_dataframe,
+    extrair_prop_inventario,
+    extrair_ut_inventario,
+    filtrar_inventario_por_propriedades,
+    filtrar_por_propriedades,
+    gravar_rastro,
+    iniciar_perfil,
+    ler_prontidao,
+    leituras_armazem,
+    limpar_cache_versao,
+    marcar_falha_cache,
+    marcar_outliers,
+    memoria_colunas,
+    memoria_objetos,
+    montar_dados_compartilhados,
+    motor_agregacao_ativo,
+    obter_artefato,
+    obter_motor,
+    perfil_ativo,
+    perfilado,
+    relatorio_memoria,
+    resumo_campanhas,
+    selecionar_campanhas,
+    separar_por_tecnica,
+    servidor_pronto,
+    taxa_acerto_cache,
+    trecho,
+    versao_dados,
+)
+
+class ImportacaoTardia:
+    """Módulo importado só no primeiro acesso a um atributo (px.bar, go.Figure...), não ao abrir a página"""
+    def __init__(self, nome):
+        self.nome = nome
+    
+    def __getattr__(self, atributo):
+        return getattr(importlib.import_module(self.nome), atributo)
+
+# O Plotly é importado no primeiro gráfico: não atrasa a barra lateral nem o esqueleto da página
+px = ImportacaoTardia('plotly.express')
+go = ImportacaoTardia('plotly.graph_objects')
+
+# Copy-on-Write do pandas no processo do servidor: filtros e colunas acrescentadas a um
+# derivado não copiam nem alteram os bancos compartilhados entre sessões
+pd.set_option('mode.copy_on_write', True)
 
 # Configuracao da pagina
 st.set_page_config(
@@ -125,59 +211,537 @@ def metric_compacta(label, value, help_text=None):
     </div>
     """, unsafe_allow_html=True)
 
-# Funcao para limpeza e padronizacao de dados
-def limpar_e_padronizar_dados(df):
+# ============================================================================
+# FRAGMENTOS E MEDIÇÃO DE TEMPO POR INTERAÇÃO
+# ============================================================================
+
+MAX_REGISTROS_TEMPO = 30
+
+@contextmanager
+def medir_execucao(nome, tipo='Fragmento'):
+    """Registra na sessão o tempo gasto por uma execução (página completa ou fragmento)"""
+    inicio = time.perf_counter()
+    try:
+        with trecho(nome, categoria='pagina' if tipo == 'Completa' else 'fragmento'):
+            yield
+    finally:
+        registros = st.session_state.setdefault('tempos_execucao', [])
+        registros.append({
+            'Horário': time.strftime('%H:%M:%S'),
+            'Tipo': tipo,
+            'Seção': nome,
+            'Tempo (ms)': round((time.perf_counter() - inicio) * 1000, 1)
+        })
+        del registros[:-MAX_REGISTROS_TEMPO]
+
+def fragmento(nome):
     """
-    Limpa e padroniza os dados do DataFrame:
-    1. Remove espacos desnecessarios
-    2. Converte para minúsculas
-    3. Capitaliza a primeira letra de cada célula
+    Transforma uma seção em fragmento (st.fragment): interações com widgets
+    internos reexecutam apenas a própria seção, com o tempo registrado.
+    Os dados devem chegar pelos argumentos da função.
     """
-    df_clean = df.copy()
-    
-    # Aplicar limpeza apenas em colunas de texto (object/string)
-    for col in df_clean.columns:
-        if df_clean[col].dtype == 'object':
-            # Converter para string, remover espaços extras e converter para minúsculas
-            df_clean[col] = (df_clean[col]
-                           .astype(str)
-                           .str.strip()  # Remove espaços no início e fim
-                           .str.replace(r'\s+', ' ', regex=True)  # Remove espaços múltiplos
-                           .str.lower()  # Converte para minúsculas
-                           .str.capitalize()  # Capitaliza primeira letra
-                           )
-            
-            # Tratar valores especiais
-            df_clean[col] = df_clean[col].replace({
-                'Nan': np.nan,
-                'None': np.nan,
-                'Null': np.nan,
-                '': np.nan
-            })
+    def decorador(func):
+        @functools.wraps(func)
+        def medida(*args, **kwargs):
+            if perfil_ativo() is None:
+                # Reexecução só do fragmento: perfil próprio
+                with perfil_execucao(f"Fragmento: {nome}"), medir_execucao(nome):
+                    return func(*args, **kwargs)
+            with medir_execucao(nome):
+                return func(*args, **kwargs)
+        return st.fragment(medida)
+    return decorador
+
+def exibir_tempos_execucao():
+    """Mostra na sidebar os tempos das últimas execuções"""
+    registros = st.session_state.get('tempos_execucao', [])
     
-    return df_clean
+    with st.sidebar.expander("⏱️ Tempo por interação"):
+        if not registros:
+            st.caption("Nenhuma execução registrada ainda.")
+            return
+        
+        df_tempos = pd.DataFrame(registros)
+        completas = df_tempos[df_tempos['Tipo'] == 'Completa']
+        fragmentos = df_tempos[df_tempos['Tipo'] == 'Fragmento']
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Página completa", f"{completas['Tempo (ms)'].iloc[-1]:.0f} ms" if len(completas) > 0 else "N/A")
+        with col2:
+            st.metric("Último fragmento", f"{fragmentos['Tempo (ms)'].iloc[-1]:.0f} ms" if len(fragmentos) > 0 else "N/A")
+        
+        st.dataframe(df_tempos.iloc[::-1], use_container_width=True, hide_index=True)
+        st.caption("Tempos de fragmentos reexecutados isoladamente aparecem aqui na próxima execução completa.")
 
-# Função para carregar dados com cache
-@st.cache_data
-def load_data():
-    """Carrega os bancos de dados Excel e aplica limpeza e padronização"""
+# ============================================================================
+# PAINEL DE DESEMPENHO (?perf=1)
+# ============================================================================
+
+MAX_PERFIS = 20
+MAX_TRECHOS_CASCATA = 60
+TRECHOS_DESTACADOS = 3
+COR_DESTAQUE = '#D32F2F'
+CORES_CATEGORIA = {
+    'pagina': '#2E7D32',
+    'fragmento': '#43A047',
+    'secao': '#81C784',
+    'calculo': '#1976D2',
+    CATEGORIA_CACHE: '#9E9E9E',
+    'grafico': '#AB47BC'
+}
+
+def painel_desempenho_ativo():
+    """Painel de desempenho ligado pelo parâmetro de URL ?perf=1"""
+    return st.query_params.get('perf') == '1'
+
+def registrar_contexto_execucao(**valores):
+    """Página e filtros em uso, gravados com o perfil de cada execução (e de fragmentos reexecutados)"""
+    st.session_state.setdefault('contexto_execucao', {}).update(valores)
+
+@contextmanager
+def perfil_execucao(nome):
+    """
+    Perfil desta execução (ou reexecução de fragmento), com o painel (?perf=1) ou o rastro
+    (INDICADORES_RASTRO) ligados: guardado no histórico da sessão e gravado no rastro.
+    """
+    if not (painel_desempenho_ativo() or arquivo_rastro()):
+        yield None
+        return
+    
+    memoria = painel_desempenho_ativo() and st.session_state.get('perf_memoria', False)
+    with iniciar_perfil(nome, memoria=memoria) as perfil:
+        yield perfil
+    contexto = get_script_run_ctx()
+    perfil.contexto.update(st.session_state.get('contexto_execucao', {}),
+                           sessao=contexto.session_id if contexto else None)
+    historico = st.session_state.setdefault('perfis_execucao', [])
+    historico.append(perfil)
+    del historico[:-MAX_PERFIS]
+    
     try:
-        # Carregar dados brutos
-        df_caracterizacao_raw = pd.read_excel('BD_caracterizacao.xlsx')
-        df_inventario_raw = pd.read_excel('BD_inventario.xlsx')
+        gravar_rastro(perfil)
+    except (OSError, ValueError) as e:
+        st.sidebar.warning(f"Rastro de desempenho não gravado: {e}")
+
+def cache_medido(cache):
+    """
+    Aplica um decorador de cache do Streamlit (st.cache_data/st.cache_resource já configurado)
+    registrando no perfil cada consulta, como acerto ou falha.
+    """
+    def decorador(func):
+        @functools.wraps(func)
+        def calcular(*args, **kwargs):
+            marcar_falha_cache()
+            return func(*args, **kwargs)
+        em_cache = cache(calcular)
+        
+        @functools.wraps(func)
+        def consultar(*args, **kwargs):
+            with trecho(func.__name__, categoria=CATEGORIA_CACHE):
+                return em_cache(*args, **kwargs)
+        consultar.clear = em_cache.clear
+        return consultar
+    return decorador
+
+def exibir_grafico(fig, **kwargs):
+    """st.plotly_chart medido como trecho do perfil (inclui a serialização da figura)"""
+    with trecho(f"Gráfico: {fig.layout.title.text or 'sem título'}", categoria='grafico'):
+        st.plotly_chart(fig, **kwargs)
+
+def grafico_cascata(tabela):
+    """Barras horizontais do início ao fim de cada trecho; os de maior tempo próprio em vermelho"""
+    destacados = set(tabela['proprio_ms'].nlargest(TRECHOS_DESTACADOS).index)
+    rotulos = [f"{i + 1}. {'· ' * nivel}{nome}" + (f" [{tarefa}]" if tarefa else "")
+               for i, (nivel, nome, tarefa) in enumerate(zip(tabela['nivel'], tabela['nome'], tabela['tarefa']))]
+    cores = [COR_DESTAQUE if i in destacados else CORES_CATEGORIA.get(categoria, '#BDBDBD')
+             for i, categoria in zip(tabela.index, tabela['categoria'])]
+    
+    fig = go.Figure(go.Bar(
+        y=rotulos, x=tabela['duracao_ms'], base=tabela['inicio_ms'], orientation='h',
+        marker_color=cores,
+        customdata=np.column_stack([tabela['proprio_ms'], tabela['linhas'].astype('float'), tabela['cache'].fillna('')]),
+        hovertemplate="%{y}<br>início %{base:.1f} ms, duração %{x:.1f} ms<br>"
+                      "próprio %{customdata[0]:.1f} ms · linhas %{customdata[1]:,.0f} %{customdata[2]}<extra></extra>"
+    ))
+    fig.update_layout(
+        height=80 + 18 * len(tabela), margin=dict(l=0, r=0, t=10, b=30),
+        xaxis_title="ms desde o início da execução", showlegend=False
+    )
+    fig.update_yaxes(autorange='reversed', tickfont=dict(size=10))
+    return fig
+
+@cache_medido(st.cache_resource(show_spinner=False, max_entries=len(BANCOS)))
+def obter_memoria_colunas(banco, chave_versao, _df):
+    """Memória por coluna de um banco compartilhado, calculada uma vez por versão dos dados"""
+    return memoria_colunas(_df)
+
+def tabela_bytes(df, colunas_bytes, divisor=1024 ** 2, unidade='MB'):
+    """Troca colunas em bytes pela unidade indicada (para exibição)"""
+    return df.assign(**{f"{coluna} ({unidade})": (df[coluna].astype('float') / divisor).round(2)
+                        for coluna in colunas_bytes}).drop(columns=colunas_bytes)
+
+def exibir_memoria_detalhada(dados, perfil):
+    """Funções que mais alocaram na execução, memória por objeto em cache e por coluna dos bancos"""
+    if perfil.alocacoes is not None and not perfil.alocacoes.empty:
+        st.caption("Funções com mais memória alocada e ainda viva ao fim da execução:")
+        st.dataframe(tabela_bytes(perfil.alocacoes, ['bytes'], 1024, 'KB'), use_container_width=True, hide_index=True)
+    
+    colunas = {banco: obter_memoria_colunas(banco, dados.versao.chave, getattr(dados, banco)) for banco in BANCOS}
+    bancos = pd.DataFrame([
+        {'objeto': f"Banco {banco} (compartilhado)", 'tipo': 'DataFrame',
+         'linhas': len(getattr(dados, banco)), 'bytes': int(tabela['bytes'].sum())}
+        for banco, tabela in colunas.items()
+    ])
+    outros = memoria_objetos({
+        'Cubo de agregados': obter_cubo(dados.caracterizacao, dados.inventario, dados.versao.chave),
+        'Estado desta sessão': st.session_state.to_dict()
+    }, excluir={id(dados.caracterizacao), id(dados.inventario)})
+    st.caption("Memória por objeto em cache:")
+    st.dataframe(tabela_bytes(pd.concat([bancos, outros], ignore_index=True), ['bytes']),
+                 use_container_width=True, hide_index=True)
+    
+    banco = st.selectbox("Memória por coluna", BANCOS, key='perf_memoria_banco')
+    st.dataframe(tabela_bytes(colunas[banco].round({'bytes_por_linha': 1, 'percentual': 1}), ['bytes']),
+                 use_container_width=True, hide_index=True)
+
+def exibir_painel_desempenho(dados):
+    """Painel da sidebar (?perf=1): cascata da última execução, trechos mais lentos, cache e memória"""
+    if not painel_desempenho_ativo():
+        return
+    
+    historico = st.session_state.get('perfis_execucao', [])
+    with st.sidebar.expander("⚡ Performance", expanded=True):
+        st.checkbox("🧠 Medir memória (tracemalloc)", key='perf_memoria',
+                    help="Pico de memória alocada por execução e por trecho e funções que mais alocaram. "
+                         "Deixa as execuções várias vezes mais lentas; execuções simultâneas de outras "
+                         "sessões entram na mesma conta.")
+        if not historico:
+            st.caption("Nenhuma execução medida ainda.")
+            return
         
-        # Aplicar limpeza e padronização
-        df_caracterizacao = limpar_e_padronizar_dados(df_caracterizacao_raw)
-        df_inventario = limpar_e_padronizar_dados(df_inventario_raw)
+        perfil = historico[-1]
+        tabela = perfil.tabela()
+        acertos, falhas = taxa_acerto_cache([perfil])
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Última execução", f"{perfil.duracao * 1000:.0f} ms")
+        with col2:
+            st.metric("Cache (acertos)", f"{acertos}/{acertos + falhas}" if acertos + falhas else "N/A")
+        if perfil.memoria:
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Pico alocado", formatar_bytes(perfil.memoria_pico))
+            with col2:
+                st.metric("RSS do processo", formatar_bytes(perfil.rss) if perfil.rss else "N/A")
+        primeira_pintura = perfil.contexto.get('primeira_pintura_ms')
+        st.caption(perfil.nome + (f" · primeira pintura em {primeira_pintura:.0f} ms" if primeira_pintura else ""))
+        
+        if tabela.empty:
+            st.caption("Nenhum trecho medido nesta execução.")
+            return
         
-        return df_caracterizacao, df_inventario
+        cascata = tabela
+        if len(tabela) > MAX_TRECHOS_CASCATA:
+            cascata = tabela.loc[sorted(tabela['duracao_ms'].nlargest(MAX_TRECHOS_CASCATA).index)]
+            st.caption(f"Cascata com os {MAX_TRECHOS_CASCATA} trechos mais longos de {len(tabela)}.")
+        st.plotly_chart(grafico_cascata(cascata), use_container_width=True)
+        
+        resumo = perfil.resumo()
+        resumo.insert(0, '', ['🔴' if i < TRECHOS_DESTACADOS else '' for i in range(len(resumo))])
+        if perfil.memoria:
+            resumo = tabela_bytes(resumo, ['memoria_pico']).rename(columns={'memoria_pico (MB)': 'Pico mem. (MB)'})
+        st.dataframe(
+            resumo.rename(columns={
+                'nome': 'Trecho', 'categoria': 'Tipo', 'chamadas': 'Chamadas', 'total_ms': 'Total (ms)',
+                'proprio_ms': 'Próprio (ms)', 'acertos': 'Acertos', 'falhas': 'Falhas'
+            }).round(1),
+            use_container_width=True, hide_index=True
+        )
+        
+        acertos, falhas = taxa_acerto_cache(historico)
+        st.caption(
+            f"Últimas {len(historico)} execuções: "
+            + " · ".join(f"{p.duracao * 1000:.0f}" for p in reversed(historico)) + " ms. "
+            + (f"Cache: {formatar_porcentagem_br(100 * acertos / (acertos + falhas), 0)} de acertos "
+               f"({acertos}/{acertos + falhas})." if acertos + falhas else "")
+        )
+        st.caption("Em vermelho, os trechos de maior tempo próprio (sem os trechos internos). "
+                   "Reexecuções de fragmentos aparecem na próxima execução completa.")
+        
+        agendador = st.session_state.get('agendador_tarefas')
+        if agendador is not None and agendador.tarefas:
+            st.caption(f"Cálculos em segundo plano do estado atual dos filtros "
+                       f"({agendador.canceladas} cancelado(s) por mudança de filtros nesta sessão):")
+            st.dataframe(
+                agendador.resumo().rename(columns={
+                    'tarefa': 'Tarefa', 'situacao': 'Situação', 'fila_ms': 'Fila (ms)', 'duracao_ms': 'Duração (ms)'
+                }).round(1),
+                use_container_width=True, hide_index=True
+            )
+        
+        eventos = pd.DataFrame([evento for p in historico for evento in eventos_perfil(p)])
+        st.download_button(
+            "⬇️ Chrome trace (esta sessão)",
+            data=json.dumps(chrome_trace(eventos), ensure_ascii=False, default=str),
+            file_name="rastro_sessao.json", mime="application/json",
+            help="Abrir em chrome://tracing ou ui.perfetto.dev"
+        )
+        if arquivo_rastro():
+            st.caption(f"Rastro de todas as sessões em `{arquivo_rastro()}` (python -m indicadores rastro).")
+        
+        if perfil.memoria:
+            exibir_memoria_detalhada(dados, perfil)
+
+# ============================================================================
+# DADOS COMPARTILHADOS ENTRE SESSÕES E MEMÓRIA
+# ============================================================================
+
+SESSAO_INATIVA_S = 30 * 60
+MAX_SELECOES_CAMPANHAS = 4
+
+@cache_medido(st.cache_resource(show_spinner="Carregando dados...", max_entries=len(BANCOS)))
+def obter_banco(banco, hash_planilha):
+    """Um banco limpo e padronizado, carregado uma vez por processo e versão (hash) da sua planilha"""
+    return carregar_banco_compartilhado(banco)
+
+@cache_medido(st.cache_resource(show_spinner=False, max_entries=1))
+def obter_dados_compartilhados(chave_versao, _versao):
+    """
+    Bancos da versão atual dos dados, uma vez por processo.
+    Todas as sessões recebem os mesmos DataFrames (sem cópia): não alterá-los no lugar.
+    Quando uma planilha muda, só o banco dela é recarregado (ver obter_banco).
+    """
+    inicio = time.perf_counter()
+    atualizar_armazem_compartilhado()
+    df_caracterizacao, df_inventario = (obter_banco(banco, _versao.do_banco(banco)) for banco in BANCOS)
+    return montar_dados_compartilhados(df_caracterizacao, df_inventario, versao=_versao,
+                                       tempo_carga=time.perf_counter() - inicio)
+
+@st.cache_resource(show_spinner=False)
+def versoes_carregadas():
+    """Chaves das versões dos dados já carregadas neste processo (sem esqueleto nas reexecuções)"""
+    return set()
+
+def exibir_esqueleto():
+    """Esqueleto da página (métricas vazias) enquanto os dados carregam; retorna o espaço a limpar depois"""
+    esqueleto = st.empty()
+    with esqueleto.container():
+        for coluna in st.columns(4):
+            coluna.metric("Carregando...", "—")
+        st.caption("⏳ Lendo as planilhas: a primeira carga de cada versão dos dados leva alguns segundos.")
+    return esqueleto
+
+def marcar_primeira_pintura():
+    """Tempo (ms) do início do script até título, navegação e esqueleto na tela, gravado com o perfil"""
+    perfil = perfil_ativo()
+    if perfil is not None:
+        perfil.contexto['primeira_pintura_ms'] = round((time.perf_counter() - INICIO_SCRIPT) * 1000, 1)
+
+def load_data():
+    """
+    Dados compartilhados da versão atual das planilhas (None se não puderem ser carregados).
+    Na primeira carga de cada versão, a página mostra um esqueleto enquanto as planilhas são lidas.
+    """
+    esqueleto = None
+    try:
+        versao = versao_dados()
+        carregadas = versoes_carregadas()
+        if versao.chave not in carregadas:
+            esqueleto = exibir_esqueleto()
+        marcar_primeira_pintura()
+        dados = obter_dados_compartilhados(versao.chave, versao)
+        carregadas.add(versao.chave)
+        return dados
     except Exception as e:
         st.error(f"Erro ao carregar dados: {e}")
-        return None, None
+        return None
+    finally:
+        if esqueleto is not None:
+            esqueleto.empty()
+
+def formatar_periodo(inicio, fim):
+    """Período 'dd/mm/aaaa a dd/mm/aaaa' de datas AAAA-MM-DD (vazio se não houver datas)"""
+    if not inicio:
+        return ""
+    return f"{pd.Timestamp(inicio):%d/%m/%Y} a {pd.Timestamp(fim):%d/%m/%Y}"
+
+@cache_medido(st.cache_resource(show_spinner=False, max_entries=MAX_SELECOES_CAMPANHAS))
+def obter_dados_campanhas(chave_selecao, _dados, campanhas):
+    """Bancos só com as campanhas selecionadas, uma vez por processo e seleção (recorte dos compartilhados)"""
+    return selecionar_campanhas(_dados, campanhas)
+
+def selecionar_campanhas_sessao(dados):
+    """
+    Campanhas da sessão, escolhidas na barra lateral quando há mais de uma; retorna os dados
+    da seleção e guarda a versão restrita a ela (chave dos caches da sessão, ver versao_sessao)
+    """
+    campanhas = dados.versao.campanhas
+    selecionadas = campanhas
+    if len(campanhas) > 1:
+        periodos = resumo_campanhas().set_index('campanha')
+        
+        def rotulo(campanha):
+            if campanha not in periodos.index:
+                return campanha
+            periodo = formatar_periodo(periodos.at[campanha, 'data_inicio'], periodos.at[campanha, 'data_fim'])
+            return f"{campanha} ({periodo})" if periodo else campanha
+        
+        selecionadas = st.sidebar.multiselect(
+            "🗓️ Campanhas", campanhas, default=campanhas, format_func=rotulo,
+            help="Campanhas de campo incluídas em todas as páginas (cada uma lida uma vez para o armazém)"
+        )
+        if not selecionadas:
+            st.sidebar.caption("Nenhuma campanha selecionada: exibindo todas.")
+    
+    versao = dados.versao.selecionar(selecionadas)
+    st.session_state['versao_sessao'] = versao
+    if not versao.selecao:
+        return dados
+    return obter_dados_campanhas(versao.chave, dados, versao.selecao)
+
+def versao_sessao():
+    """Versão dos dados desta sessão: a atual, restrita às campanhas selecionadas"""
+    return st.session_state.get('versao_sessao') or versao_dados()
+
+def exibir_leituras_planilhas():
+    """Tempo, leitor, linhas, colunas e memória da leitura de cada planilha que gerou o armazém"""
+    for leitura in leituras_armazem().values():
+        periodo = formatar_periodo(leitura.get('data_inicio'), leitura.get('data_fim'))
+        campanha = f" (campanha {leitura['campanha']}{', ' + periodo if periodo else ''})" if leitura.get('campanha') else ""
+        vazias = f" ({formatar_numero_br(leitura['linhas_vazias'], 0)} vazias descartadas)" if leitura['linhas_vazias'] else ""
+        ignoradas = f" ({len(leitura['colunas_ignoradas'])} de texto livre não lidas)" if leitura['colunas_ignoradas'] else ""
+        sem_esquema = leitura.get('memoria_sem_esquema')
+        esquema = f" ({formatar_bytes(sem_esquema)} sem o esquema de tipos)" if sem_esquema else ""
+        st.caption(
+            f"📄 {leitura['arquivo']}{campanha}: {formatar_numero_br(leitura['tempo_leitura'], 2)} s de leitura "
+            f"({leitura['leitor']}) + {formatar_numero_br(leitura['tempo_limpeza'], 2)} s de limpeza · "
+            f"{formatar_numero_br(leitura['linhas'], 0)} linhas{vazias} × {leitura['colunas']} colunas{ignoradas} · "
+            f"{formatar_bytes(leitura['memoria'])}{esquema}"
+        )
+
+def exibir_versao_dados(dados):
+    """Mostra na sidebar a versão dos dados em uso e o botão de recarga"""
+    with st.sidebar.expander("🗂️ Versão dos dados"):
+        st.caption(f"Versão **{dados.versao.chave}** — {dados.versao.descricao()}")
+        st.caption(f"Montada em {time.strftime('%d/%m/%Y %H:%M:%S', time.localtime(dados.carregado_em))} "
+                   f"({formatar_numero_br(dados.tempo_carga, 1)} s)")
+        if st.button("🔄 Recarregar dados", help="Relê as planilhas e refaz apenas o que depende das que mudaram"):
+            limpar_cache_versao()
+            st.rerun()
+        st.caption("Alterações nas planilhas são detectadas a cada interação.")
+        exibir_leituras_planilhas()
+        prontidao = ler_prontidao()
+        if servidor_pronto(prontidao=prontidao):
+            st.caption(f"🔥 Aquecida em {time.strftime('%d/%m/%Y %H:%M:%S', time.localtime(prontidao['pronto_em']))} "
+                       f"({formatar_numero_br(prontidao['etapas']['total'], 1)} s): cubo e indicadores lidos do armazém.")
+        else:
+            st.caption("Versão não aquecida: cubo e indicadores são calculados na primeira execução "
+                       "(`python -m indicadores aquecer`).")
+
+@st.cache_resource(show_spinner=False)
+def registro_sessoes():
+    """Memória estimada do estado de cada sessão do processo: id -> (bytes, último acesso)"""
+    return {}
+
+def registrar_memoria_sessao(dados):
+    """Atualiza a memória desta sessão no registro e descarta sessões inativas"""
+    contexto = get_script_run_ctx()
+    if contexto is None:
+        return
+    
+    compartilhados = {id(dados.caracterizacao), id(dados.inventario)}
+    agora = time.time()
+    registro = registro_sessoes()
+    registro[contexto.session_id] = (estimar_memoria(st.session_state.to_dict(), compartilhados), agora)
+    for sessao, (_, ultimo_acesso) in list(registro.items()):
+        if agora - ultimo_acesso > SESSAO_INATIVA_S:
+            registro.pop(sessao, None)
+
+def formatar_bytes(num_bytes):
+    """Tamanho em KB ou MB (formato brasileiro)"""
+    if num_bytes >= 1024 ** 2:
+        return f"{formatar_numero_br(num_bytes / 1024 ** 2, 1)} MB"
+    return f"{formatar_numero_br(num_bytes / 1024, 1)} KB"
+
+def exibir_memoria(dados):
+    """Mostra na sidebar a memória dos dados compartilhados e a sobrecarga por sessão"""
+    registrar_memoria_sessao(dados)
+    registro = registro_sessoes()
+    relatorio = relatorio_memoria(dados, [memoria for memoria, _ in list(registro.values())])
+    contexto = get_script_run_ctx()
+    memoria_sessao = registro.get(contexto.session_id, (0, None))[0] if contexto else 0
+    
+    with st.sidebar.expander("🧠 Memória"):
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Dados (1× por processo)", formatar_bytes(relatorio['compartilhado']))
+        with col2:
+            st.metric("Esta sessão", formatar_bytes(memoria_sessao))
+        
+        st.caption(
+            f"{relatorio['sessoes']} sessão(ões) ativa(s) · média {formatar_bytes(relatorio['media_por_sessao'])}, "
+            f"máximo {formatar_bytes(relatorio['maximo_por_sessao'])} por sessão · "
+            f"total {formatar_bytes(relatorio['total'])} "
+            f"(com uma cópia dos dados por sessão: {formatar_bytes(relatorio['total_com_copias'])})"
+        )
+
+@st.cache_resource(show_spinner=False)
+def selecionar_motor_consulta():
+    """Motor de consulta configurado e aviso (ou None); sem o DuckDB instalado, usa pandas"""
+    try:
+        return obter_motor(), None
+    except (ImportError, ValueError) as e:
+        return obter_motor('pandas'), f"{e}. Usando o motor pandas."
+
+@cache_medido(st.cache_resource(show_spinner="Montando cubo de agregados...", max_entries=MAX_SELECOES_CAMPANHAS))
+def obter_cubo(_df_caracterizacao, _df_inventario, chave_versao, persistir=True):
+    """
+    Cubo de agregados dos bancos carregados, um por versão dos dados e seleção de campanhas
+    (compartilhado entre sessões); lido do armazém se o aquecimento (python -m indicadores aquecer)
+    já o montou. Só o de todas as campanhas (persistir=True) é gravado no armazém.
+    """
+    return obter_artefato('cubo', chave_versao, _df_caracterizacao, _df_inventario, persistir=persistir)
+
+@cache_medido(st.cache_resource(show_spinner="Calculando indicadores de restauração...", max_entries=MAX_SELECOES_CAMPANHAS))
+def obter_indicadores_vista_padrao(_df_caracterizacao, _df_inventario, chave_versao, persistir=True):
+    """Indicadores de restauração sem filtros, um por versão dos dados e seleção de campanhas (do armazém, se aquecido)"""
+    return obter_artefato('indicadores_restauracao', chave_versao, _df_caracterizacao, _df_inventario,
+                          persistir=persistir)
+
+def motor_ativo():
+    """Motor de consulta usado nos filtros e agregações do dashboard"""
+    return selecionar_motor_consulta()[0]
+
+def exibir_mensagens(resultado):
+    """Exibe os avisos e erros registrados por um resultado do núcleo de cálculo"""
+    for aviso in resultado.avisos:
+        st.warning(aviso)
+    for erro in resultado.erros:
+        st.error(erro)
 
 # Função para estatísticas descritivas
-def show_descriptive_stats(df_carac, df_inv, title):
-    """Mostra estatísticas descritivas específicas para cada banco"""
+def media_caracterizacao(df_carac, coluna, resumo=None):
+    """Média numérica de uma coluna da caracterização: do cubo, se houver resumo, ou das linhas filtradas"""
+    if resumo is not None:
+        return resumo.medias_caracterizacao.get(coluna, np.nan)
+    return pd.to_numeric(df_carac[coluna], errors='coerce').mean()
+
+def estatisticas_inventario(df_inv, coluna, resumo=None):
+    """(valores válidos, média, máximo) de uma coluna numérica do inventário: do cubo ou das linhas filtradas"""
+    if resumo is not None:
+        return (resumo.contagens_inventario.get(coluna, 0),
+                resumo.medias_inventario.get(coluna, np.nan),
+                resumo.maximos_inventario.get(coluna, np.nan))
+    valores = pd.to_numeric(df_inv[coluna], errors='coerce').dropna()
+    return len(valores), valores.mean(), valores.max()
+
+def show_descriptive_stats(df_carac, df_inv, title, resumo=None, calculos=None):
+    """
+    Mostra estatísticas descritivas específicas para cada banco.
+    Com `resumo` (consulta ao cubo de agregados), contagens, médias e riquezas vêm do cubo;
+    com `calculos` (agendador da sessão), área e densidades vêm dos cálculos em segundo plano.
+    """
     st.subheader(f"📊 Estatísticas Descritivas - {title}")
     
     if title == "Caracterização":
@@ -187,7 +751,7 @@ def show_descriptive_stats(df_carac, df_inv, title):
             # Número de parcelas (cod_parc únicos)
             cod_parc_col = encontrar_coluna(df_carac, ['cod_parc', 'parcela', 'plot'])
             if cod_parc_col:
-                num_parcelas = df_carac[cod_parc_col].nunique()
+                num_parcelas = resumo.num_parcelas if resumo is not None else df_carac[cod_parc_col].nunique()
                 metric_compacta("Nº Parcelas", formatar_numero_br(num_parcelas, 0))
             else:
                 metric_compacta("Nº Parcelas", "N/A")
@@ -195,8 +759,12 @@ def show_descriptive_stats(df_carac, df_inv, title):
         with col2:
             # Área amostrada usando método adaptativo
             if len(df_carac) > 0:
-                area_ha, metodo = calcular_area_amostrada(df_carac, df_inv)
-                metric_compacta("Área Amostr.", formatar_area_br(area_ha), f"Método: {metodo}")
+                if calculos is not None:
+                    area = resultado_calculo(calculos, 'area_amostrada')
+                else:
+                    area = motor_ativo().calcular_area_amostrada(df_carac, df_inv)
+                exibir_mensagens(area)
+                metric_compacta("Área Amostr.", formatar_area_br(area.area_ha), f"Método: {area.metodo}")
             else:
                 metric_compacta("Área Amostr.", "N/A")
         
@@ -205,7 +773,7 @@ def show_descriptive_stats(df_carac, df_inv, title):
             cobertura_col = encontrar_coluna(df_carac, ['cobetura_nativa', 'cobertura_nativa', 'copa_nativa'])
             if cobertura_col:
                 # Aplicar a mesma lógica simples e direta
-                cobertura_media = pd.to_numeric(df_carac[cobertura_col], errors='coerce').mean()
+                cobertura_media = media_caracterizacao(df_carac, cobertura_col, resumo)
                 
                 # Converter de 0-1 para 0-100% se necessário
                 if pd.notna(cobertura_media) and cobertura_media <= 1:
@@ -241,7 +809,7 @@ def show_descriptive_stats(df_carac, df_inv, title):
             if col_name:
                 with current_col:
                     # Calcular a média e converter de 0-1 para 0-100%
-                    media = pd.to_numeric(df_carac[col_name], errors='coerce').mean()
+                    media = media_caracterizacao(df_carac, col_name, resumo)
                     
                     # Converter de 0-1 para 0-100% (as colunas com (%) também estão em formato 0-1)
                     if pd.notna(media):
@@ -271,8 +839,10 @@ def show_descriptive_stats(df_carac, df_inv, title):
             
             if col_name:
                 # Conta valores que indicam presença (valor 1)
-                valores = pd.to_numeric(df_carac[col_name], errors='coerce')
-                count = (valores == 1).sum()
+                if resumo is not None:
+                    count = resumo.uns_caracterizacao.get(col_name, 0)
+                else:
+                    count = (pd.to_numeric(df_carac[col_name], errors='coerce') == 1).sum()
                 
                 with current_col:
                     st.markdown(f"<div style='font-size:16px; line-height:1.4'>• <b>{label}</b>: {count}</div>", unsafe_allow_html=True)
@@ -286,9 +856,14 @@ def show_descriptive_stats(df_carac, df_inv, title):
             especies_col = encontrar_coluna(df_inv, ['especies', 'especie', 'species', 'sp'])
             ht_col = encontrar_coluna(df_inv, ['ht', 'altura', 'height'])
             
-            if especies_col and len(df_inv) > 0:
+            if especies_col and len(df_inv) > 0 and resumo is not None:
+                if resumo.riqueza_nativas is not None:
+                    metric_compacta("Riqueza", f"{resumo.riqueza} ({resumo.riqueza_nativas} nat.)")
+                else:
+                    metric_compacta("Riqueza", str(resumo.riqueza))
+            elif especies_col and len(df_inv) > 0:
                 # Filtrar especies validas (remover "Morto/Morta")
-                df_especies_validas = df_inv[~df_inv[especies_col].astype(str).str.contains('Morto|Morta', case=False, na=False)]
+                df_especies_validas = df_inv[~como_texto(df_inv[especies_col]).str.contains('Morto|Morta', case=False, na=False)]
                 
                 # Filtrar por altura > 0.5m se coluna disponivel
                 if ht_col:
@@ -300,7 +875,7 @@ def show_descriptive_stats(df_carac, df_inv, title):
                 # Riqueza de especies nativas com altura > 0.5m
                 origem_col = encontrar_coluna(df_especies_validas, ['origem', 'origin', 'procedencia'])
                 if origem_col:
-                    df_nativas = df_especies_validas[df_especies_validas[origem_col].astype(str).str.contains('Nativa', case=False, na=False)]
+                    df_nativas = df_especies_validas[como_texto(df_especies_validas[origem_col]).str.contains('Nativa', case=False, na=False)]
                     riqueza_nativas = df_nativas[especies_col].nunique()
                     metric_compacta("Riqueza", f"{riqueza_total} ({riqueza_nativas} nat.)")
                 else:
@@ -311,17 +886,23 @@ def show_descriptive_stats(df_carac, df_inv, title):
         with col2:
             # Densidade geral de indivíduos
             if len(df_inv) > 0 and len(df_carac) > 0:
-                densidade_geral, metodo = calcular_densidade_geral(df_inv, df_carac)
-                metric_compacta("Dens. Geral", formatar_densidade_br(densidade_geral), f"Método: {metodo}")
+                if calculos is not None:
+                    densidade_geral = resultado_calculo(calculos, 'densidade_geral')
+                else:
+                    densidade_geral = motor_ativo().calcular_densidade_geral(df_inv, df_carac)
+                metric_compacta("Dens. Geral", formatar_densidade_br(densidade_geral.densidade), f"Método: {densidade_geral.metodo}")
             else:
                 metric_compacta("Dens. Geral", formatar_densidade_br(0))
         
         with col3:
             # Densidade de indivíduos regenerantes
             if len(df_inv) > 0 and len(df_carac) > 0:
-                densidade = calcular_densidade_regenerantes(df_inv, df_carac)
-                
-                metric_compacta("Dens. Regen.", formatar_densidade_br(densidade))
+                if calculos is not None:
+                    densidade = resultado_calculo(calculos, 'densidade_regenerantes')
+                else:
+                    densidade = motor_ativo().calcular_densidade_regenerantes(df_inv, df_carac)
+                exibir_mensagens(densidade)
+                metric_compacta("Dens. Regen.", formatar_densidade_br(densidade.densidade))
             else:
                 metric_compacta("Dens. Regen.", formatar_densidade_br(0))
         
@@ -329,7 +910,7 @@ def show_descriptive_stats(df_carac, df_inv, title):
             # Altura média
             ht_col = encontrar_coluna(df_inv, ['ht', 'altura', 'height', 'h'])
             if ht_col and len(df_inv) > 0:
-                altura_media = pd.to_numeric(df_inv[ht_col], errors='coerce').mean()
+                _, altura_media, _ = estatisticas_inventario(df_inv, ht_col, resumo)
                 if pd.notna(altura_media):
                     metric_compacta("Alt. Média", f"{formatar_numero_br(altura_media, 2)} m")
                 else:
@@ -372,7 +953,7 @@ def show_descriptive_stats(df_carac, df_inv, title):
                         # Tratamento especial para Ameaça MMA (contagem de plaquetas únicas)
                         if label == 'Ameaça MMA' and plaqueta_col:
                             try:
-                                ameaca_dist = df_inv.groupby(col_name)[plaqueta_col].nunique()
+                                ameaca_dist = df_inv.groupby(col_name, observed=True)[plaqueta_col].nunique()
                                 
                                 if len(ameaca_dist) > 0:
                                     # Mostrar apenas top 3 (aumentamos de 2 para 3)
@@ -391,7 +972,7 @@ def show_descriptive_stats(df_carac, df_inv, title):
                         else:
                             # Tratamento normal para outras categorias (percentual)
                             try:
-                                dist = df_inv[col_name].value_counts(normalize=True) * 100
+                                dist = contar_valores(df_inv[col_name], normalize=True) * 100
                                 
                                 if len(dist) > 0:
                                     # Mostrar top 3 (aumentamos de 2 para 3)
@@ -411,302 +992,290 @@ def show_descriptive_stats(df_carac, df_inv, title):
             st.markdown("<div style='font-size:18px; font-weight:bold; margin-bottom:8px; color:#1c83e1'>Distribuição por Categorias:</div>", unsafe_allow_html=True)
             st.markdown("<div style='font-size:16px; line-height:1.4; font-style:italic'>Nenhum dado disponível com os filtros aplicados</div>", unsafe_allow_html=True)
 
-def encontrar_coluna(df, nomes_possiveis):
-    """Encontra uma coluna no dataframe baseado em nomes possíveis (case-insensitive)"""
-    for nome in nomes_possiveis:
-        for col in df.columns:
-            # Busca case-insensitive e com tratamento de espaços
-            if nome.lower().replace(' ', '').replace('_', '') in col.lower().replace(' ', '').replace('_', ''):
-                return col
-    return None
+# ============================================================================
+# VISUALIZAÇÃO PAGINADA DE TABELAS
+# ============================================================================
+
+TAMANHOS_PAGINA = [25, 50, 100, 250]
+NUM_COLUNAS_PADRAO = 12
+
+def filtrar_por_busca(df, termo, colunas):
+    """Máscara das linhas em que alguma das colunas contém o termo (sem diferenciar maiúsculas)"""
+    mascara = np.zeros(len(df), dtype=bool)
+    for col in colunas:
+        mascara |= como_texto(df[col]).str.contains(termo, case=False, na=False, regex=False).to_numpy()
+    return mascara
+
+def posicoes_busca(df, termo, colunas):
+    """Posições das linhas encontradas pela busca (todas, sem termo)"""
+    posicoes = np.arange(len(df))
+    return posicoes[filtrar_por_busca(df, termo, colunas)] if termo else posicoes
+
+def ordenar_posicoes(serie, crescente=True):
+    """Retorna as posições que ordenam a série (valores nulos ao final)"""
+    serie = serie.reset_index(drop=True)
+    try:
+        ordenada = serie.sort_values(ascending=crescente, na_position='last', kind='stable')
+    except TypeError:
+        # Colunas com tipos misturados: ordenar pela representação em texto
+        ordenada = como_texto(serie).where(serie.notna()).sort_values(ascending=crescente, na_position='last', kind='stable')
+    return ordenada.index.to_numpy()
 
-def calcular_area_amostrada(df_carac_filtered, df_inv_filtered):
+def selecionar_pagina(df, colunas, pagina, tamanho_pagina, coluna_ordem=None, crescente=True, posicoes=None):
     """
-    Calcula a área amostrada com método híbrido avançado:
-    - Separa dados por técnica (Censo vs Parcelas)
-    - Calcula área de cada técnica separadamente
-    - Soma as áreas para obter total correto
+    Seleciona apenas a fatia visível de uma tabela:
+    - Só as posições encontradas pela busca (ver posicoes_busca; None = todas as linhas)
+    - Ordenação calculada somente sobre a coluna escolhida
+    - Projeção de colunas feita apenas nas linhas da página
+    
+    Retorna (fatia, total de linhas após a busca).
     """
-    try:
-        if len(df_carac_filtered) == 0 and len(df_inv_filtered) == 0:
-            return 0.0, "Sem dados"
-        
-        # Verificar técnica no BD_caracterização
-        tecnica_col = encontrar_coluna(df_carac_filtered, ['tecnica_am', 'tecnica', 'metodo'])
-        
-        if not tecnica_col or len(df_carac_filtered) == 0:
-            # Fallback: usar método de parcelas
-            return calcular_area_parcelas_tradicional(df_inv_filtered)
-        
-        # Analisar técnicas presentes nos dados filtrados
-        df_carac_copy = df_carac_filtered.copy()
-        df_carac_copy[tecnica_col] = df_carac_copy[tecnica_col].str.lower()
-        
-        tecnicas_unicas = df_carac_copy[tecnica_col].unique()
-        tem_censo = any('censo' in str(t) for t in tecnicas_unicas)
-        tem_parcelas = any('parcela' in str(t) or 'plot' in str(t) for t in tecnicas_unicas)
-        
-        area_total = 0.0
-        metodos_usados = []
-        
-        # Se tem apenas uma técnica, usar método direto
-        if tem_censo and not tem_parcelas:
-            return calcular_area_censo_inventario(df_inv_filtered)
-        elif tem_parcelas and not tem_censo:
-            return calcular_area_parcelas_tradicional(df_inv_filtered)
-        
-        # Se tem mistura de técnicas, calcular separadamente
-        if tem_censo and tem_parcelas:
-            # Separar dados por técnica
-            dados_censo = df_carac_copy[df_carac_copy[tecnica_col].str.contains('censo', na=False)]
-            dados_parcelas = df_carac_copy[~df_carac_copy[tecnica_col].str.contains('censo', na=False)]
-            
-            # Calcular área do censo
-            if len(dados_censo) > 0:
-                # Filtrar inventário para propriedades de censo
-                props_censo = dados_censo['cod_prop'].unique() if 'cod_prop' in dados_censo.columns else []
-                if len(props_censo) > 0:
-                    # Filtrar BD_inventário para essas propriedades
-                    df_inv_censo = filtrar_inventario_por_propriedades(df_inv_filtered, props_censo)
-                    if len(df_inv_censo) > 0:
-                        area_censo, metodo_censo = calcular_area_censo_inventario(df_inv_censo)
-                        area_total += area_censo
-                        metodos_usados.append(f"Censo: {metodo_censo}")
-            
-            # Calcular área das parcelas
-            if len(dados_parcelas) > 0:
-                # Filtrar inventário para propriedades de parcelas
-                props_parcelas = dados_parcelas['cod_prop'].unique() if 'cod_prop' in dados_parcelas.columns else []
-                if len(props_parcelas) > 0:
-                    # Filtrar BD_inventário para essas propriedades
-                    df_inv_parcelas = filtrar_inventario_por_propriedades(df_inv_filtered, props_parcelas)
-                    if len(df_inv_parcelas) > 0:
-                        area_parcelas, metodo_parcelas = calcular_area_parcelas_tradicional(df_inv_parcelas)
-                        area_total += area_parcelas
-                        metodos_usados.append(f"Parcelas: {metodo_parcelas}")
-            
-            metodo_final = " + ".join(metodos_usados) if metodos_usados else "Misto (sem dados)"
-            return area_total, metodo_final
-        
-        # Fallback se não conseguiu identificar técnicas
-        return calcular_area_parcelas_tradicional(df_inv_filtered)
-            
-    except Exception as e:
-        st.warning(f"Erro no cálculo de área: {e}")
-        return 0.0, "Erro"
+    if posicoes is None:
+        posicoes = np.arange(len(df))
+    
+    if coluna_ordem:
+        posicoes = posicoes[ordenar_posicoes(df[coluna_ordem].iloc[posicoes], crescente)]
+    
+    inicio = (pagina - 1) * tamanho_pagina
+    fatia = df.iloc[posicoes[inicio:inicio + tamanho_pagina]][colunas]
+    
+    return fatia, len(posicoes)
 
-def filtrar_inventario_por_propriedades(df_inv, propriedades):
-    """Filtra o BD_inventário para incluir apenas as propriedades especificadas"""
-    try:
-        # Encontrar coluna de parcela
-        col_parc = encontrar_coluna(df_inv, ['cod_parc', 'codigo_parcela', 'parcela'])
-        
-        if not col_parc:
-            return df_inv  # Retorna tudo se não conseguir filtrar
-        
-        df_trabalho = df_inv.copy()
-        df_trabalho[col_parc] = df_trabalho[col_parc].astype(str)
-        
-        # Extrair propriedades do cod_parc
-        if '_' in str(df_trabalho[col_parc].iloc[0]) if len(df_trabalho) > 0 else False:
-            # Formato PROP_UT
-            df_trabalho['prop_temp'] = df_trabalho[col_parc].str.split('_').str[0]
-        else:
-            # Tentar colunas separadas
-            col_prop = encontrar_coluna(df_trabalho, ['cod_prop', 'codigo_propriedade', 'propriedade'])
-            if col_prop:
-                df_trabalho['prop_temp'] = df_trabalho[col_prop].astype(str)
-            else:
-                return df_inv  # Se não conseguir identificar, retorna tudo
-        
-        # Filtrar por propriedades especificadas
-        propriedades_str = [str(p).lower() for p in propriedades]
-        df_filtrado = df_trabalho[df_trabalho['prop_temp'].str.lower().isin(propriedades_str)]
-        
-        # Remover coluna temporária
-        if 'prop_temp' in df_filtrado.columns:
-            df_filtrado = df_filtrado.drop('prop_temp', axis=1)
-        
-        return df_filtrado
-        
-    except Exception as e:
-        st.warning(f"Erro ao filtrar inventário: {e}")
-        return df_inv
+@fragmento("Dados brutos (paginação)")
+def exibir_tabela_paginada(df, chave, colunas_padrao=None):
+    """
+    Exibe uma tabela paginada com busca, ordenação e projeção de colunas feitas no servidor.
+    Apenas a página visível é serializada e enviada ao navegador.
+    """
+    todas_colunas = list(df.columns)
+    if colunas_padrao is None:
+        colunas_padrao = todas_colunas[:NUM_COLUNAS_PADRAO]
+    
+    col_busca, col_tamanho = st.columns([3, 1])
+    with col_busca:
+        termo_busca = st.text_input("🔎 Buscar", key=f"{chave}_busca", placeholder="Texto em qualquer coluna exibida")
+    with col_tamanho:
+        tamanho_pagina = st.selectbox("Linhas por página", TAMANHOS_PAGINA, key=f"{chave}_tamanho")
+    
+    colunas = st.multiselect("Colunas exibidas", todas_colunas, default=colunas_padrao, key=f"{chave}_colunas")
+    if not colunas:
+        st.info("Selecione ao menos uma coluna para exibir.")
+        return
+    
+    col_ordem, col_sentido, col_pagina = st.columns([2, 1, 1])
+    with col_ordem:
+        coluna_ordem = st.selectbox(
+            "Ordenar por", [None] + colunas, key=f"{chave}_ordem",
+            format_func=lambda col: "(ordem original)" if col is None else col
+        )
+    with col_sentido:
+        crescente = st.radio("Sentido", ["Crescente", "Decrescente"], horizontal=True, key=f"{chave}_sentido") == "Crescente"
+    
+    # Total de páginas depende da busca (feita uma vez, reaproveitada na página); a página só é escolhida depois
+    posicoes = posicoes_busca(df, termo_busca, colunas)
+    total_linhas = len(posicoes)
+    num_paginas = max(1, -(-total_linhas // tamanho_pagina))
+    
+    # Sem max_value: o widget mantém a identidade quando o número de páginas muda
+    with col_pagina:
+        pagina = st.number_input("Página", min_value=1, step=1, key=f"{chave}_pagina")
+    pagina = min(int(pagina), num_paginas)
+    
+    fatia, total_linhas = selecionar_pagina(df, colunas, pagina, tamanho_pagina, coluna_ordem, crescente, posicoes)
+    
+    st.dataframe(fatia, use_container_width=True)
+    
+    inicio = (pagina - 1) * tamanho_pagina
+    st.caption(
+        f"Linhas {formatar_numero_br(min(inicio + 1, total_linhas), 0)}–{formatar_numero_br(inicio + len(fatia), 0)} "
+        f"de {formatar_numero_br(total_linhas, 0)} · página {pagina} de {num_paginas} · "
+        f"{len(colunas)} de {len(todas_colunas)} colunas"
+    )
 
-def calcular_area_censo_inventario(df_inv_filtered):
-    """Calcula área para método CENSO usando BD_inventário com desduplicação"""
-    try:
-        if len(df_inv_filtered) == 0:
-            return 0.0, "Censo (sem dados de inventário)"
-        
-        # Encontrar colunas necessárias
-        col_parc = encontrar_coluna(df_inv_filtered, ['cod_parc', 'codigo_parcela', 'parcela'])
-        col_area = encontrar_coluna(df_inv_filtered, ['area_ha', 'area'])
-        
-        if not col_parc or not col_area:
-            return 0.0, f"Censo - colunas não encontradas"
-        
-        # Trabalhar com cópia
-        df_trabalho = df_inv_filtered.copy()
-        
-        # Converter para string para garantir compatibilidade
-        df_trabalho[col_parc] = df_trabalho[col_parc].astype(str)
-        
-        # Verificar formato e extrair cod_prop e UT
-        amostra_parc = df_trabalho[col_parc].iloc[0] if len(df_trabalho) > 0 else ""
-        
-        if '_' in str(amostra_parc):
-            # Formato PROP_UT
-            df_trabalho['cod_prop_extraido'] = df_trabalho[col_parc].str.split('_').str[0]
-            df_trabalho['ut_extraido'] = df_trabalho[col_parc].str.split('_').str[1]
-        else:
-            # Tentar encontrar colunas separadas
-            col_prop = encontrar_coluna(df_trabalho, ['cod_prop', 'codigo_propriedade', 'propriedade'])
-            col_ut = encontrar_coluna(df_trabalho, ['ut', 'unidade_trabalho', 'UT'])
-            
-            if col_prop and col_ut:
-                df_trabalho['cod_prop_extraido'] = df_trabalho[col_prop].astype(str)
-                df_trabalho['ut_extraido'] = df_trabalho[col_ut].astype(str)
-            else:
-                return 0.0, "Censo - não foi possível identificar cod_prop e UT"
-        
-        # Desduplicar por UT - pegar apenas um registro por UT (já que área se repete)
-        df_unico = df_trabalho.groupby(['cod_prop_extraido', 'ut_extraido']).agg({
-            col_area: 'first',  # Pega o primeiro valor (todos são iguais)
-            col_parc: 'count'   # Conta quantos indivíduos tem na UT
-        }).reset_index()
-        
-        # Calcular área total (soma das áreas únicas de cada UT)
-        area_total = df_unico[col_area].sum()
-        num_uts = len(df_unico)
-        num_individuos = df_unico[col_parc].sum()
-        
-        metodo = f"Censo ({num_uts} UTs, {num_individuos} indivíduos)"
-        
-        return area_total, metodo
-        
-    except Exception as e:
-        st.warning(f"Erro no cálculo de área censo: {e}")
-        return 0.0, "Censo (erro)"
+# ============================================================================
+# EXPORTAÇÃO DE DADOS SOB DEMANDA
+# ============================================================================
 
-def calcular_area_parcelas_tradicional(df_inv_filtered):
-    """Calcula área para método PARCELAS usando fórmula tradicional"""
-    try:
-        if len(df_inv_filtered) == 0:
-            return 0.0, "Parcelas (sem dados)"
-        
-        # Encontrar coluna de parcela
-        col_parc = encontrar_coluna(df_inv_filtered, ['cod_parc', 'codigo_parcela', 'parcela'])
-        
-        if not col_parc:
-            return 0.0, "Parcelas (coluna não encontrada)"
-        
-        # Contar parcelas únicas
-        num_parcelas = df_inv_filtered[col_parc].nunique()
-        
-        if num_parcelas > 0:
-            # Fórmula tradicional: (número de parcelas × 100) / 10000
-            area_ha = (num_parcelas * 100) / 10000
-            return area_ha, f"Parcelas ({num_parcelas} parcelas × 100m²)"
-        else:
-            return 0.0, "Parcelas (sem dados válidos)"
-        
-    except Exception as e:
-        st.warning(f"Erro no cálculo de área parcelas: {e}")
-        return 0.0, "Parcelas (erro)"
+@cache_medido(st.cache_data(show_spinner=False, max_entries=16))
+def gerar_arquivo_exportacao(_df, chave_dados, formato):
+    """
+    Gera (em cache) o arquivo de exportação.
+    O DataFrame não é usado na chave do cache: a chave é (versão dos dados, estado dos filtros, formato).
+    """
+    return exportar_dataframe(_df, formato)
 
-def calcular_densidade_regenerantes(df_inv, df_carac):
-    """Calcula a densidade de indivíduos regenerantes seguindo critérios específicos"""
-    try:
-        # Verificar se há dados
-        if len(df_inv) == 0 or len(df_carac) == 0:
-            return 0.0
-            
-        # Aplicar filtros específicos
-        df_filtrado = df_inv.copy()
-        
-        # 1. Remover "Morto/Morta"
-        especies_col = encontrar_coluna(df_filtrado, ['especies', 'especie', 'species', 'sp'])
-        if especies_col:
-            antes_morto = len(df_filtrado)
-            df_filtrado = df_filtrado[~df_filtrado[especies_col].astype(str).str.contains('Morto|Morta', case=False, na=False)]
+def chave_estado(*partes):
+    """Resume um estado (filtros, propriedades...) em uma chave curta e estável"""
+    return hashlib.md5(repr(partes).encode('utf-8')).hexdigest()[:12]
 
-        # 2. Filtrar apenas origem "Nativa"
-        origem_col = encontrar_coluna(df_filtrado, ['origem', 'origin', 'procedencia'])
-        if origem_col:
-            antes_origem = len(df_filtrado)
-            df_filtrado = df_filtrado[df_filtrado[origem_col].astype(str).str.contains('Nativa', case=False, na=False)]
+@fragmento("Exportação")
+def botao_exportacao(df, rotulo, nome_arquivo, chave, estado):
+    """
+    Botão de exportação sob demanda:
+    - Nada é gerado até o usuário clicar em "Preparar"
+    - O arquivo fica em cache por (versão dos dados, estado dos filtros, formato),
+      então downloads repetidos não geram o arquivo de novo
+    """
+    chave_dados = (versao_sessao().chave, chave, estado)
+    chave_pronto = f"{chave}_pronto"
+    
+    col_formato, col_botao = st.columns([1, 2])
+    
+    with col_formato:
+        formato = st.selectbox("Formato", list(FORMATOS_EXPORTACAO), key=f"{chave}_formato", label_visibility="collapsed")
+    
+    pronto = st.session_state.get(chave_pronto) == (chave_dados, formato)
+    
+    with col_botao:
+        # O botão "Preparar" é substituído pelo de download no mesmo lugar
+        espaco_botao = st.empty()
+        
+        if not pronto and espaco_botao.button(f"⚙️ Preparar {rotulo}", key=f"{chave}_preparar"):
+            with st.spinner("Gerando arquivo..."):
+                gerar_arquivo_exportacao(df, chave_dados, formato)
+            st.session_state[chave_pronto] = (chave_dados, formato)
+            pronto = True
+        
+        if pronto:
+            extensao, mime = FORMATOS_EXPORTACAO[formato]
+            espaco_botao.download_button(
+                label=f"📥 Download {rotulo} ({formato})",
+                data=gerar_arquivo_exportacao(df, chave_dados, formato),
+                file_name=f"{nome_arquivo}.{extensao}",
+                mime=mime,
+                key=f"{chave}_download"
+            )
 
-        # 3. Filtrar idade "Jovem"
-        idade_col = encontrar_coluna(df_filtrado, ['idade', 'age', 'class_idade'])
-        if idade_col:
-            antes_idade = len(df_filtrado)
-            df_filtrado = df_filtrado[df_filtrado[idade_col].astype(str).str.contains('Jovem', case=False, na=False)]
+# Remover função main() daqui - será movida para o final
 
-        # 4. Filtrar altura > 0.5
-        ht_col = encontrar_coluna(df_filtrado, ['ht', 'altura', 'height', 'h'])
-        if ht_col:
-            antes_altura = len(df_filtrado)
-            alturas = pd.to_numeric(df_filtrado[ht_col], errors='coerce')
-            df_filtrado = df_filtrado[alturas >= 0.499]
+# ============================================================================
+# CÁLCULOS EM SEGUNDO PLANO
+# ============================================================================
 
-        if len(df_filtrado) == 0:
-            return 0.0
-        
-        # Contar indivíduos regenerantes válidos
-        plaqueta_col = encontrar_coluna(df_filtrado, ['plaqueta', 'plaq', 'id'])
-        if plaqueta_col:
-            num_regenerantes = df_filtrado[plaqueta_col].nunique()
-        else:
-            num_regenerantes = len(df_filtrado)
+CLASSES_DESENVOLVIMENTO = ["Plantula (< 0.5m)", "Jovem (DAP < 5cm)", "Adulto (DAP ≥ 5cm)"]
 
-        # Calcular área amostrada usando método adaptativo
-        area_ha, metodo = calcular_area_amostrada(df_carac, df_inv)
+@st.cache_resource(show_spinner=False)
+def executor_tarefas():
+    """Pool de threads dos cálculos em segundo plano, compartilhado pelas sessões do processo"""
+    return criar_executor()
 
-        if area_ha > 0:
-            densidade = num_regenerantes / area_ha
-            return densidade
-        
-        return 0.0
-    except Exception as e:
-        st.warning(f"Erro no cálculo de densidade: {e}")
-        return 0.0
+def agendador_sessao():
+    """Agendador de tarefas desta sessão (criado na primeira execução)"""
+    if 'agendador_tarefas' not in st.session_state:
+        st.session_state['agendador_tarefas'] = AgendadorTarefas(executor_tarefas())
+    return st.session_state['agendador_tarefas']
 
-def calcular_densidade_geral(df_inv, df_carac):
-    """Calcula a densidade geral de indivíduos com método híbrido para técnicas mistas"""
-    try:
-        # Verificar se há dados
-        if len(df_inv) == 0 or len(df_carac) == 0:
-            return 0.0, "Sem dados"
-            
-        # Encontrar coluna de plaqueta
-        plaqueta_col = encontrar_coluna(df_inv, ['plaqueta', 'plaq', 'id'])
-        
-        if not plaqueta_col:
-            return 0.0, "Coluna plaqueta não encontrada"
-        
-        # Contar total de indivíduos únicos
-        num_individuos = df_inv[plaqueta_col].nunique()
-        
-        # Calcular área amostrada usando método híbrido avançado
-        area_ha, metodo = calcular_area_amostrada(df_carac, df_inv)
+def resultado_calculo(agendador, nome):
+    """Resultado de um cálculo agendado; a espera entra no perfil como trecho 'tarefa'"""
+    with trecho(f"Aguardando: {nome}", 'tarefa'):
+        return agendador.resultado(nome)
+
+def agregar_estrutura_florestal(df_inv_filtered, ht_col):
+    """
+    Dados dos gráficos da aba Estrutura Florestal: (barras de frequência por faixa de altura
+    e classe de desenvolvimento, contagem por classe), cada um None se não houver alturas
+    """
+    if not ht_col or len(df_inv_filtered) == 0:
+        return None, None
+    
+    # Preparar dados com classificacao de desenvolvimento (só DAP e altura, sem copiar o inventário)
+    colunas_temp = [c for c in [encontrar_coluna(df_inv_filtered, ['dap', 'DAP', 'diametro'])] if c and c != ht_col]
+    df_temp = df_inv_filtered[colunas_temp].assign(altura_num=pd.to_numeric(df_inv_filtered[ht_col], errors='coerce'))
+    df_temp = df_temp.dropna(subset=['altura_num'])
+    if len(df_temp) == 0:
+        return None, None
+    
+    # Sistema simplificado de 3 classes
+    dap_col = encontrar_coluna(df_temp, ['dap', 'DAP', 'diametro'])
+    
+    def classificar_desenvolvimento(row):
+        altura = row['altura_num']
         
-        if area_ha > 0:
-            densidade = num_individuos / area_ha
-            
-            # Melhorar descrição do método para casos mistos
-            if "+" in metodo:
-                metodo_desc = f"Método Misto: {metodo}"
+        if altura < 0.5:
+            return "Plantula (< 0.5m)"
+        elif dap_col and pd.notna(row[dap_col]):
+            dap = row[dap_col]
+            if dap < 5:
+                return "Jovem (DAP < 5cm)"
             else:
-                metodo_desc = metodo
-                
-            return densidade, metodo_desc
+                return "Adulto (DAP ≥ 5cm)"
+        else:
+            return "Jovem (DAP < 5cm)"
+    
+    df_temp['classe_desenvolvimento'] = df_temp.apply(classificar_desenvolvimento, axis=1)
+    
+    # Criar bins de altura manualmente para ter controle total
+    min_altura = df_temp['altura_num'].min()
+    max_altura = df_temp['altura_num'].max()
+    bins = np.linspace(min_altura, max_altura, 11)  # 10 bins
+    if max_altura == min_altura:
+        bins = 10  # filtro com uma única altura: o pd.cut amplia a faixa (limites repetidos falham)
+
+    df_temp['faixa_altura'] = pd.cut(df_temp['altura_num'], bins=bins, precision=1)
+    
+    # Contar por faixa e classe
+    contagem = df_temp.groupby(['faixa_altura', 'classe_desenvolvimento'], observed=False).size().unstack(fill_value=0).reset_index()
+    
+    # Garantir que todas as classes existam
+    for classe in CLASSES_DESENVOLVIMENTO:
+        if classe not in contagem.columns:
+            contagem[classe] = 0
+    
+    # Converter faixa de altura para string para o eixo x
+    contagem['faixa_str'] = como_texto(contagem['faixa_altura'])
+    contagem['faixa_midpoint'] = contagem['faixa_altura'].apply(lambda x: x.mid if pd.notna(x) else 0)
+    
+    # Criar dados para grafico empilhado
+    dados_grafico = []
+    for _, row in contagem.iterrows():
+        for classe in CLASSES_DESENVOLVIMENTO:
+            if classe in contagem.columns:
+                dados_grafico.append({
+                    'Altura': row['faixa_midpoint'],
+                    'Faixa': f"{row['faixa_midpoint']:.1f}m",
+                    'Classe': classe,
+                    'Quantidade': row[classe]
+                })
+    
+    # Classes de todos os registros (altura ausente conta como plântula)
+    dap_col = encontrar_coluna(df_inv_filtered, ['dap', 'DAP', 'diametro'])
+    
+    def classificar_registro(row):
+        altura = row[ht_col] if pd.notna(row[ht_col]) else 0
         
-        return 0.0, metodo
-    except Exception as e:
-        return 0.0, f"Erro: {e}"
+        if altura < 0.5:
+            return "Plantula (< 0.5m)"
+        elif dap_col and pd.notna(row[dap_col]):
+            dap = row[dap_col]
+            if dap < 5:
+                return "Jovem (DAP < 5cm)"
+            else:
+                return "Adulto (DAP ≥ 5cm)"
+        else:
+            # Se nao tem DAP, assume jovem para plantas >= 0.5m
+            return "Jovem (DAP < 5cm)"
+    
+    classes = df_inv_filtered.apply(classificar_registro, axis=1)
+    classe_counts = classes.value_counts().reindex(CLASSES_DESENVOLVIMENTO, fill_value=0)
+    
+    return pd.DataFrame(dados_grafico), classe_counts
 
-# Remover função main() daqui - será movida para o final
+def agendar_calculos_pagina_principal(df_carac_filtered, df_inv_filtered, estado):
+    """
+    Agenda os cálculos pesados da página principal para o estado dos filtros, na ordem em que
+    aparecem na página: área amostrada e densidades (estatísticas descritivas e abas Estrutura
+    e Alertas) e os gráficos da aba Estrutura Florestal, que ficam prontos enquanto as seções de
+    cima são exibidas. Com um novo estado, as tarefas do anterior são canceladas.
+    """
+    agendador = agendador_sessao()
+    agendador.mudar_estado(estado)
+    motor = motor_ativo()
+    agendador.enviar('area_amostrada', motor.calcular_area_amostrada, df_carac_filtered, df_inv_filtered)
+    agendador.enviar('densidade_geral', motor.calcular_densidade_geral, df_inv_filtered, df_carac_filtered)
+    agendador.enviar('densidade_regenerantes', motor.calcular_densidade_regenerantes, df_inv_filtered, df_carac_filtered)
+    agendador.enviar('estrutura_florestal', agregar_estrutura_florestal, df_inv_filtered,
+                     encontrar_coluna(df_inv_filtered, ['ht', 'altura', 'height', 'h']))
+    return agendador
 
 def pagina_dashboard_principal(df_caracterizacao, df_inventario):
     # CSS customizado para melhor ajuste de texto
@@ -765,143 +1334,99 @@ def pagina_dashboard_principal(df_caracterizacao, df_inventario):
         O sistema detecta automaticamente o método baseado na variável 'tecnica_am' e aplica o cálculo adequado.
         """)
     
-    # Carregar dados uma vez para todas as páginas
-    df_caracterizacao, df_inventario = load_data()
-    
-    if df_caracterizacao is None or df_inventario is None:
-        st.error("Não foi possível carregar os dados. Verifique se os arquivos Excel estão no diretório correto.")
-        return
-    
     # Sidebar com filtros
-    st.sidebar.header("🔧 Filtros")
-    
-    # Filtros principais que afetam ambos os bancos
-    filtros_principais = {}
-    
-    # Filtro cod_prop
-    if 'cod_prop' in df_caracterizacao.columns:
-        cod_prop_options = ['Todos'] + list(df_caracterizacao['cod_prop'].dropna().unique())
-        filtros_principais['cod_prop'] = st.sidebar.selectbox(
-            "Código de Propriedade (cod_prop)",
-            cod_prop_options
-        )
-    
-    # Filtro tecnica
-    if 'tecnica' in df_caracterizacao.columns:
-        tecnica_options = ['Todos'] + list(df_caracterizacao['tecnica'].dropna().unique())
-        filtros_principais['tecnica'] = st.sidebar.selectbox(
-            "Técnica",
-            tecnica_options
-        )
-    
-    # Filtro UT
-    if 'UT' in df_caracterizacao.columns:
-        ut_options = ['Todos'] + list(df_caracterizacao['UT'].dropna().unique())
-        filtros_principais['UT'] = st.sidebar.selectbox(
-            "Unidade Territorial (UT)",
-            ut_options
-        )
-    
-    # Filtros específicos para inventário
-    st.sidebar.markdown("---")
-    st.sidebar.subheader("🔍 Filtros Específicos - Inventário")
-    
-    filtros_inventario = {}
-    
-    # Verificar se as colunas existem no inventário
-    inventario_cols = df_inventario.columns.tolist()
-    
-    # Filtro origem
-    origem_col = encontrar_coluna(df_inventario, ['origem'])
-    
-    if origem_col:
-        origem_options = ['Todos'] + list(df_inventario[origem_col].dropna().unique())
-        filtros_inventario['origem'] = st.sidebar.selectbox(
-            f"Origem ({origem_col})",
-            origem_options
-        )
-    
-    # Filtro regeneracao
-    regeneracao_col = encontrar_coluna(df_inventario, ['regeneracao', 'regenera'])
+    with trecho("Filtros (opções da barra lateral)"):
+        st.sidebar.header("🔧 Filtros")
+        
+        # Filtros principais que afetam ambos os bancos
+        filtros_principais = {}
+        
+        # Filtro cod_prop
+        if 'cod_prop' in df_caracterizacao.columns:
+            cod_prop_options = ['Todos'] + list(df_caracterizacao['cod_prop'].dropna().unique())
+            filtros_principais['cod_prop'] = st.sidebar.selectbox(
+                "Código de Propriedade (cod_prop)",
+                cod_prop_options
+            )
+        
+        # Filtro tecnica
+        if 'tecnica' in df_caracterizacao.columns:
+            tecnica_options = ['Todos'] + list(df_caracterizacao['tecnica'].dropna().unique())
+            filtros_principais['tecnica'] = st.sidebar.selectbox(
+                "Técnica",
+                tecnica_options
+            )
+        
+        # Filtro UT
+        if 'UT' in df_caracterizacao.columns:
+            ut_options = ['Todos'] + list(df_caracterizacao['UT'].dropna().unique())
+            filtros_principais['UT'] = st.sidebar.selectbox(
+                "Unidade Territorial (UT)",
+                ut_options
+            )
+        
+        # Filtros específicos para inventário
+        st.sidebar.markdown("---")
+        st.sidebar.subheader("🔍 Filtros Específicos - Inventário")
+        
+        filtros_inventario = {}
+        
+        # Filtro origem
+        origem_col = encontrar_coluna(df_inventario, COLUNAS_FILTRO_INVENTARIO['origem'])
+        
+        if origem_col:
+            origem_options = ['Todos'] + list(df_inventario[origem_col].dropna().unique())
+            filtros_inventario['origem'] = st.sidebar.selectbox(
+                f"Origem ({origem_col})",
+                origem_options
+            )
+        
+        # Filtro regeneracao
+        regeneracao_col = encontrar_coluna(df_inventario, COLUNAS_FILTRO_INVENTARIO['regeneracao'])
+        
+        if regeneracao_col:
+            regeneracao_options = ['Todos'] + list(df_inventario[regeneracao_col].dropna().unique())
+            filtros_inventario['regeneracao'] = st.sidebar.selectbox(
+                f"Regeneração ({regeneracao_col})",
+                regeneracao_options
+            )
+        
+        # Filtro idade
+        idade_col = encontrar_coluna(df_inventario, COLUNAS_FILTRO_INVENTARIO['idade'])
+        
+        if idade_col:
+            idade_options = ['Todos'] + list(df_inventario[idade_col].dropna().unique())
+            filtros_inventario['idade'] = st.sidebar.selectbox(
+                f"Idade ({idade_col})",
+                idade_options
+            )
+        
     
-    if regeneracao_col:
-        regeneracao_options = ['Todos'] + list(df_inventario[regeneracao_col].dropna().unique())
-        filtros_inventario['regeneracao'] = st.sidebar.selectbox(
-            f"Regeneração ({regeneracao_col})",
-            regeneracao_options
-        )
+    # Aplicar filtros (principais nos dois bancos, ligação via cod_parc e específicos do inventário)
+    df_carac_filtered, df_inv_filtered = motor_ativo().aplicar_filtros(
+        df_caracterizacao, df_inventario, filtros_principais, filtros_inventario
+    )
     
-    # Filtro idade
-    idade_col = encontrar_coluna(df_inventario, ['idade', 'age', 'class_idade'])
+    registrar_contexto_execucao(filtros={**filtros_principais, **filtros_inventario})
+    estado_filtros = chave_estado(sorted(filtros_principais.items()), sorted(filtros_inventario.items()))
     
-    if idade_col:
-        idade_options = ['Todos'] + list(df_inventario[idade_col].dropna().unique())
-        filtros_inventario['idade'] = st.sidebar.selectbox(
-            f"Idade ({idade_col})",
-            idade_options
-        )
+    # Área, densidades e gráficos das abas adiantados em segundo plano (cancelados se os filtros mudarem)
+    versao = versao_sessao()
+    calculos = agendar_calculos_pagina_principal(df_carac_filtered, df_inv_filtered, (versao.chave, estado_filtros))
     
-    # Aplicar filtros principais a ambos os bancos de dados
-    df_carac_filtered = df_caracterizacao.copy()
-    df_inv_filtered = df_inventario.copy()
-    
-    # Obter coluna cod_parc para ligação entre bancos
-    cod_parc_carac = encontrar_coluna(df_caracterizacao, ['cod_parc', 'parcela', 'plot'])
-    cod_parc_inv = encontrar_coluna(df_inventario, ['cod_parc', 'parcela', 'plot'])
-    
-    # Aplicar filtros que afetam ambos os bancos
-    for filtro, valor in filtros_principais.items():
-        if valor != 'Todos' and valor is not None:
-            # Filtrar BD_caracterizacao primeiro
-            if filtro in df_carac_filtered.columns:
-                # Comparação case-insensitive e tratamento de espaços
-                mask = df_carac_filtered[filtro].astype(str).str.strip().str.lower() == valor.strip().lower()
-                df_carac_filtered = df_carac_filtered[mask]
-            
-            # Aplicar também ao BD_inventario se a coluna existir
-            if filtro in df_inv_filtered.columns:
-                mask = df_inv_filtered[filtro].astype(str).str.strip().str.lower() == valor.strip().lower()
-                df_inv_filtered = df_inv_filtered[mask]
-    
-    # Sempre aplicar a conexão via cod_parc se ambas as colunas existem
-    if cod_parc_carac and cod_parc_inv and len(df_carac_filtered) > 0:
-        # Obter cod_parc válidos do BD_caracterizacao filtrado
-        cod_parc_validos = df_carac_filtered[cod_parc_carac].dropna().unique()
-        
-        if len(cod_parc_validos) > 0:
-            # Filtrar BD_inventario pelos cod_parc válidos
-            # Usar comparação mais robusta
-            df_inv_filtered = df_inv_filtered[
-                df_inv_filtered[cod_parc_inv].astype(str).str.strip().isin(
-                    [str(x).strip() for x in cod_parc_validos]
-                )
-            ]
-        else:
-            # Se não há cod_parc válidos, o inventário fica vazio
-            df_inv_filtered = df_inv_filtered.iloc[0:0]  # DataFrame vazio com mesma estrutura
-    
-    # Aplicar filtros específicos do inventário
-    for filtro, valor in filtros_inventario.items():
-        if valor != 'Todos' and valor is not None:
-            if filtro == 'origem' and origem_col:
-                mask = df_inv_filtered[origem_col].astype(str).str.strip().str.lower() == valor.strip().lower()
-                df_inv_filtered = df_inv_filtered[mask]
-            elif filtro == 'regeneracao' and regeneracao_col:
-                mask = df_inv_filtered[regeneracao_col].astype(str).str.strip().str.lower() == valor.strip().lower()
-                df_inv_filtered = df_inv_filtered[mask]
-            elif filtro == 'idade' and idade_col:
-                mask = df_inv_filtered[idade_col].astype(str).str.strip().str.lower() == valor.strip().lower()
-                df_inv_filtered = df_inv_filtered[mask]
+    # Contagens, médias e riquezas da combinação de filtros, somadas no cubo de agregados
+    resumo = consultar_cubo(obter_cubo(df_caracterizacao, df_inventario, versao.chave, not versao.selecao),
+                            filtros_principais, filtros_inventario)
     
     # Layout principal
     # Estatísticas descritivas
     col1, col2 = st.columns(2)
     
-    with col1:
-        show_descriptive_stats(df_carac_filtered, df_inv_filtered, "Caracterização")
+    with col1, trecho("Estatísticas descritivas: Caracterização"):
+        show_descriptive_stats(df_carac_filtered, df_inv_filtered, "Caracterização", resumo, calculos)
     
-    with col2:
-        show_descriptive_stats(df_carac_filtered, df_inv_filtered, "Inventário")
+    with col2, trecho("Estatísticas descritivas: Inventário"):
+        show_descriptive_stats(df_carac_filtered, df_inv_filtered, "Inventário", resumo, calculos)
     
     st.markdown("---")
     
@@ -931,8 +1456,11 @@ def pagina_dashboard_principal(df_caracterizacao, df_inventario):
         - **Definidas**: Por propriedade conforme contexto ecológico
         """)
     
-    # Chamar função para exibir indicadores de restauração
-    exibir_indicadores_restauracao(df_carac_filtered, df_inv_filtered)
+    # Chamar função para exibir indicadores de restauração (sem filtros, os da versão dos dados)
+    indicadores = None
+    if all(valor in ('Todos', None) for valor in [*filtros_principais.values(), *filtros_inventario.values()]):
+        indicadores = obter_indicadores_vista_padrao(df_caracterizacao, df_inventario, versao.chave, not versao.selecao)
+    exibir_indicadores_restauracao(df_carac_filtered, df_inv_filtered, indicadores)
     
     st.markdown("---")
     
@@ -952,7 +1480,7 @@ def pagina_dashboard_principal(df_caracterizacao, df_inventario):
     ])
     
     # ==================== ABA 1: ESTRUTURA FLORESTAL ====================
-    with tab1:
+    with tab1, trecho("Aba: Estrutura Florestal"):
         st.subheader("📏 Estrutura e Desenvolvimento Florestal")
         
         # Métricas principais de estrutura
@@ -961,98 +1489,39 @@ def pagina_dashboard_principal(df_caracterizacao, df_inventario):
         # Altura média e máxima
         ht_col = encontrar_coluna(df_inv_filtered, ['ht', 'altura', 'height', 'h'])
         if ht_col and len(df_inv_filtered) > 0:
-            alturas = pd.to_numeric(df_inv_filtered[ht_col], errors='coerce').dropna()
-            if len(alturas) > 0:
+            num_alturas, altura_media, altura_max = estatisticas_inventario(df_inv_filtered, ht_col, resumo)
+            if num_alturas > 0:
                 with col_str1:
-                    altura_media = alturas.mean()
                     st.metric("🌲 Altura Média", f"{altura_media:.2f} m")
                 
                 with col_str2:
-                    altura_max = alturas.max()
                     st.metric("🌲 Altura Máxima", f"{altura_max:.2f} m")
         
         # DAP médio (se disponível)
         dap_col = encontrar_coluna(df_inv_filtered, ['dap', 'diameter', 'dap_cm'])
         if dap_col and len(df_inv_filtered) > 0:
-            daps = pd.to_numeric(df_inv_filtered[dap_col], errors='coerce').dropna()
-            if len(daps) > 0:
+            num_daps, dap_medio, _ = estatisticas_inventario(df_inv_filtered, dap_col, resumo)
+            if num_daps > 0:
                 with col_str3:
-                    dap_medio = daps.mean()
                     st.metric("📐 DAP Médio", f"{dap_medio:.1f} cm")
         
         # Densidade por hectare
         if len(df_inv_filtered) > 0 and len(df_carac_filtered) > 0:
-            densidade, metodo = calcular_densidade_geral(df_inv_filtered, df_carac_filtered)
+            densidade = resultado_calculo(calculos, 'densidade_geral').densidade
             with col_str4:
                 st.metric("🌱 Densidade", formatar_densidade_br(densidade))
         
-        # Gráficos de estrutura florestal
+        # Gráficos de estrutura florestal (dados preparados em segundo plano)
         col_graf1, col_graf2 = st.columns(2)
         
-        # Distribuição de alturas por classes de desenvolvimento
         if ht_col and len(df_inv_filtered) > 0:
+            df_grafico, classe_counts = resultado_calculo(calculos, 'estrutura_florestal')
+            
+            # Distribuição de alturas por classes de desenvolvimento
             with col_graf1:
                 st.write("**Distribuição de Alturas por Classe**")
                 
-                # Preparar dados com classificacao de desenvolvimento
-                df_temp = df_inv_filtered.copy()
-                df_temp['altura_num'] = pd.to_numeric(df_temp[ht_col], errors='coerce')
-                df_temp = df_temp.dropna(subset=['altura_num'])
-                
-                if len(df_temp) > 0:
-                    # Sistema simplificado de 3 classes
-                    dap_col = encontrar_coluna(df_temp, ['dap', 'DAP', 'diametro'])
-                    
-                    def classificar_desenvolvimento(row):
-                        altura = row['altura_num']
-                        
-                        if altura < 0.5:
-                            return "Plantula (< 0.5m)"
-                        elif dap_col and pd.notna(row[dap_col]):
-                            dap = row[dap_col]
-                            if dap < 5:
-                                return "Jovem (DAP < 5cm)"
-                            else:
-                                return "Adulto (DAP ≥ 5cm)"
-                        else:
-                            return "Jovem (DAP < 5cm)"
-                    
-                    df_temp['classe_desenvolvimento'] = df_temp.apply(classificar_desenvolvimento, axis=1)
-                    
-                    # Criar bins de altura manualmente para ter controle total
-                    min_altura = df_temp['altura_num'].min()
-                    max_altura = df_temp['altura_num'].max()
-                    bins = np.linspace(min_altura, max_altura, 11)  # 10 bins
-                    
-                    df_temp['faixa_altura'] = pd.cut(df_temp['altura_num'], bins=bins, precision=1)
-                    
-                    # Contar por faixa e classe
-                    contagem = df_temp.groupby(['faixa_altura', 'classe_desenvolvimento']).size().unstack(fill_value=0).reset_index()
-                    
-                    # Garantir que todas as classes existam
-                    todas_classes = ["Plantula (< 0.5m)", "Jovem (DAP < 5cm)", "Adulto (DAP ≥ 5cm)"]
-                    for classe in todas_classes:
-                        if classe not in contagem.columns:
-                            contagem[classe] = 0
-                    
-                    # Converter faixa de altura para string para o eixo x
-                    contagem['faixa_str'] = contagem['faixa_altura'].astype(str)
-                    contagem['faixa_midpoint'] = contagem['faixa_altura'].apply(lambda x: x.mid if pd.notna(x) else 0)
-                    
-                    # Criar dados para grafico empilhado
-                    dados_grafico = []
-                    for _, row in contagem.iterrows():
-                        for classe in todas_classes:
-                            if classe in contagem.columns:
-                                dados_grafico.append({
-                                    'Altura': row['faixa_midpoint'],
-                                    'Faixa': f"{row['faixa_midpoint']:.1f}m",
-                                    'Classe': classe,
-                                    'Quantidade': row[classe]
-                                })
-                    
-                    df_grafico = pd.DataFrame(dados_grafico)
-                    
+                if df_grafico is not None:
                     # Criar grafico de barras empilhadas
                     fig_hist = px.bar(
                         df_grafico,
@@ -1066,7 +1535,7 @@ def pagina_dashboard_principal(df_caracterizacao, df_inventario):
                             "Jovem (DAP < 5cm)": "#228B22", 
                             "Adulto (DAP ≥ 5cm)": "#006400"
                         },
-                        category_orders={"Classe": todas_classes}
+                        category_orders={"Classe": CLASSES_DESENVOLVIMENTO}
                     )
                     
                     # Configurar para barras empilhadas
@@ -1084,40 +1553,13 @@ def pagina_dashboard_principal(df_caracterizacao, df_inventario):
                         xaxis_title="Altura (m)",
                         yaxis_title="Frequência"
                     )
-                    st.plotly_chart(fig_hist, use_container_width=True)
-        
-        # Classes de desenvolvimento
-        if ht_col and len(df_inv_filtered) > 0:
+                    exibir_grafico(fig_hist, use_container_width=True)
+            
+            # Classes de desenvolvimento
             with col_graf2:
                 st.write("**Classes de Desenvolvimento**")
-                alturas = pd.to_numeric(df_inv_filtered[ht_col], errors='coerce').dropna()
                 
-                if len(alturas) > 0:
-                    # Sistema simplificado de 3 classes
-                    dap_col = encontrar_coluna(df_inv_filtered, ['dap', 'DAP', 'diametro'])
-                    
-                    def classificar_desenvolvimento(row):
-                        altura = row[ht_col] if pd.notna(row[ht_col]) else 0
-                        
-                        if altura < 0.5:
-                            return "Plantula (< 0.5m)"
-                        elif dap_col and pd.notna(row[dap_col]):
-                            dap = row[dap_col]
-                            if dap < 5:
-                                return "Jovem (DAP < 5cm)"
-                            else:
-                                return "Adulto (DAP ≥ 5cm)"
-                        else:
-                            # Se nao tem DAP, assume jovem para plantas >= 0.5m
-                            return "Jovem (DAP < 5cm)"
-                    
-                    classes = df_inv_filtered.apply(classificar_desenvolvimento, axis=1)
-                    classe_counts = classes.value_counts()
-                    
-                    # Garantir ordem das classes
-                    ordem_classes = ["Plantula (< 0.5m)", "Jovem (DAP < 5cm)", "Adulto (DAP ≥ 5cm)"]
-                    classe_counts = classe_counts.reindex(ordem_classes, fill_value=0)
-                    
+                if classe_counts is not None:
                     # Grafico de pizza com cores verdes
                     fig_pie = px.pie(
                         values=classe_counts.values,
@@ -1126,10 +1568,10 @@ def pagina_dashboard_principal(df_caracterizacao, df_inventario):
                         color_discrete_sequence=['#90EE90', '#228B22', '#006400']
                     )
                     fig_pie.update_layout(height=300)
-                    st.plotly_chart(fig_pie, use_container_width=True)
+                    exibir_grafico(fig_pie, use_container_width=True)
     
     # ==================== ABA 2: SUCESSÃO ECOLÓGICA ====================
-    with tab2:
+    with tab2, trecho("Aba: Sucessão Ecológica"):
         st.subheader("🌿 Dinâmica Sucessional")
         
         # Métricas de sucessão
@@ -1139,7 +1581,7 @@ def pagina_dashboard_principal(df_caracterizacao, df_inventario):
         gsuc_col = encontrar_coluna(df_inv_filtered, ['g_suc', 'grupo_suc', 'sucessional'])
         if gsuc_col and len(df_inv_filtered) > 0:
             with col_suc1:
-                gsuc_dist = df_inv_filtered[gsuc_col].value_counts()
+                gsuc_dist = contar_valores(df_inv_filtered[gsuc_col])
                 if len(gsuc_dist) > 0:
                     principal_gsuc = gsuc_dist.index[0]
                     perc_principal = (gsuc_dist.iloc[0] / len(df_inv_filtered)) * 100
@@ -1152,7 +1594,7 @@ def pagina_dashboard_principal(df_caracterizacao, df_inventario):
         if especies_col and len(df_inv_filtered) > 0:
             with col_suc2:
                 # Aplicar filtros: remover "Morto" e altura > 0.5m
-                df_especies_validas = df_inv_filtered[~df_inv_filtered[especies_col].astype(str).str.contains('Morto|Morta', case=False, na=False)]
+                df_especies_validas = df_inv_filtered[~como_texto(df_inv_filtered[especies_col]).str.contains('Morto|Morta', case=False, na=False)]
                 
                 # Filtrar por altura > 0.5m se coluna disponivel
                 if ht_col:
@@ -1164,7 +1606,7 @@ def pagina_dashboard_principal(df_caracterizacao, df_inventario):
                 # Calcular riqueza de nativas
                 origem_col = encontrar_coluna(df_especies_validas, ['origem', 'origin', 'procedencia'])
                 if origem_col:
-                    df_nativas = df_especies_validas[df_especies_validas[origem_col].astype(str).str.contains('Nativa', case=False, na=False)]
+                    df_nativas = df_especies_validas[como_texto(df_especies_validas[origem_col]).str.contains('Nativa', case=False, na=False)]
                     riqueza_nativas = df_nativas[especies_col].nunique()
                     st.metric("🌺 Riqueza", f"{riqueza} ({riqueza_nativas} nat.)")
                 else:
@@ -1173,7 +1615,7 @@ def pagina_dashboard_principal(df_caracterizacao, df_inventario):
         # Diversidade Shannon
         if especies_col and len(df_inv_filtered) > 0:
             with col_suc3:
-                especies_count = df_inv_filtered[especies_col].value_counts()
+                especies_count = contar_valores(df_inv_filtered[especies_col])
                 if len(especies_count) > 1:
                     # Calculo de Shannon
                     total = especies_count.sum()
@@ -1183,7 +1625,7 @@ def pagina_dashboard_principal(df_caracterizacao, df_inventario):
         # Equitabilidade de Pielou
         if especies_col and len(df_inv_filtered) > 0:
             with col_suc4:
-                especies_count = df_inv_filtered[especies_col].value_counts()
+                especies_count = contar_valores(df_inv_filtered[especies_col])
                 if len(especies_count) > 1:
                     # Calculo de Shannon
                     total = especies_count.sum()
@@ -1200,7 +1642,7 @@ def pagina_dashboard_principal(df_caracterizacao, df_inventario):
         if gsuc_col and len(df_inv_filtered) > 0:
             with col_graf_suc1:
                 st.write("**Grupos Sucessionais**")
-                gsuc_dist = df_inv_filtered[gsuc_col].value_counts()
+                gsuc_dist = contar_valores(df_inv_filtered[gsuc_col])
                 
                 if len(gsuc_dist) > 0:
                     fig_gsuc = px.bar(
@@ -1211,14 +1653,14 @@ def pagina_dashboard_principal(df_caracterizacao, df_inventario):
                         color_discrete_sequence=['#32CD32']
                     )
                     fig_gsuc.update_layout(height=300)
-                    st.plotly_chart(fig_gsuc, use_container_width=True)
+                    exibir_grafico(fig_gsuc, use_container_width=True)
         
         # Origem das espécies
         origem_col = encontrar_coluna(df_inv_filtered, ['origem'])
         if origem_col and len(df_inv_filtered) > 0:
             with col_graf_suc2:
                 st.write("**Origem das Espécies**")
-                origem_dist = df_inv_filtered[origem_col].value_counts()
+                origem_dist = contar_valores(df_inv_filtered[origem_col])
                 
                 if len(origem_dist) > 0:
                     fig_origem = px.pie(
@@ -1228,10 +1670,10 @@ def pagina_dashboard_principal(df_caracterizacao, df_inventario):
                         color_discrete_sequence=['#228B22', '#FFD700', '#FF6347']
                     )
                     fig_origem.update_layout(height=300)
-                    st.plotly_chart(fig_origem, use_container_width=True)
+                    exibir_grafico(fig_origem, use_container_width=True)
     
     # ==================== ABA 3: INDICADORES AMBIENTAIS ====================
-    with tab3:
+    with tab3, trecho("Aba: Indicadores Ambientais"):
         st.subheader("🌍 Qualidade Ambiental")
         
         # Métricas ambientais do BD_caracterização
@@ -1343,10 +1785,10 @@ def pagina_dashboard_principal(df_caracterizacao, df_inventario):
                 height=400
             )
             
-            st.plotly_chart(fig_radar, use_container_width=True)
+            exibir_grafico(fig_radar, use_container_width=True)
     
     # ==================== ABA 4: ALERTAS E MONITORAMENTO ====================
-    with tab4:
+    with tab4, trecho("Aba: Alertas e Monitoramento"):
         st.subheader("⚠️ Sistema de Alertas")
         
         alertas = []
@@ -1375,7 +1817,7 @@ def pagina_dashboard_principal(df_caracterizacao, df_inventario):
         # Verificar alertas de diversidade
         if especies_col and len(df_inv_filtered) > 0:
             # Aplicar filtros: remover "Morto" e altura > 0.5m
-            df_especies_validas = df_inv_filtered[~df_inv_filtered[especies_col].astype(str).str.contains('Morto|Morta', case=False, na=False)]
+            df_especies_validas = df_inv_filtered[~como_texto(df_inv_filtered[especies_col]).str.contains('Morto|Morta', case=False, na=False)]
             ht_col_alert = encontrar_coluna(df_especies_validas, ['ht', 'altura', 'height'])
             
             if ht_col_alert:
@@ -1454,7 +1896,7 @@ def pagina_dashboard_principal(df_caracterizacao, df_inventario):
                 pesos_totais += 3
         
         # 2. DENSIDADE DE REGENERANTES (Peso 3)
-        densidade_regenerantes = calcular_densidade_regenerantes(df_inv_filtered, df_carac_filtered)
+        densidade_regenerantes = resultado_calculo(calculos, 'densidade_regenerantes').densidade
         if densidade_regenerantes > 0:
             # Meta: 1500 ind/ha para restauracao assistida
             score_densidade = min(100, (densidade_regenerantes / 1500) * 100)
@@ -1464,7 +1906,7 @@ def pagina_dashboard_principal(df_caracterizacao, df_inventario):
         # 3. RIQUEZA DE ESPECIES NATIVAS (Peso 3)
         if especies_col and len(df_inv_filtered) > 0:
             # Aplicar filtros: remover "Morto" e altura > 0.5m
-            df_especies_validas = df_inv_filtered[~df_inv_filtered[especies_col].astype(str).str.contains('Morto|Morta', case=False, na=False)]
+            df_especies_validas = df_inv_filtered[~como_texto(df_inv_filtered[especies_col]).str.contains('Morto|Morta', case=False, na=False)]
             ht_col_score = encontrar_coluna(df_especies_validas, ['ht', 'altura', 'height'])
             
             if ht_col_score:
@@ -1474,7 +1916,7 @@ def pagina_dashboard_principal(df_caracterizacao, df_inventario):
             # Contar apenas especies nativas
             origem_col = encontrar_coluna(df_especies_validas, ['origem', 'origin', 'procedencia'])
             if origem_col:
-                df_nativas = df_especies_validas[df_especies_validas[origem_col].astype(str).str.contains('Nativa', case=False, na=False)]
+                df_nativas = df_especies_validas[como_texto(df_especies_validas[origem_col]).str.contains('Nativa', case=False, na=False)]
                 riqueza_nativas = df_nativas[especies_col].nunique()
                 
                 # Obter meta específica da propriedade
@@ -1607,13 +2049,13 @@ def pagina_dashboard_principal(df_caracterizacao, df_inventario):
                     st.error(f"**Score Geral: {score_geral:.0f}/100** ❌ Atenção")
             
             with col_score2:
-                densidade_atual, _ = calcular_densidade_geral(df_inv_filtered, df_carac_filtered) if len(df_inv_filtered) > 0 and len(df_carac_filtered) > 0 else (0, "")
+                densidade_atual = resultado_calculo(calculos, 'densidade_geral').densidade
                 st.metric("🌱 Status Atual", formatar_densidade_br(densidade_atual))
             
             with col_score3:
                 if especies_col and len(df_inv_filtered) > 0:
                     # Aplicar filtros: remover "Morto" e altura > 0.5m
-                    df_especies_validas = df_inv_filtered[~df_inv_filtered[especies_col].astype(str).str.contains('Morto|Morta', case=False, na=False)]
+                    df_especies_validas = df_inv_filtered[~como_texto(df_inv_filtered[especies_col]).str.contains('Morto|Morta', case=False, na=False)]
                     ht_col_bio = encontrar_coluna(df_especies_validas, ['ht', 'altura', 'height'])
                     
                     if ht_col_bio:
@@ -1625,7 +2067,7 @@ def pagina_dashboard_principal(df_caracterizacao, df_inventario):
                     # Calcular riqueza de nativas
                     origem_col = encontrar_coluna(df_especies_validas, ['origem', 'origin', 'procedencia'])
                     if origem_col:
-                        df_nativas = df_especies_validas[df_especies_validas[origem_col].astype(str).str.contains('Nativa', case=False, na=False)]
+                        df_nativas = df_especies_validas[como_texto(df_especies_validas[origem_col]).str.contains('Nativa', case=False, na=False)]
                         riqueza_nativas = df_nativas[especies_col].nunique()
                         st.metric("🌺 Biodiversidade", f"{riqueza_atual} ({riqueza_nativas} nat.)")
                     else:
@@ -1638,27 +2080,134 @@ def pagina_dashboard_principal(df_caracterizacao, df_inventario):
         tab1, tab2 = st.tabs(["Caracterização", "Inventário"])
         
         with tab1:
-            st.dataframe(df_carac_filtered)
-            st.download_button(
-                label="📥 Download Caracterização Filtrada (CSV)",
-                data=df_carac_filtered.to_csv(index=False),
-                file_name="caracterizacao_filtrada.csv",
-                mime="text/csv"
-            )
+            exibir_tabela_paginada(df_carac_filtered, 'bruto_caracterizacao')
+            botao_exportacao(df_carac_filtered, "Caracterização Filtrada", "caracterizacao_filtrada",
+                             "exportar_caracterizacao", estado_filtros)
         
         with tab2:
-            st.dataframe(df_inv_filtered)
-            st.download_button(
-                label="📥 Download Inventário Filtrado (CSV)",
-                data=df_inv_filtered.to_csv(index=False),
-                file_name="inventario_filtrado.csv",
-                mime="text/csv"
-            )
+            exibir_tabela_paginada(df_inv_filtered, 'bruto_inventario')
+            botao_exportacao(df_inv_filtered, "Inventário Filtrado", "inventario_filtrado",
+                             "exportar_inventario", estado_filtros)
+
+# ============================================================================
+# GRÁFICOS DE DISPERSÃO PARA GRANDES VOLUMES
+# ============================================================================
+
+LIMITE_PONTOS_SVG = 5_000      # Até aqui: Scatter (SVG) com todos os pontos
+LIMITE_PONTOS_WEBGL = 50_000   # Até aqui: Scattergl com todos os pontos; acima, amostragem
+BINS_DENSIDADE = 100           # Grade usada na amostragem e no histograma 2D
+
+def _celulas_grade(x, y, bins):
+    """Retorna o índice da célula (grade bins × bins) de cada ponto e as bordas da grade"""
+    bordas_x = np.linspace(x.min(), x.max(), bins + 1)
+    bordas_y = np.linspace(y.min(), y.max(), bins + 1)
+    cx = np.clip(np.searchsorted(bordas_x, x, side='right') - 1, 0, bins - 1)
+    cy = np.clip(np.searchsorted(bordas_y, y, side='right') - 1, 0, bins - 1)
+    return cx * bins + cy, bordas_x, bordas_y
+
+def amostrar_preservando_densidade(x, y, max_pontos, bins=BINS_DENSIDADE, seed=0):
+    """
+    Reduz uma nuvem de pontos mantendo sua distribuição espacial:
+    - Divide o plano em uma grade bins × bins
+    - Toda célula ocupada mantém ao menos um ponto (extremos não somem)
+    - O restante da cota é dividido proporcionalmente à contagem de cada célula
+    Retorna os índices posicionais dos pontos mantidos.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    
+    if n <= max_pontos:
+        return np.arange(n)
+    
+    celulas, _, _ = _celulas_grade(x, y, bins)
+    contagens = np.bincount(celulas, minlength=bins * bins)
+    
+    # Cota por célula: 1 garantido + parcela proporcional do que sobrar
+    garantido = (contagens > 0).astype(int)
+    restante = max(max_pontos - garantido.sum(), 0)
+    cota = garantido + np.floor((contagens - garantido) * restante / max(n - garantido.sum(), 1)).astype(int)
+    
+    # Ordem aleatória dentro de cada célula, depois manter os primeiros `cota` de cada uma
+    rng = np.random.default_rng(seed)
+    embaralhado = rng.permutation(n)
+    ordem = embaralhado[np.argsort(celulas[embaralhado], kind='stable')]
+    celulas_ordenadas = celulas[ordem]
+    inicio_celula = np.concatenate([[0], np.cumsum(contagens)[:-1]])
+    posicao_na_celula = np.arange(n) - inicio_celula[celulas_ordenadas]
+    
+    return np.sort(ordem[posicao_na_celula < cota[celulas_ordenadas]])
+
+def agregar_densidade_2d(x, y, bins=BINS_DENSIDADE):
+    """Histograma 2D calculado no servidor: retorna (contagens, centros_x, centros_y)"""
+    contagens, bordas_x, bordas_y = np.histogram2d(np.asarray(x, dtype=float), np.asarray(y, dtype=float), bins=bins)
+    centros_x = (bordas_x[:-1] + bordas_x[1:]) / 2
+    centros_y = (bordas_y[:-1] + bordas_y[1:]) / 2
+    return contagens.T, centros_x, centros_y
+
+def grafico_dispersao_escalavel(x, y, titulo, rotulo_x, rotulo_y, max_pontos=LIMITE_PONTOS_WEBGL):
+    """
+    Cria gráfico de dispersão com payload limitado, independente do tamanho do inventário:
+    - Até LIMITE_PONTOS_SVG pontos: Scatter (SVG)
+    - Até `max_pontos`: Scattergl (WebGL) com todos os pontos
+    - Acima: Scattergl com amostra que preserva a densidade, sobre um
+      histograma 2D de todos os pontos (agregado no servidor)
+    
+    Retorna (figura, descrição dos pontos representados).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    validos = np.isfinite(x) & np.isfinite(y)
+    x, y = x[validos], y[validos]
+    total = len(x)
+    
+    fig = go.Figure()
+    
+    if total <= LIMITE_PONTOS_SVG:
+        fig.add_trace(go.Scatter(x=x, y=y, mode='markers', name='Indivíduos', opacity=0.6))
+        descricao = f"{formatar_numero_br(total, 0)} pontos (SVG)"
+    elif total <= max_pontos:
+        fig.add_trace(go.Scattergl(x=x, y=y, mode='markers', name='Indivíduos', opacity=0.5, marker=dict(size=4)))
+        descricao = f"{formatar_numero_br(total, 0)} pontos (WebGL)"
+    else:
+        contagens, centros_x, centros_y = agregar_densidade_2d(x, y)
+        fig.add_trace(go.Heatmap(
+            x=centros_x, y=centros_y, z=np.where(contagens > 0, contagens, np.nan),
+            colorscale='Greens', opacity=0.7, colorbar=dict(title='Indivíduos'), name='Densidade'
+        ))
+        
+        indices = amostrar_preservando_densidade(x, y, max_pontos)
+        fig.add_trace(go.Scattergl(
+            x=x[indices], y=y[indices], mode='markers', name='Amostra',
+            opacity=0.4, marker=dict(size=3, color='#1c83e1')
+        ))
+        descricao = (f"{formatar_numero_br(len(indices), 0)} de {formatar_numero_br(total, 0)} pontos "
+                     f"(amostra que preserva a densidade, WebGL) sobre histograma 2D de todos os pontos")
+    
+    fig.update_layout(title=titulo, xaxis_title=rotulo_x, yaxis_title=rotulo_y)
+    return fig, descricao
+
+# ============================================================================
+# FUNÇÕES DE AUDITORIA E VERIFICAÇÃO DE DADOS  
+# ============================================================================
+
+@cache_medido(st.cache_data(show_spinner=False))
+def obter_limites_iqr(_df, chave_dados, colunas, fator=FATOR_IQR):
+    """
+    Versão em cache de calcular_limites_iqr (reutilizada pela visão detalhada).
+    O DataFrame não é usado na chave do cache: a chave é (versão dos dados, banco), mais as colunas.
+    """
+    return calcular_limites_iqr(_df, list(colunas), fator)
 
-# ============================================================================
-# FUNÇÕES DE AUDITORIA E VERIFICAÇÃO DE DADOS  
-# ============================================================================
+@cache_medido(st.cache_data(show_spinner=False))
+def obter_outliers_por_grupo(_df, chave_dados, coluna, coluna_grupo, fator=FATOR_IQR):
+    """
+    Versão em cache de calcular_outliers_por_grupo.
+    O DataFrame não é usado na chave do cache: a chave é (versão dos dados, banco, agrupamento), mais as colunas.
+    """
+    return calcular_outliers_por_grupo(_df, coluna, coluna_grupo, fator)
 
+@fragmento("Outliers - Caracterização")
 def analisar_outliers_caracterizacao(df_caracterizacao):
     """Analisa outliers nos dados de caracterização"""
     st.write("#### 🔍 Análise de Outliers - BD_Caracterização")
@@ -1666,61 +2215,48 @@ def analisar_outliers_caracterizacao(df_caracterizacao):
     # Colunas numéricas para análise
     colunas_numericas = []
     for col in df_caracterizacao.columns:
-        if df_caracterizacao[col].dtype in ['float64', 'int64']:
+        if pd.api.types.is_numeric_dtype(df_caracterizacao[col]) and not pd.api.types.is_bool_dtype(df_caracterizacao[col]):
             colunas_numericas.append(col)
     
     if not colunas_numericas:
         st.warning("Nenhuma coluna numérica encontrada para análise de outliers.")
         return
     
-    # Análise de outliers usando IQR
-    outliers_data = []
-    
-    for col in colunas_numericas:
-        values = pd.to_numeric(df_caracterizacao[col], errors='coerce').dropna()
-        if len(values) > 0:
-            Q1 = values.quantile(0.25)
-            Q3 = values.quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
-            
-            outliers = values[(values < lower_bound) | (values > upper_bound)]
-            
-            if len(outliers) > 0:
-                outliers_data.append({
-                    'Coluna': col,
-                    'Num_Outliers': len(outliers),
-                    'Percentual': f"{(len(outliers)/len(values)*100):.1f}%",
-                    'Min_Outlier': outliers.min(),
-                    'Max_Outlier': outliers.max(),
-                    'Limite_Inferior': lower_bound,
-                    'Limite_Superior': upper_bound
-                })
+    # Análise de outliers usando IQR (todas as colunas de uma vez, em cache)
+    limites = obter_limites_iqr(df_caracterizacao, (versao_sessao().chave, 'caracterizacao'), tuple(colunas_numericas))
+    limites = limites[limites['n_validos'] > 0]
+    
+    mascara = marcar_outliers(df_caracterizacao, limites)
+    valores = converter_colunas_numericas(df_caracterizacao, limites.index)
+    valores_outliers = valores.where(mascara)
+    
+    num_outliers = mascara.sum()
+    df_outliers = pd.DataFrame({
+        'Coluna': limites.index,
+        'Num_Outliers': num_outliers.values,
+        'Percentual': (num_outliers / limites['n_validos'] * 100).map(lambda x: f"{x:.1f}%").values,
+        'Min_Outlier': valores_outliers.min().values,
+        'Max_Outlier': valores_outliers.max().values,
+        'Limite_Inferior': limites['limite_inferior'].values,
+        'Limite_Superior': limites['limite_superior'].values
+    })
+    df_outliers = df_outliers[df_outliers['Num_Outliers'] > 0].reset_index(drop=True)
     
-    if outliers_data:
-        df_outliers = pd.DataFrame(outliers_data)
+    if len(df_outliers) > 0:
         st.dataframe(df_outliers, use_container_width=True)
         
-        # Mostrar valores específicos se solicitado
+        # Mostrar valores específicos se solicitado (reaproveita a máscara já calculada)
         col_selecionada = st.selectbox("Ver outliers detalhados para:", [None] + df_outliers['Coluna'].tolist())
         
         if col_selecionada:
-            values = pd.to_numeric(df_caracterizacao[col_selecionada], errors='coerce').dropna()
-            Q1 = values.quantile(0.25)
-            Q3 = values.quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
-            
-            outliers_mask = (values < lower_bound) | (values > upper_bound)
-            outliers_df = df_caracterizacao[df_caracterizacao[col_selecionada].isin(values[outliers_mask])]
+            outliers_df = df_caracterizacao[mascara[col_selecionada]]
             
             st.write(f"**Outliers para {col_selecionada}:**")
             st.dataframe(outliers_df[[col for col in ['cod_prop', 'ut', col_selecionada] if col in outliers_df.columns]], use_container_width=True)
     else:
         st.success("✅ Nenhum outlier detectado nos dados de caracterização!")
 
+@fragmento("Outliers - Inventário")
 def analisar_outliers_inventario(df_inventario):
     """Analisa outliers nos dados de inventário"""
     st.write("#### 🔍 Análise de Outliers - BD_Inventário")
@@ -1731,39 +2267,86 @@ def analisar_outliers_inventario(df_inventario):
     
     for col_nome in colunas_possiveis:
         col_encontrada = encontrar_coluna(df_inventario, [col_nome])
-        if col_encontrada:
+        if col_encontrada and col_encontrada not in colunas_relevantes:
             colunas_relevantes.append(col_encontrada)
     
     if not colunas_relevantes:
         st.warning("Nenhuma coluna relevante encontrada para análise de outliers.")
         return
     
-    outliers_data = []
+    limites = obter_limites_iqr(df_inventario, (versao_sessao().chave, 'inventario'), tuple(colunas_relevantes))
+    limites = limites[limites['n_validos'] > 0]
+    
+    mascara = marcar_outliers(df_inventario, limites)
+    valores = converter_colunas_numericas(df_inventario, limites.index)
+    num_outliers = mascara.sum()
+    
+    df_outliers = pd.DataFrame({
+        'Coluna': limites.index,
+        'Num_Outliers': num_outliers.values,
+        'Percentual': (num_outliers / limites['n_validos'] * 100).map(lambda x: f"{x:.1f}%").values,
+        'Min_Valor': valores.min().values,
+        'Max_Valor': valores.max().values,
+        'Mediana': limites['Mediana'].values,
+        'Outliers_Detectados': (num_outliers > 0).values
+    })
+    st.dataframe(df_outliers, use_container_width=True)
     
-    for col in colunas_relevantes:
-        values = pd.to_numeric(df_inventario[col], errors='coerce').dropna()
-        if len(values) > 0:
-            Q1 = values.quantile(0.25)
-            Q3 = values.quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
-            
-            outliers = values[(values < lower_bound) | (values > upper_bound)]
-            
-            outliers_data.append({
-                'Coluna': col,
-                'Num_Outliers': len(outliers),
-                'Percentual': f"{(len(outliers)/len(values)*100):.1f}%",
-                'Min_Valor': values.min(),
-                'Max_Valor': values.max(),
-                'Mediana': values.median(),
-                'Outliers_Detectados': len(outliers) > 0
-            })
+    # Outliers por grupo: para ht/DAP o limite global mistura espécies de portes muito diferentes
+    col_ht = encontrar_coluna(df_inventario, ['ht', 'altura', 'height'])
+    col_dap = encontrar_coluna(df_inventario, ['dap', 'diameter'])
+    colunas_grupo = [col for col in [col_ht, col_dap] if col]
     
-    df_outliers = pd.DataFrame(outliers_data)
-    st.dataframe(df_outliers, use_container_width=True)
+    if not colunas_grupo:
+        return
+    
+    st.write("**🌳 Outliers por Grupo (limites IQR calculados dentro de cada grupo):**")
+    
+    col_especie = encontrar_coluna(df_inventario, ['especie', 'especies', 'species', 'sp'])
+    uts = extrair_ut_inventario(df_inventario)
+    
+    opcoes_grupo = []
+    if col_especie:
+        opcoes_grupo.append("Espécie")
+    if uts is not None:
+        opcoes_grupo.append("UT")
+    
+    if not opcoes_grupo:
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        agrupamento = st.radio("Agrupar por:", opcoes_grupo, horizontal=True, key="outliers_inv_agrupamento")
+    with col2:
+        coluna_analise = st.selectbox("Variável:", colunas_grupo, key="outliers_inv_variavel")
+    
+    if agrupamento == "Espécie":
+        df_grupo = df_inventario[[col_especie, coluna_analise]]
+        coluna_grupo = col_especie
+    else:
+        df_grupo = pd.DataFrame({'UT': uts, coluna_analise: df_inventario[coluna_analise]})
+        coluna_grupo = 'UT'
+    
+    limites_grupo, mascara_grupo = obter_outliers_por_grupo(df_grupo, (versao_sessao().chave, 'inventario', agrupamento),
+                                                             coluna_analise, coluna_grupo)
+    
+    total_grupo = int(mascara_grupo.sum())
+    grupos_avaliados = int(limites_grupo['limite_inferior'].notna().sum())
+    st.info(f"📊 {total_grupo} outliers em {grupos_avaliados} grupos avaliados "
+            f"(grupos com menos de {MIN_OBSERVACOES_GRUPO} registros são ignorados)")
+    
+    resumo_grupo = limites_grupo[limites_grupo['num_outliers'] > 0].sort_values('num_outliers', ascending=False)
+    if len(resumo_grupo) > 0:
+        resumo_grupo = resumo_grupo[['n_validos', 'num_outliers', 'Mediana', 'limite_inferior', 'limite_superior']].round(3)
+        st.dataframe(resumo_grupo.rename_axis(agrupamento).reset_index(), use_container_width=True)
+        
+        colunas_detalhe = [col for col in ['cod_parc', 'plaqueta', col_especie, coluna_analise] if col and col in df_inventario.columns]
+        st.write(f"**Registros outliers de {coluna_analise} por {agrupamento.lower()}:**")
+        st.dataframe(df_inventario.loc[mascara_grupo, list(dict.fromkeys(colunas_detalhe))], use_container_width=True)
+    else:
+        st.success(f"✅ Nenhum outlier de {coluna_analise} dentro dos grupos!")
 
+@fragmento("Consistência cod_prop ↔ UT")
 def verificar_consistencia_prop_ut(df_caracterizacao, df_inventario):
     """Verifica consistência entre cod_prop e UT nos dois bancos"""
     st.write("#### 🔗 Verificação de Consistência cod_prop ↔ UT")
@@ -1847,9 +2430,8 @@ def verificar_consistencia_areas(df_inventario):
         st.error("Colunas necessárias não encontradas")
         return
     
-    # Converter para análise
-    df_trabalho = df_inventario.copy()
-    df_trabalho[col_parc] = df_trabalho[col_parc].astype(str)
+    # Converter para análise (só parcela e área)
+    df_trabalho = pd.DataFrame({col_parc: como_texto(df_inventario[col_parc]), col_area: df_inventario[col_area]})
     
     # Extrair UT se formato for PROP_UT
     if '_' in str(df_trabalho[col_parc].iloc[0]) if len(df_trabalho) > 0 else False:
@@ -1859,7 +2441,7 @@ def verificar_consistencia_areas(df_inventario):
         grupo_col = col_parc
     
     # Agrupar e verificar consistência
-    verificacao = df_trabalho.groupby(grupo_col).agg({
+    verificacao = df_trabalho.groupby(grupo_col, observed=True).agg({
         col_area: ['min', 'max', 'count', 'nunique']
     }).round(8)
     
@@ -1889,31 +2471,15 @@ def analisar_especies(df_inventario):
     """Analisa nomes de espécies para padronização"""
     st.write("#### 🌿 Análise de Nomes de Espécies")
     
-    # Encontrar coluna de espécie
-    colunas_especies = ['especie', 'species', 'nome_cientifico', 'scientific_name', 'sp']
-    col_especie = encontrar_coluna(df_inventario, colunas_especies)
-    
-    if not col_especie:
-        st.error("Coluna de espécie não encontrada")
+    resultado = analisar_nomes_especies(df_inventario)
+    if resultado.erros:
+        exibir_mensagens(resultado)
         return
     
-    # Análise de espécies
-    especies = df_inventario[col_especie].dropna()
-    especies_unicas = especies.unique()
-    
-    st.write(f"**📊 Total de espécies únicas:** {len(especies_unicas)}")
-    
-    # Buscar possíveis duplicatas (nomes similares)
-    especies_suspeitas = []
-    especies_list = [str(esp).lower().strip() for esp in especies_unicas]
-    
-    for i, esp1 in enumerate(especies_list):
-        for j, esp2 in enumerate(especies_list[i+1:], i+1):
-            # Verificar similaridade simples
-            if len(esp1) > 3 and len(esp2) > 3:
-                if esp1 in esp2 or esp2 in esp1:
-                    especies_suspeitas.append((especies_unicas[i], especies_unicas[j]))
+    st.write(f"**📊 Total de espécies únicas:** {len(resultado.contagens)}")
     
+    # Possíveis duplicatas (um nome contido no outro)
+    especies_suspeitas = resultado.suspeitas
     if especies_suspeitas:
         st.warning(f"⚠️ {len(especies_suspeitas)} possíveis duplicatas encontradas:")
         
@@ -1925,12 +2491,10 @@ def analisar_especies(df_inventario):
     
     # Top espécies mais comuns
     st.write("**🔝 Top 15 Espécies Mais Comuns:**")
-    top_especies = especies.value_counts().head(15)
-    st.dataframe(top_especies.reset_index(), use_container_width=True)
+    st.dataframe(resultado.contagens.head(15).reset_index(), use_container_width=True)
     
     # Espécies com apenas 1 ocorrência
-    especies_raras = especies.value_counts()
-    especies_unicas_ocorrencia = especies_raras[especies_raras == 1]
+    especies_unicas_ocorrencia = resultado.contagens[resultado.contagens == 1]
     
     if len(especies_unicas_ocorrencia) > 0:
         st.write(f"**🔍 {len(especies_unicas_ocorrencia)} espécies com apenas 1 ocorrência:**")
@@ -1938,6 +2502,7 @@ def analisar_especies(df_inventario):
         if st.button("Ver espécies raras"):
             st.dataframe(especies_unicas_ocorrencia.reset_index(), use_container_width=True)
 
+@perfilado("Relatório de estatísticas", categoria='secao')
 def gerar_relatorio_estatisticas(df_caracterizacao, df_inventario):
     """Gera relatório completo de estatísticas"""
     st.write("#### 📊 Relatório Completo de Estatísticas")
@@ -2005,7 +2570,7 @@ def pagina_auditoria_dados(df_caracterizacao, df_inventario):
         **📏 Dados Dendrométricos:**
         - **Altura (ht)**: Outliers, valores impossíveis (< 0.1m ou > 80m)
         - **DAP**: Consistência com altura, relação hipsométrica
-        - **Relação H/DAP**: Detecção de valores biologicamente implausíveis
+        - **Relação H/DAP**: Modelos hipsométricos (Schumacher, Curtis) por espécie e propriedade, com resíduos extremos
         
         **📝 Qualidade de Strings:**
         - **Espaços extras**: Início, fim ou duplos no meio
@@ -2032,27 +2597,31 @@ def pagina_auditoria_dados(df_caracterizacao, df_inventario):
         "📊 Relatório Geral"
     ])
     
-    with tab1:
+    with tab1, trecho("Aba: Dados Dendrométricos"):
         st.subheader("🌳 Auditoria de Dados Dendrométricos")
         auditoria_dendrometricos(df_inventario)
     
-    with tab2:
+    with tab2, trecho("Aba: Qualidade de Strings"):
         st.subheader("📝 Auditoria de Qualidade de Strings")
         auditoria_strings(df_caracterizacao, df_inventario)
     
-    with tab3:
+    with tab3, trecho("Aba: Inconsistências Numéricas"):
         st.subheader("🔢 Auditoria de Inconsistências Numéricas")
         auditoria_numericos(df_caracterizacao, df_inventario)
     
-    with tab4:
+    with tab4, trecho("Aba: Validações Ecológicas"):
         st.subheader("🌿 Validações Ecológicas")
         auditoria_ecologicas(df_inventario)
     
-    with tab5:
+    with tab5, trecho("Aba: Relatório Geral"):
         st.subheader("📊 Relatório Geral de Auditoria")
+        verificar_consistencia_prop_ut(df_caracterizacao, df_inventario)
+        
+        st.markdown("---")
         if st.button("� Gerar Relatório Completo de Auditoria"):
             relatorio_auditoria_completo(df_caracterizacao, df_inventario)
 
+@fragmento("Auditoria - Dendrométricos")
 def auditoria_dendrometricos(df_inventario):
     """Auditoria específica para dados dendrométricos"""
     st.markdown("### 📏 Análise de Dados Dendrométricos")
@@ -2116,13 +2685,14 @@ def auditoria_dendrometricos(df_inventario):
         if st.button("🔍 Analisar Relação H/DAP"):
             analisar_relacao_hipsometrica(df_inventario, col_ht, col_dap)
 
+@fragmento("Auditoria - Strings")
 def auditoria_strings(df_caracterizacao, df_inventario):
     """Auditoria de qualidade de strings"""
     st.markdown("### 📝 Análise de Qualidade de Strings")
     
     # Combinar colunas de texto dos dois DataFrames
-    colunas_texto_carac = df_caracterizacao.select_dtypes(include=['object']).columns
-    colunas_texto_inv = df_inventario.select_dtypes(include=['object']).columns
+    colunas_texto_carac = df_caracterizacao.select_dtypes(include=['object', 'category']).columns
+    colunas_texto_inv = df_inventario.select_dtypes(include=['object', 'category']).columns
     
     problemas_encontrados = []
     
@@ -2138,21 +2708,22 @@ def auditoria_strings(df_caracterizacao, df_inventario):
             for col in colunas:
                 if col in df.columns:
                     # Espaços no início/fim
-                    espacos_inicio_fim = df[col].astype(str).apply(lambda x: x != x.strip()).sum()
+                    espacos_inicio_fim = como_texto(df[col]).apply(lambda x: x != x.strip()).sum()
                     
                     # Espaços duplos
-                    espacos_duplos = df[col].astype(str).str.contains('  ', na=False).sum()
+                    espacos_duplos = como_texto(df[col]).str.contains('  ', na=False).sum()
                     
                     if espacos_inicio_fim > 0 or espacos_duplos > 0:
                         st.warning(f"⚠️ {col}: {espacos_inicio_fim} com espaços início/fim, {espacos_duplos} com espaços duplos")
                         
                         # Mostrar exemplos
                         if espacos_inicio_fim > 0:
-                            exemplos = df[df[col].astype(str).apply(lambda x: x != x.strip())][col].head(3)
+                            exemplos = df[como_texto(df[col]).apply(lambda x: x != x.strip())][col].head(3)
                             st.code(f"Exemplos espaços início/fim: {list(exemplos)}")
                     else:
                         st.success(f"✅ {col}: OK")
 
+@fragmento("Auditoria - Numéricos")
 def auditoria_numericos(df_caracterizacao, df_inventario):
     """Auditoria de inconsistências numéricas"""
     st.markdown("### 🔢 Análise de Inconsistências Numéricas")
@@ -2173,7 +2744,15 @@ def auditoria_numericos(df_caracterizacao, df_inventario):
                 st.warning(f"⚠️ {areas_muito_grandes} registros com área > 10 ha (possível confusão ha/m²)")
             
             st.info(f"📊 Distribuição de áreas: min={areas.min():.6f}, max={areas.max():.6f}, mediana={areas.median():.6f}")
+    
+    # Outliers (IQR) em todas as colunas numéricas
+    st.markdown("---")
+    analisar_outliers_caracterizacao(df_caracterizacao)
+    
+    st.markdown("---")
+    analisar_outliers_inventario(df_inventario)
 
+@fragmento("Auditoria - Ecológicas")
 def auditoria_ecologicas(df_inventario):
     """Validações ecológicas específicas"""
     st.markdown("### 🌿 Validações Ecológicas")
@@ -2184,7 +2763,7 @@ def auditoria_ecologicas(df_inventario):
     if col_especie and st.button("🔍 Analisar Nomes de Espécies"):
         st.write("#### Análise de Nomes de Espécies")
         
-        especies = df_inventario[col_especie].dropna().astype(str)
+        especies = como_texto(df_inventario[col_especie].dropna())
         
         # Problemas comuns
         problemas = {
@@ -2208,7 +2787,7 @@ def auditoria_ecologicas(df_inventario):
         
         with col2:
             st.write("**Top 10 Espécies:**")
-            top_especies = especies.value_counts().head(10)
+            top_especies = contar_valores(especies).head(10)
             st.dataframe(top_especies.reset_index())
 
 def analisar_alturas(df_inventario, col_ht):
@@ -2247,10 +2826,8 @@ def analisar_alturas(df_inventario, col_ht):
             st.success(f"✅ {problema}: OK")
     
     # Mostrar outliers se existirem
-    Q1 = alturas.quantile(0.25)
-    Q3 = alturas.quantile(0.75)
-    IQR = Q3 - Q1
-    outliers = alturas[(alturas < Q1 - 1.5*IQR) | (alturas > Q3 + 1.5*IQR)]
+    limites = obter_limites_iqr(df_inventario, (versao_sessao().chave, 'inventario'), (col_ht,))
+    outliers = alturas[marcar_outliers(alturas.to_frame(col_ht), limites)[col_ht]]
     
     if len(outliers) > 0:
         st.warning(f"⚠️ {len(outliers)} outliers detectados (método IQR)")
@@ -2301,6 +2878,50 @@ def analisar_dap(df_inventario, col_dap):
         else:
             st.success(f"✅ {problema}: OK")
 
+@cache_medido(st.cache_data(show_spinner=False))
+def obter_ajustes_hipsometricos(_df, chave_dados, col_ht, col_dap, col_grupo):
+    """
+    Versão em cache de ajustar_modelos_hipsometricos.
+    O DataFrame não é usado na chave do cache: a chave é (versão dos dados, agrupamento), mais as colunas.
+    """
+    return ajustar_modelos_hipsometricos(_df, col_ht, col_dap, col_grupo)
+
+def exibir_ajustes_hipsometricos(df_inventario, ajustes, rotulo_grupo, col_especie):
+    """Exibe comparação de modelos, coeficientes e indivíduos com resíduo extremo"""
+    comparacao = pd.DataFrame([{
+        'Modelo': modelo,
+        'Equação': MODELOS_HIPSOMETRICOS[modelo][0],
+        'Grupos com ajuste próprio': int((coef['ajuste'] == 'Próprio').sum()),
+        'Syx mediano (ln)': coef['syx'].median(),
+        'R² mediano': coef['r2'].median(),
+        'Indivíduos extremos': int(residuos['extremo'].sum())
+    } for modelo, (coef, residuos) in ajustes.items()])
+    st.dataframe(comparacao.round(4), use_container_width=True)
+    
+    # Detalhar o modelo de menor erro padrão mediano
+    melhor_modelo = comparacao.sort_values('Syx mediano (ln)').iloc[0]['Modelo']
+    coeficientes, residuos = ajustes[melhor_modelo]
+    st.write(f"**Coeficientes por {rotulo_grupo.lower()} - {melhor_modelo} ({MODELOS_HIPSOMETRICOS[melhor_modelo][0]}):**")
+    
+    tabela = coeficientes.rename(columns={
+        'n': 'N', 'a': 'a', 'b': 'b', 'r2': 'R²', 'syx': 'Syx (ln)', 'ajuste': 'Ajuste', 'num_extremos': 'Extremos'
+    }).rename_axis(rotulo_grupo).reset_index()
+    st.dataframe(tabela.round(4), use_container_width=True)
+    
+    extremos = residuos[residuos['extremo']]
+    if len(extremos) > 0:
+        st.warning(f"⚠️ {len(extremos)} indivíduos com |resíduo padronizado| > {LIMITE_RESIDUO_PADRONIZADO:.0f} "
+                   f"({len(extremos)/len(residuos)*100:.1f}%) para a própria {rotulo_grupo.lower()}")
+        
+        colunas_id = [col for col in ['cod_parc', 'plaqueta', col_especie] if col and col in df_inventario.columns]
+        detalhe = df_inventario.loc[extremos.index, list(dict.fromkeys(colunas_id))].join(
+            extremos[['grupo', 'altura', 'dap', 'altura_estimada', 'residuo_padronizado']].round(3)
+        )
+        st.dataframe(detalhe.sort_values('residuo_padronizado', key=np.abs, ascending=False), use_container_width=True)
+    else:
+        st.success(f"✅ Nenhum indivíduo com resíduo extremo para a própria {rotulo_grupo.lower()}")
+
+@perfilado("Relação hipsométrica", categoria='secao')
 def analisar_relacao_hipsometrica(df_inventario, col_ht, col_dap):
     """Análise da relação hipsométrica H/DAP"""
     # Filtrar dados válidos
@@ -2310,15 +2931,15 @@ def analisar_relacao_hipsometrica(df_inventario, col_ht, col_dap):
         st.error("Nenhum par H/DAP válido encontrado")
         return
     
-    alturas = pd.to_numeric(dados_validos[col_ht], errors='coerce')
-    daps = pd.to_numeric(dados_validos[col_dap], errors='coerce')
+    alturas = pd.to_numeric(df_inventario[col_ht], errors='coerce')
+    daps = pd.to_numeric(df_inventario[col_dap], errors='coerce')
     
     # Ajustar unidade do DAP se necessário
     if daps.median() > 100:
         daps = daps / 10  # Converter mm para cm
     
     # Calcular relação H/DAP
-    relacao_h_dap = alturas / daps
+    relacao_h_dap = (alturas / daps)[dados_validos.index]
     
     # Estatísticas da relação
     col1, col2, col3, col4 = st.columns(4)
@@ -2332,36 +2953,53 @@ def analisar_relacao_hipsometrica(df_inventario, col_ht, col_dap):
     with col4:
         st.metric("Pares Analisados", len(dados_validos))
     
-    # Valores biologicamente implausíveis
-    problemas = {
-        "H/DAP < 0.3": (relacao_h_dap < 0.3).sum(),  # Muito baixo
-        "H/DAP > 3.0": (relacao_h_dap > 3.0).sum(),  # Muito alto 
-        "H/DAP > 5.0": (relacao_h_dap > 5.0).sum()   # Extremamente alto
-    }
-    
-    st.write("**🌳 Relações Biologicamente Suspeitas:**")
-    for problema, count in problemas.items():
-        if count > 0:
-            st.warning(f"⚠️ {problema}: {count} registros ({count/len(dados_validos)*100:.1f}%)")
-        else:
-            st.success(f"✅ {problema}: OK")
+    # Modelos hipsométricos por espécie e por propriedade
+    st.write("**🌳 Modelos Hipsométricos (resíduos avaliados dentro de cada grupo):**")
     
-    # Sugestão de equação hipsométrica
-    if st.button("📊 Calcular Equação Hipsométrica"):
-        import plotly.express as px
+    col_especie = encontrar_coluna(df_inventario, ['especie', 'especies', 'species', 'sp'])
+    propriedades = extrair_prop_inventario(df_inventario)
+    
+    df_hipsometria = pd.DataFrame({'ht': alturas, 'dap': daps})
+    agrupamentos = []
+    if col_especie:
+        df_hipsometria['especie'] = df_inventario[col_especie]
+        agrupamentos.append(('Espécie', 'especie'))
+    if propriedades is not None:
+        df_hipsometria['propriedade'] = propriedades
+        agrupamentos.append(('Propriedade', 'propriedade'))
+    
+    abas = st.tabs([f"Por {rotulo}" for rotulo, _ in agrupamentos] + ["📈 Gráfico"])
+    
+    for aba, (rotulo, coluna_grupo) in zip(abas, agrupamentos):
+        with aba:
+            ajustes = obter_ajustes_hipsometricos(df_hipsometria[['ht', 'dap', coluna_grupo]], (versao_sessao().chave, coluna_grupo),
+                                                  'ht', 'dap', coluna_grupo)
+            exibir_ajustes_hipsometricos(df_inventario, ajustes, rotulo, col_especie)
+    
+    with abas[-1]:
+        # Correlação no espaço linearizado e curvas globais de cada modelo
+        validos = (alturas > 0) & (daps > 0)
+        correlacao = np.log(alturas[validos]).corr(np.log(daps[validos]))
+        st.info(f"📈 Correlação ln(H) vs ln(DAP): {correlacao:.3f}")
+        
+        fig, descricao_pontos = grafico_dispersao_escalavel(
+            daps[validos], alturas[validos],
+            titulo="Relação Hipsométrica (Altura vs DAP)",
+            rotulo_x='DAP (cm)', rotulo_y='Altura (m)'
+        )
         
-        # Correlação
-        correlacao = alturas.corr(daps)
-        st.info(f"📈 Correlação H vs DAP: {correlacao:.3f}")
+        grade_dap = np.linspace(daps[validos].min(), daps[validos].max(), 200)
+        grupo_unico = pd.Series('Global', index=alturas.index)
+        for modelo, (equacao, transformacao) in MODELOS_HIPSOMETRICOS.items():
+            coef, _ = ajustar_modelo_hipsometrico(alturas, daps, grupo_unico, modelo)
+            a, b = coef.iloc[0]['a'], coef.iloc[0]['b']
+            fig.add_trace(go.Scatter(
+                x=grade_dap, y=np.exp(a + b * transformacao(grade_dap)),
+                mode='lines', name=f"{modelo}: {equacao}"
+            ))
         
-        # Gráfico de dispersão
-        fig = px.scatter(
-            x=daps, y=alturas,
-            title="Relação Hipsométrica (Altura vs DAP)",
-            labels={'x': 'DAP (cm)', 'y': 'Altura (m)'},
-            trendline="ols"
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        exibir_grafico(fig, use_container_width=True)
+        st.caption(f"📍 Pontos representados: {descricao_pontos}")
 
 def relatorio_auditoria_completo(df_caracterizacao, df_inventario):
     """Gera relatório completo de auditoria"""
@@ -2399,36 +3037,12 @@ def pagina_analises_avancadas(df_caracterizacao, df_inventario):
             )
         else:
             propriedades_selecionadas = []
-        
-        # Aplicar filtros
-        if propriedades_selecionadas:
-            df_carac_filtrado = df_caracterizacao[df_caracterizacao['cod_prop'].isin(propriedades_selecionadas)]
-            
-            # Filtrar inventário DIRETAMENTE por cod_prop se a coluna existir
-            if 'cod_prop' in df_inventario.columns:
-                df_inv_filtrado = df_inventario[df_inventario['cod_prop'].isin(propriedades_selecionadas)]
-            else:
-                # Fallback: filtrar baseado nas propriedades selecionadas via cod_parc
-                cod_parc_col = encontrar_coluna(df_inventario, ['cod_parc', 'parcela', 'plot'])
-                if cod_parc_col:
-                    # Se existe coluna cod_parc na caracterização, usar ela para filtrar
-                    if 'cod_parc' in df_carac_filtrado.columns:
-                        parcelas_validas = df_carac_filtrado['cod_parc'].dropna().unique()
-                        df_inv_filtrado = df_inventario[df_inventario[cod_parc_col].astype(str).isin([str(p) for p in parcelas_validas])]
-                    else:
-                        # Se não tem cod_parc na caracterização, tentar filtrar por propriedade diretamente no inventário
-                        # Extrair propriedade do cod_parc do inventário (formato PROP_UT)
-                        df_inv_temp = df_inventario.copy()
-                        df_inv_temp['prop_extraida'] = df_inv_temp[cod_parc_col].astype(str).str.split('_').str[0]
-                        df_inv_filtrado = df_inv_temp[df_inv_temp['prop_extraida'].isin([str(p) for p in propriedades_selecionadas])]
-                        if 'prop_extraida' in df_inv_filtrado.columns:
-                            df_inv_filtrado = df_inv_filtrado.drop('prop_extraida', axis=1)
-                else:
-                    # Se não encontrou cod_parc, usar todos os dados do inventário
-                    df_inv_filtrado = df_inventario
-        else:
-            df_carac_filtrado = df_caracterizacao
-            df_inv_filtrado = df_inventario
+    
+    # Aplicar filtros
+    df_carac_filtrado, df_inv_filtrado = filtrar_por_propriedades(
+        df_caracterizacao, df_inventario, propriedades_selecionadas
+    )
+    registrar_contexto_execucao(filtros={'propriedades': ', '.join(map(str, propriedades_selecionadas))})
     
     # Abas principais
     tab1, tab2, tab3 = st.tabs([
@@ -2438,7 +3052,7 @@ def pagina_analises_avancadas(df_caracterizacao, df_inventario):
     ])
     
     # ==================== ABA 1: FITOSSOCIOLOGIA ====================
-    with tab1:
+    with tab1, trecho("Aba: Análise Fitossociológica"):
         st.subheader("🌿 Análise Fitossociológica")
         
         # Informações sobre metodologia
@@ -2471,17 +3085,8 @@ def pagina_analises_avancadas(df_caracterizacao, df_inventario):
             st.warning("⚠️ Nenhum dado de inventário disponível com os filtros selecionados.")
             return
         
-        # Detectar técnica de amostragem
-        tecnica_col = encontrar_coluna(df_carac_filtrado, ['tecnica_am', 'tecnica', 'metodo'])
-        
-        if tecnica_col and len(df_carac_filtrado) > 0:
-            tecnicas_presentes = df_carac_filtrado[tecnica_col].str.lower().unique()
-            tem_censo = any('censo' in str(t) for t in tecnicas_presentes)
-            tem_parcelas = any('parcela' in str(t) or 'plot' in str(t) for t in tecnicas_presentes)
-        else:
-            # Fallback: assumir parcelas
-            tem_censo = False
-            tem_parcelas = True
+        # Detectar técnica de amostragem (sem coluna de técnica, assume parcelas)
+        tecnica_col, tem_censo, tem_parcelas = detectar_tecnicas(df_carac_filtrado)
         
         # Mostrar informações sobre as técnicas detectadas
         col_info1, col_info2 = st.columns(2)
@@ -2502,32 +3107,31 @@ def pagina_analises_avancadas(df_caracterizacao, df_inventario):
             # Análise unificada para uma propriedade
             if tem_censo and not tem_parcelas:
                 st.markdown("### 🔬 Análise Fitossociológica - Método CENSO")
-                calcular_fitossociologia_censo(df_inv_filtrado, df_carac_filtrado)
+                exibir_fitossociologia(df_inv_filtrado, df_carac_filtrado, 'censo')
                 
             elif tem_parcelas and not tem_censo:
                 st.markdown("### 📏 Análise Fitossociológica - Método PARCELAS")
-                calcular_fitossociologia_parcelas(df_inv_filtrado, df_carac_filtrado)
+                exibir_fitossociologia(df_inv_filtrado, df_carac_filtrado, 'parcelas')
                 
             elif tem_censo and tem_parcelas:
                 st.markdown("### 🔀 Análise Fitossociológica - Métodos MISTOS")
                 
                 # Separar dados por técnica
-                dados_censo = df_carac_filtrado[df_carac_filtrado[tecnica_col].str.contains('censo', case=False, na=False)]
-                dados_parcelas = df_carac_filtrado[~df_carac_filtrado[tecnica_col].str.contains('censo', case=False, na=False)]
+                dados_censo, dados_parcelas = separar_por_tecnica(df_carac_filtrado, tecnica_col)
                 
                 if len(dados_censo) > 0:
                     st.markdown("#### 🔬 Área de Censo:")
                     props_censo = dados_censo['cod_prop'].unique() if 'cod_prop' in dados_censo.columns else []
                     df_inv_censo = filtrar_inventario_por_propriedades(df_inv_filtrado, props_censo) if len(props_censo) > 0 else pd.DataFrame()
                     if len(df_inv_censo) > 0:
-                        calcular_fitossociologia_censo(df_inv_censo, dados_censo)
+                        exibir_fitossociologia(df_inv_censo, dados_censo, 'censo')
                 
                 if len(dados_parcelas) > 0:
                     st.markdown("#### 📏 Área de Parcelas:")
                     props_parcelas = dados_parcelas['cod_prop'].unique() if 'cod_prop' in dados_parcelas.columns else []
                     df_inv_parcelas = filtrar_inventario_por_propriedades(df_inv_filtrado, props_parcelas) if len(props_parcelas) > 0 else pd.DataFrame()
                     if len(df_inv_parcelas) > 0:
-                        calcular_fitossociologia_parcelas(df_inv_parcelas, dados_parcelas)
+                        exibir_fitossociologia(df_inv_parcelas, dados_parcelas, 'parcelas')
         
         else:
             # Análise separada para múltiplas propriedades
@@ -2537,471 +3141,171 @@ def pagina_analises_avancadas(df_caracterizacao, df_inventario):
             if tem_censo:
                 st.markdown("#### 🔬 Propriedades com Método CENSO")
                 propriedades_censo = analisar_propriedades_por_tecnica(
-                    df_inv_filtrado, df_carac_filtrado, propriedades_selecionadas, 'censo'
+                    df_carac_filtrado, propriedades_selecionadas, 'censo'
                 )
                 if len(propriedades_censo) > 0:
                     for prop in propriedades_censo:
                         with st.expander(f"🔍 Propriedade {prop} - CENSO"):
                             df_prop = filtrar_inventario_por_propriedades(df_inv_filtrado, [prop])
                             df_carac_prop = df_carac_filtrado[df_carac_filtrado['cod_prop'] == prop] if 'cod_prop' in df_carac_filtrado.columns else df_carac_filtrado
-                            calcular_fitossociologia_censo(df_prop, df_carac_prop)
+                            exibir_fitossociologia(df_prop, df_carac_prop, 'censo')
             
             if tem_parcelas:
                 st.markdown("#### 📏 Propriedades com Método PARCELAS")
                 propriedades_parcelas = analisar_propriedades_por_tecnica(
-                    df_inv_filtrado, df_carac_filtrado, propriedades_selecionadas, 'parcelas'
+                    df_carac_filtrado, propriedades_selecionadas, 'parcelas'
                 )
                 if len(propriedades_parcelas) > 0:
                     for prop in propriedades_parcelas:
                         with st.expander(f"📐 Propriedade {prop} - PARCELAS"):
                             df_prop = filtrar_inventario_por_propriedades(df_inv_filtrado, [prop])
                             df_carac_prop = df_carac_filtrado[df_carac_filtrado['cod_prop'] == prop] if 'cod_prop' in df_carac_filtrado.columns else df_carac_filtrado
-                            calcular_fitossociologia_parcelas(df_prop, df_carac_prop)
+                            exibir_fitossociologia(df_prop, df_carac_prop, 'parcelas')
     
     # ==================== ABA 2: ÍNDICES DE DIVERSIDADE ====================
-    with tab2:
+    with tab2, trecho("Aba: Índices de Diversidade"):
         st.subheader("📊 Índices de Diversidade")
-        calcular_indices_diversidade(df_inv_filtrado, propriedades_selecionadas)
+        exibir_indices_diversidade(df_inv_filtrado)
     
     # ==================== ABA 3: VISUALIZAÇÕES AVANÇADAS ====================
-    with tab3:
+    with tab3, trecho("Aba: Visualizações Avançadas"):
         st.subheader("📈 Visualizações Avançadas")
         gerar_visualizacoes_avancadas(df_inv_filtrado, df_carac_filtrado)
 
-def calcular_fitossociologia_censo(df_inventario, df_caracterizacao):
-    """Calcula parâmetros fitossociológicos para método de censo"""
-    try:
-        if len(df_inventario) == 0:
-            st.warning("⚠️ Nenhum dado de inventário disponível")
-            return
-        
-        # Encontrar colunas necessárias
-        col_especie = encontrar_coluna(df_inventario, ['especie', 'especies', 'species', 'sp'])
-        col_dap = encontrar_coluna(df_inventario, ['dap', 'dap_cm', 'diameter'])
-        col_plaqueta = encontrar_coluna(df_inventario, ['plaqueta', 'plaq', 'id'])
-        
-        if not col_especie:
-            st.error("❌ Coluna de espécie não encontrada")
-            return
-        
-        # Preparar dados
-        df_trabalho = df_inventario.copy()
-        
-        # Calcular área basal se DAP disponível
-        area_basal_disponivel = False
-        if col_dap:
-            daps = pd.to_numeric(df_trabalho[col_dap], errors='coerce')
-            
-            # Ajustar unidade se necessário (mm para cm)
-            if daps.median() > 100:
-                daps = daps / 10
-            
-            # Calcular área basal em m² (π * (DAP/2)²) / 10000 para converter cm² para m²
-            df_trabalho['area_basal_m2'] = (np.pi * (daps/2)**2) / 10000
-            area_basal_disponivel = True
-        
-        # Agrupar por espécie
-        if col_plaqueta:
-            # CORREÇÃO: Primeiro agrupar por plaqueta (indivíduo) para somar fustes múltiplos
-            if area_basal_disponivel:
-                # Somar área basal por indivíduo (todos os fustes de uma mesma plaqueta)
-                df_por_individuo = df_trabalho.groupby([col_especie, col_plaqueta]).agg({
-                    'area_basal_m2': 'sum'  # Soma fustes do mesmo indivíduo
-                }).reset_index()
-                
-                # Agora agrupar por espécie
-                fitossocio = df_por_individuo.groupby(col_especie).agg({
-                    col_plaqueta: 'nunique',     # Número de indivíduos únicos
-                    'area_basal_m2': 'sum'       # Soma das áreas basais dos indivíduos
-                }).reset_index()
-                fitossocio.columns = [col_especie, 'num_individuos', 'area_basal_total']
-            else:
-                # Sem área basal, apenas contar indivíduos
-                fitossocio = df_trabalho.groupby(col_especie).agg({
-                    col_plaqueta: 'nunique'  # Número de indivíduos únicos
-                }).reset_index()
-                fitossocio['area_basal_total'] = 0
-                fitossocio.columns = [col_especie, 'num_individuos', 'area_basal_total']
-        else:
-            # Fallback: contar registros (sem plaqueta não há como distinguir fustes)
-            fitossocio = df_trabalho.groupby(col_especie).agg({
-                col_especie: 'count',
-                'area_basal_m2': 'sum' if area_basal_disponivel else 'count'
-            }).reset_index()
-            fitossocio.columns = [col_especie, 'num_individuos', 'area_basal_total']
-        
-        # Calcular totais
-        total_individuos = fitossocio['num_individuos'].sum()
-        total_area_basal = fitossocio['area_basal_total'].sum() if area_basal_disponivel else 0
-        
-        # Calcular parâmetros fitossociológicos
-        fitossocio['densidade_relativa'] = (fitossocio['num_individuos'] / total_individuos) * 100
-        
-        if area_basal_disponivel and total_area_basal > 0:
-            fitossocio['dominancia_relativa'] = (fitossocio['area_basal_total'] / total_area_basal) * 100
-            fitossocio['valor_cobertura'] = (fitossocio['densidade_relativa'] + fitossocio['dominancia_relativa']) / 2
-        else:
-            fitossocio['dominancia_relativa'] = 0
-            fitossocio['valor_cobertura'] = fitossocio['densidade_relativa'] / 2
-        
-        # Ordenar por valor de cobertura
-        fitossocio = fitossocio.sort_values('valor_cobertura', ascending=False).reset_index(drop=True)
-        
-        # Renomear colunas para exibição
-        colunas_display = {
-            col_especie: 'Espécie',
-            'num_individuos': 'N° Indivíduos',
-            'area_basal_total': 'Área Basal (m²)' if area_basal_disponivel else 'AB (não calc.)',
-            'densidade_relativa': 'DR (%)',
-            'dominancia_relativa': 'DoR (%)',
-            'valor_cobertura': 'VC (%)'
-        }
-        
-        fitossocio_display = fitossocio.rename(columns=colunas_display)
-        
-        # Arredondar valores numéricos
-        colunas_numericas = ['N° Indivíduos', 'DR (%)', 'DoR (%)', 'VC (%)']
-        if area_basal_disponivel:
-            colunas_numericas.append('Área Basal (m²)')
-            fitossocio_display['Área Basal (m²)'] = fitossocio_display['Área Basal (m²)'].round(4)
-        
-        fitossocio_display['DR (%)'] = fitossocio_display['DR (%)'].round(2)
-        fitossocio_display['DoR (%)'] = fitossocio_display['DoR (%)'].round(2)
-        fitossocio_display['VC (%)'] = fitossocio_display['VC (%)'].round(2)
-        
-        # Exibir resultados
-        st.write("**📋 Tabela Fitossociológica - Método CENSO**")
-        
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Total de Espécies", formatar_numero_br(len(fitossocio_display), 0))
-        with col2:
-            st.metric("Total de Indivíduos", formatar_numero_br(total_individuos, 0))
-        with col3:
-            if area_basal_disponivel:
-                st.metric("Área Basal Total", f"{formatar_numero_br(total_area_basal, 3)} m²")
-            else:
-                st.metric("Área Basal", "Não calculada")
-        
-        # Aplicar formatação brasileira na tabela
-        colunas_porcentagem = ['DR (%)', 'DoR (%)', 'FR (%)', 'VC (%)', 'VI (%)']
-        colunas_numericas = ['Densidade (ind/ha)', 'Dominância (m²/ha)', 'AB_media (m²)']
-        fitossocio_display_formatado = formatar_dataframe_br(
-            fitossocio_display, 
-            colunas_numericas=colunas_numericas, 
-            colunas_porcentagem=colunas_porcentagem
-        )
-        
-        # Tabela principal
-        st.dataframe(fitossocio_display_formatado, use_container_width=True, height=400)
-        
-        # Download
-        csv = fitossocio_display.to_csv(index=False)
-        st.download_button(
-            label="📥 Download Tabela Fitossociológica (CSV)",
-            data=csv,
-            file_name="fitossociologia_censo.csv",
-            mime="text/csv"
-        )
-        
-        # Gráfico das espécies mais importantes
-        if len(fitossocio_display) > 0:
-            st.markdown("#### 📊 Top 10 Espécies por Valor de Cobertura")
-            top_especies = fitossocio_display.head(10)
-            
-            fig = px.bar(
-                top_especies,
-                x='VC (%)',
-                y='Espécie',
-                orientation='h',
-                title="Valor de Cobertura das Principais Espécies",
-                color='VC (%)',
-                color_continuous_scale='Greens'
-            )
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
-        
-    except Exception as e:
-        st.error(f"Erro no cálculo fitossociológico (censo): {e}")
-
-def calcular_fitossociologia_parcelas(df_inventario, df_caracterizacao):
-    """Calcula parâmetros fitossociológicos para método de parcelas"""
-    try:
-        if len(df_inventario) == 0:
-            st.warning("⚠️ Nenhum dado de inventário disponível")
-            return
-        
-        # Encontrar colunas necessárias
-        col_especie = encontrar_coluna(df_inventario, ['especie', 'especies', 'species', 'sp'])
-        col_dap = encontrar_coluna(df_inventario, ['dap', 'dap_cm', 'diameter'])
-        col_parc = encontrar_coluna(df_inventario, ['cod_parc', 'parcela', 'plot'])
-        col_plaqueta = encontrar_coluna(df_inventario, ['plaqueta', 'plaq', 'id'])
-        
-        if not col_especie or not col_parc:
-            st.error("❌ Colunas essenciais não encontradas (espécie ou parcela)")
-            return
-        
-        # Preparar dados
-        df_trabalho = df_inventario.copy()
-        
-        # Calcular área basal se DAP disponível
-        area_basal_disponivel = False
-        if col_dap:
-            daps = pd.to_numeric(df_trabalho[col_dap], errors='coerce')
-            
-            # Ajustar unidade se necessário
-            if daps.median() > 100:
-                daps = daps / 10
-            
-            df_trabalho['area_basal_m2'] = (np.pi * (daps/2)**2) / 10000
-            area_basal_disponivel = True
-        
-        # Calcular frequência por espécie (número de parcelas onde a espécie ocorre)
-        frequencia_especies = df_trabalho.groupby(col_especie)[col_parc].nunique().reset_index()
-        frequencia_especies.columns = [col_especie, 'frequencia']
-        
-        # Calcular número de indivíduos por espécie
-        if col_plaqueta:
-            individuos_especies = df_trabalho.groupby(col_especie)[col_plaqueta].nunique().reset_index()
-        else:
-            individuos_especies = df_trabalho.groupby(col_especie).size().reset_index()
-        individuos_especies.columns = [col_especie, 'num_individuos']
-        
-        # Calcular área basal por espécie (CORREÇÃO: considerar fustes múltiplos)
-        if area_basal_disponivel:
-            if col_plaqueta:
-                # Primeiro agrupar por plaqueta para somar fustes múltiplos do mesmo indivíduo
-                df_por_individuo = df_trabalho.groupby([col_especie, col_plaqueta]).agg({
-                    'area_basal_m2': 'sum'  # Soma fustes do mesmo indivíduo
-                }).reset_index()
-                
-                # Depois agrupar por espécie
-                area_basal_especies = df_por_individuo.groupby(col_especie)['area_basal_m2'].sum().reset_index()
-                area_basal_especies.columns = [col_especie, 'area_basal_total']
-            else:
-                # Sem plaqueta, somar diretamente (não há como distinguir fustes)
-                area_basal_especies = df_trabalho.groupby(col_especie)['area_basal_m2'].sum().reset_index()
-                area_basal_especies.columns = [col_especie, 'area_basal_total']
-        else:
-            area_basal_especies = individuos_especies.copy()
-            area_basal_especies['area_basal_total'] = 0
-        
-        # Combinar dados
-        fitossocio = frequencia_especies.merge(individuos_especies, on=col_especie)
-        fitossocio = fitossocio.merge(area_basal_especies, on=col_especie)
-        
-        # Calcular totais
-        total_individuos = fitossocio['num_individuos'].sum()
-        total_area_basal = fitossocio['area_basal_total'].sum() if area_basal_disponivel else 0
-        total_frequencia = fitossocio['frequencia'].sum()
-        total_parcelas = df_trabalho[col_parc].nunique()
-        
-        # Calcular parâmetros fitossociológicos
-        fitossocio['densidade_relativa'] = (fitossocio['num_individuos'] / total_individuos) * 100
-        fitossocio['frequencia_relativa'] = (fitossocio['frequencia'] / total_frequencia) * 100
-        
-        if area_basal_disponivel and total_area_basal > 0:
-            fitossocio['dominancia_relativa'] = (fitossocio['area_basal_total'] / total_area_basal) * 100
-            fitossocio['valor_importancia'] = (fitossocio['densidade_relativa'] + fitossocio['dominancia_relativa'] + fitossocio['frequencia_relativa']) / 3
-        else:
-            fitossocio['dominancia_relativa'] = 0
-            fitossocio['valor_importancia'] = (fitossocio['densidade_relativa'] + fitossocio['frequencia_relativa']) / 2
-        
-        # Ordenar por valor de importância
-        fitossocio = fitossocio.sort_values('valor_importancia', ascending=False).reset_index(drop=True)
-        
-        # Renomear colunas para exibição
-        colunas_display = {
-            col_especie: 'Espécie',
-            'frequencia': 'Frequência',
-            'num_individuos': 'N° Indivíduos',
-            'area_basal_total': 'Área Basal (m²)' if area_basal_disponivel else 'AB (não calc.)',
-            'densidade_relativa': 'DR (%)',
-            'dominancia_relativa': 'DoR (%)',
-            'frequencia_relativa': 'FR (%)',
-            'valor_importancia': 'VI (%)'
-        }
-        
-        fitossocio_display = fitossocio.rename(columns=colunas_display)
-        
-        # Arredondar valores numéricos
-        fitossocio_display['DR (%)'] = fitossocio_display['DR (%)'].round(2)
-        fitossocio_display['DoR (%)'] = fitossocio_display['DoR (%)'].round(2)
-        fitossocio_display['FR (%)'] = fitossocio_display['FR (%)'].round(2)
-        fitossocio_display['VI (%)'] = fitossocio_display['VI (%)'].round(2)
-        
-        if area_basal_disponivel:
-            fitossocio_display['Área Basal (m²)'] = fitossocio_display['Área Basal (m²)'].round(4)
-        
-        # Exibir resultados
-        st.write("**📋 Tabela Fitossociológica - Método PARCELAS**")
-        
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Total de Espécies", formatar_numero_br(len(fitossocio_display), 0))
-        with col2:
-            st.metric("Total de Indivíduos", formatar_numero_br(total_individuos, 0))
-        with col3:
-            st.metric("Total de Parcelas", formatar_numero_br(total_parcelas, 0))
-        with col4:
-            if area_basal_disponivel:
-                st.metric("Área Basal Total", f"{formatar_numero_br(total_area_basal, 3)} m²")
-            else:
-                st.metric("Área Basal", "Não calculada")
-        
-        # Aplicar formatação brasileira na tabela
-        colunas_porcentagem = ['DR (%)', 'DoR (%)', 'FR (%)', 'VC (%)', 'VI (%)']
-        colunas_numericas = ['Densidade (ind/ha)', 'Dominância (m²/ha)', 'Área Basal (m²)']
-        fitossocio_display_formatado = formatar_dataframe_br(
-            fitossocio_display, 
-            colunas_numericas=colunas_numericas, 
-            colunas_porcentagem=colunas_porcentagem
-        )
-        
-        # Tabela principal
-        st.dataframe(fitossocio_display_formatado, use_container_width=True, height=400)
-        
-        # Download
-        csv = fitossocio_display.to_csv(index=False)
-        st.download_button(
-            label="📥 Download Tabela Fitossociológica (CSV)",
-            data=csv,
-            file_name="fitossociologia_parcelas.csv",
-            mime="text/csv"
-        )
-        
-        # Gráfico das espécies mais importantes
-        if len(fitossocio_display) > 0:
-            st.markdown("#### 📊 Top 10 Espécies por Valor de Importância")
-            top_especies = fitossocio_display.head(10)
-            
-            fig = px.bar(
-                top_especies,
-                x='VI (%)',
-                y='Espécie',
-                orientation='h',
-                title="Valor de Importância das Principais Espécies",
-                color='VI (%)',
-                color_continuous_scale='Viridis'
-            )
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
-        
-    except Exception as e:
-        st.error(f"Erro no cálculo fitossociológico (parcelas): {e}")
+# Título, métrica principal e escala de cor de cada método fitossociológico
+EXIBICAO_FITOSSOCIOLOGIA = {
+    'censo': ("CENSO", calcular_fitossociologia_censo, 'VC (%)', "Valor de Cobertura", 'Greens'),
+    'parcelas': ("PARCELAS", calcular_fitossociologia_parcelas, 'VI (%)', "Valor de Importância", 'Viridis')
+}
 
-def analisar_propriedades_por_tecnica(df_inventario, df_caracterizacao, propriedades, tecnica):
-    """Identifica propriedades que usam uma técnica específica"""
-    try:
-        tecnica_col = encontrar_coluna(df_caracterizacao, ['tecnica_am', 'tecnica', 'metodo'])
-        
-        if not tecnica_col:
-            return propriedades  # Retorna todas se não conseguir identificar
-        
-        df_tecnica = df_caracterizacao[df_caracterizacao['cod_prop'].isin(propriedades)] if 'cod_prop' in df_caracterizacao.columns else df_caracterizacao
-        
-        if tecnica.lower() == 'censo':
-            props_tecnica = df_tecnica[df_tecnica[tecnica_col].str.contains('censo', case=False, na=False)]['cod_prop'].unique()
-        else:  # parcelas
-            props_tecnica = df_tecnica[~df_tecnica[tecnica_col].str.contains('censo', case=False, na=False)]['cod_prop'].unique()
-        
-        return list(props_tecnica)
+@perfilado("Fitossociologia", categoria='secao')
+def exibir_fitossociologia(df_inventario, df_caracterizacao, metodo):
+    """Exibe a tabela fitossociológica ('censo' ou 'parcelas'), com exportação e gráfico das principais espécies"""
+    titulo, calcular, coluna_valor, nome_valor, escala_cor = EXIBICAO_FITOSSOCIOLOGIA[metodo]
+    
+    resultado = calcular(df_inventario)
+    exibir_mensagens(resultado)
+    if resultado.erros or len(resultado.tabela) == 0:
+        return
+    
+    fitossocio_display = resultado.tabela
+    
+    # Exibir resultados
+    st.write(f"**📋 Tabela Fitossociológica - Método {titulo}**")
+    
+    metricas = [("Total de Espécies", formatar_numero_br(resultado.total_especies, 0)),
+                ("Total de Indivíduos", formatar_numero_br(resultado.total_individuos, 0))]
+    if metodo == 'parcelas':
+        metricas.append(("Total de Parcelas", formatar_numero_br(resultado.total_parcelas, 0)))
+    if resultado.area_basal_disponivel:
+        metricas.append(("Área Basal Total", f"{formatar_numero_br(resultado.area_basal_total, 3)} m²"))
+    else:
+        metricas.append(("Área Basal", "Não calculada"))
+    
+    for coluna, (rotulo, valor) in zip(st.columns(len(metricas)), metricas):
+        with coluna:
+            st.metric(rotulo, valor)
+    
+    # Aplicar formatação brasileira na tabela
+    fitossocio_display_formatado = formatar_dataframe_br(
+        fitossocio_display, 
+        colunas_numericas=['Área Basal (m²)'] if metodo == 'parcelas' else [], 
+        colunas_porcentagem=['DR (%)', 'DoR (%)', 'FR (%)', 'VC (%)', 'VI (%)']
+    )
     
-    except Exception:
-        return []
+    # Tabela principal
+    st.dataframe(fitossocio_display_formatado, use_container_width=True, height=400)
+    
+    # Download (gerado sob demanda; chave distinta por conjunto de propriedades)
+    propriedades = sorted(como_texto(df_caracterizacao['cod_prop'].dropna()).unique()) if 'cod_prop' in df_caracterizacao.columns else []
+    chave_tabela = f"fitossociologia_{metodo}_{chave_estado(propriedades)}"
+    botao_exportacao(fitossocio_display, "Tabela Fitossociológica", f"fitossociologia_{metodo}",
+                     chave_tabela, chave_estado(propriedades, len(df_inventario)))
+    
+    # Gráfico das espécies mais importantes
+    st.markdown(f"#### 📊 Top 10 Espécies por {nome_valor}")
+    fig = px.bar(
+        fitossocio_display.head(10),
+        x=coluna_valor,
+        y='Espécie',
+        orientation='h',
+        title=f"{nome_valor} das Principais Espécies",
+        color=coluna_valor,
+        color_continuous_scale=escala_cor
+    )
+    fig.update_layout(height=400)
+    exibir_grafico(fig, use_container_width=True, key=f"{chave_tabela}_grafico")
 
-def calcular_indices_diversidade(df_inventario, propriedades_selecionadas):
-    """Calcula índices de diversidade"""
+@perfilado("Índices de diversidade", categoria='secao')
+def exibir_indices_diversidade(df_inventario):
+    """Exibe os índices de diversidade e a curva de rank-abundância"""
     st.markdown("### 📊 Índices de Diversidade Ecológica")
     
-    col_especie = encontrar_coluna(df_inventario, ['especie', 'especies', 'species', 'sp'])
-    
-    if not col_especie:
-        st.error("❌ Coluna de espécie não encontrada")
+    resultado = calcular_indices_diversidade(df_inventario)
+    exibir_mensagens(resultado)
+    if resultado.erros or resultado.riqueza == 0:
         return
     
-    try:
-        # Contar indivíduos por espécie
-        especies_count = df_inventario[col_especie].value_counts()
-        
-        if len(especies_count) == 0:
-            st.warning("⚠️ Nenhuma espécie encontrada")
-            return
-        
-        # Calcular índices
-        total_individuos = especies_count.sum()
-        riqueza = len(especies_count)
-        
-        # Índice de Shannon
-        shannon = -sum((count/total_individuos) * log(count/total_individuos) for count in especies_count)
-        
-        # Índice de Simpson
-        simpson = sum((count/total_individuos)**2 for count in especies_count)
-        simpson_diversidade = 1 - simpson
-        
-        # Equitabilidade de Pielou
-        if riqueza > 1:
-            equitabilidade = shannon / log(riqueza)
-        else:
-            equitabilidade = 0
-        
-        # Exibir resultados
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.metric("🌺 Riqueza (S)", riqueza)
-        
-        with col2:
-            st.metric("🌍 Shannon (H')", f"{shannon:.3f}")
-        
-        with col3:
-            st.metric("🔄 Simpson (1-D)", f"{simpson_diversidade:.3f}")
-        
-        with col4:
-            st.metric("⚖️ Pielou (J)", f"{equitabilidade:.3f}")
-        
-        # Interpretação dos índices
-        with st.expander("📖 Interpretação dos Índices"):
-            st.markdown(f"""
-            **🌺 Riqueza (S = {riqueza}):**
-            - Número total de espécies encontradas
-            
-            **🌍 Índice de Shannon (H' = {shannon:.3f}):**
-            - Valores típicos: 1.5 a 3.5
-            - {'Alto' if shannon > 3.0 else 'Médio' if shannon > 2.0 else 'Baixo'} valor de diversidade
-            
-            **🔄 Índice de Simpson (1-D = {simpson_diversidade:.3f}):**
-            - Varia de 0 a 1 (maior = mais diverso)
-            - {'Alta' if simpson_diversidade > 0.8 else 'Média' if simpson_diversidade > 0.6 else 'Baixa'} diversidade
-            
-            **⚖️ Índice de Pielou (J = {equitabilidade:.3f}):**
-            - Varia de 0 a 1 (maior = distribuicao mais uniforme)
-            - {'Alta' if equitabilidade > 0.8 else 'Media' if equitabilidade > 0.6 else 'Baixa'} equitabilidade
-            - Mede a uniformidade da distribuicao das especies
-            """)
-        
-        # Gráfico de distribuição de abundância
-        st.markdown("#### 📈 Curva de Abundância das Espécies")
-        
-        # Preparar dados para o gráfico
-        especies_ordenadas = especies_count.sort_values(ascending=False).reset_index()
-        especies_ordenadas['rank'] = range(1, len(especies_ordenadas) + 1)
-        especies_ordenadas.columns = ['Espécie', 'Abundância', 'Rank']
-        
-        fig = px.line(
-            especies_ordenadas,
-            x='Rank',
-            y='Abundância',
-            title="Curva de Rank-Abundância",
-            labels={'Rank': 'Ranking da Espécie', 'Abundância': 'Número de Indivíduos'},
-            markers=True
-        )
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
-        
-    except Exception as e:
-        st.error(f"Erro no cálculo de índices: {e}")
+    riqueza = resultado.riqueza
+    shannon = resultado.shannon
+    simpson_diversidade = resultado.simpson_diversidade
+    equitabilidade = resultado.pielou
+    
+    # Exibir resultados
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("🌺 Riqueza (S)", riqueza)
+    
+    with col2:
+        st.metric("🌍 Shannon (H')", f"{shannon:.3f}")
+    
+    with col3:
+        st.metric("🔄 Simpson (1-D)", f"{simpson_diversidade:.3f}")
+    
+    with col4:
+        st.metric("⚖️ Pielou (J)", f"{equitabilidade:.3f}")
+    
+    # Interpretação dos índices
+    with st.expander("📖 Interpretação dos Índices"):
+        st.markdown(f"""
+        **🌺 Riqueza (S = {riqueza}):**
+        - Número total de espécies encontradas
+        
+        **🌍 Índice de Shannon (H' = {shannon:.3f}):**
+        - Valores típicos: 1.5 a 3.5
+        - {'Alto' if shannon > 3.0 else 'Médio' if shannon > 2.0 else 'Baixo'} valor de diversidade
+        
+        **🔄 Índice de Simpson (1-D = {simpson_diversidade:.3f}):**
+        - Varia de 0 a 1 (maior = mais diverso)
+        - {'Alta' if simpson_diversidade > 0.8 else 'Média' if simpson_diversidade > 0.6 else 'Baixa'} diversidade
+        
+        **⚖️ Índice de Pielou (J = {equitabilidade:.3f}):**
+        - Varia de 0 a 1 (maior = distribuicao mais uniforme)
+        - {'Alta' if equitabilidade > 0.8 else 'Media' if equitabilidade > 0.6 else 'Baixa'} equitabilidade
+        - Mede a uniformidade da distribuicao das especies
+        """)
+    
+    # Gráfico de distribuição de abundância
+    st.markdown("#### 📈 Curva de Abundância das Espécies")
+    
+    # Preparar dados para o gráfico
+    especies_ordenadas = resultado.abundancias.sort_values(ascending=False).reset_index()
+    especies_ordenadas['rank'] = range(1, len(especies_ordenadas) + 1)
+    especies_ordenadas.columns = ['Espécie', 'Abundância', 'Rank']
+    
+    fig = px.line(
+        especies_ordenadas,
+        x='Rank',
+        y='Abundância',
+        title="Curva de Rank-Abundância",
+        labels={'Rank': 'Ranking da Espécie', 'Abundância': 'Número de Indivíduos'},
+        markers=True
+    )
+    fig.update_layout(height=400)
+    exibir_grafico(fig, use_container_width=True)
 
+@perfilado("Visualizações avançadas", categoria='secao')
 def gerar_visualizacoes_avancadas(df_inventario, df_caracterizacao):
     """Gera visualizações avançadas"""
     st.markdown("### 📈 Visualizações Avançadas")
@@ -3024,8 +3328,12 @@ def gerar_visualizacoes_avancadas(df_inventario, df_caracterizacao):
 # INDICADORES DE RESTAURAÇÃO FLORESTAL
 # ============================================================================
 
-def exibir_indicadores_restauracao(df_caracterizacao, df_inventario):
-    """Exibe dashboard específico para indicadores de restauração florestal"""
+@perfilado("Indicadores de restauração", categoria='secao')
+def exibir_indicadores_restauracao(df_caracterizacao, df_inventario, indicadores=None):
+    """
+    Exibe dashboard específico para indicadores de restauração florestal
+    (indicadores já calculados, se informados; senão, calculados dos bancos recebidos)
+    """
     
     # Verificar se há dados
     if len(df_caracterizacao) == 0 and len(df_inventario) == 0:
@@ -3033,17 +3341,10 @@ def exibir_indicadores_restauracao(df_caracterizacao, df_inventario):
         return
     
     # Obter dados por propriedade
-    dados_restauracao = calcular_indicadores_restauracao(df_caracterizacao, df_inventario)
-
-    if dados_restauracao.empty:
-        st.warning("⚠️ Não foi possível calcular os indicadores de restauração.")
-        return
-
-        
-        st.markdown("---")
-    
-    # Obter dados por propriedade
-    dados_restauracao = calcular_indicadores_restauracao(df_caracterizacao, df_inventario)
+    if indicadores is None:
+        indicadores = motor_ativo().calcular_indicadores_restauracao(df_caracterizacao, df_inventario)
+    exibir_mensagens(indicadores)
+    dados_restauracao = indicadores.tabela
     
     if dados_restauracao.empty:
         st.warning("⚠️ Não foi possível calcular os indicadores de restauração.")
@@ -3085,174 +3386,17 @@ def exibir_indicadores_restauracao(df_caracterizacao, df_inventario):
     ])
     
     # ABA 1: COBERTURA DE COPA
-    with tab1:
+    with tab1, trecho("Aba: Cobertura de Copa"):
         exibir_analise_cobertura_copa(dados_restauracao, df_caracterizacao)
     
     # ABA 2: DENSIDADE DE REGENERANTES
-    with tab2:
+    with tab2, trecho("Aba: Densidade de Regenerantes"):
         exibir_analise_densidade_regenerantes(dados_restauracao, df_inventario)
     
     # ABA 3: RIQUEZA DE ESPÉCIES
-    with tab3:
+    with tab3, trecho("Aba: Riqueza de Espécies"):
         exibir_analise_riqueza_especies(dados_restauracao, df_inventario)
     
-def calcular_indicadores_restauracao(df_caracterizacao, df_inventario):
-    """Calcula os indicadores de restauração por propriedade"""
-    try:
-        resultados = []
-        
-        # Obter propriedades únicas
-        propriedades = set()
-        
-        if 'cod_prop' in df_caracterizacao.columns:
-            propriedades.update(df_caracterizacao['cod_prop'].dropna().unique())
-        
-        # Extrair propriedades do inventário se necessário
-        cod_parc_col = encontrar_coluna(df_inventario, ['cod_parc', 'parcela', 'plot'])
-        if cod_parc_col:
-            for parc in df_inventario[cod_parc_col].dropna().unique():
-                if '_' in str(parc):
-                    prop = str(parc).split('_')[0]
-                    propriedades.add(prop)
-        
-        # Calcular indicadores para cada propriedade
-        for prop in propriedades:
-            resultado = calcular_indicadores_propriedade(prop, df_caracterizacao, df_inventario)
-            if resultado:
-                resultados.append(resultado)
-        
-        return pd.DataFrame(resultados)
-    
-    except Exception as e:
-        st.error(f"Erro ao calcular indicadores de restauração: {e}")
-        return pd.DataFrame()
-
-def calcular_indicadores_propriedade(cod_prop, df_caracterizacao, df_inventario):
-    """Calcula indicadores de restauração para uma propriedade específica"""
-    try:
-        resultado = {'cod_prop': cod_prop}
-        
-        # Filtrar dados da propriedade na caracterização
-        df_carac_prop = df_caracterizacao[df_caracterizacao['cod_prop'] == cod_prop] if 'cod_prop' in df_caracterizacao.columns else pd.DataFrame()
-        
-        # Filtrar dados da propriedade no inventário
-        # Usar a coluna cod_prop diretamente se existir
-        if 'cod_prop' in df_inventario.columns:
-            df_inv_prop = df_inventario[df_inventario['cod_prop'] == cod_prop]
-        else:
-            # Fallback para método anterior
-            cod_parc_col = encontrar_coluna(df_inventario, ['cod_parc', 'parcela', 'plot'])
-            if cod_parc_col:
-                df_inv_prop = df_inventario[df_inventario[cod_parc_col].astype(str).str.startswith(f"{cod_prop}_")]
-                if len(df_inv_prop) == 0:
-                    df_inv_prop = df_inventario[df_inventario[cod_parc_col].astype(str).str.contains(f"{cod_prop}", na=False)]
-                if len(df_inv_prop) == 0:
-                    df_inv_prop = df_inventario[df_inventario[cod_parc_col].astype(str) == str(cod_prop)]
-            else:
-                df_inv_prop = pd.DataFrame()
-        
-        # === 1. COBERTURA DE COPA ===
-        cobertura_col = encontrar_coluna(df_carac_prop, ['cobetura_nativa', 'cobertura_nativa', 'copa_nativa'])
-        if cobertura_col and len(df_carac_prop) > 0:
-            cobertura_media = pd.to_numeric(df_carac_prop[cobertura_col], errors='coerce').mean()
-            # Converter de 0-1 para 0-100% se necessário
-            if not pd.isna(cobertura_media) and cobertura_media <= 1:
-                cobertura_media = cobertura_media * 100
-            resultado['cobertura_copa'] = cobertura_media if not pd.isna(cobertura_media) else 0
-        else:
-            resultado['cobertura_copa'] = 0
-        
-        # === 2. DENSIDADE DE REGENERANTES ===
-        # Detectar método de restauração
-        metodo_col = encontrar_coluna(df_carac_prop, ['metodo_restauracao', 'metodo', 'tecnica_restauracao'])
-        metodo_restauracao = 'Ativa'  # Padrao
-        
-        if metodo_col and len(df_carac_prop) > 0:
-            metodo_valor = df_carac_prop[metodo_col].iloc[0]
-            if 'assistida' in str(metodo_valor).lower():
-                metodo_restauracao = 'Assistida'
-        
-        resultado['metodo_restauracao'] = metodo_restauracao
-        
-        # Calcular densidade
-        densidade = calcular_densidade_regenerantes(df_inv_prop, df_carac_prop)
-        resultado['densidade_regenerantes'] = densidade
-        
-        # Meta de densidade
-        meta_densidade = 1500 if metodo_restauracao == 'Assistida' else 1333
-        resultado['meta_densidade'] = meta_densidade
-        resultado['densidade_adequada'] = densidade >= meta_densidade
-        
-        # === 3. RIQUEZA DE ESPECIES ===
-        especies_col = encontrar_coluna(df_inv_prop, ['especies', 'especie', 'species', 'sp'])
-        if especies_col and len(df_inv_prop) > 0:
-            # Filtrar especies validas (remover "Morto/Morta")
-            df_especies_validas = df_inv_prop[~df_inv_prop[especies_col].astype(str).str.contains('Morto|Morta', case=False, na=False)]
-            
-            # Filtrar apenas especies nativas
-            origem_col = encontrar_coluna(df_especies_validas, ['origem', 'origin', 'procedencia'])
-            if origem_col:
-                df_nativas = df_especies_validas[df_especies_validas[origem_col].astype(str).str.contains('Nativa', case=False, na=False)]
-            else:
-                df_nativas = df_especies_validas
-            
-            # Filtrar apenas individuos com altura > 0.5m
-            ht_col = encontrar_coluna(df_nativas, ['ht', 'altura', 'height'])
-            if ht_col:
-                alturas = pd.to_numeric(df_nativas[ht_col], errors='coerce')
-                df_nativas_altura = df_nativas[alturas > 0.5]
-            else:
-                df_nativas_altura = df_nativas
-            
-            # Riqueza observada = especies nativas com altura > 0.5m
-            riqueza_observada = df_nativas_altura[especies_col].nunique()
-            
-            # Riqueza de especies nativas (todas as alturas)
-            riqueza_nativas = df_nativas[especies_col].nunique()
-        else:
-            riqueza_observada = 0
-            riqueza_nativas = 0
-        
-        resultado['riqueza_observada'] = riqueza_observada
-        resultado['riqueza_nativas'] = riqueza_nativas
-        
-        # Obter meta de riqueza (baseada em espécies nativas)
-        meta_riqueza_col = encontrar_coluna(df_inv_prop, ['meta', 'meta_riqueza', 'riqueza_meta', 'meta_especies'])
-        if meta_riqueza_col and len(df_inv_prop) > 0:
-            meta_riqueza = pd.to_numeric(df_inv_prop[meta_riqueza_col], errors='coerce').dropna()
-            if len(meta_riqueza) > 0:
-                meta_riqueza = meta_riqueza.iloc[0]
-            else:
-                meta_riqueza = 30  # Valor padrao
-        else:
-            meta_riqueza = 30  # Valor padrao
-        
-        resultado['meta_riqueza'] = meta_riqueza
-        # Meta baseada em espécies nativas com altura > 0.5m (critério observado)
-        resultado['riqueza_adequada'] = riqueza_observada >= meta_riqueza
-        
-        # === 4. STATUS GERAL ===
-        status_count = sum([
-            resultado['cobertura_copa'] >= 80,
-            resultado['densidade_adequada'],
-            resultado['riqueza_adequada']
-        ])
-        
-        if status_count == 3:
-            resultado['status_geral'] = 'Excelente'
-        elif status_count == 2:
-            resultado['status_geral'] = 'Bom'
-        elif status_count == 1:
-            resultado['status_geral'] = 'Regular'
-        else:
-            resultado['status_geral'] = 'Crítico'
-        
-        return resultado
-    
-    except Exception as e:
-        st.error(f"Erro ao calcular indicadores para propriedade {cod_prop}: {e}")
-        return None
-
 def exibir_analise_cobertura_copa(dados_restauracao, df_caracterizacao):
     """Exibe análise específica da cobertura de copa"""
     st.markdown("### 🌿 Análise de Cobertura de Copa")
@@ -3277,12 +3421,12 @@ def exibir_analise_cobertura_copa(dados_restauracao, df_caracterizacao):
                            annotation_text="Meta: 80%")
     
     fig_cobertura.update_layout(height=400)
-    st.plotly_chart(fig_cobertura, use_container_width=True)
+    exibir_grafico(fig_cobertura, use_container_width=True)
     
     # Tabela resumo
     st.markdown("#### 📊 Resumo por Propriedade")
     
-    df_resumo_cobertura = dados_restauracao[['cod_prop', 'cobertura_copa']].copy()
+    df_resumo_cobertura = dados_restauracao[['cod_prop', 'cobertura_copa']]
     df_resumo_cobertura['Status'] = df_resumo_cobertura['cobertura_copa'].apply(
         lambda x: '✅ Adequada' if x >= 80 else '⚠️ Abaixo da Meta'
     )
@@ -3316,12 +3460,12 @@ def exibir_analise_densidade_regenerantes(dados_restauracao, df_inventario):
                            annotation_text="Meta Assistida: 1.500 ind/ha")
     
     fig_densidade.update_layout(height=400)
-    st.plotly_chart(fig_densidade, use_container_width=True)
+    exibir_grafico(fig_densidade, use_container_width=True)
     
     # Tabela resumo
     st.markdown("#### 📊 Resumo por Propriedade")
     
-    df_resumo_densidade = dados_restauracao[['cod_prop', 'metodo_restauracao', 'densidade_regenerantes', 'meta_densidade', 'densidade_adequada']].copy()
+    df_resumo_densidade = dados_restauracao[['cod_prop', 'metodo_restauracao', 'densidade_regenerantes', 'meta_densidade', 'densidade_adequada']]
     df_resumo_densidade['Status'] = df_resumo_densidade['densidade_adequada'].apply(
         lambda x: '✅ Adequada' if x else '⚠️ Abaixo da Meta'
     )
@@ -3395,7 +3539,7 @@ def exibir_analise_riqueza_especies(dados_restauracao, df_inventario):
     
     # Criar container scrollable
     with st.container():
-        st.plotly_chart(fig_riqueza, use_container_width=False)
+        exibir_grafico(fig_riqueza, use_container_width=False)
     
     # Tabela resumo
     st.markdown("#### 📊 Resumo por Propriedade")
@@ -3405,7 +3549,7 @@ def exibir_analise_riqueza_especies(dados_restauracao, df_inventario):
     if 'riqueza_nativas' in dados_ordenados.columns:
         colunas_resumo.insert(2, 'riqueza_nativas')
     
-    df_resumo_riqueza = dados_ordenados[colunas_resumo].copy()
+    df_resumo_riqueza = dados_ordenados[colunas_resumo]
     df_resumo_riqueza['Status'] = df_resumo_riqueza['riqueza_adequada'].apply(
         lambda x: '✅ Adequada' if x else '⚠️ Abaixo da Meta'
     )
@@ -3426,6 +3570,7 @@ def exibir_analise_riqueza_especies(dados_restauracao, df_inventario):
     # Informação sobre os critérios
     st.info("💡 **Critérios:** Meta baseada em espécies nativas com altura > 0.5m. Espécies 'Morto/Morta' excluídas de todas as análises.")
 
+@perfilado("Análise por UT", categoria='secao')
 def exibir_analise_por_uts(df_caracterizacao, df_inventario):
     """Exibe análise detalhada por UTs dentro das propriedades"""
     st.markdown("### 📊 Análise Detalhada por Unidades de Trabalho (UTs)")
@@ -3447,7 +3592,7 @@ def exibir_analise_por_uts(df_caracterizacao, df_inventario):
         
         cod_parc_col = encontrar_coluna(df_inventario, ['cod_parc', 'parcela', 'plot'])
         if cod_parc_col:
-            df_inv_prop = df_inventario[df_inventario[cod_parc_col].astype(str).str.startswith(f"{propriedade_selecionada}_")]
+            df_inv_prop = df_inventario[como_texto(df_inventario[cod_parc_col]).str.startswith(f"{propriedade_selecionada}_")]
         else:
             df_inv_prop = pd.DataFrame()
         
@@ -3459,7 +3604,7 @@ def exibir_analise_por_uts(df_caracterizacao, df_inventario):
                 
                 cobertura_col = encontrar_coluna(df_carac_prop, ['cobetura_nativa', 'cobertura_nativa', 'copa_nativa'])
                 if cobertura_col:
-                    df_cobertura_ut = df_carac_prop.groupby('ut')[cobertura_col].mean().reset_index()
+                    df_cobertura_ut = df_carac_prop.groupby('ut', observed=True)[cobertura_col].mean().reset_index()
                     df_cobertura_ut.columns = ['UT', 'Cobertura_Copa']
                     df_cobertura_ut['Status'] = df_cobertura_ut['Cobertura_Copa'].apply(
                         lambda x: '✅ Adequada' if x >= 80 else '⚠️ Abaixo da Meta'
@@ -3475,7 +3620,7 @@ def exibir_analise_por_uts(df_caracterizacao, df_inventario):
                     )
                     fig_ut_cobertura.add_hline(y=80, line_dash="dash", line_color="red")
                     fig_ut_cobertura.update_layout(height=300)
-                    st.plotly_chart(fig_ut_cobertura, use_container_width=True)
+                    exibir_grafico(fig_ut_cobertura, use_container_width=True)
                     
                     st.dataframe(df_cobertura_ut, use_container_width=True)
         
@@ -3486,10 +3631,9 @@ def exibir_analise_por_uts(df_caracterizacao, df_inventario):
             especies_col = encontrar_coluna(df_inv_prop, ['especies', 'especie', 'species', 'sp'])
             if especies_col:
                 # Extrair UT do cod_parc
-                df_inv_prop_copy = df_inv_prop.copy()
-                df_inv_prop_copy['UT'] = df_inv_prop_copy[cod_parc_col].astype(str).str.split('_').str[1]
+                ut = como_texto(df_inv_prop[cod_parc_col]).str.split('_').str[1].rename('UT')
                 
-                df_riqueza_ut = df_inv_prop_copy.groupby('UT')[especies_col].nunique().reset_index()
+                df_riqueza_ut = df_inv_prop.groupby(ut)[especies_col].nunique().reset_index()
                 df_riqueza_ut.columns = ['UT', 'Riqueza']
                 
                 fig_ut_riqueza = px.bar(
@@ -3501,7 +3645,7 @@ def exibir_analise_por_uts(df_caracterizacao, df_inventario):
                     color_continuous_scale='Viridis'
                 )
                 fig_ut_riqueza.update_layout(height=300)
-                st.plotly_chart(fig_ut_riqueza, use_container_width=True)
+                exibir_grafico(fig_ut_riqueza, use_container_width=True)
                 
                 st.dataframe(df_riqueza_ut, use_container_width=True)
 
@@ -3521,20 +3665,47 @@ def main():
         ["📊 Dashboard Principal", "🔍 Auditoria de Dados", "📈 Análises Avançadas"]
     )
     
-    # Carregar dados uma vez
-    df_caracterizacao, df_inventario = load_data()
-    
-    if df_caracterizacao is None or df_inventario is None:
-        st.error("Não foi possível carregar os dados. Verifique se os arquivos Excel estão no diretório correto.")
-        return
-    
-    # Roteamento de páginas
-    if pagina == "📊 Dashboard Principal":
-        pagina_dashboard_principal(df_caracterizacao, df_inventario)
-    elif pagina == "🔍 Auditoria de Dados":
-        pagina_auditoria_dados(df_caracterizacao, df_inventario)
-    elif pagina == "📈 Análises Avançadas":
-        pagina_analises_avancadas(df_caracterizacao, df_inventario)
+    # Perfil de tempo desta execução (painel de desempenho com ?perf=1, rastro com INDICADORES_RASTRO)
+    registrar_contexto_execucao(pagina=pagina, filtros={})
+    with perfil_execucao(pagina):
+        # Carregar dados uma vez (compartilhados entre sessões)
+        with trecho("Carregar dados"):
+            dados = load_data()
+        
+        if dados is None:
+            st.error("Não foi possível carregar os dados. Verifique se os arquivos Excel estão no diretório correto.")
+            return
+        dados_sessao = selecionar_campanhas_sessao(dados)
+        df_caracterizacao, df_inventario = dados_sessao.caracterizacao, dados_sessao.inventario
+        
+        motor, aviso_motor = selecionar_motor_consulta()
+        if aviso_motor:
+            st.sidebar.warning(aviso_motor)
+        st.sidebar.caption(f"Motor de consulta: {motor.nome}")
+        
+        aviso_agregacao = aviso_motor_agregacao()
+        if aviso_agregacao:
+            st.sidebar.warning(aviso_agregacao)
+        st.sidebar.caption(f"Motor de agregação: {motor_agregacao_ativo()}")
+        
+        aviso_leitor = aviso_leitor_excel()
+        if aviso_leitor:
+            st.sidebar.warning(aviso_leitor)
+        exibir_versao_dados(dados)
+        
+        # Roteamento de páginas
+        with medir_execucao(pagina, tipo='Completa'):
+            if pagina == "📊 Dashboard Principal":
+                pagina_dashboard_principal(df_caracterizacao, df_inventario)
+            elif pagina == "🔍 Auditoria de Dados":
+                pagina_auditoria_dados(df_caracterizacao, df_inventario)
+            elif pagina == "📈 Análises Avançadas":
+                pagina_analises_avancadas(df_caracterizacao, df_inventario)
+        
+        exibir_tempos_execucao()
+        exibir_memoria(dados)
+    
+    exibir_painel_desempenho(dados)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,194 @@
+"""
+Núcleo de cálculo dos indicadores ambientais, independente da interface.
+
+As funções recebem DataFrames e retornam valores ou objetos de resultado
+(ver `resultados`), sem depender do Streamlit: podem ser usadas pelo
+dashboard, por rotinas em lote e por benchmarks. Avisos e erros ficam nas
+listas `avisos` e `erros` dos resultados para a interface exibir.
+
+Nenhuma rotina altera o DataFrame recebido (colunas novas vão para um
+derivado, nunca para o banco). O pacote não muda opções globais do
+pandas: o dashboard e a linha de comando ligam o Copy-on-Write, com o
+qual seleções, filtros e colunas temporárias não duplicam os bancos
+inteiros.
+"""
+from .agregacao import (
+    FUNCOES_AGREGACAO,
+    agregacao_configuravel,
+    aviso_motor_agregacao,
+    motor_agregacao_ativo,
+    polars_disponivel,
+)
+from .aquecimento import (
+    ARTEFATOS,
+    aquecer,
+    caminho_artefato,
+    ler_artefato,
+    ler_prontidao,
+    obter_artefato,
+    servidor_pronto,
+)
+from .area import (
+    calcular_area_amostrada,
+    calcular_area_censo_inventario,
+    calcular_area_parcelas_tradicional,
+)
+from .armazem import (
+    armazem_atualizado,
+    atualizar_armazem,
+    bancos_desatualizados,
+    caminhos_armazem,
+    carregar_banco_armazem,
+    carregar_dados_armazem,
+    leituras_armazem,
+    planilhas_desatualizadas,
+)
+from .auditoria import analisar_nomes_especies, encontrar_especies_suspeitas
+from .campanhas import filtrar_campanhas, resumo_campanhas
+from .colunas import encontrar_coluna, extrair_prop_inventario, extrair_ut_inventario
+from .compartilhado import (
+    DadosCompartilhados,
+    atualizar_armazem_compartilhado,
+    carregar_banco_compartilhado,
+    carregar_dados_compartilhados,
+    montar_dados_compartilhados,
+    relatorio_memoria,
+    selecionar_campanhas,
+)
+from .configuracao import (
+    LEITORES_EXCEL,
+    MOTORES_AGREGACAO,
+    MOTORES_CONSULTA,
+    arquivo_rastro,
+    diretorio_armazem,
+    leitor_excel,
+    limites_rastro,
+    motor_agregacao,
+    motor_consulta,
+    trabalhadores_tarefas,
+)
+from .consulta import MOTOR_PANDAS, MotorConsulta, obter_motor
+from .cubo import CuboAgregado, construir_cubo, consultar_cubo, tamanho_cubo
+from .dados import (
+    ARQUIVOS_DADOS,
+    BANCOS,
+    CAMPANHA_PADRAO,
+    COLUNA_CAMPANHA,
+    COLUNAS_TEXTO_LIVRE,
+    PROJECOES,
+    LeituraPlanilha,
+    assinatura_leitura,
+    assinatura_leituras,
+    arquivo_planilha,
+    aviso_leitor_excel,
+    calamine_disponivel,
+    carregar_banco,
+    carregar_dados,
+    juntar_campanhas,
+    leitor_excel_ativo,
+    ler_planilha,
+    ler_planilhas,
+    limpar_e_padronizar_dados,
+    planilhas_diretorio,
+)
+from .desempenho import (
+    comparar_com_base,
+    executar_desempenho,
+    medir,
+    medir_importacao,
+    medir_primeira_pintura,
+)
+from .densidade import calcular_densidade_geral, calcular_densidade_regenerantes
+from .diversidade import calcular_indices_diversidade
+from .esquema import (
+    ESQUEMAS,
+    ampliar_medida,
+    aplicar_esquema,
+    como_texto,
+    contar_valores,
+    converter_coluna,
+    economia_esquema,
+)
+from .exportacao import (
+    FORMATOS_EXPORTACAO,
+    FORMATOS_POR_EXTENSAO,
+    exportar_dataframe,
+    salvar_dataframe,
+)
+from .filtros import (
+    COLUNAS_FILTRO_INVENTARIO,
+    analisar_propriedades_por_tecnica,
+    aplicar_filtros,
+    detectar_tecnicas,
+    filtrar_inventario_por_propriedades,
+    filtrar_por_propriedades,
+    separar_por_tecnica,
+)
+from .fitossociologia import (
+    calcular_fitossociologia_censo,
+    calcular_fitossociologia_parcelas,
+    calcular_fitossociologia_por_tecnica,
+)
+from .hipsometria import (
+    LIMITE_RESIDUO_PADRONIZADO,
+    MIN_OBSERVACOES_HIPSOMETRIA,
+    MODELOS_HIPSOMETRICOS,
+    ajustar_modelo_hipsometrico,
+    ajustar_modelos_hipsometricos,
+)
+from .memoria import (
+    estimar_memoria,
+    maiores_alocacoes,
+    memoria_colunas,
+    memoria_dataframe,
+    memoria_objetos,
+    rss_atual,
+    rss_pico,
+)
+from .outliers import (
+    FATOR_IQR,
+    MIN_OBSERVACOES_GRUPO,
+    calcular_limites_iqr,
+    calcular_outliers_por_grupo,
+    converter_colunas_numericas,
+    marcar_outliers,
+)
+from .rastro import (
+    chrome_trace,
+    eventos_perfil,
+    exportar_chrome_trace,
+    gravar_rastro,
+    ler_rastro,
+    percentis_latencia,
+)
+from .restauracao import (
+    META_COBERTURA_COPA,
+    calcular_indicadores_propriedade,
+    calcular_indicadores_restauracao,
+    listar_propriedades,
+)
+from .paridade import verificar_paridade
+from .perfil import (
+    CATEGORIA_CACHE,
+    PerfilExecucao,
+    Trecho,
+    em_tarefa,
+    iniciar_perfil,
+    marcar_falha_cache,
+    perfil_ativo,
+    perfilado,
+    taxa_acerto_cache,
+    trecho,
+)
+from .sintetico import gerar_dados_sinteticos, salvar_dados_sinteticos
+from .tarefas import AgendadorTarefas, Tarefa, criar_executor
+from .versao import VersaoDados, hash_arquivo, limpar_cache_versao, versao_dados
+from .resultados import (
+    ResultadoArea,
+    ResultadoCubo,
+    ResultadoDensidade,
+    ResultadoDiversidade,
+    ResultadoEspecies,
+    ResultadoFitossociologia,
+    ResultadoIndicadores,
+)
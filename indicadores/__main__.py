@@ -0,0 +1,26 @@
+"""
+Linha de comando do núcleo de indicadores: python -m indicadores <comando>
+"""
+import argparse
+import sys
+
+import pandas as pd
+
+from . import aquecimento, campanhas, desempenho, esquema, paridade, rastro, relatorio, sintetico
+
+COMANDOS = [relatorio, paridade, sintetico, desempenho, rastro, aquecimento, campanhas, esquema]
+
+def main(argv=None):
+    # Copy-on-Write só nos processos da linha de comando (importar o pacote não muda opções do pandas)
+    pd.set_option('mode.copy_on_write', True)
+    parser = argparse.ArgumentParser(prog='python -m indicadores',
+                                     description='Rotinas em lote dos indicadores ambientais')
+    subparsers = parser.add_subparsers(title='comandos', dest='comando', required=True)
+    for comando in COMANDOS:
+        comando.configurar_parser(subparsers)
+
+    args = parser.parse_args(argv)
+    return args.executar(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""
+Seleção do motor de agregação (pandas ou Polars) das funções com groupby pesado.
+
+As funções marcadas com `agregacao_configuravel` são chamadas normalmente;
+com INDICADORES_MOTOR_AGREGACAO=polars (e o Polars instalado), a chamada é
+repassada à função de mesmo nome em `agregacao_polars`, com os mesmos
+resultados. A versão em pandas fica acessível em `funcao.pandas`, usada na
+verificação de paridade.
+"""
+import functools
+import importlib.util
+
+from .configuracao import motor_agregacao
+
+# Nome -> função configurável, para a verificação de paridade
+FUNCOES_AGREGACAO = {}
+
+@functools.lru_cache(maxsize=None)
+def polars_disponivel():
+    """True se o Polars está instalado (sem importá-lo)"""
+    return importlib.util.find_spec('polars') is not None
+
+def aviso_motor_agregacao():
+    """Mensagem quando o motor de agregação configurado não pode ser usado (None se pode)"""
+    try:
+        motor = motor_agregacao()
+    except ValueError as e:
+        return f"{e}. Usando o motor pandas."
+    if motor == 'polars' and not polars_disponivel():
+        return "Motor Polars indisponível: instale com `pip install polars`. Usando o motor pandas."
+    return None
+
+def motor_agregacao_ativo():
+    """Motor de agregação em uso: o configurado, ou pandas se ele não puder ser usado"""
+    return 'pandas' if aviso_motor_agregacao() else motor_agregacao()
+
+def agregacao_configuravel(funcao):
+    """Executa `funcao` no motor de agregação ativo; a versão em pandas fica em `.pandas`"""
+    @functools.wraps(funcao)
+    def executar(*args, **kwargs):
+        if motor_agregacao_ativo() == 'polars':
+            from . import agregacao_polars
+            return getattr(agregacao_polars, funcao.__name__)(*args, **kwargs)
+        return funcao(*args, **kwargs)
+
+    executar.pandas = funcao
+    FUNCOES_AGREGACAO[funcao.__name__] = executar
+    return executar
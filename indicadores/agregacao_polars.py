@@ -0,0 +1,467 @@
+"""
+Motor de agregação Polars (opcional: `pip install polars`).
+
+Versões das funções com groupby pesado (área de censo por UT, fitossociologia
+por espécie/plaqueta, indicadores de todas as propriedades, outliers por
+grupo) com as mesmas assinaturas e resultados das funções em pandas. As
+agregações rodam em LazyFrames, com otimização da consulta e em vários
+núcleos; as partes finais (parâmetros relativos, ordenação, arredondamento
+e montagem das linhas) são as mesmas funções do pandas.
+
+As conversões reproduzem as do pandas: `_texto` equivale a astype(str)
+(nulos viram 'nan'), `_numero` a pd.to_numeric(errors='coerce') (com as
+medidas float32 ampliadas para float64, ver `esquema`) e `_codigos`
+numera os valores distintos (nulos = -1), para que as contagens de distintos
+sejam as de nunique. Cada linha leva sua posição original em `pos`.
+"""
+import numpy as np
+import pandas as pd
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+from .area import AREA_PARCELA_M2
+from .colunas import COLUNAS_CARACTERIZACAO, COLUNAS_INVENTARIO, encontrar_coluna
+from .densidade import ALTURA_MINIMA_REGENERANTE
+from .esquema import ampliar_medida, como_texto
+from .fitossociologia import _finalizar_censo, _finalizar_parcelas, _preparar
+from .outliers import FATOR_IQR, MIN_OBSERVACOES_GRUPO
+from .restauracao import (
+    ALTURA_MINIMA_RIQUEZA,
+    escolher_area_propriedade,
+    listar_propriedades,
+    montar_linha_indicadores,
+)
+from .resultados import ResultadoArea, ResultadoIndicadores
+
+POLARS_DISPONIVEL = pl is not None
+
+# ============================================================================
+# CONVERSÕES
+# ============================================================================
+
+def _texto(serie):
+    """Equivalente Polars de astype(str): nulos viram 'nan'"""
+    return pl.Series(como_texto(serie).to_numpy(dtype=object), dtype=pl.String)
+
+def _numero(serie):
+    """Equivalente Polars de pd.to_numeric(errors='coerce') (medidas float32 ampliadas), com NaN como nulo"""
+    return pl.Series(ampliar_medida(pd.to_numeric(serie, errors='coerce')).to_numpy(dtype=float), nan_to_null=True)
+
+def _codigos(serie):
+    """Código inteiro de cada valor distinto (nulos = -1), com os mesmos distintos de nunique"""
+    return pl.Series(pd.factorize(serie)[0])
+
+def _distintos(coluna, condicao=None):
+    """Número de códigos distintos não nulos (como nunique), opcionalmente só onde `condicao`"""
+    validos = pl.col(coluna) >= 0
+    if condicao is not None:
+        validos = validos & condicao
+    return pl.col(coluna).filter(validos).n_unique()
+
+def _quadro_inventario(df_inventario, cols):
+    """LazyFrame com a posição e as colunas de cada papel já convertidas"""
+    dados = {'pos': np.arange(len(df_inventario))}
+    conversoes = {
+        'parcela': [('parc', _texto), ('parc_cod', _codigos)],
+        'ligacao': [('lig', _texto)],
+        'area': [('area', _numero)],
+        'propriedade': [('prop_col', _texto)],
+        'ut': [('ut_col', _texto)],
+        'plaqueta': [('plaqueta', _codigos)],
+        'especie': [('especie', _codigos), ('especie_txt', _texto)],
+        'origem': [('origem', _texto)],
+        'idade': [('idade', _texto)],
+        'altura': [('altura', _numero)],
+        'altura_riqueza': [('altura_riqueza', _numero)],
+        'meta': [('meta', _numero)]
+    }
+    for papel, coluna in cols.items():
+        if coluna is not None:
+            for nome, converter in conversoes[papel]:
+                dados[nome] = converter(df_inventario[coluna])
+    return pl.DataFrame(dados).lazy()
+
+# ============================================================================
+# ÁREA AMOSTRADA (agrupada por `ordem`: 0 para um conjunto, ou uma por propriedade)
+# ============================================================================
+
+def _areas_censo(quadro, cols):
+    """
+    Área de censo por grupo: primeira área não nula de cada (propriedade, UT), somada.
+    Retorna {ordem: ResultadoArea}; grupos sem linhas ficam de fora.
+    """
+    if not cols['parcela'] or not cols['area']:
+        return {ordem: ResultadoArea(0.0, "Censo - colunas não encontradas")
+                for ordem in quadro.select('ordem').unique().collect()['ordem']}
+
+    por_colunas = bool(cols['propriedade'] and cols['ut'])
+    sem_coluna = pl.lit(None, dtype=pl.String)
+    partes = pl.col('parc').str.split('_')
+
+    # Formato PROP_UT decidido pelo primeiro registro de cada grupo, como no pandas
+    chaves = quadro.with_columns(
+        prop_ut=pl.col('parc').str.contains('_', literal=True).sort_by('pos').first().over('ordem')
+    ).with_columns(
+        prop=pl.when('prop_ut').then(partes.list.first()).otherwise(pl.col('prop_col') if por_colunas else sem_coluna),
+        ut=pl.when('prop_ut').then(partes.list.get(1, null_on_oob=True)).otherwise(pl.col('ut_col') if por_colunas else sem_coluna)
+    )
+    uts = (chaves.filter(pl.col('prop').is_not_null() & pl.col('ut').is_not_null())
+           .sort('pos')
+           .group_by('ordem', 'prop', 'ut')
+           .agg(area=pl.col('area').drop_nulls().first(), num_individuos=pl.len())
+           .group_by('ordem')
+           .agg(pl.col('area').sum(), num_uts=pl.len(), num_individuos=pl.col('num_individuos').sum()))
+    grupos = chaves.group_by('ordem').agg(pl.col('prop_ut').first())
+
+    areas = {}
+    for linha in grupos.join(uts, on='ordem', how='left').collect().iter_rows(named=True):
+        if not linha['prop_ut'] and not por_colunas:
+            areas[linha['ordem']] = ResultadoArea(0.0, "Censo - não foi possível identificar cod_prop e UT")
+        else:
+            num_uts, num_individuos = linha['num_uts'] or 0, linha['num_individuos'] or 0
+            areas[linha['ordem']] = ResultadoArea(float(linha['area'] or 0.0),
+                                                  f"Censo ({num_uts} UTs, {num_individuos} indivíduos)")
+    return areas
+
+def _areas_parcelas(quadro, cols):
+    """Área de parcelas por grupo: parcelas únicas × 100 m². Retorna {ordem: ResultadoArea}"""
+    if not cols['parcela']:
+        return {ordem: ResultadoArea(0.0, "Parcelas (coluna não encontrada)")
+                for ordem in quadro.select('ordem').unique().collect()['ordem']}
+
+    areas = {}
+    contagens = quadro.group_by('ordem').agg(num_parcelas=_distintos('parc_cod')).collect()
+    for ordem, num_parcelas in contagens.iter_rows():
+        if num_parcelas > 0:
+            area_ha = (num_parcelas * AREA_PARCELA_M2) / 10000
+            areas[ordem] = ResultadoArea(area_ha, f"Parcelas ({num_parcelas} parcelas × {AREA_PARCELA_M2}m²)")
+        else:
+            areas[ordem] = ResultadoArea(0.0, "Parcelas (sem dados válidos)")
+    return areas
+
+def calcular_area_censo_inventario(df_inv_filtered):
+    """Mesmo resultado de `area.calcular_area_censo_inventario`, com a desduplicação por UT no Polars"""
+    try:
+        if len(df_inv_filtered) == 0:
+            return ResultadoArea(0.0, "Censo (sem dados de inventário)")
+
+        cols = {papel: encontrar_coluna(df_inv_filtered, COLUNAS_INVENTARIO[papel])
+                for papel in ['parcela', 'area', 'propriedade', 'ut']}
+        if not cols['parcela'] or not cols['area']:
+            return ResultadoArea(0.0, "Censo - colunas não encontradas")
+
+        quadro = _quadro_inventario(df_inv_filtered, cols).with_columns(ordem=pl.lit(0))
+        return _areas_censo(quadro, cols)[0]
+
+    except Exception as e:
+        return ResultadoArea(0.0, "Censo (erro)", avisos=[f"Erro no cálculo de área censo: {e}"])
+
+# ============================================================================
+# FITOSSOCIOLOGIA
+# ============================================================================
+
+def _agregar_por_especie(df_trabalho, colunas, area_basal_disponivel, com_frequencia=False):
+    """
+    Mesmo resultado de `fitossociologia._agregar_por_especie` (e, com `com_frequencia`,
+    da coluna de frequência por parcelas), com o agrupamento no Polars.
+    """
+    especies, rotulos = pd.factorize(df_trabalho[colunas['especie']])
+    dados = {'especie': especies}
+    if colunas['plaqueta']:
+        dados['plaqueta'] = pd.factorize(df_trabalho[colunas['plaqueta']])[0]
+    if com_frequencia:
+        dados['parcela'] = pd.factorize(df_trabalho[colunas['parcela']])[0]
+    if area_basal_disponivel:
+        dados['area_basal'] = pl.Series(df_trabalho['area_basal_m2'].to_numpy(dtype=float), nan_to_null=True)
+
+    quadro = pl.DataFrame(dados).lazy().filter(pl.col('especie') >= 0)
+    area_basal = pl.col('area_basal').sum() if area_basal_disponivel else pl.lit(0.0)
+
+    if colunas['plaqueta'] and area_basal_disponivel:
+        # Fustes sem plaqueta não formam indivíduo (como o groupby por espécie e plaqueta)
+        agregado = quadro.filter(pl.col('plaqueta') >= 0).group_by('especie').agg(
+            num_individuos=pl.col('plaqueta').n_unique(), area_basal_total=area_basal)
+    elif colunas['plaqueta']:
+        agregado = quadro.group_by('especie').agg(num_individuos=_distintos('plaqueta'), area_basal_total=area_basal)
+    else:
+        # Sem plaqueta não há como distinguir fustes: cada registro é um indivíduo
+        agregado = quadro.group_by('especie').agg(num_individuos=pl.len(), area_basal_total=area_basal)
+
+    colunas_saida = ['num_individuos', 'area_basal_total']
+    if com_frequencia:
+        frequencia = quadro.group_by('especie').agg(frequencia=_distintos('parcela'))
+        agregado = agregado.join(frequencia, on='especie', how='left')
+        colunas_saida.insert(0, 'frequencia')
+
+    agregado = agregado.collect()
+    indice = pd.Index(rotulos.take(agregado['especie'].to_numpy()), name=colunas['especie'])
+    fitossocio = pd.DataFrame({
+        col: agregado[col].to_numpy().astype('int64' if col != 'area_basal_total' else 'float64')
+        for col in colunas_saida
+    }, index=indice)
+
+    # Mesma ordem das espécies do groupby do pandas (desempate da ordenação por VC/VI)
+    return fitossocio.sort_index()
+
+def calcular_fitossociologia_censo(df_inventario):
+    """Mesmo resultado de `fitossociologia.calcular_fitossociologia_censo`, agregando no Polars"""
+    resultado, dados = _preparar(df_inventario, 'censo')
+    if dados is None:
+        return resultado
+
+    try:
+        df_trabalho, colunas = dados
+        if not colunas['especie']:
+            resultado.erros.append("❌ Coluna de espécie não encontrada")
+            return resultado
+
+        fitossocio = _agregar_por_especie(df_trabalho, colunas, resultado.area_basal_disponivel)
+        _finalizar_censo(resultado, fitossocio, colunas['especie'])
+
+    except Exception as e:
+        resultado.erros.append(f"Erro no cálculo fitossociológico (censo): {e}")
+
+    return resultado
+
+def calcular_fitossociologia_parcelas(df_inventario):
+    """Mesmo resultado de `fitossociologia.calcular_fitossociologia_parcelas`, agregando no Polars"""
+    resultado, dados = _preparar(df_inventario, 'parcelas')
+    if dados is None:
+        return resultado
+
+    try:
+        df_trabalho, colunas = dados
+        if not colunas['especie'] or not colunas['parcela']:
+            resultado.erros.append("❌ Colunas essenciais não encontradas (espécie ou parcela)")
+            return resultado
+
+        fitossocio = _agregar_por_especie(df_trabalho, colunas, resultado.area_basal_disponivel, com_frequencia=True)
+        _finalizar_parcelas(resultado, fitossocio, colunas['especie'], df_trabalho[colunas['parcela']].nunique())
+
+    except Exception as e:
+        resultado.erros.append(f"Erro no cálculo fitossociológico (parcelas): {e}")
+
+    return resultado
+
+# ============================================================================
+# INDICADORES DE RESTAURAÇÃO POR PROPRIEDADE
+# ============================================================================
+
+def _condicao_regenerante(cols):
+    """Equivalente Polars de `densidade.filtrar_regenerantes`"""
+    condicao = pl.col('pos').is_not_null()
+    if cols['especie']:
+        condicao = condicao & ~pl.col('especie_txt').str.contains('(?i)morto|morta')
+    if cols['origem']:
+        condicao = condicao & pl.col('origem').str.contains('(?i)nativa')
+    if cols['idade']:
+        condicao = condicao & pl.col('idade').str.contains('(?i)jovem')
+    if cols['altura']:
+        condicao = condicao & (pl.col('altura') >= ALTURA_MINIMA_REGENERANTE).fill_null(False)
+    return condicao
+
+def _membros(df_inventario, cols, chaves):
+    """
+    LazyFrame (ordem, pos) com os registros do inventário de cada propriedade, pelas regras
+    de `selecionar_inventario_propriedade`: cod_prop igual; ou cod_parc começando com
+    "PROP_"; ou, sem nenhum, contendo PROP. None se não houver como ligar.
+    """
+    props = pl.DataFrame({'ordem': np.arange(len(chaves)), 'chave': chaves}).lazy()
+
+    if 'cod_prop' in df_inventario.columns:
+        registros = pl.DataFrame({'pos': np.arange(len(df_inventario)), 'chave': _texto(df_inventario['cod_prop'])})
+        return registros.lazy().join(props, on='chave').select('ordem', 'pos')
+
+    if not cols['ligacao']:
+        return None
+
+    # Os códigos distintos são poucos: o casamento por prefixo e por trecho é feito sobre eles
+    ordens_por_chave = {}
+    for ordem, chave in enumerate(chaves):
+        ordens_por_chave.setdefault(chave, []).append(ordem)
+
+    codigos = _texto(df_inventario[cols['ligacao']])
+    distintos = codigos.unique().to_list()
+    pares = set()
+    for codigo in distintos:
+        partes = codigo.split('_')
+        for k in range(1, len(partes)):
+            for ordem in ordens_por_chave.get('_'.join(partes[:k]), []):
+                pares.add((ordem, codigo))
+
+    com_prefixo = {ordem for ordem, _ in pares}
+    for ordem, chave in enumerate(chaves):
+        if ordem not in com_prefixo:
+            pares.update((ordem, codigo) for codigo in distintos if chave in codigo)
+
+    membros = pl.DataFrame(sorted(pares), schema={'ordem': pl.Int64, 'lig': pl.String}, orient='row').lazy()
+    registros = pl.DataFrame({'pos': np.arange(len(df_inventario)), 'lig': codigos}).lazy()
+    return membros.join(registros, on='lig').select('ordem', 'pos')
+
+def _caracterizacao_por_propriedade(df_caracterizacao, chaves):
+    """
+    {ordem: (registros, cobertura média, primeiro método, tem censo, tem parcelas, tem não-censo)}
+    para cada propriedade, e se a caracterização tem coluna de técnica.
+    """
+    cols = {papel: encontrar_coluna(df_caracterizacao, nomes) for papel, nomes in COLUNAS_CARACTERIZACAO.items()}
+    props = pl.DataFrame({'ordem': np.arange(len(chaves)), 'chave': chaves}).lazy()
+
+    dados = {'pos': np.arange(len(df_caracterizacao))}
+    if 'cod_prop' in df_caracterizacao.columns:
+        dados['chave'] = _texto(df_caracterizacao['cod_prop'])
+    else:
+        dados['chave'] = pl.Series([None] * len(df_caracterizacao), dtype=pl.String)
+    if cols['cobertura']:
+        dados['cobertura'] = _numero(df_caracterizacao[cols['cobertura']])
+    if cols['metodo']:
+        dados['metodo'] = _texto(df_caracterizacao[cols['metodo']])
+    if cols['tecnica']:
+        dados['tecnica'] = _texto(df_caracterizacao[cols['tecnica']]).str.to_lowercase()
+
+    if cols['tecnica']:
+        tecnicas = [
+            pl.col('tecnica').str.contains('censo', literal=True).any().alias('censo'),
+            (pl.col('tecnica').str.contains('parcela', literal=True) | pl.col('tecnica').str.contains('plot', literal=True)).any().alias('parcelas'),
+            (~pl.col('tecnica').str.contains('censo', literal=True)).any().alias('nao_censo')
+        ]
+    else:
+        tecnicas = [pl.lit(False).alias('censo'), pl.lit(True).alias('parcelas'), pl.lit(True).alias('nao_censo')]
+
+    agregado = (props.join(pl.DataFrame(dados).lazy(), on='chave', how='left')
+                .sort('ordem', 'pos', nulls_last=True)
+                .group_by('ordem')
+                .agg(pl.col('pos').count().alias('registros'),
+                     (pl.col('cobertura').mean() if cols['cobertura'] else pl.lit(None)).alias('cobertura'),
+                     (pl.col('metodo').first() if cols['metodo'] else pl.lit(None)).alias('metodo'),
+                     *tecnicas)
+                .collect())
+
+    carac = {}
+    for ordem, registros, cobertura, metodo, censo, parcelas, nao_censo in agregado.iter_rows():
+        if registros == 0 and cols['tecnica']:
+            censo = parcelas = nao_censo = False
+        carac[ordem] = (registros, cobertura, metodo, censo, parcelas, nao_censo)
+    return carac, cols['tecnica'] is not None
+
+def _inventario_por_propriedade(df_inventario, cols, chaves):
+    """
+    {ordem: (registros, registros regenerantes, regenerantes, riqueza observada,
+    riqueza de nativas, meta)} e as áreas de cada propriedade.
+    """
+    membros = _membros(df_inventario, cols, chaves)
+    if membros is None:
+        return {}, {}
+
+    quadro = membros.join(_quadro_inventario(df_inventario, cols), on='pos').sort('ordem', 'pos')
+
+    regenerante = _condicao_regenerante(cols)
+    regenerantes = _distintos('plaqueta', regenerante) if cols['plaqueta'] else regenerante.sum()
+
+    if cols['especie']:
+        nativas = ~pl.col('especie_txt').str.contains('(?i)morto|morta')
+        if cols['origem']:
+            nativas = nativas & pl.col('origem').str.contains('(?i)nativa')
+        observadas = nativas
+        if cols['altura_riqueza']:
+            observadas = observadas & (pl.col('altura_riqueza') > ALTURA_MINIMA_RIQUEZA).fill_null(False)
+        riquezas = [_distintos('especie', observadas), _distintos('especie', nativas)]
+    else:
+        riquezas = [pl.lit(0), pl.lit(0)]
+
+    meta = pl.col('pos').filter(pl.col('meta').is_not_null()).min() if cols['meta'] else pl.lit(None)
+
+    agregado = quadro.group_by('ordem').agg(
+        pl.len(), regenerante.sum(), regenerantes, *[r.alias(f'riqueza_{i}') for i, r in enumerate(riquezas)],
+        meta.alias('meta')
+    ).collect()
+
+    inventario = {}
+    for ordem, *valores, pos_meta in agregado.iter_rows():
+        valor_meta = df_inventario[cols['meta']].iloc[pos_meta] if pos_meta is not None else None
+        inventario[ordem] = (*valores, valor_meta)
+
+    # Para técnicas mistas, a área usa só os registros cujo cod_parc (ou cod_prop) é a
+    # própria propriedade, como `filtrar_inventario_por_propriedades`
+    sub = quadro
+    if cols['parcela']:
+        sem_prefixo = pl.col('prop_col').str.to_lowercase() if cols['propriedade'] else pl.lit(None, dtype=pl.String)
+        chave_sub = (pl.when(pl.col('parc').str.contains('_', literal=True).first().over('ordem'))
+                     .then(pl.col('parc').str.split('_').list.first().str.to_lowercase())
+                     .otherwise(sem_prefixo))
+        chaves_minusculas = pl.DataFrame({'ordem': np.arange(len(chaves)), 'chave': [c.lower() for c in chaves]}).lazy()
+        sub = (quadro.with_columns(chave_sub=chave_sub).join(chaves_minusculas, on='ordem')
+               .filter(pl.col('chave_sub').is_null() | (pl.col('chave_sub') == pl.col('chave')))
+               .drop('chave_sub', 'chave'))
+
+    areas = {
+        'censo': _areas_censo(quadro, cols),
+        'parcelas': _areas_parcelas(quadro, cols),
+        'censo_sub': _areas_censo(sub, cols),
+        'parcelas_sub': _areas_parcelas(sub, cols)
+    }
+    return inventario, areas
+
+def calcular_indicadores_restauracao(df_caracterizacao, df_inventario):
+    """
+    Mesmo resultado de `restauracao.calcular_indicadores_restauracao`, com as agregações
+    de todas as propriedades agrupadas no Polars, em vez de uma passada por propriedade.
+    """
+    saida = ResultadoIndicadores()
+
+    try:
+        propriedades = listar_propriedades(df_caracterizacao, df_inventario)
+        chaves = [str(p) for p in propriedades]
+
+        carac, tem_coluna_tecnica = _caracterizacao_por_propriedade(df_caracterizacao, chaves)
+        cols = {papel: encontrar_coluna(df_inventario, nomes) for papel, nomes in COLUNAS_INVENTARIO.items()}
+        inventario, areas = _inventario_por_propriedade(df_inventario, cols, chaves)
+
+        saida.tabela = pd.DataFrame([
+            montar_linha_indicadores(cod_prop, carac[ordem], inventario.get(ordem),
+                                     escolher_area_propriedade(ordem, tem_coluna_tecnica, carac[ordem], areas),
+                                     cols['meta'] is not None)
+            for ordem, cod_prop in enumerate(propriedades)
+        ])
+    except Exception as e:
+        saida.erros.append(f"Erro ao calcular indicadores de restauração: {e}")
+
+    return saida
+
+# ============================================================================
+# OUTLIERS POR GRUPO
+# ============================================================================
+
+def calcular_outliers_por_grupo(df, coluna, coluna_grupo, fator=FATOR_IQR):
+    """Mesmo resultado de `outliers.calcular_outliers_por_grupo`, com quartis e contagens no Polars"""
+    grupos = como_texto(df[coluna_grupo])
+    quadro = pl.DataFrame({'grupo': _texto(grupos), 'valor': _numero(df[coluna])}).lazy()
+
+    limites = quadro.group_by('grupo').agg(
+        Q1=pl.col('valor').quantile(0.25, interpolation='linear'),
+        Mediana=pl.col('valor').quantile(0.5, interpolation='linear'),
+        Q3=pl.col('valor').quantile(0.75, interpolation='linear'),
+        n_validos=pl.col('valor').count()
+    ).with_columns(
+        IQR=pl.col('Q3') - pl.col('Q1')
+    ).with_columns(
+        limite_inferior=pl.when(pl.col('n_validos') >= MIN_OBSERVACOES_GRUPO).then(pl.col('Q1') - fator * pl.col('IQR')),
+        limite_superior=pl.when(pl.col('n_validos') >= MIN_OBSERVACOES_GRUPO).then(pl.col('Q3') + fator * pl.col('IQR'))
+    )
+
+    fora = (pl.col('valor') < pl.col('limite_inferior')) | (pl.col('valor') > pl.col('limite_superior'))
+    marcado = (quadro.join(limites.select('grupo', 'limite_inferior', 'limite_superior'),
+                           on='grupo', how='left', maintain_order='left')
+               .with_columns(outlier=fora.fill_null(False)))
+    num_outliers = marcado.group_by('grupo').agg(num_outliers=pl.col('outlier').sum())
+
+    limites, marcado = pl.collect_all([limites.join(num_outliers, on='grupo'), marcado.select('outlier')])
+
+    mascara = pd.Series(marcado['outlier'].to_numpy(), index=df.index)
+
+    limites = limites.to_pandas().set_index('grupo').rename_axis(coluna_grupo).sort_index()
+    limites = limites[['Q1', 'Mediana', 'Q3', 'n_validos', 'IQR', 'limite_inferior', 'limite_superior', 'num_outliers']]
+    limites = limites.astype({'n_validos': 'int64', 'num_outliers': 'int64'})
+    return limites, mascara
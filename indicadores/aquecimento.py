@@ -0,0 +1,208 @@
+"""
+Aquecimento: prepara, antes da chegada do primeiro usuário, o que o
+dashboard levaria segundos para montar na primeira execução.
+
+O comando atualiza o armazém Parquet, monta o cubo de agregados e calcula
+os indicadores de restauração por propriedade da vista padrão (sem
+filtros), gravando-os no armazém com a chave da versão dos dados (ver
+`versao`). O dashboard lê esses artefatos em vez de recalculá-los; uma
+versão nova das planilhas invalida os artefatos, e o dashboard volta a
+calcular até o próximo aquecimento. Ao terminar, o comando grava o
+arquivo de prontidão (pronto.json) com a versão e o tempo de cada etapa:
+
+    python -m indicadores aquecer --dados dados && streamlit run app_indicadores.py
+    python -m indicadores aquecer --dados dados --verificar   # 0 se pronto para a versão atual
+
+Os artefatos são pickles gerados pelo próprio pacote: a pasta do armazém
+não deve aceitar escrita de terceiros.
+"""
+import glob
+import json
+import os
+import pickle
+import time
+
+from .armazem import atualizar_armazem, carregar_dados_armazem, leituras_armazem
+from .configuracao import diretorio_armazem
+from .cubo import construir_cubo
+from .dados import assinatura_leituras
+from .filtros import aplicar_filtros
+from .restauracao import calcular_indicadores_restauracao
+from .versao import versao_dados
+
+ARQUIVO_PRONTIDAO = 'pronto.json'
+
+def _indicadores_vista_padrao(df_caracterizacao, df_inventario):
+    """Indicadores de restauração da vista padrão do dashboard (todos os filtros em 'Todos')"""
+    return calcular_indicadores_restauracao(*aplicar_filtros(df_caracterizacao, df_inventario, {}, {}))
+
+# Artefato -> função que o monta a partir dos bancos completos
+ARTEFATOS = {
+    'cubo': construir_cubo,
+    'indicadores_restauracao': _indicadores_vista_padrao,
+}
+
+# ============================================================================
+# ARTEFATOS
+# ============================================================================
+
+def caminho_artefato(nome, chave_versao, diretorio_dados='.'):
+    """
+    Arquivo do artefato de uma versão dos dados, na pasta do armazém (a assinatura da leitura
+    das planilhas também entra no nome: outra projeção de colunas não reaproveita o artefato)
+    """
+    return os.path.join(diretorio_armazem(diretorio_dados), f'{nome}_{chave_versao}_{assinatura_leituras()}.pkl')
+
+def ler_artefato(nome, chave_versao, diretorio_dados='.'):
+    """Artefato gravado para a versão dos dados (None se não houver ou não puder ser lido)"""
+    try:
+        with open(caminho_artefato(nome, chave_versao, diretorio_dados), 'rb') as arquivo:
+            return pickle.load(arquivo)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+def gravar_artefato(objeto, nome, chave_versao, diretorio_dados='.'):
+    """
+    Grava o artefato em arquivo temporário e renomeia (leitores nunca veem um arquivo
+    pela metade) e apaga os das outras versões. Retorna o caminho.
+    """
+    caminho = caminho_artefato(nome, chave_versao, diretorio_dados)
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(f'{caminho}.tmp', 'wb') as arquivo:
+        pickle.dump(objeto, arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(f'{caminho}.tmp', caminho)
+
+    for antigo in glob.glob(os.path.join(diretorio_armazem(diretorio_dados), f'{nome}_*.pkl')):
+        if antigo != caminho:
+            try:
+                os.remove(antigo)
+            except OSError:
+                pass
+    return caminho
+
+def obter_artefato(nome, chave_versao, df_caracterizacao, df_inventario, diretorio_dados='.', persistir=True):
+    """
+    Artefato da versão dos dados: lido do armazém se o aquecimento já o gravou;
+    senão, montado a partir dos bancos (e gravado, se a pasta aceitar escrita).
+    Com persistir=False (ex.: só algumas campanhas selecionadas), só é montado.
+    """
+    if not persistir:
+        return ARTEFATOS[nome](df_caracterizacao, df_inventario)
+    objeto = ler_artefato(nome, chave_versao, diretorio_dados)
+    if objeto is None:
+        objeto = ARTEFATOS[nome](df_caracterizacao, df_inventario)
+        try:
+            gravar_artefato(objeto, nome, chave_versao, diretorio_dados)
+        except OSError:
+            pass
+    return objeto
+
+# ============================================================================
+# AQUECIMENTO E PRONTIDÃO
+# ============================================================================
+
+def ler_prontidao(diretorio_dados='.'):
+    """Conteúdo do arquivo de prontidão (vazio se o aquecimento nunca terminou)"""
+    try:
+        with open(os.path.join(diretorio_armazem(diretorio_dados), ARQUIVO_PRONTIDAO), encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return {}
+
+def _gravar_prontidao(diretorio_dados, prontidao):
+    """Grava o arquivo de prontidão em arquivo temporário e renomeia"""
+    caminho = os.path.join(diretorio_armazem(diretorio_dados), ARQUIVO_PRONTIDAO)
+    with open(f'{caminho}.tmp', 'w', encoding='utf-8') as arquivo:
+        json.dump(prontidao, arquivo, indent=2)
+    os.replace(f'{caminho}.tmp', caminho)
+
+def servidor_pronto(diretorio_dados='.', prontidao=None):
+    """True se o último aquecimento foi da versão atual das planilhas e todos os artefatos existem"""
+    prontidao = ler_prontidao(diretorio_dados) if prontidao is None else prontidao
+    chave = versao_dados(diretorio_dados).chave
+    return prontidao.get('versao') == chave and all(
+        os.path.exists(caminho_artefato(nome, chave, diretorio_dados)) for nome in ARTEFATOS
+    )
+
+def aquecer(diretorio_dados='.', forcar=False):
+    """
+    Atualiza o armazém e grava os artefatos da versão atual (todos refeitos, com forcar=True;
+    senão, só os que faltam). Grava e retorna a prontidão: versão, horário, tempo de cada
+    etapa (s), origem de cada artefato ('calculado' ou 'armazem') e a leitura de cada
+    planilha que gerou o armazém (ver `dados.LeituraPlanilha`).
+    """
+    etapas = {}
+    origens = {}
+    inicio_total = time.perf_counter()
+
+    inicio = time.perf_counter()
+    atualizar_armazem(diretorio_dados, forcar=forcar)
+    etapas['armazem'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    df_caracterizacao, df_inventario = carregar_dados_armazem(diretorio_dados)
+    etapas['carregamento'] = time.perf_counter() - inicio
+
+    chave = versao_dados(diretorio_dados).chave
+    for nome, construir in ARTEFATOS.items():
+        inicio = time.perf_counter()
+        if not forcar and os.path.exists(caminho_artefato(nome, chave, diretorio_dados)):
+            origens[nome] = 'armazem'
+        else:
+            gravar_artefato(construir(df_caracterizacao, df_inventario), nome, chave, diretorio_dados)
+            origens[nome] = 'calculado'
+        etapas[nome] = time.perf_counter() - inicio
+
+    etapas['total'] = time.perf_counter() - inicio_total
+    prontidao = {
+        'versao': chave,
+        'pronto_em': time.time(),
+        'etapas': {etapa: round(segundos, 3) for etapa, segundos in etapas.items()},
+        'artefatos': origens,
+        'leituras': leituras_armazem(diretorio_dados),
+    }
+    _gravar_prontidao(diretorio_dados, prontidao)
+    return prontidao
+
+# ============================================================================
+# LINHA DE COMANDO
+# ============================================================================
+
+def imprimir_prontidao(prontidao, diretorio_dados='.'):
+    """Versão, tempo de cada etapa e situação dos artefatos"""
+    situacao = 'pronto' if servidor_pronto(diretorio_dados, prontidao) else 'DESATUALIZADO'
+    print(f"Versão {prontidao['versao']} ({situacao}), aquecida em "
+          f"{time.strftime('%d/%m/%Y %H:%M:%S', time.localtime(prontidao['pronto_em']))}")
+    for etapa, segundos in prontidao['etapas'].items():
+        origem = prontidao['artefatos'].get(etapa)
+        print(f"  {etapa:<25} {segundos:8.2f} s" + (f"  ({origem})" if origem else ''))
+    for leitura in prontidao.get('leituras', {}).values():
+        print(f"  {leitura['arquivo']}: leitura {leitura['tempo_leitura']:.2f} s ({leitura['leitor']}), "
+              f"limpeza {leitura['tempo_limpeza']:.2f} s, {leitura['linhas']} linhas "
+              f"({leitura['linhas_vazias']} vazias descartadas), {leitura['colunas']} colunas "
+              f"({len(leitura['colunas_ignoradas'])} não lidas), {leitura['memoria'] / 1024 ** 2:.1f} MB"
+              + (f" ({leitura['memoria_sem_esquema'] / 1024 ** 2:.1f} MB sem o esquema de tipos)"
+                 if leitura.get('memoria_sem_esquema') else ''))
+
+def executar(args):
+    """Subcomando `aquecer`"""
+    if args.verificar:
+        prontidao = ler_prontidao(args.dados)
+        if not prontidao:
+            print("Dados não aquecidos (nenhum arquivo de prontidão)")
+            return 1
+        imprimir_prontidao(prontidao, args.dados)
+        return 0 if servidor_pronto(args.dados, prontidao) else 1
+
+    imprimir_prontidao(aquecer(args.dados, args.forcar), args.dados)
+    return 0
+
+def configurar_parser(subparsers):
+    """Registra o subcomando `aquecer` (ou `warmup`)"""
+    parser = subparsers.add_parser('aquecer', aliases=['warmup'],
+                                   help='prepara armazém, cubo e indicadores antes de abrir o dashboard')
+    parser.add_argument('--dados', default='.', help='pasta com as planilhas BD_*.xlsx (padrão: pasta atual)')
+    parser.add_argument('--forcar', action='store_true', help='refaz o armazém e todos os artefatos')
+    parser.add_argument('--verificar', action='store_true',
+                        help='só confere se o aquecimento é da versão atual (saída 0 se pronto, 1 se não)')
+    parser.set_defaults(executar=executar)
@@ -0,0 +1,143 @@
+"""
+Área amostrada por técnica de amostragem (censo, parcelas ou mista).
+"""
+import pandas as pd
+
+from .agregacao import agregacao_configuravel
+from .colunas import encontrar_coluna
+from .esquema import ampliar_medida, como_texto
+from .filtros import detectar_tecnicas, filtrar_inventario_por_propriedades, separar_por_tecnica
+from .perfil import perfilado
+from .resultados import ResultadoArea
+
+AREA_PARCELA_M2 = 100
+
+@perfilado()
+def calcular_area_amostrada(df_carac_filtered, df_inv_filtered):
+    """
+    Calcula a área amostrada com método híbrido avançado:
+    - Separa dados por técnica (Censo vs Parcelas)
+    - Calcula área de cada técnica separadamente
+    - Soma as áreas para obter total correto
+    """
+    try:
+        if len(df_carac_filtered) == 0 and len(df_inv_filtered) == 0:
+            return ResultadoArea(0.0, "Sem dados")
+
+        tecnica_col, tem_censo, tem_parcelas = detectar_tecnicas(df_carac_filtered)
+
+        if not tecnica_col or len(df_carac_filtered) == 0:
+            # Fallback: usar método de parcelas
+            return calcular_area_parcelas_tradicional(df_inv_filtered)
+
+        # Se tem apenas uma técnica, usar método direto
+        if tem_censo and not tem_parcelas:
+            return calcular_area_censo_inventario(df_inv_filtered)
+        elif tem_parcelas and not tem_censo:
+            return calcular_area_parcelas_tradicional(df_inv_filtered)
+
+        # Se tem mistura de técnicas, calcular separadamente
+        if tem_censo and tem_parcelas:
+            resultado = ResultadoArea()
+            metodos_usados = []
+
+            dados_censo, dados_parcelas = separar_por_tecnica(df_carac_filtered, tecnica_col)
+
+            for rotulo, dados, calcular in [("Censo", dados_censo, calcular_area_censo_inventario),
+                                            ("Parcelas", dados_parcelas, calcular_area_parcelas_tradicional)]:
+                # Filtrar BD_inventário para as propriedades de cada técnica
+                props = dados['cod_prop'].unique() if 'cod_prop' in dados.columns else []
+                if len(props) == 0:
+                    continue
+
+                df_inv_tecnica = filtrar_inventario_por_propriedades(df_inv_filtered, props)
+                if len(df_inv_tecnica) > 0:
+                    parcial = calcular(df_inv_tecnica)
+                    resultado.area_ha += parcial.area_ha
+                    resultado.avisos += parcial.avisos
+                    metodos_usados.append(f"{rotulo}: {parcial.metodo}")
+
+            resultado.metodo = " + ".join(metodos_usados) if metodos_usados else "Misto (sem dados)"
+            return resultado
+
+        # Fallback se não conseguiu identificar técnicas
+        return calcular_area_parcelas_tradicional(df_inv_filtered)
+
+    except Exception as e:
+        return ResultadoArea(0.0, "Erro", avisos=[f"Erro no cálculo de área: {e}"])
+
+@agregacao_configuravel
+def calcular_area_censo_inventario(df_inv_filtered):
+    """Calcula área para método CENSO usando BD_inventário com desduplicação"""
+    try:
+        if len(df_inv_filtered) == 0:
+            return ResultadoArea(0.0, "Censo (sem dados de inventário)")
+
+        # Encontrar colunas necessárias
+        col_parc = encontrar_coluna(df_inv_filtered, ['cod_parc', 'codigo_parcela', 'parcela'])
+        col_area = encontrar_coluna(df_inv_filtered, ['area_ha', 'area'])
+
+        if not col_parc or not col_area:
+            return ResultadoArea(0.0, "Censo - colunas não encontradas")
+
+        # Só as colunas usadas, com cod_parc como texto para garantir compatibilidade
+        df_trabalho = pd.DataFrame({col_parc: como_texto(df_inv_filtered[col_parc]),
+                                    col_area: ampliar_medida(df_inv_filtered[col_area])})
+
+        # Verificar formato e extrair cod_prop e UT
+        if '_' in str(df_trabalho[col_parc].iloc[0]):
+            # Formato PROP_UT
+            partes = df_trabalho[col_parc].str.split('_')
+            df_trabalho['cod_prop_extraido'] = partes.str[0]
+            df_trabalho['ut_extraido'] = partes.str[1]
+        else:
+            # Tentar encontrar colunas separadas
+            col_prop = encontrar_coluna(df_inv_filtered, ['cod_prop', 'codigo_propriedade', 'propriedade'])
+            col_ut = encontrar_coluna(df_inv_filtered, ['ut', 'unidade_trabalho', 'UT'])
+
+            if col_prop and col_ut:
+                df_trabalho['cod_prop_extraido'] = como_texto(df_inv_filtered[col_prop])
+                df_trabalho['ut_extraido'] = como_texto(df_inv_filtered[col_ut])
+            else:
+                return ResultadoArea(0.0, "Censo - não foi possível identificar cod_prop e UT")
+
+        # Desduplicar por UT - pegar apenas um registro por UT (já que área se repete)
+        df_unico = df_trabalho.groupby(['cod_prop_extraido', 'ut_extraido']).agg({
+            col_area: 'first',  # Pega o primeiro valor (todos são iguais)
+            col_parc: 'count'   # Conta quantos indivíduos tem na UT
+        }).reset_index()
+
+        # Calcular área total (soma das áreas únicas de cada UT)
+        area_total = df_unico[col_area].sum()
+        num_uts = len(df_unico)
+        num_individuos = df_unico[col_parc].sum()
+
+        return ResultadoArea(area_total, f"Censo ({num_uts} UTs, {num_individuos} indivíduos)")
+
+    except Exception as e:
+        return ResultadoArea(0.0, "Censo (erro)", avisos=[f"Erro no cálculo de área censo: {e}"])
+
+def calcular_area_parcelas_tradicional(df_inv_filtered):
+    """Calcula área para método PARCELAS usando fórmula tradicional"""
+    try:
+        if len(df_inv_filtered) == 0:
+            return ResultadoArea(0.0, "Parcelas (sem dados)")
+
+        # Encontrar coluna de parcela
+        col_parc = encontrar_coluna(df_inv_filtered, ['cod_parc', 'codigo_parcela', 'parcela'])
+
+        if not col_parc:
+            return ResultadoArea(0.0, "Parcelas (coluna não encontrada)")
+
+        # Contar parcelas únicas
+        num_parcelas = df_inv_filtered[col_parc].nunique()
+
+        if num_parcelas > 0:
+            # Fórmula tradicional: (número de parcelas × 100) / 10000
+            area_ha = (num_parcelas * AREA_PARCELA_M2) / 10000
+            return ResultadoArea(area_ha, f"Parcelas ({num_parcelas} parcelas × {AREA_PARCELA_M2}m²)")
+        else:
+            return ResultadoArea(0.0, "Parcelas (sem dados válidos)")
+
+    except Exception as e:
+        return ResultadoArea(0.0, "Parcelas (erro)", avisos=[f"Erro no cálculo de área parcelas: {e}"])
@@ -0,0 +1,166 @@
+"""
+Armazém Parquet dos bancos já limpos e padronizados.
+
+A leitura das planilhas Excel é a etapa mais lenta do carregamento; o
+armazém guarda o resultado da leitura em Parquet (colunar), um arquivo por
+banco e campanha (<banco>/<campanha>.parquet). O manifesto (versao.json)
+registra, para cada planilha, o hash de origem (ver `versao`), a leitura
+que a gerou (leitor, projeção de colunas, tempo e memória, ver
+`dados.LeituraPlanilha`) e o período das datas de execução da campanha:
+só a planilha que mudou (ou a campanha nova) é lida, as demais ficam como
+estão, e as planilhas a ler são lidas ao mesmo tempo. As campanhas cujas
+planilhas saíram da pasta saem do armazém. Os bancos podem ser carregados
+só com as campanhas pedidas. Também é a fonte do motor de consulta DuckDB,
+que lê os arquivos sem carregá-los no pandas.
+"""
+import json
+import os
+import time
+from dataclasses import asdict
+
+import numpy as np
+import pandas as pd
+
+from .configuracao import diretorio_armazem
+from .dados import BANCOS, assinatura_leitura, juntar_campanhas, ler_planilhas
+from .versao import versao_dados
+
+ARQUIVO_MANIFESTO = 'versao.json'
+
+def chave_planilha(banco, campanha):
+    """Chave de uma planilha no manifesto ('<banco>/<campanha>')"""
+    return f'{banco}/{campanha}'
+
+def caminho_planilha_armazem(banco, campanha, diretorio_dados='.'):
+    """Arquivo Parquet de um banco em uma campanha"""
+    return os.path.join(diretorio_armazem(diretorio_dados), banco, f'{campanha}.parquet')
+
+def caminhos_armazem(diretorio_dados='.', campanhas=None):
+    """Arquivos Parquet de cada banco, um por campanha (só as de `campanhas`, se informadas)"""
+    caminhos = {banco: [] for banco in BANCOS}
+    for banco, campanha, _ in versao_dados(diretorio_dados).planilhas:
+        if campanhas is None or campanha in campanhas:
+            caminhos[banco].append(caminho_planilha_armazem(banco, campanha, diretorio_dados))
+    return caminhos
+
+def ler_manifesto(diretorio_dados='.'):
+    """Manifesto do armazém: 'planilhas' -> entrada de cada planilha (vazio se não houver manifesto)"""
+    try:
+        with open(os.path.join(diretorio_armazem(diretorio_dados), ARQUIVO_MANIFESTO), encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return {}
+
+def _gravar_manifesto(diretorio_dados, manifesto):
+    """Grava o manifesto em arquivo temporário e renomeia"""
+    caminho = os.path.join(diretorio_armazem(diretorio_dados), ARQUIVO_MANIFESTO)
+    with open(f'{caminho}.tmp', 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo, indent=2)
+    os.replace(f'{caminho}.tmp', caminho)
+
+def leituras_armazem(diretorio_dados='.'):
+    """
+    Entrada de cada planilha do armazém: a leitura que a gerou (`LeituraPlanilha` como
+    dicionário, com campanha e período das datas), o hash de origem e o horário da ingestão
+    """
+    return ler_manifesto(diretorio_dados).get('planilhas', {})
+
+def planilhas_desatualizadas(diretorio_dados='.', bancos=None):
+    """
+    Planilhas (banco, campanha) cujo arquivo Parquet falta ou foi gerado de outra versão
+    da planilha (ou com outra projeção)
+    """
+    entradas = leituras_armazem(diretorio_dados)
+    desatualizadas = []
+    for banco, campanha, valor in versao_dados(diretorio_dados).planilhas:
+        if bancos is not None and banco not in bancos:
+            continue
+        entrada = entradas.get(chave_planilha(banco, campanha), {})
+        if (not os.path.exists(caminho_planilha_armazem(banco, campanha, diretorio_dados))
+                or entrada.get('hash') != valor or entrada.get('assinatura') != assinatura_leitura(banco)):
+            desatualizadas.append((banco, campanha))
+    return desatualizadas
+
+def bancos_desatualizados(diretorio_dados='.', bancos=None):
+    """Bancos com alguma planilha desatualizada no armazém (ver `planilhas_desatualizadas`)"""
+    desatualizadas = {banco for banco, _ in planilhas_desatualizadas(diretorio_dados, bancos)}
+    return [banco for banco in (bancos or BANCOS) if banco in desatualizadas]
+
+def armazem_atualizado(diretorio_dados='.'):
+    """True se todos os arquivos do armazém existem e correspondem às planilhas atuais"""
+    return not planilhas_desatualizadas(diretorio_dados)
+
+def _gravar_parquet(df, caminho):
+    """Grava em arquivo temporário e renomeia, para leitores nunca verem um arquivo pela metade"""
+    temporario = f'{caminho}.tmp'
+    df.to_parquet(temporario, index=False)
+    os.replace(temporario, caminho)
+
+def _remover(caminho):
+    """Remove um arquivo do armazém (ignora o que já não existe)"""
+    try:
+        os.remove(caminho)
+    except OSError:
+        pass
+
+def _remover_planilhas(diretorio_dados, entradas, chaves, bancos):
+    """Tira do armazém e do manifesto as planilhas que saíram da pasta (e os arquivos do formato antigo, um por banco)"""
+    for chave in chaves:
+        _remover(caminho_planilha_armazem(*chave.split('/', 1), diretorio_dados))
+        del entradas[chave]
+    for banco in bancos:
+        _remover(os.path.join(diretorio_armazem(diretorio_dados), f'{banco}.parquet'))
+
+def atualizar_armazem(diretorio_dados='.', forcar=False, bancos=None):
+    """
+    Lê para o armazém as planilhas novas ou desatualizadas (todas as de `bancos`, com
+    forcar=True), ao mesmo tempo, e remove as campanhas que saíram da pasta.
+    Retorna os caminhos dos arquivos Parquet de cada banco.
+    """
+    bancos = list(bancos or BANCOS)
+    versao = versao_dados(diretorio_dados)
+    if forcar:
+        refazer = [(banco, campanha) for banco, campanha, _ in versao.planilhas if banco in bancos]
+    else:
+        refazer = planilhas_desatualizadas(diretorio_dados, bancos)
+
+    entradas = ler_manifesto(diretorio_dados).get('planilhas', {})
+    atuais = {chave_planilha(banco, campanha) for banco, campanha, _ in versao.planilhas}
+    ausentes = [chave for chave in entradas if chave.split('/', 1)[0] in bancos and chave not in atuais]
+    if refazer or ausentes:
+        for banco in bancos:
+            os.makedirs(os.path.join(diretorio_armazem(diretorio_dados), banco), exist_ok=True)
+        for (banco, campanha), (df, leitura) in ler_planilhas(refazer, diretorio_dados).items():
+            _gravar_parquet(df, caminho_planilha_armazem(banco, campanha, diretorio_dados))
+            entradas[chave_planilha(banco, campanha)] = {
+                **asdict(leitura),
+                'hash': versao.da_planilha(banco, campanha),
+                'assinatura': assinatura_leitura(banco),
+                'ingerida_em': time.time(),
+            }
+        _remover_planilhas(diretorio_dados, entradas, ausentes, bancos)
+        _gravar_manifesto(diretorio_dados, {'planilhas': entradas})
+    return caminhos_armazem(diretorio_dados)
+
+def ler_parquet_armazem(caminho):
+    """Lê um arquivo do armazém com os nulos de texto como NaN (igual à leitura do Excel)"""
+    df = pd.read_parquet(caminho)
+    for col in df.columns:
+        if df[col].dtype == 'object':
+            df[col] = df[col].where(df[col].notna(), np.nan)
+    return df
+
+def carregar_banco_armazem(banco, diretorio_dados='.', campanhas=None):
+    """
+    Mesmo resultado de `carregar_banco`, lido do armazém (atualizado antes, se preciso);
+    com `campanhas`, só os arquivos dessas campanhas são lidos
+    """
+    caminhos = atualizar_armazem(diretorio_dados, bancos=[banco])
+    selecionados = caminhos_armazem(diretorio_dados, campanhas)[banco] if campanhas is not None else caminhos[banco]
+    if not selecionados:
+        return ler_parquet_armazem(caminhos[banco][0]).iloc[:0]
+    return juntar_campanhas(ler_parquet_armazem(caminho) for caminho in selecionados)
+
+def carregar_dados_armazem(diretorio_dados='.', campanhas=None):
+    """Mesmo resultado de `carregar_dados`, lido do armazém (só as `campanhas` pedidas, se informadas)"""
+    return tuple(carregar_banco_armazem(banco, diretorio_dados, campanhas) for banco in BANCOS)
@@ -0,0 +1,42 @@
+"""
+Verificações de qualidade dos dados usadas na página de auditoria.
+"""
+from .colunas import encontrar_coluna
+from .esquema import contar_valores
+from .perfil import perfilado
+from .resultados import ResultadoEspecies
+
+COLUNAS_ESPECIE_AUDITORIA = ['especie', 'species', 'nome_cientifico', 'scientific_name', 'sp']
+TAMANHO_MINIMO_NOME = 4
+
+def encontrar_especies_suspeitas(especies_unicas):
+    """
+    Pares de nomes em que um contém o outro (minúsculas, sem espaços nas pontas),
+    possíveis grafias da mesma espécie. Nomes com menos de 4 letras são ignorados.
+    Retorna a lista de pares (nome original, nome original) na ordem de `especies_unicas`.
+    """
+    nomes = [str(esp).lower().strip() for esp in especies_unicas]
+
+    suspeitas = []
+    for i, nome1 in enumerate(nomes):
+        if len(nome1) < TAMANHO_MINIMO_NOME:
+            continue
+        for j in range(i + 1, len(nomes)):
+            nome2 = nomes[j]
+            if len(nome2) >= TAMANHO_MINIMO_NOME and (nome1 in nome2 or nome2 in nome1):
+                suspeitas.append((especies_unicas[i], especies_unicas[j]))
+    return suspeitas
+
+@perfilado()
+def analisar_nomes_especies(df_inventario):
+    """Contagem de registros por espécie e pares de nomes suspeitos de duplicidade"""
+    col_especie = encontrar_coluna(df_inventario, COLUNAS_ESPECIE_AUDITORIA)
+    if not col_especie:
+        return ResultadoEspecies(erros=["Coluna de espécie não encontrada"])
+
+    especies = df_inventario[col_especie].dropna()
+    return ResultadoEspecies(
+        coluna=col_especie,
+        contagens=contar_valores(especies),
+        suspeitas=encontrar_especies_suspeitas(especies.unique())
+    )
@@ -0,0 +1,82 @@
+"""
+Campanhas de campo: ingestão incremental das planilhas de cada campanha e
+seleção das linhas de uma ou mais campanhas.
+
+Cada campanha entrega as próprias planilhas na pasta dos dados, com o id
+da campanha no nome (BD_caracterizacao_2025-1.xlsx, BD_inventario_2025-1.xlsx;
+as planilhas sem sufixo são a campanha 'base'). Cada planilha é lida uma
+vez para o armazém (ver `armazem`), com a campanha e o período das datas de
+execução no manifesto: acrescentar uma campanha lê só as planilhas dela.
+As consultas escolhem as campanhas pela coluna 'campanha', sem reler as
+planilhas das demais:
+
+    python -m indicadores campanhas --dados dados   # ingere as planilhas novas e lista as campanhas
+"""
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from .armazem import atualizar_armazem, leituras_armazem, planilhas_desatualizadas
+from .dados import BANCOS, COLUNA_CAMPANHA, arquivo_planilha
+from .versao import versao_dados
+
+def filtrar_campanhas(df, campanhas):
+    """Linhas das campanhas pedidas (o próprio banco, se `campanhas` for None ou ele não tiver a coluna)"""
+    if campanhas is None or COLUNA_CAMPANHA not in df.columns:
+        return df
+    return df[df[COLUNA_CAMPANHA].isin(list(campanhas))]
+
+def resumo_campanhas(diretorio_dados='.'):
+    """
+    Uma campanha por linha, na ordem da pasta: linhas de cada banco, período das datas de
+    execução e horário da última ingestão (do manifesto do armazém)
+    """
+    linhas = {}
+    for entrada in leituras_armazem(diretorio_dados).values():
+        linha = linhas.setdefault(entrada['campanha'], {
+            'campanha': entrada['campanha'], **{f'linhas_{banco}': 0 for banco in BANCOS},
+            'data_inicio': None, 'data_fim': None, 'ingerida_em': None,
+        })
+        linha[f"linhas_{entrada['banco']}"] = entrada['linhas']
+        for campo, escolher in [('data_inicio', min), ('data_fim', max), ('ingerida_em', max)]:
+            valores = [valor for valor in (linha[campo], entrada.get(campo)) if valor is not None]
+            linha[campo] = escolher(valores) if valores else None
+
+    ordem = versao_dados(diretorio_dados).campanhas
+    df = pd.DataFrame([linhas[campanha] for campanha in ordem if campanha in linhas],
+                      columns=['campanha', *[f'linhas_{banco}' for banco in BANCOS], 'data_inicio', 'data_fim',
+                               'ingerida_em'])
+    df['ingerida_em'] = (pd.to_datetime(df['ingerida_em'], unit='s', utc=True)
+                         .dt.tz_convert(datetime.now().astimezone().tzinfo).dt.tz_localize(None).dt.floor('s'))
+    return df
+
+# ============================================================================
+# LINHA DE COMANDO
+# ============================================================================
+
+def executar(args):
+    """Subcomando `campanhas`"""
+    pendentes = planilhas_desatualizadas(args.dados)
+    anteriores = leituras_armazem(args.dados)
+    inicio = time.perf_counter()
+    atualizar_armazem(args.dados)
+    removidas = [entrada['arquivo'] for chave, entrada in anteriores.items() if chave not in leituras_armazem(args.dados)]
+    if pendentes:
+        print(f"{len(pendentes)} planilha(s) lida(s) para o armazém em {time.perf_counter() - inicio:.2f} s: "
+              f"{', '.join(arquivo_planilha(banco, campanha) for banco, campanha in pendentes)}")
+    if removidas:
+        print(f"{len(removidas)} planilha(s) fora da pasta, retirada(s) do armazém: {', '.join(removidas)}")
+    if not pendentes and not removidas:
+        print("Nenhuma planilha nova ou alterada: armazém em dia")
+
+    resumo = resumo_campanhas(args.dados)
+    with pd.option_context('display.width', 200):
+        print(resumo.to_string(index=False))
+    return 0
+
+def configurar_parser(subparsers):
+    """Registra o subcomando `campanhas`"""
+    parser = subparsers.add_parser('campanhas', help='ingere as planilhas novas no armazém e lista as campanhas')
+    parser.add_argument('--dados', default='.', help='pasta com as planilhas BD_*.xlsx (padrão: pasta atual)')
+    parser.set_defaults(executar=executar)
@@ -0,0 +1,60 @@
+"""
+Localização de colunas e chaves de propriedade/UT nos bancos de dados.
+"""
+from .esquema import como_texto
+
+# Papéis das colunas -> nomes possíveis (os mesmos das funções em pandas), para os motores
+# que resolvem todas as colunas de uma vez
+COLUNAS_INVENTARIO = {
+    'parcela': ['cod_parc', 'codigo_parcela', 'parcela'],
+    'ligacao': ['cod_parc', 'parcela', 'plot'],
+    'area': ['area_ha', 'area'],
+    'propriedade': ['cod_prop', 'codigo_propriedade', 'propriedade'],
+    'ut': ['ut', 'unidade_trabalho', 'UT'],
+    'plaqueta': ['plaqueta', 'plaq', 'id'],
+    'especie': ['especies', 'especie', 'species', 'sp'],
+    'origem': ['origem', 'origin', 'procedencia'],
+    'idade': ['idade', 'age', 'class_idade'],
+    'altura': ['ht', 'altura', 'height', 'h'],
+    'altura_riqueza': ['ht', 'altura', 'height'],
+    'meta': ['meta', 'meta_riqueza', 'riqueza_meta', 'meta_especies']
+}
+COLUNAS_CARACTERIZACAO = {
+    'ligacao': ['cod_parc', 'parcela', 'plot'],
+    'tecnica': ['tecnica_am', 'tecnica', 'metodo'],
+    'cobertura': ['cobetura_nativa', 'cobertura_nativa', 'copa_nativa'],
+    'metodo': ['metodo_restauracao', 'metodo', 'tecnica_restauracao']
+}
+
+def encontrar_coluna(df, nomes_possiveis):
+    """Encontra uma coluna no dataframe baseado em nomes possíveis (case-insensitive)"""
+    for nome in nomes_possiveis:
+        for col in df.columns:
+            # Busca case-insensitive e com tratamento de espaços
+            if nome.lower().replace(' ', '').replace('_', '') in col.lower().replace(' ', '').replace('_', ''):
+                return col
+    return None
+
+def extrair_ut_inventario(df_inventario):
+    """Extrai a UT de cada registro do inventário (cod_parc no formato PROP_UT ou coluna UT)"""
+    col_parc = encontrar_coluna(df_inventario, ['cod_parc', 'codigo_parcela', 'parcela'])
+
+    if col_parc and len(df_inventario) > 0 and '_' in str(df_inventario[col_parc].iloc[0]):
+        return como_texto(df_inventario[col_parc]).str.split('_').str[1]
+
+    col_ut = encontrar_coluna(df_inventario, ['ut', 'unidade_trabalho'])
+    if col_ut:
+        return como_texto(df_inventario[col_ut])
+
+    return None
+
+def extrair_prop_inventario(df_inventario):
+    """Extrai a propriedade de cada registro do inventário (coluna cod_prop ou cod_parc no formato PROP_UT)"""
+    if 'cod_prop' in df_inventario.columns:
+        return como_texto(df_inventario['cod_prop'])
+
+    col_parc = encontrar_coluna(df_inventario, ['cod_parc', 'codigo_parcela', 'parcela'])
+    if col_parc and len(df_inventario) > 0 and '_' in str(df_inventario[col_parc].iloc[0]):
+        return como_texto(df_inventario[col_parc]).str.split('_').str[0]
+
+    return None
@@ -0,0 +1,91 @@
+"""
+Bancos compartilhados entre sessões e estimativa de memória.
+
+O dashboard guarda um único `DadosCompartilhados` por processo (e por
+versão dos dados): todas as sessões recebem os mesmos DataFrames, sem
+cópia, e os tratam como somente leitura (com o Copy-on-Write ligado pelo
+dashboard, colunas alteradas em um derivado não chegam ao banco compartilhado).
+O custo de cada sessão fica restrito ao seu estado próprio, estimado por
+`memoria.estimar_memoria`. As campanhas selecionadas em uma sessão são um recorte
+dos bancos compartilhados (`selecionar_campanhas`), sem releitura.
+"""
+import time
+from dataclasses import dataclass, field, replace
+
+import pandas as pd
+
+from .armazem import atualizar_armazem, carregar_banco_armazem
+from .campanhas import filtrar_campanhas
+from .dados import BANCOS, carregar_banco
+from .memoria import memoria_dataframe
+from .versao import versao_dados
+
+@dataclass
+class DadosCompartilhados:
+    """Bancos carregados uma vez por processo, com a versão (`VersaoDados`), o momento e o tempo da carga"""
+    caracterizacao: pd.DataFrame
+    inventario: pd.DataFrame
+    versao: object = None
+    carregado_em: float = field(default_factory=time.time)
+    tempo_carga: float = 0.0
+    memoria: int = 0
+
+def carregar_banco_compartilhado(banco, diretorio_dados='.'):
+    """Carrega um banco do armazém Parquet (ou da planilha, se a pasta não aceitar escrita)"""
+    try:
+        return carregar_banco_armazem(banco, diretorio_dados)
+    except OSError:
+        return carregar_banco(banco, diretorio_dados)
+
+def atualizar_armazem_compartilhado(diretorio_dados='.'):
+    """
+    Refaz de uma vez os bancos desatualizados do armazém (as planilhas são lidas ao mesmo tempo);
+    se a pasta não aceitar escrita, cada banco é lido da planilha por `carregar_banco_compartilhado`
+    """
+    try:
+        atualizar_armazem(diretorio_dados)
+    except OSError:
+        pass
+
+def montar_dados_compartilhados(df_caracterizacao, df_inventario, versao=None, tempo_carga=0.0):
+    """Junta os bancos já carregados, com a versão e a memória ocupada"""
+    return DadosCompartilhados(df_caracterizacao, df_inventario, versao=versao, tempo_carga=tempo_carga,
+                               memoria=memoria_dataframe(df_caracterizacao) + memoria_dataframe(df_inventario))
+
+def carregar_dados_compartilhados(diretorio_dados='.'):
+    """Carrega os dois bancos (ver `carregar_banco_compartilhado`) com a versão atual das planilhas"""
+    versao = versao_dados(diretorio_dados)
+    inicio = time.perf_counter()
+    atualizar_armazem_compartilhado(diretorio_dados)
+    bancos = [carregar_banco_compartilhado(banco, diretorio_dados) for banco in BANCOS]
+    return montar_dados_compartilhados(*bancos, versao=versao, tempo_carga=time.perf_counter() - inicio)
+
+def selecionar_campanhas(dados, campanhas):
+    """
+    Bancos só com as campanhas pedidas, com a versão restrita a elas (chave própria para os
+    caches); os próprios dados compartilhados se nenhuma ou todas as campanhas forem pedidas
+    """
+    versao = dados.versao.selecionar(campanhas)
+    if not versao.selecao:
+        return dados
+    caracterizacao = filtrar_campanhas(dados.caracterizacao, versao.selecao)
+    inventario = filtrar_campanhas(dados.inventario, versao.selecao)
+    return replace(dados, caracterizacao=caracterizacao, inventario=inventario, versao=versao,
+                   memoria=memoria_dataframe(caracterizacao) + memoria_dataframe(inventario))
+
+def relatorio_memoria(dados, memorias_sessoes):
+    """
+    Memória dos dados compartilhados e das sessões (bytes), com a estimativa de
+    quanto seria gasto se cada sessão recebesse a própria cópia dos bancos.
+    """
+    memorias = list(memorias_sessoes)
+    num_sessoes = len(memorias)
+    total_sessoes = sum(memorias)
+    return {
+        'compartilhado': dados.memoria,
+        'sessoes': num_sessoes,
+        'media_por_sessao': total_sessoes / num_sessoes if num_sessoes else 0,
+        'maximo_por_sessao': max(memorias, default=0),
+        'total': dados.memoria + total_sessoes,
+        'total_com_copias': dados.memoria * max(num_sessoes, 1) + total_sessoes,
+    }
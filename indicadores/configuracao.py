@@ -0,0 +1,73 @@
+"""
+Configuração por variáveis de ambiente.
+
+- INDICADORES_MOTOR_CONSULTA: motor de filtros e agregações, 'pandas' (padrão) ou 'duckdb'
+- INDICADORES_MOTOR_AGREGACAO: motor das agregações pesadas (área de censo, fitossociologia,
+  indicadores por propriedade, outliers por grupo), 'pandas' (padrão) ou 'polars'
+- INDICADORES_LEITOR_EXCEL: leitor das planilhas, 'auto' (padrão: calamine se instalado, senão
+  openpyxl), 'calamine' ou 'openpyxl'
+- INDICADORES_ARMAZEM: pasta do armazém Parquet; relativa à pasta dos dados (padrão: .armazem)
+- INDICADORES_RASTRO: arquivo JSON-lines do rastro de desempenho do dashboard (padrão: sem rastro)
+- INDICADORES_RASTRO_MAX_MB: tamanho do arquivo de rastro antes da rotação, em MB (padrão: 10)
+- INDICADORES_RASTRO_ARQUIVOS: arquivos antigos de rastro mantidos na rotação (padrão: 5)
+- INDICADORES_TAREFAS: threads dos cálculos em segundo plano do dashboard, por processo (padrão: 2)
+"""
+import os
+
+MOTORES_CONSULTA = ('pandas', 'duckdb')
+MOTOR_CONSULTA_PADRAO = 'pandas'
+MOTORES_AGREGACAO = ('pandas', 'polars')
+MOTOR_AGREGACAO_PADRAO = 'pandas'
+LEITORES_EXCEL = ('auto', 'calamine', 'openpyxl')
+LEITOR_EXCEL_PADRAO = 'auto'
+DIRETORIO_ARMAZEM_PADRAO = '.armazem'
+RASTRO_MAX_MB_PADRAO = 10
+RASTRO_ARQUIVOS_PADRAO = 5
+TAREFAS_PADRAO = 2
+
+def motor_consulta():
+    """Nome do motor de consulta configurado"""
+    motor = os.environ.get('INDICADORES_MOTOR_CONSULTA', MOTOR_CONSULTA_PADRAO).strip().lower()
+    if motor not in MOTORES_CONSULTA:
+        raise ValueError(f"INDICADORES_MOTOR_CONSULTA inválido: {motor!r} (use {' ou '.join(MOTORES_CONSULTA)})")
+    return motor
+
+def motor_agregacao():
+    """Nome do motor de agregação configurado"""
+    motor = os.environ.get('INDICADORES_MOTOR_AGREGACAO', MOTOR_AGREGACAO_PADRAO).strip().lower()
+    if motor not in MOTORES_AGREGACAO:
+        raise ValueError(f"INDICADORES_MOTOR_AGREGACAO inválido: {motor!r} (use {' ou '.join(MOTORES_AGREGACAO)})")
+    return motor
+
+def leitor_excel():
+    """Nome do leitor de planilhas configurado ('auto', 'calamine' ou 'openpyxl')"""
+    leitor = os.environ.get('INDICADORES_LEITOR_EXCEL', LEITOR_EXCEL_PADRAO).strip().lower()
+    if leitor not in LEITORES_EXCEL:
+        raise ValueError(f"INDICADORES_LEITOR_EXCEL inválido: {leitor!r} (use {', '.join(LEITORES_EXCEL)})")
+    return leitor
+
+def diretorio_armazem(diretorio_dados='.'):
+    """Pasta do armazém Parquet dos bancos de `diretorio_dados`"""
+    return os.path.join(diretorio_dados, os.environ.get('INDICADORES_ARMAZEM', DIRETORIO_ARMAZEM_PADRAO))
+
+def arquivo_rastro():
+    """Caminho do arquivo de rastro de desempenho (None se o rastro estiver desligado)"""
+    return os.environ.get('INDICADORES_RASTRO', '').strip() or None
+
+def _inteiro_positivo(variavel, padrao):
+    """Valor inteiro positivo de uma variável de ambiente"""
+    valor = os.environ.get(variavel, '').strip()
+    if not valor:
+        return padrao
+    if not valor.isdigit() or int(valor) <= 0:
+        raise ValueError(f"{variavel} inválido: {valor!r} (use um inteiro positivo)")
+    return int(valor)
+
+def limites_rastro():
+    """(bytes por arquivo, arquivos antigos mantidos) da rotação do rastro"""
+    return (_inteiro_positivo('INDICADORES_RASTRO_MAX_MB', RASTRO_MAX_MB_PADRAO) * 1024 * 1024,
+            _inteiro_positivo('INDICADORES_RASTRO_ARQUIVOS', RASTRO_ARQUIVOS_PADRAO))
+
+def trabalhadores_tarefas():
+    """Threads do pool de cálculos em segundo plano"""
+    return _inteiro_positivo('INDICADORES_TAREFAS', TAREFAS_PADRAO)
@@ -0,0 +1,56 @@
+"""
+Seleção do motor de consulta (pandas ou DuckDB) para filtros e agregações.
+
+Os dois motores expõem as mesmas funções, com as mesmas assinaturas e
+resultados; a interface chama sempre `motor.<função>` e o motor é escolhido
+pela configuração (INDICADORES_MOTOR_CONSULTA).
+"""
+from dataclasses import dataclass
+from typing import Callable
+
+from .area import calcular_area_amostrada
+from .configuracao import motor_consulta
+from .densidade import calcular_densidade_geral, calcular_densidade_regenerantes
+from .filtros import aplicar_filtros
+from .restauracao import calcular_indicadores_restauracao
+
+@dataclass(frozen=True)
+class MotorConsulta:
+    """Funções de filtro e agregação de um motor de consulta"""
+    nome: str
+    aplicar_filtros: Callable
+    calcular_area_amostrada: Callable
+    calcular_densidade_geral: Callable
+    calcular_densidade_regenerantes: Callable
+    calcular_indicadores_restauracao: Callable
+
+MOTOR_PANDAS = MotorConsulta(
+    'pandas',
+    aplicar_filtros,
+    calcular_area_amostrada,
+    calcular_densidade_geral,
+    calcular_densidade_regenerantes,
+    calcular_indicadores_restauracao
+)
+
+def obter_motor(nome=None):
+    """
+    Motor de consulta pelo nome (padrão: o configurado).
+    Levanta ImportError se o DuckDB for pedido sem estar instalado.
+    """
+    nome = nome or motor_consulta()
+    if nome != 'duckdb':
+        return MOTOR_PANDAS
+
+    from . import consulta_duckdb
+    if not consulta_duckdb.DUCKDB_DISPONIVEL:
+        raise ImportError("Motor DuckDB indisponível: instale com `pip install duckdb`")
+
+    return MotorConsulta(
+        'duckdb',
+        consulta_duckdb.aplicar_filtros,
+        consulta_duckdb.calcular_area_amostrada,
+        consulta_duckdb.calcular_densidade_geral,
+        consulta_duckdb.calcular_densidade_regenerantes,
+        consulta_duckdb.calcular_indicadores_restauracao
+    )
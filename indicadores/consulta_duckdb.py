@@ -0,0 +1,550 @@
+"""
+Motor de consulta DuckDB (opcional: `pip install duckdb`).
+
+Filtros, somas de área, contagem de regenerantes e indicadores por
+propriedade expressos em SQL, com as mesmas assinaturas e resultados das
+funções em pandas. O DuckDB lê os DataFrames sem convertê-los e executa
+as consultas em vários núcleos; em `aplicar_filtros` os bancos também
+podem ser caminhos Parquet (ex.: o armazém), lidos sob demanda, de modo
+que só as linhas filtradas chegam ao pandas.
+
+As expressões reproduzem as conversões do pandas: `_texto` equivale a
+astype(str) (nulos viram 'nan') e `_numero` a pd.to_numeric(errors='coerce'),
+com as medidas float32 ampliadas para DOUBLE (ver `esquema`).
+Cada linha leva sua posição original em __pos, para preservar a ordem.
+
+Os resultados têm os mesmos valores e tipos dos do pandas, exceto pela ordem
+das somas de ponto flutuante: áreas, densidades e coberturas médias podem
+diferir no último algarismo (diferença relativa abaixo de 1e-12), dentro da
+tolerância da verificação de paridade (`paridade.TOLERANCIA_RELATIVA`).
+"""
+import numpy as np
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+from .area import AREA_PARCELA_M2
+from .colunas import COLUNAS_CARACTERIZACAO, COLUNAS_INVENTARIO, encontrar_coluna
+from .densidade import ALTURA_MINIMA_REGENERANTE
+from .filtros import COLUNAS_FILTRO_INVENTARIO, detectar_tecnicas, separar_por_tecnica
+from .perfil import perfilado
+from .restauracao import (
+    ALTURA_MINIMA_RIQUEZA,
+    escolher_area_propriedade,
+    listar_propriedades,
+    montar_linha_indicadores,
+)
+from .resultados import ResultadoArea, ResultadoDensidade, ResultadoIndicadores
+
+DUCKDB_DISPONIVEL = duckdb is not None
+
+# ============================================================================
+# CONEXÃO, REGISTRO DAS FONTES E EXPRESSÕES
+# ============================================================================
+
+def conectar():
+    """Nova conexão DuckDB em memória (uma por consulta: seguro entre sessões/threads)"""
+    if duckdb is None:
+        raise ImportError("Motor DuckDB indisponível: instale com `pip install duckdb`")
+    return duckdb.connect()
+
+def _id(coluna):
+    """Identificador SQL entre aspas"""
+    return '"' + str(coluna).replace('"', '""') + '"'
+
+def _literal(texto):
+    """Texto SQL entre aspas simples"""
+    return "'" + str(texto).replace("'", "''") + "'"
+
+def _texto(coluna):
+    """Equivalente SQL de astype(str): nulos viram 'nan'"""
+    return f"coalesce(CAST({_id(coluna)} AS VARCHAR), 'nan')"
+
+def _numero(coluna):
+    """Equivalente SQL de pd.to_numeric(errors='coerce') (medidas float32 ampliadas, como em `esquema.ampliar_medida`)"""
+    return f"TRY_CAST({_id(coluna)} AS DOUBLE)"
+
+def _contem(coluna, padrao):
+    """Equivalente SQL de astype(str).str.contains(padrao, case=False)"""
+    return f"regexp_matches({_texto(coluna)}, {_literal(padrao)}, 'i')"
+
+def _colunas_fonte(con, fonte):
+    """Colunas de um DataFrame ou de um arquivo Parquet"""
+    if isinstance(fonte, pd.DataFrame):
+        return list(fonte.columns)
+    return [linha[0] for linha in con.execute(f"DESCRIBE SELECT * FROM read_parquet({_literal(fonte)})").fetchall()]
+
+def _resolver(colunas, papeis):
+    """Coluna encontrada (ou None) para cada papel, pela mesma busca das funções em pandas"""
+    esquema = pd.DataFrame(columns=colunas)
+    return {papel: encontrar_coluna(esquema, nomes) for papel, nomes in papeis.items()}
+
+def _registrar(con, nome, fonte, colunas):
+    """
+    Cria a view `nome` sobre a fonte com a posição original de cada linha em __pos.
+    DataFrames são registrados só com as colunas usadas; Parquet é lido sob demanda.
+    """
+    if isinstance(fonte, pd.DataFrame):
+        usadas = list(dict.fromkeys(col for col in colunas if col is not None))
+        dados = pd.DataFrame({col: fonte[col].to_numpy() for col in usadas})
+        dados['__pos'] = np.arange(len(fonte))
+        con.register(nome, dados)
+    else:
+        con.execute(f"CREATE VIEW {nome} AS SELECT * EXCLUDE (file_row_number), file_row_number AS __pos "
+                    f"FROM read_parquet({_literal(fonte)}, file_row_number = true)")
+
+def _materializar(con, fonte, tabela):
+    """Linhas da fonte presentes em `tabela`, na ordem original (DataFrame: mesmo índice e tipos)"""
+    if isinstance(fonte, pd.DataFrame):
+        posicoes = con.execute(f"SELECT __pos FROM {tabela} ORDER BY __pos").fetchnumpy()['__pos']
+        return fonte.iloc[posicoes]
+
+    df = con.execute(f"SELECT * EXCLUDE (__pos) FROM {tabela} ORDER BY __pos").df()
+    for col in df.columns:
+        if df[col].dtype == 'object':
+            df[col] = df[col].where(df[col].notna(), np.nan)
+    return df
+
+def _no_tipo_da_coluna(valor, serie):
+    """
+    Valor lido do DuckDB (int/float do Python) no tipo numpy da coluna de origem, como o
+    pandas o devolve (ex.: meta int32 pelo esquema, e não int64)
+    """
+    if valor is None or not pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_bool_dtype(serie):
+        return valor
+    return pd.Series([valor]).astype(serie.dtype).iloc[0]
+
+def _contar(con, relacao):
+    return con.execute(f"SELECT count(*) FROM {relacao}").fetchone()[0]
+
+# ============================================================================
+# FILTROS
+# ============================================================================
+
+def _condicao_igual(coluna):
+    """Equivalente SQL de `_mascara_igual` (o valor entra como parâmetro)"""
+    return f"lower(trim({_texto(coluna)})) = ?"
+
+@perfilado()
+def aplicar_filtros(df_caracterizacao, df_inventario, filtros_principais, filtros_inventario):
+    """
+    Mesmo resultado de `filtros.aplicar_filtros`, com os filtros executados em SQL.
+    Os bancos podem ser DataFrames ou caminhos de arquivos Parquet.
+    """
+    con = conectar()
+    try:
+        colunas_carac = _colunas_fonte(con, df_caracterizacao)
+        colunas_inv = _colunas_fonte(con, df_inventario)
+        cod_parc_carac = _resolver(colunas_carac, {'c': ['cod_parc', 'parcela', 'plot']})['c']
+        cod_parc_inv = _resolver(colunas_inv, {'c': ['cod_parc', 'parcela', 'plot']})['c']
+
+        ativos = {filtro: str(valor).strip().lower() for filtro, valor in filtros_principais.items()
+                  if valor != 'Todos' and valor is not None}
+        especificos = {}
+        for filtro, valor in filtros_inventario.items():
+            if valor != 'Todos' and valor is not None and filtro in COLUNAS_FILTRO_INVENTARIO:
+                coluna = _resolver(colunas_inv, {'c': COLUNAS_FILTRO_INVENTARIO[filtro]})['c']
+                if coluna:
+                    especificos.setdefault(coluna, []).append(str(valor).strip().lower())
+
+        filtros_carac = [(col, valor) for col, valor in ativos.items() if col in colunas_carac]
+        filtros_inv = [(col, valor) for col, valor in ativos.items() if col in colunas_inv]
+        filtros_inv += [(col, valor) for col, valores in especificos.items() for valor in valores]
+
+        _registrar(con, 'carac', df_caracterizacao, [col for col, _ in filtros_carac] + [cod_parc_carac])
+        _registrar(con, 'inv', df_inventario, [col for col, _ in filtros_inv] + [cod_parc_inv])
+
+        # Caracterização: filtros principais
+        condicoes = [_condicao_igual(col) for col, _ in filtros_carac] or ['TRUE']
+        con.execute(f"CREATE TEMP TABLE carac_filtrada AS SELECT * FROM carac WHERE {' AND '.join(condicoes)}",
+                    [valor for _, valor in filtros_carac])
+
+        # Inventário: filtros principais e específicos, ligado à caracterização via cod_parc
+        condicoes = [_condicao_igual(col) for col, _ in filtros_inv] or ['TRUE']
+        if cod_parc_carac and cod_parc_inv and _contar(con, 'carac_filtrada') > 0:
+            condicoes.append(f"trim({_texto(cod_parc_inv)}) IN ("
+                             f"SELECT trim(CAST({_id(cod_parc_carac)} AS VARCHAR)) FROM carac_filtrada "
+                             f"WHERE {_id(cod_parc_carac)} IS NOT NULL)")
+        con.execute(f"CREATE TEMP TABLE inv_filtrado AS SELECT * FROM inv WHERE {' AND '.join(condicoes)}",
+                    [valor for _, valor in filtros_inv])
+
+        return (_materializar(con, df_caracterizacao, 'carac_filtrada'),
+                _materializar(con, df_inventario, 'inv_filtrado'))
+    finally:
+        con.close()
+
+# ============================================================================
+# ÁREA AMOSTRADA (agrupada por `ordem`: 0 para um conjunto, ou uma por propriedade)
+# ============================================================================
+
+def _areas_censo(con, relacao, cols):
+    """
+    Área de censo por grupo: primeira Area_ha de cada (propriedade, UT), somada.
+    Retorna {ordem: ResultadoArea}; grupos sem linhas ficam de fora.
+    """
+    if not cols['parcela'] or not cols['area']:
+        return {ordem: ResultadoArea(0.0, "Censo - colunas não encontradas")
+                for (ordem,) in con.execute(f"SELECT DISTINCT ordem FROM {relacao}").fetchall()}
+
+    texto = _texto(cols['parcela'])
+    por_colunas = cols['propriedade'] and cols['ut']
+    prop_colunas = _texto(cols['propriedade']) if por_colunas else 'NULL'
+    ut_colunas = _texto(cols['ut']) if por_colunas else 'NULL'
+
+    linhas = con.execute(f"""
+        WITH base AS (
+            SELECT ordem, __pos, {texto} AS txt, {_numero(cols['area'])} AS area,
+                   {prop_colunas} AS prop_col, {ut_colunas} AS ut_col,
+                   first_value(strpos({texto}, '_') > 0) OVER (PARTITION BY ordem ORDER BY __pos) AS prop_ut
+            FROM {relacao}
+        ), chaves AS (
+            SELECT ordem, __pos, area,
+                   CASE WHEN prop_ut THEN split_part(txt, '_', 1) ELSE prop_col END AS prop,
+                   CASE WHEN prop_ut THEN CASE WHEN strpos(txt, '_') > 0 THEN split_part(txt, '_', 2) END
+                        ELSE ut_col END AS ut
+            FROM base
+        ), uts AS (
+            SELECT ordem, prop, ut, arg_min(area, __pos) FILTER (WHERE area IS NOT NULL) AS area, count(*) AS n
+            FROM chaves WHERE prop IS NOT NULL AND ut IS NOT NULL
+            GROUP BY ordem, prop, ut
+        ), grupos AS (
+            SELECT DISTINCT ordem, prop_ut FROM base
+        )
+        SELECT g.ordem, g.prop_ut, coalesce(sum(u.area), 0), count(u.ordem), coalesce(sum(u.n), 0)
+        FROM grupos g LEFT JOIN uts u ON u.ordem = g.ordem
+        GROUP BY g.ordem, g.prop_ut
+    """).fetchall()
+
+    areas = {}
+    for ordem, prop_ut, area_total, num_uts, num_individuos in linhas:
+        if not prop_ut and not por_colunas:
+            areas[ordem] = ResultadoArea(0.0, "Censo - não foi possível identificar cod_prop e UT")
+        else:
+            areas[ordem] = ResultadoArea(float(area_total), f"Censo ({num_uts} UTs, {num_individuos} indivíduos)")
+    return areas
+
+def _areas_parcelas(con, relacao, cols):
+    """Área de parcelas por grupo: parcelas únicas × 100 m². Retorna {ordem: ResultadoArea}"""
+    if not cols['parcela']:
+        return {ordem: ResultadoArea(0.0, "Parcelas (coluna não encontrada)")
+                for (ordem,) in con.execute(f"SELECT DISTINCT ordem FROM {relacao}").fetchall()}
+
+    areas = {}
+    consulta = f"SELECT ordem, count(DISTINCT {_id(cols['parcela'])}) FROM {relacao} GROUP BY ordem"
+    for ordem, num_parcelas in con.execute(consulta).fetchall():
+        if num_parcelas > 0:
+            area_ha = (num_parcelas * AREA_PARCELA_M2) / 10000
+            areas[ordem] = ResultadoArea(area_ha, f"Parcelas ({num_parcelas} parcelas × {AREA_PARCELA_M2}m²)")
+        else:
+            areas[ordem] = ResultadoArea(0.0, "Parcelas (sem dados válidos)")
+    return areas
+
+def _area_censo(con, relacao, cols):
+    return _areas_censo(con, relacao, cols).get(0, ResultadoArea(0.0, "Censo (sem dados de inventário)"))
+
+def _area_parcelas(con, relacao, cols):
+    return _areas_parcelas(con, relacao, cols).get(0, ResultadoArea(0.0, "Parcelas (sem dados)"))
+
+def _condicao_propriedades(con, relacao, cols, propriedades):
+    """Equivalente SQL de `filtrar_inventario_por_propriedades` sobre uma relação"""
+    if not cols['parcela']:
+        return 'TRUE'
+
+    lista = ', '.join(_literal(str(p).lower()) for p in propriedades) or 'NULL'
+    primeiro = con.execute(f"SELECT {_texto(cols['parcela'])} FROM {relacao} ORDER BY __pos LIMIT 1").fetchone()
+
+    if primeiro and '_' in primeiro[0]:
+        return f"lower(split_part({_texto(cols['parcela'])}, '_', 1)) IN ({lista})"
+    if cols['propriedade']:
+        return f"lower({_texto(cols['propriedade'])}) IN ({lista})"
+    return 'TRUE'
+
+def _calcular_area(con, df_carac, cols):
+    """Área amostrada da view `inv` (ordem 0), pelo mesmo método híbrido de `calcular_area_amostrada`"""
+    tecnica_col, tem_censo, tem_parcelas = detectar_tecnicas(df_carac)
+
+    if not tecnica_col or len(df_carac) == 0:
+        return _area_parcelas(con, 'inv', cols)
+    if tem_censo and not tem_parcelas:
+        return _area_censo(con, 'inv', cols)
+    if tem_parcelas and not tem_censo:
+        return _area_parcelas(con, 'inv', cols)
+    if not (tem_censo and tem_parcelas):
+        return _area_parcelas(con, 'inv', cols)
+
+    resultado = ResultadoArea()
+    metodos_usados = []
+    dados_censo, dados_parcelas = separar_por_tecnica(df_carac, tecnica_col)
+
+    for rotulo, dados, calcular in [("Censo", dados_censo, _area_censo), ("Parcelas", dados_parcelas, _area_parcelas)]:
+        props = dados['cod_prop'].unique() if 'cod_prop' in dados.columns else []
+        if len(props) == 0:
+            continue
+
+        nome = f"inv_{rotulo.lower()}"
+        con.execute(f"CREATE OR REPLACE TEMP VIEW {nome} AS SELECT * FROM inv "
+                    f"WHERE {_condicao_propriedades(con, 'inv', cols, props)}")
+        if _contar(con, nome) > 0:
+            parcial = calcular(con, nome, cols)
+            resultado.area_ha += parcial.area_ha
+            metodos_usados.append(f"{rotulo}: {parcial.metodo}")
+
+    resultado.metodo = " + ".join(metodos_usados) if metodos_usados else "Misto (sem dados)"
+    return resultado
+
+def _registrar_inventario(con, df_inventario):
+    """Registra o inventário como `inv` (com ordem 0) e retorna as colunas de cada papel"""
+    cols = _resolver(list(df_inventario.columns), COLUNAS_INVENTARIO)
+    extras = ['cod_prop'] if 'cod_prop' in df_inventario.columns else []
+    _registrar(con, 'inv_base', df_inventario, list(cols.values()) + extras)
+    con.execute("CREATE TEMP VIEW inv AS SELECT 0 AS ordem, * FROM inv_base")
+    return cols
+
+@perfilado()
+def calcular_area_amostrada(df_carac_filtered, df_inv_filtered):
+    """Mesmo resultado de `area.calcular_area_amostrada`, com as somas em SQL"""
+    try:
+        if len(df_carac_filtered) == 0 and len(df_inv_filtered) == 0:
+            return ResultadoArea(0.0, "Sem dados")
+
+        con = conectar()
+        try:
+            cols = _registrar_inventario(con, df_inv_filtered)
+            return _calcular_area(con, df_carac_filtered, cols)
+        finally:
+            con.close()
+    except Exception as e:
+        return ResultadoArea(0.0, "Erro", avisos=[f"Erro no cálculo de área: {e}"])
+
+# ============================================================================
+# DENSIDADES
+# ============================================================================
+
+def _condicao_regenerante(cols):
+    """Equivalente SQL de `densidade.filtrar_regenerantes`"""
+    condicoes = []
+    if cols['especie']:
+        condicoes.append(f"NOT {_contem(cols['especie'], 'morto|morta')}")
+    if cols['origem']:
+        condicoes.append(_contem(cols['origem'], 'nativa'))
+    if cols['idade']:
+        condicoes.append(_contem(cols['idade'], 'jovem'))
+    if cols['altura']:
+        condicoes.append(f"{_numero(cols['altura'])} >= {ALTURA_MINIMA_REGENERANTE}")
+    return ' AND '.join(condicoes) or 'TRUE'
+
+def _contagem_individuos(cols):
+    """Plaquetas únicas, ou registros se não houver plaqueta (como `contar_individuos`)"""
+    return f"count(DISTINCT {_id(cols['plaqueta'])})" if cols['plaqueta'] else "count(*)"
+
+@perfilado()
+def calcular_densidade_regenerantes(df_inv, df_carac):
+    """Mesmo resultado de `densidade.calcular_densidade_regenerantes`, com contagem e área em SQL"""
+    try:
+        if len(df_inv) == 0 or len(df_carac) == 0:
+            return ResultadoDensidade()
+
+        con = conectar()
+        try:
+            cols = _registrar_inventario(con, df_inv)
+            num_linhas, num_regenerantes = con.execute(
+                f"SELECT count(*), {_contagem_individuos(cols)} FROM inv WHERE {_condicao_regenerante(cols)}"
+            ).fetchone()
+            if num_linhas == 0:
+                return ResultadoDensidade()
+
+            area = _calcular_area(con, df_carac, cols)
+        finally:
+            con.close()
+
+        resultado = ResultadoDensidade(0.0, area.metodo, num_regenerantes, area.area_ha, avisos=area.avisos)
+        if area.area_ha > 0:
+            resultado.densidade = num_regenerantes / area.area_ha
+        return resultado
+    except Exception as e:
+        return ResultadoDensidade(avisos=[f"Erro no cálculo de densidade: {e}"])
+
+@perfilado()
+def calcular_densidade_geral(df_inv, df_carac):
+    """Mesmo resultado de `densidade.calcular_densidade_geral`, com contagem e área em SQL"""
+    try:
+        if len(df_inv) == 0 or len(df_carac) == 0:
+            return ResultadoDensidade(0.0, "Sem dados")
+
+        con = conectar()
+        try:
+            cols = _registrar_inventario(con, df_inv)
+            if not cols['plaqueta']:
+                return ResultadoDensidade(0.0, "Coluna plaqueta não encontrada")
+
+            num_individuos = con.execute(f"SELECT {_contagem_individuos(cols)} FROM inv").fetchone()[0]
+            area = _calcular_area(con, df_carac, cols)
+        finally:
+            con.close()
+
+        resultado = ResultadoDensidade(0.0, area.metodo, num_individuos, area.area_ha, avisos=area.avisos)
+        if area.area_ha > 0:
+            resultado.densidade = num_individuos / area.area_ha
+            if "+" in area.metodo:
+                resultado.metodo = f"Método Misto: {area.metodo}"
+        return resultado
+    except Exception as e:
+        return ResultadoDensidade(0.0, f"Erro: {e}")
+
+# ============================================================================
+# INDICADORES DE RESTAURAÇÃO POR PROPRIEDADE
+# ============================================================================
+
+def _registrar_membros(con, df_inventario, cols):
+    """
+    View `inv_prop` com os registros do inventário de cada propriedade (ordem = posição
+    na lista de propriedades), pelas regras de `selecionar_inventario_propriedade`:
+    cod_prop igual; ou cod_parc começando com "PROP_"; ou, sem nenhum, contendo PROP.
+    """
+    if 'cod_prop' in df_inventario.columns:
+        con.execute("CREATE TEMP VIEW inv_prop AS SELECT p.ordem, i.* FROM props p "
+                    "JOIN inv_base i ON CAST(i.cod_prop AS VARCHAR) = p.chave")
+        return True
+
+    if not cols['ligacao']:
+        return False
+
+    # Prefixos "A", "A_B", ... de cada código distinto: o começo "PROP_" vira junção por igualdade
+    texto = _texto(cols['ligacao'])
+    con.execute(f"""
+        CREATE TEMP TABLE codigos_prop AS
+        WITH codigos AS (
+            SELECT DISTINCT {texto} AS txt FROM inv_base
+        ), prefixos AS (
+            SELECT txt, unnest(range(1, len(string_split(txt, '_')))) AS k FROM codigos
+        ), por_prefixo AS (
+            SELECT DISTINCT p.ordem, c.txt FROM prefixos c
+            JOIN props p ON array_to_string(string_split(c.txt, '_')[1:c.k], '_') = p.chave
+        )
+        SELECT * FROM por_prefixo
+        UNION ALL
+        SELECT p.ordem, c.txt FROM props p JOIN codigos c ON contains(c.txt, p.chave)
+        WHERE p.ordem NOT IN (SELECT ordem FROM por_prefixo)
+    """)
+    con.execute(f"CREATE TEMP VIEW inv_prop AS SELECT m.ordem, i.* FROM codigos_prop m "
+                f"JOIN inv_base i ON {texto} = m.txt")
+    return True
+
+def _caracterizacao_por_propriedade(con, df_caracterizacao):
+    """
+    {ordem: (registros, cobertura média, primeiro método, tem censo, tem parcelas, tem não-censo)}
+    para cada propriedade da view `props`.
+    """
+    cols = _resolver(list(df_caracterizacao.columns), COLUNAS_CARACTERIZACAO)
+    tem_cod_prop = 'cod_prop' in df_caracterizacao.columns
+    _registrar(con, 'carac', df_caracterizacao, list(cols.values()) + (['cod_prop'] if tem_cod_prop else []))
+
+    cobertura = f"avg({_numero(cols['cobertura'])})" if cols['cobertura'] else 'NULL'
+    metodo = f"first({_texto(cols['metodo'])} ORDER BY c.__pos)" if cols['metodo'] else 'NULL'
+    if cols['tecnica']:
+        tecnica = f"lower({_texto(cols['tecnica'])})"
+        tecnicas = (f"bool_or(contains({tecnica}, 'censo')), "
+                    f"bool_or(contains({tecnica}, 'parcela') OR contains({tecnica}, 'plot')), "
+                    f"bool_or(NOT contains({tecnica}, 'censo'))")
+    else:
+        tecnicas = "false, true, true"
+    juncao = "CAST(c.cod_prop AS VARCHAR) = p.chave" if tem_cod_prop else "false"
+
+    linhas = con.execute(f"""
+        SELECT p.ordem, count(c.__pos), {cobertura}, {metodo}, {tecnicas}
+        FROM props p LEFT JOIN carac c ON {juncao}
+        GROUP BY p.ordem
+    """).fetchall()
+    return {ordem: tuple(linha) for ordem, *linha in linhas}, cols['tecnica'] is not None
+
+def _inventario_por_propriedade(con, df_inventario, cols):
+    """
+    {ordem: (registros, registros regenerantes, regenerantes, riqueza observada,
+    riqueza de nativas, meta)} e as áreas de cada propriedade da view `props`.
+    """
+    if not _registrar_membros(con, df_inventario, cols):
+        return {}, {}
+
+    if cols['especie']:
+        especie = _id(cols['especie'])
+        nativas = f"NOT {_contem(cols['especie'], 'morto|morta')}"
+        if cols['origem']:
+            nativas += f" AND {_contem(cols['origem'], 'nativa')}"
+        observadas = nativas
+        if cols['altura_riqueza']:
+            observadas += f" AND {_numero(cols['altura_riqueza'])} > {ALTURA_MINIMA_RIQUEZA}"
+        riqueza = (f"count(DISTINCT {especie}) FILTER (WHERE {observadas}), "
+                   f"count(DISTINCT {especie}) FILTER (WHERE {nativas})")
+    else:
+        riqueza = "0, 0"
+
+    meta = 'NULL'
+    if cols['meta']:
+        meta = f"arg_min({_id(cols['meta'])}, __pos) FILTER (WHERE {_numero(cols['meta'])} IS NOT NULL)"
+
+    regenerante = _condicao_regenerante(cols)
+    linhas = con.execute(f"""
+        SELECT ordem, count(*), count(*) FILTER (WHERE {regenerante}),
+               {_contagem_individuos(cols)} FILTER (WHERE {regenerante}), {riqueza}, {meta}
+        FROM inv_prop GROUP BY ordem
+    """).fetchall()
+    if cols['meta']:
+        linhas = [(*linha[:-1], _no_tipo_da_coluna(linha[-1], df_inventario[cols['meta']])) for linha in linhas]
+
+    # Para técnicas mistas, a área usa só os registros cujo cod_parc (ou cod_prop) é a
+    # própria propriedade, como `filtrar_inventario_por_propriedades`
+    chave_sub = 'NULL'
+    if cols['parcela']:
+        texto = _texto(cols['parcela'])
+        sem_prefixo = f"lower({_texto(cols['propriedade'])})" if cols['propriedade'] else 'NULL'
+        chave_sub = (f"CASE WHEN first_value(strpos({texto}, '_') > 0) OVER (PARTITION BY i.ordem ORDER BY i.__pos) "
+                     f"THEN lower(split_part({texto}, '_', 1)) ELSE {sem_prefixo} END")
+    con.execute(f"""
+        CREATE TEMP VIEW inv_sub AS
+        SELECT * EXCLUDE (chave_sub, chave) FROM (
+            SELECT i.*, {chave_sub} AS chave_sub, lower(p.chave) AS chave
+            FROM inv_prop i JOIN props p ON p.ordem = i.ordem
+        ) WHERE chave_sub IS NULL OR chave_sub = chave
+    """)
+
+    areas = {
+        'censo': _areas_censo(con, 'inv_prop', cols),
+        'parcelas': _areas_parcelas(con, 'inv_prop', cols),
+        'censo_sub': _areas_censo(con, 'inv_sub', cols),
+        'parcelas_sub': _areas_parcelas(con, 'inv_sub', cols)
+    }
+    return {ordem: tuple(linha) for ordem, *linha in linhas}, areas
+
+@perfilado()
+def calcular_indicadores_restauracao(df_caracterizacao, df_inventario):
+    """
+    Mesmo resultado de `restauracao.calcular_indicadores_restauracao`, com as agregações
+    de todas as propriedades em consultas agrupadas, em vez de uma passada por propriedade.
+    """
+    saida = ResultadoIndicadores()
+
+    try:
+        propriedades = listar_propriedades(df_caracterizacao, df_inventario)
+        con = conectar()
+        try:
+            con.register('props', pd.DataFrame({'ordem': np.arange(len(propriedades)),
+                                                'chave': [str(p) for p in propriedades]}))
+            carac, tem_coluna_tecnica = _caracterizacao_por_propriedade(con, df_caracterizacao)
+            cols = _registrar_inventario(con, df_inventario)
+            inventario, areas = _inventario_por_propriedade(con, df_inventario, cols)
+        finally:
+            con.close()
+
+        saida.tabela = pd.DataFrame([
+            montar_linha_indicadores(cod_prop, carac[ordem], inventario.get(ordem),
+                                     escolher_area_propriedade(ordem, tem_coluna_tecnica, carac[ordem], areas),
+                                     cols['meta'] is not None)
+            for ordem, cod_prop in enumerate(propriedades)
+        ])
+    except Exception as e:
+        saida.erros.append(f"Erro ao calcular indicadores de restauração: {e}")
+
+    return saida
@@ -0,0 +1,241 @@
+"""
+Cubo de agregados pré-calculados sobre as dimensões dos filtros do dashboard.
+
+Na carga, os bancos são agrupados em células pelas dimensões de filtro
+(caracterização: cod_prop × técnica × UT; inventário: as mesmas, herdadas
+da caracterização via cod_parc, × origem × regeneração × idade), com
+medidas aditivas por célula: registros, somas, contagens e máximos das
+colunas numéricas, contagens de valores 1 (distúrbios) e conjuntos de
+parcelas e espécies em bitsets. Uma combinação de filtros é respondida
+somando (ou unindo, nos bitsets) as células selecionadas, sem percorrer
+as linhas.
+
+As chaves são normalizadas como em `aplicar_filtros` (texto sem espaços
+nas pontas, minúsculo). Um mesmo cod_parc pode aparecer em várias células
+da caracterização (numeração por propriedade); por isso a dimensão herdada
+é o grupo de ligação (o conjunto de células da caracterização com aquele
+cod_parc), selecionado quando alguma das suas células é selecionada.
+"""
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from .colunas import encontrar_coluna
+from .esquema import ampliar_medida, como_texto
+from .filtros import COLUNAS_FILTRO_INVENTARIO
+from .perfil import perfilado
+from .restauracao import ALTURA_MINIMA_RIQUEZA
+from .resultados import ResultadoCubo
+
+# Filtros principais do dashboard (valem para os dois bancos quando a coluna existe)
+DIMENSOES_PRINCIPAIS = ['cod_prop', 'tecnica', 'UT']
+
+@dataclass
+class TabelaCelulas:
+    """Células de um banco: chaves normalizadas e medidas aditivas (uma linha por célula)"""
+    chaves: pd.DataFrame
+    registros: np.ndarray
+    somas: pd.DataFrame
+    contagens: pd.DataFrame
+    maximos: pd.DataFrame
+    uns: pd.DataFrame
+    bitsets: dict = field(default_factory=dict)
+
+@dataclass
+class CuboAgregado:
+    """
+    Cubo dos dois bancos. `grupos_ligacao` é a matriz (grupos × células da caracterização)
+    dos grupos de ligação; None se um dos bancos não tem cod_parc.
+    """
+    caracterizacao: TabelaCelulas
+    inventario: TabelaCelulas
+    dimensoes_caracterizacao: list
+    dimensoes_inventario: dict
+    grupos_ligacao: np.ndarray
+    colunas: dict
+
+def _normalizar(serie):
+    """Mesma normalização de `_mascara_igual`"""
+    return como_texto(serie).str.strip().str.lower()
+
+def _normalizar_valor(valor):
+    return str(valor).strip().lower()
+
+def _bitsets(celulas, num_celulas, serie, mascara=None):
+    """Matriz (células × bytes) com os valores distintos de `serie` presentes em cada célula"""
+    codigos = pd.factorize(serie)[0]
+    validos = codigos >= 0 if mascara is None else (codigos >= 0) & np.asarray(mascara)
+    num_codigos = int(codigos.max()) + 1 if len(codigos) else 0
+    presenca = np.zeros((num_celulas, max(num_codigos, 1)), dtype=bool)
+    presenca[celulas[validos], codigos[validos]] = True
+    return np.packbits(presenca, axis=1)
+
+def _contar_bits(bitsets, selecao):
+    """Número de valores distintos na união das células selecionadas"""
+    if not selecao.any():
+        return 0
+    return int(np.unpackbits(np.bitwise_or.reduce(bitsets[selecao], axis=0)).sum())
+
+def _tabela_celulas(chaves, df):
+    """Agrupa `df` pelas chaves e calcula as medidas aditivas das colunas numéricas"""
+    if len(chaves.columns):
+        celulas = chaves.groupby(list(chaves.columns), sort=False, dropna=False).ngroup().to_numpy()
+    else:
+        celulas = np.zeros(len(df), dtype=int)
+    num_celulas = int(celulas.max()) + 1 if len(celulas) else 0
+
+    numericas = {}
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            continue  # datas (ver `esquema`) não são medidas; como texto, também ficavam de fora
+        valores = df[col] if pd.api.types.is_numeric_dtype(df[col]) else pd.to_numeric(df[col], errors='coerce')
+        if valores.notna().any():
+            numericas[col] = ampliar_medida(valores).astype(float)
+    valores = pd.DataFrame(numericas, index=df.index)
+    agrupado = valores.groupby(celulas)
+
+    return TabelaCelulas(
+        chaves=chaves.groupby(celulas).first().reset_index(drop=True),
+        registros=np.bincount(celulas, minlength=num_celulas),
+        somas=agrupado.sum().reset_index(drop=True),
+        contagens=agrupado.count().reset_index(drop=True),
+        maximos=agrupado.max().reset_index(drop=True),
+        uns=valores.eq(1).groupby(celulas).sum().reset_index(drop=True)
+    ), celulas, num_celulas
+
+def _grupos_ligacao(df_caracterizacao, col_carac, celulas, num_celulas):
+    """
+    Grupo de ligação de cada chave (cod_parc como texto, sem espaços, como em aplicar_filtros)
+    e a matriz (grupos × células) das células da caracterização de cada grupo.
+    """
+    validas = df_caracterizacao[col_carac].notna().to_numpy()
+    pares = pd.DataFrame({'chave': [str(x).strip() for x in df_caracterizacao[col_carac][validas]],
+                          'celula': celulas[validas]}).drop_duplicates()
+    celulas_por_chave = pares.groupby('chave')['celula'].agg(lambda c: tuple(sorted(c)))
+    grupos, conjuntos = pd.factorize(celulas_por_chave)
+
+    incidencia = np.zeros((len(conjuntos), num_celulas), dtype=bool)
+    for grupo, conjunto in enumerate(conjuntos):
+        incidencia[grupo, list(conjunto)] = True
+    return pd.Series(grupos, index=celulas_por_chave.index), incidencia
+
+@perfilado()
+def construir_cubo(df_caracterizacao, df_inventario):
+    """Monta o cubo de agregados dos dois bancos (já limpos)"""
+    colunas = {
+        'parcela_caracterizacao': encontrar_coluna(df_caracterizacao, ['cod_parc', 'parcela', 'plot']),
+        'parcela_inventario': encontrar_coluna(df_inventario, ['cod_parc', 'parcela', 'plot']),
+        'especie': encontrar_coluna(df_inventario, ['especies', 'especie', 'species', 'sp']),
+        'altura_riqueza': encontrar_coluna(df_inventario, ['ht', 'altura', 'height']),
+        'origem': encontrar_coluna(df_inventario, ['origem', 'origin', 'procedencia'])
+    }
+
+    # === CARACTERIZAÇÃO: cod_prop × técnica × UT ===
+    dimensoes_carac = [d for d in DIMENSOES_PRINCIPAIS if d in df_caracterizacao.columns]
+    chaves_carac = pd.DataFrame({d: _normalizar(df_caracterizacao[d]) for d in dimensoes_carac}, index=df_caracterizacao.index)
+    caracterizacao, celulas, num_celulas = _tabela_celulas(chaves_carac, df_caracterizacao)
+    if colunas['parcela_caracterizacao']:
+        caracterizacao.bitsets['parcelas'] = _bitsets(celulas, num_celulas, df_caracterizacao[colunas['parcela_caracterizacao']])
+
+    # === INVENTÁRIO: grupo de ligação via cod_parc, dimensões próprias e filtros específicos ===
+    chaves_inv = pd.DataFrame(index=df_inventario.index)
+    grupos_ligacao = None
+
+    if colunas['parcela_caracterizacao'] and colunas['parcela_inventario']:
+        grupo_por_chave, grupos_ligacao = _grupos_ligacao(df_caracterizacao, colunas['parcela_caracterizacao'],
+                                                          celulas, num_celulas)
+        chave_inv = como_texto(df_inventario[colunas['parcela_inventario']]).str.strip()
+        chaves_inv['grupo_ligacao'] = chave_inv.map(grupo_por_chave).fillna(-1).astype(int)
+
+    dimensoes_inv = {}
+    for d in DIMENSOES_PRINCIPAIS:
+        if d in df_inventario.columns:
+            dimensoes_inv[d] = f'inventario:{d}'
+            chaves_inv[f'inventario:{d}'] = _normalizar(df_inventario[d])
+    for filtro, nomes in COLUNAS_FILTRO_INVENTARIO.items():
+        coluna = encontrar_coluna(df_inventario, nomes)
+        if coluna:
+            dimensoes_inv[f'filtro:{filtro}'] = f'filtro:{filtro}'
+            chaves_inv[f'filtro:{filtro}'] = _normalizar(df_inventario[coluna])
+
+    inventario, celulas, num_celulas = _tabela_celulas(chaves_inv, df_inventario)
+
+    # Espécies para a riqueza (sem "Morto/Morta", altura > 0.5 m; e só nativas)
+    if colunas['especie']:
+        especies = df_inventario[colunas['especie']]
+        validas = ~como_texto(especies).str.contains('Morto|Morta', case=False, na=False)
+        if colunas['altura_riqueza']:
+            validas &= pd.to_numeric(df_inventario[colunas['altura_riqueza']], errors='coerce') > ALTURA_MINIMA_RIQUEZA
+        inventario.bitsets['especies'] = _bitsets(celulas, num_celulas, especies, validas)
+        if colunas['origem']:
+            nativas = validas & como_texto(df_inventario[colunas['origem']]).str.contains('Nativa', case=False, na=False)
+            inventario.bitsets['especies_nativas'] = _bitsets(celulas, num_celulas, especies, nativas)
+
+    return CuboAgregado(caracterizacao, inventario, dimensoes_carac, dimensoes_inv, grupos_ligacao, colunas)
+
+def _somar(tabela, selecao):
+    """Médias, máximos e contagens de valores 1 das células selecionadas, por coluna"""
+    somas = tabela.somas[selecao].sum()
+    contagens = tabela.contagens[selecao].sum()
+    medias = (somas / contagens.where(contagens > 0)).to_dict()
+    return medias, tabela.maximos[selecao].max().to_dict(), tabela.uns[selecao].sum().astype(int).to_dict(), contagens.astype(int).to_dict()
+
+@perfilado()
+def consultar_cubo(cubo, filtros_principais, filtros_inventario):
+    """
+    Métricas de uma combinação de filtros (mesmos argumentos de `aplicar_filtros`),
+    somando as células do cubo em vez de filtrar as linhas.
+    """
+    ativos = {f: _normalizar_valor(v) for f, v in filtros_principais.items() if v != 'Todos' and v is not None}
+    resultado = ResultadoCubo()
+
+    # === CARACTERIZAÇÃO ===
+    carac = cubo.caracterizacao
+    selecao = np.ones(len(carac.registros), dtype=bool)
+    for d in cubo.dimensoes_caracterizacao:
+        if d in ativos:
+            selecao &= (carac.chaves[d] == ativos[d]).to_numpy()
+
+    resultado.registros_caracterizacao = int(carac.registros[selecao].sum())
+    resultado.medias_caracterizacao, _, resultado.uns_caracterizacao, _ = _somar(carac, selecao)
+    if 'parcelas' in carac.bitsets:
+        resultado.num_parcelas = _contar_bits(carac.bitsets['parcelas'], selecao)
+    selecao_carac = selecao
+
+    # === INVENTÁRIO ===
+    inv = cubo.inventario
+    selecao = np.ones(len(inv.registros), dtype=bool)
+    for d, coluna in cubo.dimensoes_inventario.items():
+        if d in ativos:
+            selecao &= (inv.chaves[coluna] == ativos[d]).to_numpy()
+
+    # Ligação via cod_parc com a caracterização filtrada (como em aplicar_filtros, só se ela tiver linhas)
+    if cubo.grupos_ligacao is not None and resultado.registros_caracterizacao > 0:
+        grupos_selecionados = np.append(cubo.grupos_ligacao[:, selecao_carac].any(axis=1), False)
+        selecao &= grupos_selecionados[inv.chaves['grupo_ligacao'].to_numpy()]
+
+    for filtro, valor in filtros_inventario.items():
+        if valor != 'Todos' and valor is not None and f'filtro:{filtro}' in cubo.dimensoes_inventario:
+            selecao &= (inv.chaves[f'filtro:{filtro}'] == _normalizar_valor(valor)).to_numpy()
+
+    resultado.registros_inventario = int(inv.registros[selecao].sum())
+    (resultado.medias_inventario, resultado.maximos_inventario,
+     _, resultado.contagens_inventario) = _somar(inv, selecao)
+    if 'especies' in inv.bitsets:
+        resultado.riqueza = _contar_bits(inv.bitsets['especies'], selecao)
+    if 'especies_nativas' in inv.bitsets:
+        resultado.riqueza_nativas = _contar_bits(inv.bitsets['especies_nativas'], selecao)
+
+    return resultado
+
+def tamanho_cubo(cubo):
+    """Número de células e memória aproximada (bytes) do cubo"""
+    tabelas = [cubo.caracterizacao, cubo.inventario]
+    memoria = 0
+    for tabela in tabelas:
+        memoria += sum(int(df.memory_usage(deep=True).sum())
+                       for df in [tabela.chaves, tabela.somas, tabela.contagens, tabela.maximos, tabela.uns])
+        memoria += tabela.registros.nbytes + sum(b.nbytes for b in tabela.bitsets.values())
+    return {'celulas_caracterizacao': len(cubo.caracterizacao.registros),
+            'celulas_inventario': len(cubo.inventario.registros), 'bytes': memoria}
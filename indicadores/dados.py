@@ -0,0 +1,297 @@
+"""
+Leitura dos bancos Excel e limpeza/padronização dos dados.
+
+A leitura usa o leitor calamine (em Rust, `pip install python-calamine`)
+quando instalado, ou o openpyxl; os dois entregam os mesmos valores. Cada
+consumidor declara sua projeção de colunas (`PROJECOES`): as colunas de
+texto livre que nenhum cálculo, filtro ou tela usa não chegam à limpeza nem
+à memória, e as linhas inteiramente vazias (linhas formatadas sem dados no
+fim da planilha) são descartadas. As planilhas de vários bancos são lidas
+em processos separados, ao mesmo tempo (`ler_planilhas`), com tempo e
+memória de cada arquivo em `LeituraPlanilha`. Depois da limpeza, as colunas
+recebem os tipos compactos do esquema (ver `esquema`).
+
+Cada campanha de campo entrega as próprias planilhas, com o id da campanha
+no nome (BD_inventario_2025-1.xlsx); as planilhas sem sufixo
+(BD_inventario.xlsx) são a campanha 'base'. Cada linha lida leva o id da
+campanha na coluna 'campanha', e o banco é a junção das campanhas.
+"""
+import functools
+import hashlib
+import importlib.util
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from .configuracao import leitor_excel
+from .esquema import ESQUEMAS, VERSAO_REGRAS, aplicar_esquema
+from .memoria import memoria_dataframe
+from .perfil import perfilado
+
+ARQUIVOS_DADOS = ['BD_caracterizacao.xlsx', 'BD_inventario.xlsx']
+BANCOS = ['caracterizacao', 'inventario']
+ARQUIVO_POR_BANCO = dict(zip(BANCOS, ARQUIVOS_DADOS))
+
+# Campanhas: BD_<banco>.xlsx é a campanha base; BD_<banco>_<campanha>.xlsx, as demais
+CAMPANHA_PADRAO = 'base'
+COLUNA_CAMPANHA = 'campanha'
+COLUNA_DATA = 'data_exe'
+PADRAO_ARQUIVO_CAMPANHA = re.compile(r'^BD_(?P<banco>' + '|'.join(BANCOS) + r')(?:_(?P<campanha>[^.]+))?\.xlsx$')
+
+# Colunas de texto livre das planilhas que nenhum cálculo, filtro ou tela usa
+COLUNAS_TEXTO_LIVRE = {
+    'caracterizacao': [
+        'Presença de processos erosivos (qual?)',
+        'Presença de animais domésticos (qual?)',
+        'Presença de animais silvestres (qual?)',
+        'Arbóreas não Amostradas',
+        'Lianas, Arbustos, Herbáceas notáveis',
+        'Observação',
+    ],
+    'inventario': [],
+}
+
+# Projeção de colunas por consumidor: banco -> colunas não lidas. 'indicadores' é a do
+# dashboard, do armazém, do relatório e dos motores; 'completa' lê todas as colunas.
+PROJECOES = {
+    'indicadores': COLUNAS_TEXTO_LIVRE,
+    'completa': {},
+}
+PROJECAO_PADRAO = 'indicadores'
+
+@dataclass
+class LeituraPlanilha:
+    """
+    Leitura de uma planilha (de uma campanha): leitor, tamanho, linhas e colunas, tempos (s),
+    memória (bytes, com e sem o esquema de tipos) e período das datas de execução (data_exe, AAAA-MM-DD)
+    """
+    banco: str
+    arquivo: str
+    leitor: str
+    projecao: str
+    campanha: str = CAMPANHA_PADRAO
+    data_inicio: str = None
+    data_fim: str = None
+    tamanho_arquivo: int = 0
+    linhas: int = 0
+    linhas_vazias: int = 0
+    colunas: int = 0
+    colunas_ignoradas: list = field(default_factory=list)
+    tempo_leitura: float = 0.0
+    tempo_limpeza: float = 0.0
+    memoria: int = 0
+    memoria_sem_esquema: int = 0
+
+@perfilado()
+def limpar_e_padronizar_dados(df):
+    """
+    Limpa e padroniza os dados do DataFrame:
+    1. Remove espacos desnecessarios
+    2. Converte para minúsculas
+    3. Capitaliza a primeira letra de cada célula
+    """
+    # Cópia rasa: as colunas são substituídas inteiras (nunca alteradas no lugar), sem alterar `df`
+    df_clean = df.copy(deep=False)
+
+    # Aplicar limpeza apenas em colunas de texto (object/string)
+    for col in df_clean.columns:
+        if df_clean[col].dtype == 'object':
+            # Converter para string, remover espaços extras e converter para minúsculas
+            df_clean[col] = (df_clean[col]
+                           .astype(str)
+                           .str.strip()  # Remove espaços no início e fim
+                           .str.replace(r'\s+', ' ', regex=True)  # Remove espaços múltiplos
+                           .str.lower()  # Converte para minúsculas
+                           .str.capitalize()  # Capitaliza primeira letra
+                           )
+
+            # Tratar valores especiais
+            df_clean[col] = df_clean[col].replace({
+                'Nan': np.nan,
+                'None': np.nan,
+                'Null': np.nan,
+                '': np.nan
+            })
+
+    return df_clean
+
+# ============================================================================
+# CAMPANHAS
+# ============================================================================
+
+def arquivo_planilha(banco, campanha=CAMPANHA_PADRAO):
+    """Nome da planilha de um banco em uma campanha (BD_<banco>.xlsx na campanha base)"""
+    if campanha == CAMPANHA_PADRAO:
+        return ARQUIVO_POR_BANCO[banco]
+    return f'BD_{banco}_{campanha}.xlsx'
+
+def planilhas_diretorio(diretorio='.'):
+    """
+    Planilhas (banco, campanha) encontradas no diretório, por banco e campanha (base primeiro).
+    O banco sem nenhuma planilha entra com a campanha base, cuja leitura acusa o arquivo ausente.
+    """
+    try:
+        nomes = os.listdir(diretorio)
+    except OSError:
+        nomes = []
+    encontradas = set()
+    for nome in nomes:
+        correspondencia = PADRAO_ARQUIVO_CAMPANHA.match(nome)
+        if correspondencia:
+            encontradas.add((correspondencia['banco'], correspondencia['campanha'] or CAMPANHA_PADRAO))
+    for banco in BANCOS:
+        if not any(banco_encontrado == banco for banco_encontrado, _ in encontradas):
+            encontradas.add((banco, CAMPANHA_PADRAO))
+    return sorted(encontradas, key=lambda planilha: (BANCOS.index(planilha[0]), planilha[1] != CAMPANHA_PADRAO, planilha[1]))
+
+def periodo_datas(df):
+    """Primeira e última data de execução (data_exe) do banco, AAAA-MM-DD (None se não houver)"""
+    if COLUNA_DATA not in df.columns:
+        return None, None
+    datas = pd.to_datetime(df[COLUNA_DATA], errors='coerce').dropna()
+    if datas.empty:
+        return None, None
+    return datas.min().strftime('%Y-%m-%d'), datas.max().strftime('%Y-%m-%d')
+
+def juntar_campanhas(dfs):
+    """
+    Banco com as campanhas, na ordem recebida (colunas ausentes em uma campanha ficam NaN).
+    As colunas category recebem antes as categorias de todas as campanhas, em ordem alfabética
+    (sem isso, o concat de categorias diferentes volta a object).
+    """
+    dfs = list(dfs)
+    if len(dfs) == 1:
+        return dfs[0]
+    categorias = {}
+    for df in dfs:
+        for coluna, tipo in df.dtypes.items():
+            if isinstance(tipo, pd.CategoricalDtype):
+                categorias.setdefault(coluna, set()).update(tipo.categories)
+    for coluna, valores in categorias.items():
+        tipo = pd.CategoricalDtype(sorted(valores))
+        for i, df in enumerate(dfs):
+            if coluna in df.columns and (isinstance(df[coluna].dtype, pd.CategoricalDtype) or df[coluna].isna().all()):
+                dfs[i] = df.astype({coluna: tipo})
+    return pd.concat(dfs, ignore_index=True)
+
+# ============================================================================
+# LEITURA DAS PLANILHAS
+# ============================================================================
+
+@functools.lru_cache(maxsize=None)
+def calamine_disponivel():
+    """True se o python-calamine está instalado (sem importá-lo)"""
+    return importlib.util.find_spec('python_calamine') is not None
+
+def aviso_leitor_excel():
+    """Mensagem quando o leitor configurado não pode ser usado (None se pode)"""
+    try:
+        leitor = leitor_excel()
+    except ValueError as e:
+        return f"{e}. Usando o leitor openpyxl."
+    if leitor == 'calamine' and not calamine_disponivel():
+        return "Leitor calamine indisponível: instale com `pip install python-calamine`. Usando o leitor openpyxl."
+    return None
+
+def leitor_excel_ativo():
+    """Leitor de planilhas em uso: o configurado ('auto': calamine se instalado) ou openpyxl"""
+    if aviso_leitor_excel():
+        return 'openpyxl'
+    leitor = leitor_excel()
+    if leitor == 'auto':
+        return 'calamine' if calamine_disponivel() else 'openpyxl'
+    return leitor
+
+def assinatura_leitura(banco, projecao=PROJECAO_PADRAO):
+    """
+    Chave curta do que a leitura de um banco entrega (colunas ignoradas, descarte de linhas
+    vazias, coluna da campanha e esquema de tipos): o armazém refaz os arquivos gerados com
+    outra assinatura
+    """
+    ignoradas = sorted(PROJECOES[projecao].get(banco, []))
+    chave = (ignoradas, 'sem linhas vazias', COLUNA_CAMPANHA, sorted(ESQUEMAS[banco].items()), VERSAO_REGRAS)
+    return hashlib.sha256(repr(chave).encode('utf-8')).hexdigest()[:12]
+
+def assinatura_leituras(projecao=PROJECAO_PADRAO):
+    """Assinatura da leitura de todos os bancos (entra na chave dos artefatos derivados deles)"""
+    return hashlib.sha256(''.join(assinatura_leitura(banco, projecao) for banco in BANCOS).encode('utf-8')).hexdigest()[:8]
+
+def ler_planilha(banco, diretorio='.', projecao=PROJECAO_PADRAO, leitor=None, campanha=CAMPANHA_PADRAO,
+                 esquema=True):
+    """
+    Lê a planilha de um banco em uma campanha com a projeção de colunas do consumidor, sem as
+    linhas vazias, aplica limpeza e padronização, marca a campanha na coluna 'campanha' e
+    aplica o esquema de tipos (com esquema=False, as colunas ficam como saem da limpeza).
+    Retorna (DataFrame, `LeituraPlanilha`).
+    """
+    arquivo = arquivo_planilha(banco, campanha)
+    caminho = os.path.join(diretorio, arquivo)
+    leitor = leitor or leitor_excel_ativo()
+    ignoradas = set(PROJECOES[projecao].get(banco, []))
+    leitura = LeituraPlanilha(banco, arquivo, leitor, projecao, campanha, tamanho_arquivo=os.path.getsize(caminho))
+
+    inicio = time.perf_counter()
+    df = pd.read_excel(caminho, engine=leitor, usecols=(lambda coluna: coluna not in ignoradas) if ignoradas else None)
+    vazias = df.isna().all(axis=1)
+    if vazias.any():
+        df = df[~vazias].reset_index(drop=True)
+    leitura.tempo_leitura = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    df = limpar_e_padronizar_dados(df)
+    df[COLUNA_CAMPANHA] = campanha
+    leitura.memoria_sem_esquema = memoria_dataframe(df)
+    if esquema:
+        df = aplicar_esquema(df, banco)
+    leitura.tempo_limpeza = time.perf_counter() - inicio
+
+    leitura.linhas, leitura.colunas = df.shape
+    leitura.linhas_vazias = int(vazias.sum())
+    leitura.colunas_ignoradas = sorted(ignoradas)
+    leitura.data_inicio, leitura.data_fim = periodo_datas(df)
+    leitura.memoria = memoria_dataframe(df)
+    return df, leitura
+
+def _ler_planilha_em_processo(banco, diretorio, projecao, leitor, campanha):
+    """`ler_planilha` em um processo do pool (o leitor é resolvido no processo principal)"""
+    return ler_planilha(banco, diretorio, projecao, leitor, campanha)
+
+def ler_planilhas(planilhas, diretorio='.', projecao=PROJECAO_PADRAO, paralelo=None):
+    """
+    Lê as planilhas (banco, campanha); com mais de uma planilha e mais de uma CPU (ou paralelo=True),
+    cada uma é lida em um processo, ao mesmo tempo. Retorna (banco, campanha) -> (DataFrame, LeituraPlanilha).
+    """
+    planilhas = [tuple(planilha) for planilha in planilhas]
+    leitor = leitor_excel_ativo()
+    if paralelo is None:
+        paralelo = len(planilhas) > 1 and (os.cpu_count() or 1) > 1
+    if not paralelo or len(planilhas) < 2:
+        return {(banco, campanha): ler_planilha(banco, diretorio, projecao, leitor, campanha)
+                for banco, campanha in planilhas}
+
+    # 'spawn': o processo que lê pode ter outras threads (servidor do dashboard)
+    trabalhadores = min(len(planilhas), max(os.cpu_count() or 1, 2))
+    with ProcessPoolExecutor(max_workers=trabalhadores, mp_context=multiprocessing.get_context('spawn')) as executor:
+        futuros = {(banco, campanha): executor.submit(_ler_planilha_em_processo, banco, diretorio, projecao, leitor, campanha)
+                   for banco, campanha in planilhas}
+        return {planilha: futuro.result() for planilha, futuro in futuros.items()}
+
+def carregar_banco(banco, diretorio='.', projecao=PROJECAO_PADRAO):
+    """Carrega as planilhas de um banco ('caracterizacao' ou 'inventario'), todas as campanhas, já limpas"""
+    planilhas = [planilha for planilha in planilhas_diretorio(diretorio) if planilha[0] == banco]
+    return juntar_campanhas(df for df, _ in ler_planilhas(planilhas, diretorio, projecao).values())
+
+def carregar_dados(diretorio='.', projecao=PROJECAO_PADRAO):
+    """
+    Carrega os bancos de dados Excel do diretório, todas as campanhas (ao mesmo tempo, ver
+    `ler_planilhas`), e aplica limpeza e padronização. Erros de leitura são propagados para quem chamou.
+    """
+    lidos = ler_planilhas(planilhas_diretorio(diretorio), diretorio, projecao)
+    return tuple(juntar_campanhas(df for (banco_lido, _), (df, _) in lidos.items() if banco_lido == banco)
+                 for banco in BANCOS)
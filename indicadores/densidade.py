@@ -0,0 +1,106 @@
+"""
+Densidade de indivíduos (geral e de regenerantes) por hectare amostrado.
+"""
+import pandas as pd
+
+from .area import calcular_area_amostrada
+from .colunas import encontrar_coluna
+from .esquema import como_texto
+from .perfil import perfilado
+from .resultados import ResultadoDensidade
+
+ALTURA_MINIMA_REGENERANTE = 0.499
+
+def filtrar_regenerantes(df_inv):
+    """
+    Seleciona os indivíduos regenerantes:
+    1. Remove "Morto/Morta"
+    2. Apenas origem "Nativa"
+    3. Apenas idade "Jovem"
+    4. Apenas altura >= 0.5 m
+    """
+    df_filtrado = df_inv
+
+    especies_col = encontrar_coluna(df_filtrado, ['especies', 'especie', 'species', 'sp'])
+    if especies_col:
+        df_filtrado = df_filtrado[~como_texto(df_filtrado[especies_col]).str.contains('Morto|Morta', case=False, na=False)]
+
+    origem_col = encontrar_coluna(df_filtrado, ['origem', 'origin', 'procedencia'])
+    if origem_col:
+        df_filtrado = df_filtrado[como_texto(df_filtrado[origem_col]).str.contains('Nativa', case=False, na=False)]
+
+    idade_col = encontrar_coluna(df_filtrado, ['idade', 'age', 'class_idade'])
+    if idade_col:
+        df_filtrado = df_filtrado[como_texto(df_filtrado[idade_col]).str.contains('Jovem', case=False, na=False)]
+
+    ht_col = encontrar_coluna(df_filtrado, ['ht', 'altura', 'height', 'h'])
+    if ht_col:
+        alturas = pd.to_numeric(df_filtrado[ht_col], errors='coerce')
+        df_filtrado = df_filtrado[alturas >= ALTURA_MINIMA_REGENERANTE]
+
+    return df_filtrado
+
+def contar_individuos(df_inv):
+    """Número de indivíduos (plaquetas únicas, ou registros se não houver plaqueta)"""
+    plaqueta_col = encontrar_coluna(df_inv, ['plaqueta', 'plaq', 'id'])
+    if plaqueta_col:
+        return df_inv[plaqueta_col].nunique()
+    return len(df_inv)
+
+@perfilado()
+def calcular_densidade_regenerantes(df_inv, df_carac):
+    """Calcula a densidade de indivíduos regenerantes seguindo critérios específicos"""
+    try:
+        # Verificar se há dados
+        if len(df_inv) == 0 or len(df_carac) == 0:
+            return ResultadoDensidade()
+
+        df_regenerantes = filtrar_regenerantes(df_inv)
+        if len(df_regenerantes) == 0:
+            return ResultadoDensidade()
+
+        # Contar indivíduos regenerantes válidos
+        num_regenerantes = contar_individuos(df_regenerantes)
+
+        # Área amostrada usando método adaptativo (sobre todo o inventário recebido)
+        area = calcular_area_amostrada(df_carac, df_inv)
+        resultado = ResultadoDensidade(0.0, area.metodo, num_regenerantes, area.area_ha, avisos=area.avisos)
+
+        if area.area_ha > 0:
+            resultado.densidade = num_regenerantes / area.area_ha
+
+        return resultado
+    except Exception as e:
+        return ResultadoDensidade(avisos=[f"Erro no cálculo de densidade: {e}"])
+
+@perfilado()
+def calcular_densidade_geral(df_inv, df_carac):
+    """Calcula a densidade geral de indivíduos com método híbrido para técnicas mistas"""
+    try:
+        # Verificar se há dados
+        if len(df_inv) == 0 or len(df_carac) == 0:
+            return ResultadoDensidade(0.0, "Sem dados")
+
+        # Encontrar coluna de plaqueta
+        plaqueta_col = encontrar_coluna(df_inv, ['plaqueta', 'plaq', 'id'])
+
+        if not plaqueta_col:
+            return ResultadoDensidade(0.0, "Coluna plaqueta não encontrada")
+
+        # Contar total de indivíduos únicos
+        num_individuos = df_inv[plaqueta_col].nunique()
+
+        # Calcular área amostrada usando método híbrido avançado
+        area = calcular_area_amostrada(df_carac, df_inv)
+        resultado = ResultadoDensidade(0.0, area.metodo, num_individuos, area.area_ha, avisos=area.avisos)
+
+        if area.area_ha > 0:
+            resultado.densidade = num_individuos / area.area_ha
+
+            # Melhorar descrição do método para casos mistos
+            if "+" in area.metodo:
+                resultado.metodo = f"Método Misto: {area.metodo}"
+
+        return resultado
+    except Exception as e:
+        return ResultadoDensidade(0.0, f"Erro: {e}")
@@ -0,0 +1,448 @@
+"""
+Medição de desempenho das rotinas principais e da inicialização do dashboard.
+
+Cada caso (leitura e limpeza, filtros da barra lateral, área, indicadores,
+fitossociologia, diversidade e auditoria) roda sobre bancos sintéticos (ver
+`sintetico`) de tamanhos crescentes. Mede-se o tempo (menor de várias
+repetições) e o pico de memória alocada (tracemalloc, em uma execução à
+parte, com o pico de cada função do núcleo chamada pelo caso).
+
+Os casos de inicialização medem, em processos novos, o tempo de importação
+dos módulos carregados no início do dashboard e dos importados só no
+primeiro gráfico (com `-X importtime`, módulo a módulo, e o aumento da RSS),
+e o tempo até a primeira pintura do dashboard (título, navegação e
+esqueleto na tela), lido do rastro de uma execução pelo AppTest do Streamlit.
+
+Os resultados podem ser gravados como base e comparados depois: o comando
+sai com código 1 se algum caso ficar mais lento ou usar mais memória que a
+base além da tolerância.
+
+    python -m indicadores desempenho --tamanhos 10000 100000 --salvar-base desempenho_base.json
+    python -m indicadores desempenho --tamanhos 10000 100000 --base desempenho_base.json
+"""
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from .agregacao import motor_agregacao_ativo
+from .armazem import ler_parquet_armazem
+from .auditoria import analisar_nomes_especies
+from .colunas import encontrar_coluna
+from .consulta import obter_motor
+from .dados import BANCOS, limpar_e_padronizar_dados
+from .diversidade import calcular_indices_diversidade
+from .esquema import aplicar_esquema
+from .filtros import (
+    COLUNAS_FILTRO_INVENTARIO,
+    detectar_tecnicas,
+    filtrar_inventario_por_propriedades,
+    separar_por_tecnica,
+)
+from .fitossociologia import calcular_fitossociologia_censo, calcular_fitossociologia_parcelas
+from .memoria import memoria_colunas
+from .outliers import calcular_outliers_por_grupo
+from .perfil import iniciar_perfil
+from .rastro import TRECHO_EXECUCAO, ler_rastro
+from .sintetico import gerar_dados_sinteticos, salvar_dados_sinteticos
+
+TAMANHOS_PADRAO = [10_000, 100_000]
+REPETICOES_PADRAO = 3
+TOLERANCIA_TEMPO_PADRAO = 0.25
+TOLERANCIA_MEMORIA_PADRAO = 0.25
+# Diferenças absolutas abaixo destas são ruído de medição, não regressão
+DIFERENCA_MINIMA_TEMPO_S = 0.005
+DIFERENCA_MINIMA_MEMORIA_MB = 1.0
+
+# Módulos importados no início do app_indicadores e os importados só no primeiro gráfico
+MODULOS_DASHBOARD = ['streamlit', 'pandas', 'numpy', 'indicadores']
+MODULOS_GRAFICOS = ['plotly.express', 'plotly.graph_objects']
+ARQUIVO_APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app_indicadores.py')
+FUSTES_PRIMEIRA_PINTURA = 1_000
+TEMPO_LIMITE_APP_S = 600
+MARCA_IMPORTACAO = '--- importacao medida ---'
+
+# ============================================================================
+# DADOS E CASOS
+# ============================================================================
+
+def preparar_dados(num_fustes, semente, diretorio):
+    """
+    Bancos sintéticos brutos (como nas planilhas) e limpos (com o esquema de tipos, como na
+    leitura das planilhas), e os limpos gravados em Parquet
+    """
+    brutos = gerar_dados_sinteticos(num_fustes, semente)
+    limpos = tuple(aplicar_esquema(limpar_e_padronizar_dados(df), banco) for banco, df in zip(BANCOS, brutos))
+
+    caminhos = []
+    for banco, df in zip(BANCOS, limpos):
+        caminho = os.path.join(diretorio, f'{banco}_{num_fustes}.parquet')
+        df.to_parquet(caminho, index=False)
+        caminhos.append(caminho)
+
+    return {'brutos': brutos, 'caracterizacao': limpos[0], 'inventario': limpos[1], 'parquet': caminhos}
+
+def _filtros_barra_lateral(motor, df_caracterizacao, df_inventario, cod_prop):
+    """Opções dos filtros e duas seleções (tudo; uma propriedade e só nativas), como na barra lateral"""
+    for coluna in ['cod_prop', 'tecnica', 'UT']:
+        if coluna in df_caracterizacao.columns:
+            list(df_caracterizacao[coluna].dropna().unique())
+    for nomes in COLUNAS_FILTRO_INVENTARIO.values():
+        coluna = encontrar_coluna(df_inventario, nomes)
+        if coluna:
+            list(df_inventario[coluna].dropna().unique())
+
+    todos = {'cod_prop': 'Todos', 'tecnica': 'Todos', 'UT': 'Todos'}
+    motor.aplicar_filtros(df_caracterizacao, df_inventario, todos, {})
+    motor.aplicar_filtros(df_caracterizacao, df_inventario, {**todos, 'cod_prop': cod_prop}, {'origem': 'Nativa'})
+
+def casos_desempenho(dados, motor):
+    """(nome, função sem argumentos) de cada rotina medida, chamada como no dashboard"""
+    df_caracterizacao, df_inventario = dados['caracterizacao'], dados['inventario']
+
+    tecnica_col, _, _ = detectar_tecnicas(df_caracterizacao)
+    dados_censo, dados_parcelas = separar_por_tecnica(df_caracterizacao, tecnica_col)
+    inv_censo = filtrar_inventario_por_propriedades(df_inventario, dados_censo['cod_prop'].unique())
+    inv_parcelas = filtrar_inventario_por_propriedades(df_inventario, dados_parcelas['cod_prop'].unique())
+    cod_prop = df_caracterizacao['cod_prop'].dropna().iloc[0]
+    col_ht = encontrar_coluna(df_inventario, ['ht', 'altura', 'height'])
+    col_especie = encontrar_coluna(df_inventario, ['especie', 'especies', 'species', 'sp'])
+
+    return [
+        ('limpeza', lambda: [limpar_e_padronizar_dados(df) for df in dados['brutos']]),
+        ('leitura_parquet', lambda: [ler_parquet_armazem(caminho) for caminho in dados['parquet']]),
+        ('filtros', lambda: _filtros_barra_lateral(motor, df_caracterizacao, df_inventario, cod_prop)),
+        ('area_amostrada', lambda: motor.calcular_area_amostrada(df_caracterizacao, df_inventario)),
+        ('indicadores_restauracao', lambda: motor.calcular_indicadores_restauracao(df_caracterizacao, df_inventario)),
+        ('fitossociologia_censo', lambda: calcular_fitossociologia_censo(inv_censo)),
+        ('fitossociologia_parcelas', lambda: calcular_fitossociologia_parcelas(inv_parcelas)),
+        ('diversidade', lambda: calcular_indices_diversidade(df_inventario)),
+        ('especies', lambda: analisar_nomes_especies(df_inventario)),
+        ('outliers', lambda: calcular_outliers_por_grupo(df_inventario, col_ht, col_especie)),
+    ]
+
+NOMES_CASOS = ['limpeza', 'leitura_parquet', 'filtros', 'area_amostrada', 'indicadores_restauracao',
+               'fitossociologia_censo', 'fitossociologia_parcelas', 'diversidade', 'especies', 'outliers']
+NOMES_CASOS_INICIALIZACAO = ['importacao', 'importacao_graficos', 'primeira_pintura']
+
+# ============================================================================
+# INICIALIZAÇÃO
+# ============================================================================
+
+_SCRIPT_IMPORTACAO = """
+import os, sys, time
+def rss():
+    try:
+        with open('/proc/self/statm') as arquivo:
+            return int(arquivo.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return 0
+{previos}
+antes = rss()
+sys.stderr.write({marca!r} + '\\n')
+sys.stderr.flush()
+inicio = time.perf_counter()
+import {modulos}
+print(time.perf_counter() - inicio, rss() - antes)
+"""
+
+_SCRIPT_APP = """
+from streamlit.testing.v1 import AppTest
+AppTest.from_file({app!r}, default_timeout={tempo_limite}).run()
+"""
+
+def _ambiente_processo(**variaveis):
+    """Variáveis de ambiente de um processo filho que importa este pacote"""
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    caminhos = [raiz] + [c for c in os.environ.get('PYTHONPATH', '').split(os.pathsep) if c]
+    return {**os.environ, 'PYTHONPATH': os.pathsep.join(caminhos), **variaveis}
+
+def _importacoes_primeiro_nivel(saida_importtime):
+    """Tempo acumulado (s) de cada import de primeiro nível feito depois da marca, na saída do -X importtime"""
+    tempos = {}
+    for linha in saida_importtime.split(MARCA_IMPORTACAO)[-1].splitlines():
+        if not linha.startswith('import time:'):
+            continue
+        _, acumulado, nome = linha.split('|')
+        # Imports internos vêm recuados (dois espaços por nível)
+        if acumulado.strip().isdigit() and not nome[1:].startswith(' '):
+            tempos[nome.strip()] = int(acumulado) / 1e6
+    return dict(sorted(tempos.items(), key=lambda item: item[1], reverse=True))
+
+def medir_importacao(modulos, previos=(), repeticoes=REPETICOES_PADRAO):
+    """
+    Tempo (s) de importar `modulos` em um processo Python novo, depois de `previos` (fora da
+    conta): menor e mediano de `repeticoes` processos, aumento da RSS (MB; 0 fora do Linux) e,
+    em 'modulos', o tempo de cada import de primeiro nível (-X importtime).
+    """
+    script = _SCRIPT_IMPORTACAO.format(previos=f"import {', '.join(previos)}" if previos else '',
+                                       marca=MARCA_IMPORTACAO, modulos=', '.join(modulos))
+    execucoes = []
+    for _ in range(max(repeticoes, 1)):
+        processo = subprocess.run([sys.executable, '-X', 'importtime', '-c', script], capture_output=True,
+                                  text=True, env=_ambiente_processo(), check=True)
+        tempo, rss = processo.stdout.split()
+        execucoes.append((float(tempo), int(rss), processo.stderr))
+
+    tempo, rss, saida = min(execucoes)
+    return {
+        'tempo': tempo,
+        'tempo_mediano': statistics.median(t for t, _, _ in execucoes),
+        'pico_mb': rss / 1024 ** 2,
+        'modulos': _importacoes_primeiro_nivel(saida),
+    }
+
+def medir_primeira_pintura(app=ARQUIVO_APP, repeticoes=REPETICOES_PADRAO, semente=0):
+    """
+    Tempo (s) do início do script até a primeira pintura do dashboard (ver `marcar_primeira_pintura`
+    no app), em processos novos com o AppTest do Streamlit e bancos sintéticos pequenos: menor e
+    mediano de `repeticoes` processos e, em 'execucao_completa', a menor duração da primeira execução.
+    Retorna None se o app ou o Streamlit não estiverem disponíveis.
+    """
+    if not os.path.exists(app) or importlib.util.find_spec('streamlit') is None:
+        return None
+
+    pinturas, completas = [], []
+    with tempfile.TemporaryDirectory() as diretorio:
+        salvar_dados_sinteticos(*gerar_dados_sinteticos(FUSTES_PRIMEIRA_PINTURA, semente), diretorio)
+        script = _SCRIPT_APP.format(app=os.path.abspath(app), tempo_limite=TEMPO_LIMITE_APP_S)
+        for i in range(max(repeticoes, 1)):
+            rastro = os.path.join(diretorio, f'rastro_{i}.jsonl')
+            subprocess.run([sys.executable, '-c', script], cwd=diretorio, capture_output=True, text=True, check=True,
+                           env=_ambiente_processo(INDICADORES_RASTRO=rastro), timeout=TEMPO_LIMITE_APP_S)
+            eventos = ler_rastro(rastro)
+            execucao = eventos[eventos['trecho'] == TRECHO_EXECUCAO].iloc[0]
+            pinturas.append(execucao['primeira_pintura_ms'] / 1000)
+            completas.append(execucao['duracao_ms'] / 1000)
+
+    return {
+        'tempo': min(pinturas),
+        'tempo_mediano': statistics.median(pinturas),
+        'pico_mb': None,
+        'execucao_completa': min(completas),
+    }
+
+def casos_inicializacao(app=ARQUIVO_APP, repeticoes=REPETICOES_PADRAO, semente=0):
+    """(nome, fustes, função sem argumentos) de cada caso de inicialização do dashboard"""
+    return [
+        ('importacao', 0, lambda: medir_importacao(MODULOS_DASHBOARD, repeticoes=repeticoes)),
+        ('importacao_graficos', 0, lambda: medir_importacao(MODULOS_GRAFICOS, MODULOS_DASHBOARD, repeticoes)),
+        ('primeira_pintura', FUSTES_PRIMEIRA_PINTURA, lambda: medir_primeira_pintura(app, repeticoes, semente)),
+    ]
+
+# ============================================================================
+# MEDIÇÃO E COMPARAÇÃO
+# ============================================================================
+
+def medir(funcao, repeticoes=REPETICOES_PADRAO):
+    """
+    Pico de memória alocada (MB) em uma execução com tracemalloc (perfil com memória), que
+    também serve de aquecimento, e tempos (s) de `repeticoes` execuções sem ele: menor e
+    mediano. Em 'funcoes', o maior pico (MB) de cada função do núcleo chamada, do maior ao menor.
+    Memória alocada fora do Python e do NumPy (ex.: pelo Arrow) não entra no pico.
+    """
+    with iniciar_perfil('desempenho', memoria=True) as perfil:
+        funcao()
+    picos = perfil.resumo().dropna(subset=['memoria_pico']).sort_values('memoria_pico', ascending=False)
+
+    tempos = []
+    for _ in range(max(repeticoes, 1)):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    return {
+        'tempo': min(tempos),
+        'tempo_mediano': statistics.median(tempos),
+        'pico_mb': perfil.memoria_pico / 1024 ** 2,
+        'funcoes': {nome: int(pico) / 1024 ** 2 for nome, pico in zip(picos['nome'], picos['memoria_pico'])},
+    }
+
+def memoria_bancos(dados):
+    """Memória (MB, deep) de cada banco limpo e das suas três maiores colunas"""
+    bancos = {}
+    for banco in BANCOS:
+        colunas = memoria_colunas(dados[banco])
+        bancos[banco] = {
+            'total_mb': colunas['bytes'].sum() / 1024 ** 2,
+            'maiores_colunas': {coluna: bytes_ / 1024 ** 2 for coluna, bytes_ in
+                                zip(colunas['coluna'].head(3), colunas['bytes'].head(3))},
+        }
+    return bancos
+
+def ambiente():
+    """Versões e motores que influenciam os números (gravados junto com a base)"""
+    return {
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'maquina': platform.machine(),
+        'motor_consulta': obter_motor().nome,
+        'motor_agregacao': motor_agregacao_ativo(),
+    }
+
+def executar_desempenho(tamanhos=TAMANHOS_PADRAO, repeticoes=REPETICOES_PADRAO, semente=0, casos=None,
+                        app=ARQUIVO_APP):
+    """
+    Mede os casos de inicialização e os casos em cada tamanho (número de fustes).
+    Retorna {'ambiente', 'semente', 'resultados', 'bancos', 'avisos'}, com resultados por
+    '<caso>@<fustes>' e a memória dos bancos limpos por número de fustes.
+    """
+    motor = obter_motor()
+    resultados = {}
+    bancos = {}
+    avisos = []
+    for nome, num_fustes, funcao in casos_inicializacao(app, repeticoes, semente):
+        if casos and nome not in casos:
+            continue
+        medicao = funcao()
+        if medicao is None:
+            avisos.append(f"{nome}: não medido (sem o Streamlit ou sem o app em {app})")
+            continue
+        resultados[f'{nome}@{num_fustes}'] = {'caso': nome, 'fustes': num_fustes, **medicao}
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        for num_fustes in tamanhos:
+            if casos and not set(casos) & set(NOMES_CASOS):
+                break
+            dados = preparar_dados(num_fustes, semente, diretorio)
+            bancos[str(num_fustes)] = memoria_bancos(dados)
+            for nome, funcao in casos_desempenho(dados, motor):
+                if casos and nome not in casos:
+                    continue
+                resultados[f'{nome}@{num_fustes}'] = {'caso': nome, 'fustes': num_fustes, **medir(funcao, repeticoes)}
+
+    return {'ambiente': ambiente(), 'semente': semente, 'resultados': resultados, 'bancos': bancos,
+            'avisos': avisos}
+
+def comparar_com_base(medicao, base, tolerancia_tempo=TOLERANCIA_TEMPO_PADRAO,
+                      tolerancia_memoria=TOLERANCIA_MEMORIA_PADRAO):
+    """
+    Variação de tempo e memória de cada caso em relação à base (frações; None se o caso
+    não está na base) e a lista de regressões (textos).
+    """
+    variacoes = {}
+    regressoes = []
+    for chave, atual in medicao['resultados'].items():
+        anterior = base.get('resultados', {}).get(chave)
+        if not anterior:
+            variacoes[chave] = (None, None)
+            continue
+
+        variacao_tempo = atual['tempo'] / anterior['tempo'] - 1 if anterior['tempo'] > 0 else 0.0
+        # Sem memória medida (primeira pintura), a variação de memória é 0
+        variacao_memoria = atual['pico_mb'] / anterior['pico_mb'] - 1 if anterior['pico_mb'] else 0.0
+        variacoes[chave] = (variacao_tempo, variacao_memoria)
+
+        if (variacao_tempo > tolerancia_tempo
+                and atual['tempo'] - anterior['tempo'] > DIFERENCA_MINIMA_TEMPO_S):
+            regressoes.append(f"{chave}: tempo {anterior['tempo'] * 1000:.1f} -> {atual['tempo'] * 1000:.1f} ms "
+                              f"(+{variacao_tempo:.0%})")
+        if (variacao_memoria > tolerancia_memoria
+                and atual['pico_mb'] - anterior['pico_mb'] > DIFERENCA_MINIMA_MEMORIA_MB):
+            regressoes.append(f"{chave}: memória {anterior['pico_mb']:.1f} -> {atual['pico_mb']:.1f} MB "
+                              f"(+{variacao_memoria:.0%})")
+
+    return variacoes, regressoes
+
+def imprimir_medicao(medicao, variacoes=None, detalhar=0):
+    """
+    Tabela de tempos e memória por caso e tamanho (com a variação em relação à base, se houver);
+    com `detalhar`, as funções de maior pico de memória de cada caso e os imports mais lentos
+    """
+    amb = medicao['ambiente']
+    print(f"Python {amb['python']}, pandas {amb['pandas']}, motores {amb['motor_consulta']}/{amb['motor_agregacao']}, "
+          f"semente {medicao['semente']}")
+    for num_fustes, bancos in medicao.get('bancos', {}).items():
+        print(f"Bancos com {num_fustes} fustes: " + "; ".join(
+            f"{banco} {info['total_mb']:.1f} MB (" + ", ".join(f"{coluna} {mb:.1f}" for coluna, mb in
+                                                               info['maiores_colunas'].items()) + ")"
+            for banco, info in bancos.items()))
+    print(f"{'caso':<26} {'fustes':>9} {'tempo':>10} {'mediana':>10} {'pico':>10}  base (tempo / memória)")
+    for chave, r in medicao['resultados'].items():
+        pico = f"{r['pico_mb']:7.1f} MB" if r['pico_mb'] is not None else f"{'-':>10}"
+        linha = (f"{r['caso']:<26} {r['fustes'] or '-':>9} {r['tempo'] * 1000:7.1f} ms "
+                 f"{r['tempo_mediano'] * 1000:7.1f} ms {pico}")
+        if variacoes is not None:
+            variacao_tempo, variacao_memoria = variacoes.get(chave, (None, None))
+            linha += "  (sem base)" if variacao_tempo is None else f"  {variacao_tempo:+.0%} / {variacao_memoria:+.0%}"
+        print(linha)
+        for nome, pico_mb in list(r.get('funcoes', {}).items())[:detalhar]:
+            print(f"    {nome:<40} {pico_mb:7.1f} MB")
+        for nome, tempo in list(r.get('modulos', {}).items())[:detalhar]:
+            print(f"    import {nome:<33} {tempo * 1000:7.1f} ms")
+        if detalhar and 'execucao_completa' in r:
+            print(f"    {'primeira execução completa':<40} {r['execucao_completa'] * 1000:7.1f} ms")
+    for aviso in medicao.get('avisos', []):
+        print(f"Aviso: {aviso}")
+
+def executar(args):
+    """Subcomando `desempenho`"""
+    # A base é lida antes das medições: um caminho errado não deve custar a execução inteira
+    base = None
+    if args.base:
+        try:
+            with open(args.base, encoding='utf-8') as arquivo:
+                base = json.load(arquivo)
+        except (OSError, ValueError) as e:
+            print(f"Base {args.base} não pôde ser lida: {e}")
+            return 1
+        if not isinstance(base, dict) or not isinstance(base.get('resultados'), dict):
+            print(f"Base {args.base} não tem o formato das medições (gravadas com --salvar-base)")
+            return 1
+
+    try:
+        medicao = executar_desempenho(args.tamanhos, args.repeticoes, args.semente, args.casos, args.app)
+    except ImportError as e:
+        print(e)
+        return 1
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+        print(f"Falha em um processo de medição da inicialização: {e}")
+        print((e.stderr or '')[-2000:])
+        return 1
+
+    variacoes, regressoes = comparar_com_base(medicao, base, args.tolerancia_tempo,
+                                              args.tolerancia_memoria) if base else (None, [])
+    imprimir_medicao(medicao, variacoes, args.detalhar)
+
+    if base and base.get('ambiente') != medicao['ambiente']:
+        print(f"Aviso: ambiente diferente do da base ({base.get('ambiente')})")
+    if args.salvar_base:
+        with open(args.salvar_base, 'w', encoding='utf-8') as arquivo:
+            json.dump(medicao, arquivo, indent=2)
+        print(f"Base gravada em {args.salvar_base}")
+
+    for regressao in regressoes:
+        print(f"  REGRESSÃO {regressao}")
+    return 1 if regressoes else 0
+
+def configurar_parser(subparsers):
+    """Registra o subcomando `desempenho`"""
+    parser = subparsers.add_parser('desempenho', help='mede tempo e memória das rotinas principais (dados sintéticos)')
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS_PADRAO,
+                        help='números de fustes dos bancos sintéticos (padrão: 10000 100000)')
+    parser.add_argument('--casos', nargs='+', choices=NOMES_CASOS_INICIALIZACAO + NOMES_CASOS,
+                        help='casos a medir (padrão: todos)')
+    parser.add_argument('--detalhar', type=int, nargs='?', const=5, default=0,
+                        help='mostra as N funções de maior pico de memória (ou imports mais lentos) '
+                             'de cada caso (padrão: 5)')
+    parser.add_argument('--app', default=ARQUIVO_APP,
+                        help='script do dashboard medido em primeira_pintura (padrão: app_indicadores.py do projeto)')
+    parser.add_argument('--repeticoes', type=int, default=REPETICOES_PADRAO,
+                        help=f'execuções cronometradas por caso (padrão: {REPETICOES_PADRAO})')
+    parser.add_argument('--semente', type=int, default=0, help='semente dos dados sintéticos (padrão: 0)')
+    parser.add_argument('--base', help='arquivo JSON de base para comparar (código 1 se houver regressão)')
+    parser.add_argument('--salvar-base', help='grava as medições neste arquivo JSON')
+    parser.add_argument('--tolerancia-tempo', type=float, default=TOLERANCIA_TEMPO_PADRAO,
+                        help=f'aumento de tempo aceito, em fração (padrão: {TOLERANCIA_TEMPO_PADRAO})')
+    parser.add_argument('--tolerancia-memoria', type=float, default=TOLERANCIA_MEMORIA_PADRAO,
+                        help=f'aumento de memória aceito, em fração (padrão: {TOLERANCIA_MEMORIA_PADRAO})')
+    parser.set_defaults(executar=executar)
@@ -0,0 +1,50 @@
+"""
+Índices de diversidade: riqueza, Shannon (H'), Simpson (1-D) e Pielou (J).
+"""
+import numpy as np
+
+from .colunas import encontrar_coluna
+from .esquema import contar_valores
+from .perfil import perfilado
+from .resultados import ResultadoDiversidade
+
+@perfilado()
+def calcular_indices_diversidade(df_inventario):
+    """Calcula os índices de diversidade a partir da abundância (registros) por espécie"""
+    resultado = ResultadoDiversidade()
+
+    col_especie = encontrar_coluna(df_inventario, ['especie', 'especies', 'species', 'sp'])
+    if not col_especie:
+        resultado.erros.append("❌ Coluna de espécie não encontrada")
+        return resultado
+
+    try:
+        # Contar indivíduos por espécie
+        abundancias = contar_valores(df_inventario[col_especie])
+
+        if len(abundancias) == 0:
+            resultado.avisos.append("⚠️ Nenhuma espécie encontrada")
+            return resultado
+
+        total_individuos = int(abundancias.sum())
+        riqueza = len(abundancias)
+        proporcoes = abundancias.to_numpy(dtype=float) / total_individuos
+
+        resultado.abundancias = abundancias
+        resultado.riqueza = riqueza
+        resultado.total_individuos = total_individuos
+
+        # Índice de Shannon
+        resultado.shannon = float(-(proporcoes * np.log(proporcoes)).sum())
+
+        # Índice de Simpson
+        resultado.simpson = float((proporcoes ** 2).sum())
+        resultado.simpson_diversidade = 1 - resultado.simpson
+
+        # Equitabilidade de Pielou
+        resultado.pielou = resultado.shannon / np.log(riqueza) if riqueza > 1 else 0.0
+
+    except Exception as e:
+        resultado.erros.append(f"Erro no cálculo de índices: {e}")
+
+    return resultado
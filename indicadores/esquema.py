@@ -0,0 +1,210 @@
+"""
+Esquema de tipos dos bancos limpos.
+
+Depois da limpeza, os códigos e nomes ficam como texto (object, um objeto
+Python por célula), as medidas e frações de cobertura em float64 e os
+indicadores de distúrbio (1 ou vazio) em float64. O esquema declara o tipo
+lógico de cada coluna conhecida e a leitura das planilhas (ver
+`dados.ler_planilha`) aplica os tipos compactos:
+
+- 'codigo': category (os textos distintos guardados uma vez, um código por linha),
+  se houver no máximo um valor distinto a cada duas linhas; códigos quase
+  únicos (ex.: Cod_geo_UT - original) ocupam menos como texto e ficam
+  como estão
+- 'medida': float32 (7 algarismos significativos, acima da precisão das medições de campo)
+- 'indicador': Int8 (0/1 com nulo)
+- 'inteiro': int32 (Int32 com nulos)
+- 'data': datetime64
+
+Uma coluna só é convertida se a conversão não perde valores (texto em uma
+coluna de medida, número fora de 0/1 em um indicador, data que não pôde
+ser lida...): a coluna fica como veio da limpeza. Uma medida em float32
+guarda cada valor com erro relativo de até `ERRO_RELATIVO_MEDIDA` (2^-24,
+cerca de 6e-8: 0.4 vira 0.4000000059604645); as contas que comparam ou somam
+medidas as recebem de volta em float64 (`ampliar_medida`, um astype), e seus
+resultados diferem dos da planilha em float64 dentro dessa tolerância (uma
+meta só muda de lado se o valor estiver a menos dela do limite). As
+coordenadas UTM ficam em float64 (o float32 arredondaria metros). A
+economia de memória de cada planilha vai para `LeituraPlanilha` e, coluna
+a coluna, para `economia_esquema`:
+
+    python -m indicadores esquema --dados dados
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from .memoria import memoria_dataframe
+
+# Banco -> coluna -> tipo lógico (colunas ausentes na planilha são ignoradas)
+ESQUEMAS = {
+    'caracterizacao': {
+        **{coluna: 'codigo' for coluna in [
+            'Cod_geo_UT - original', 'cod_ref', 'cod_prop', 'UT', 'unido', 'tecnica', 'metodo', 'cod_parc',
+            'Município', 'tecnica_am', 'Equipe', 'Decomposição serapilheira', 'Formigas Cortadeiras ou Cupins',
+            'campanha',
+        ]},
+        **{coluna: 'medida' for coluna in [
+            'Cobertura de gramíneas (m)', 'Cobertura de herbáceas/ruderais', 'Solo exposto', 'Cobertura de palhada',
+            'Cobertura de serapilheira (m)', 'Soma das coberturas do solo', '(%)graminea', '(%) herbacea',
+            ' (%) Solo exposto', '(%) palhada', '(%) serapilheira (m)', '(%)cobetura_total', '(%)cobetura_nativa',
+            '(%)cobetura_exotica', 'Cobertura de dossel (m)', 'Cobertura de nativas - dossel (m)',
+            'Cobertura de exóticas- dossel (m)', 'Altura de serapilheira - início (cm)',
+            'Altura de serapilheira - fim (cm)',
+        ]},
+        **{coluna: 'indicador' for coluna in [
+            'Erosao_simplificada', 'Fogo', 'Corte de madeira', 'Inundação', 'Animais_simplificado',
+            'Formigas(simplificado)',
+        ]},
+        'data_exe': 'data',
+    },
+    'inventario': {
+        **{coluna: 'codigo' for coluna in ['cod_parc', 'especie', 'origem', 'idade', 'regeneracao', 'campanha']},
+        **{coluna: 'medida' for coluna in ['ht', 'dap', 'area_ha']},
+        'plaqueta': 'inteiro',
+        'meta': 'inteiro',
+    },
+}
+
+# Muda quando as regras de conversão mudam (o armazém refaz os arquivos gerados com outras regras)
+VERSAO_REGRAS = 2
+
+LIMITES_INT32 = (-2 ** 31, 2 ** 31 - 1)
+MAXIMO_FLOAT32 = float(np.finfo('float32').max)
+# Erro relativo máximo de um valor guardado em float32 (metade da distância entre floats vizinhos)
+ERRO_RELATIVO_MEDIDA = 2.0 ** -24
+
+def _numerica(serie):
+    """True para colunas numéricas (sem contar booleanos)"""
+    return pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie)
+
+def converter_coluna(serie, tipo):
+    """Coluna no tipo compacto do tipo lógico, ou None se a conversão perderia valores"""
+    vazia = serie.isna().all()
+    if tipo == 'codigo':
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            return serie
+        if not (serie.dtype == 'object' or vazia) or serie.nunique() > len(serie) // 2:
+            return None
+        return serie.astype('category')
+
+    if tipo == 'data':
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            return serie
+        datas = pd.to_datetime(serie, errors='coerce')
+        return datas if datas.notna().sum() == serie.notna().sum() else None
+
+    if not (_numerica(serie) or vazia):
+        return None
+    valores = serie.dropna()
+    if tipo == 'medida':
+        return serie.astype('float32') if (valores.abs() <= MAXIMO_FLOAT32).all() else None
+    if tipo == 'indicador':
+        return serie.astype('Int8') if valores.isin([0, 1]).all() else None
+    if tipo == 'inteiro':
+        if not ((valores % 1 == 0).all() and valores.between(*LIMITES_INT32).all()):
+            return None
+        return serie.astype('Int32' if serie.hasnans else 'int32')
+    raise ValueError(f"Tipo lógico desconhecido: {tipo}")
+
+def aplicar_esquema(df, banco):
+    """
+    Banco limpo com os tipos compactos do esquema (`ESQUEMAS`); as colunas fora do
+    esquema ou que perderiam valores na conversão ficam como estão
+    """
+    convertidas = {}
+    for coluna, tipo in ESQUEMAS[banco].items():
+        if coluna in df.columns:
+            convertida = converter_coluna(df[coluna], tipo)
+            if convertida is not None and convertida.dtype != df[coluna].dtype:
+                convertidas[coluna] = convertida
+    return df.assign(**convertidas) if convertidas else df
+
+def contar_valores(serie, normalize=False):
+    """
+    value_counts de uma coluna, também quando ela é category (ver `aplicar_esquema`): só os
+    valores presentes (o value_counts de um recorte traz todas as categorias do banco, com
+    contagem zero) e, nos empates, a ordem de aparição, como no value_counts de texto
+    """
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.value_counts(normalize=normalize)
+    codigos, valores = pd.factorize(serie)
+    contagens = pd.Series(np.bincount(codigos[codigos >= 0], minlength=len(valores)),
+                          index=pd.Index(np.asarray(valores), name=serie.name), name='count')
+    contagens = contagens.sort_values(ascending=False)
+    if normalize:
+        contagens = (contagens / max(contagens.sum(), 1)).rename('proportion')
+    return contagens
+
+def como_texto(serie):
+    """
+    astype(str) de uma coluna, também quando ela é category: o texto de cada categoria é
+    montado uma vez (nulos viram 'nan', como no astype(str)). No pandas 2.2 com
+    Copy-on-Write, o astype(str) de uma category vazia (ex.: um filtro sem linhas) falha.
+    """
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.astype(str)
+    textos = np.append(serie.cat.categories.astype(str).to_numpy(dtype=object), 'nan')
+    return pd.Series(textos[serie.cat.codes.to_numpy()], index=serie.index, name=serie.name)
+
+def ampliar_medida(serie):
+    """
+    Medida float32 de volta em float64, para somas e médias acumularem em float64 (valores
+    dentro de `ERRO_RELATIVO_MEDIDA` dos da planilha); outros tipos ficam como estão
+    """
+    return serie.astype('float64') if serie.dtype == 'float32' else serie
+
+def economia_esquema(antes, depois):
+    """
+    Memória (deep) de cada coluna sem e com o esquema de tipos: tipo e bytes de antes e de
+    depois e bytes economizados, da maior à menor economia
+    """
+    uso_antes = antes.memory_usage(deep=True, index=False)
+    uso_depois = depois.memory_usage(deep=True, index=False)
+    tabela = pd.DataFrame({
+        'coluna': [str(coluna) for coluna in antes.columns],
+        'tipo_original': [str(tipo) for tipo in antes.dtypes],
+        'tipo': [str(depois[coluna].dtype) for coluna in antes.columns],
+        'bytes_original': uso_antes.to_numpy(dtype='int64'),
+        'bytes': uso_depois[antes.columns].to_numpy(dtype='int64'),
+    })
+    tabela['economia'] = tabela['bytes_original'] - tabela['bytes']
+    return tabela.sort_values('economia', ascending=False, ignore_index=True)
+
+# ============================================================================
+# LINHA DE COMANDO
+# ============================================================================
+
+def executar(args):
+    """Subcomando `esquema`"""
+    from .dados import arquivo_planilha, ler_planilha, planilhas_diretorio  # o módulo dados importa este
+
+    ausentes = 0
+    for banco, campanha in planilhas_diretorio(args.dados):
+        if args.bancos and banco not in args.bancos:
+            continue
+        arquivo = arquivo_planilha(banco, campanha)
+        if not os.path.exists(os.path.join(args.dados, arquivo)):
+            print(f"{arquivo}: não encontrado em {args.dados}\n")
+            ausentes += 1
+            continue
+        df, leitura = ler_planilha(banco, args.dados, campanha=campanha, esquema=False)
+        compacto = aplicar_esquema(df, banco)
+        tabela = economia_esquema(df, compacto)
+        antes, depois = memoria_dataframe(df), memoria_dataframe(compacto)
+        print(f"{leitura.arquivo}: {leitura.linhas} linhas, {antes / 1024 ** 2:.2f} MB -> {depois / 1024 ** 2:.2f} MB "
+              f"({100 * (antes - depois) / max(antes, 1):.0f}% a menos)")
+        tabela = tabela.assign(**{f'{coluna} (KB)': (tabela[coluna] / 1024).round(1)
+                                  for coluna in ['bytes_original', 'bytes', 'economia']})
+        with pd.option_context('display.width', 200, 'display.max_rows', None):
+            print(tabela.drop(columns=['bytes_original', 'bytes', 'economia']).to_string(index=False))
+        print()
+    return 1 if ausentes else 0
+
+def configurar_parser(subparsers):
+    """Registra o subcomando `esquema`"""
+    parser = subparsers.add_parser('esquema', help='memória de cada coluna das planilhas sem e com o esquema de tipos')
+    parser.add_argument('--dados', default='.', help='pasta com as planilhas BD_*.xlsx (padrão: pasta atual)')
+    parser.add_argument('--bancos', nargs='+', choices=list(ESQUEMAS), help='só estes bancos (padrão: todos)')
+    parser.set_defaults(executar=executar)
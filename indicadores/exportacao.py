@@ -0,0 +1,63 @@
+"""
+Gravação de tabelas em CSV (opcionalmente gzip), Parquet ou XLSX.
+"""
+import gzip
+import io
+
+import pandas as pd
+
+# Formato -> (extensão, tipo MIME)
+FORMATOS_EXPORTACAO = {
+    'CSV': ('csv', 'text/csv'),
+    'CSV (gzip)': ('csv.gz', 'application/gzip'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'XLSX': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+}
+# Extensão -> formato (nomes aceitos na linha de comando)
+FORMATOS_POR_EXTENSAO = {extensao: formato for formato, (extensao, _) in FORMATOS_EXPORTACAO.items()}
+LINHAS_POR_BLOCO_EXPORTACAO = 50_000
+
+def escrever_csv_em_blocos(df, destino, linhas_por_bloco=LINHAS_POR_BLOCO_EXPORTACAO):
+    """Escreve o CSV bloco a bloco no destino (não monta uma string única com a tabela inteira)"""
+    if len(df) == 0:
+        df.to_csv(destino, index=False)
+        return
+
+    for inicio in range(0, len(df), linhas_por_bloco):
+        df.iloc[inicio:inicio + linhas_por_bloco].to_csv(destino, index=False, header=(inicio == 0))
+
+def escrever_dataframe(df, destino, formato):
+    """Escreve a tabela no formato pedido em um destino binário (arquivo ou buffer)"""
+    if formato in ('CSV', 'CSV (gzip)'):
+        saida = gzip.GzipFile(fileobj=destino, mode='wb') if formato == 'CSV (gzip)' else destino
+        texto = io.TextIOWrapper(saida, encoding='utf-8', newline='')
+        escrever_csv_em_blocos(df, texto)
+        texto.flush()
+        texto.detach()
+        if saida is not destino:
+            saida.close()
+
+    elif formato == 'Parquet':
+        # Colunas de texto com tipos misturados (ex.: datas digitadas) viram string
+        colunas_texto = {col: 'string' for col in df.columns if df[col].dtype == 'object'}
+        df.astype(colunas_texto).to_parquet(destino, index=False, row_group_size=LINHAS_POR_BLOCO_EXPORTACAO)
+
+    elif formato == 'XLSX':
+        with pd.ExcelWriter(destino, engine='openpyxl') as writer:
+            df.to_excel(writer, index=False, sheet_name='dados')
+
+    else:
+        raise ValueError(f"Formato de exportação desconhecido: {formato}")
+
+def exportar_dataframe(df, formato):
+    """Gera os bytes do arquivo de exportação no formato pedido"""
+    buffer = io.BytesIO()
+    escrever_dataframe(df, buffer, formato)
+    return buffer.getvalue()
+
+def salvar_dataframe(df, caminho_base, formato):
+    """Grava a tabela em `caminho_base` + extensão do formato e retorna o caminho completo"""
+    caminho = f"{caminho_base}.{FORMATOS_EXPORTACAO[formato][0]}"
+    with open(caminho, 'wb') as arquivo:
+        escrever_dataframe(df, arquivo, formato)
+    return caminho
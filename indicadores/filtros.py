@@ -0,0 +1,190 @@
+"""
+Filtros dos bancos de dados e separação por técnica de amostragem.
+"""
+import numpy as np
+import pandas as pd
+
+from .colunas import encontrar_coluna
+from .esquema import como_texto
+from .perfil import perfilado
+
+# Nomes possíveis das colunas usadas nos filtros específicos do inventário
+COLUNAS_FILTRO_INVENTARIO = {
+    'origem': ['origem'],
+    'regeneracao': ['regeneracao', 'regenera'],
+    'idade': ['idade', 'age', 'class_idade']
+}
+
+def _mascara_igual(serie, valor):
+    """
+    Comparação case-insensitive e com tratamento de espaços (numa coluna category, feita
+    uma vez por categoria e levada às linhas pelos códigos)
+    """
+    valor = valor.strip().lower()
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.astype(str).str.strip().str.lower() == valor
+    iguais = np.append(serie.cat.categories.astype(str).str.strip().str.lower() == valor, valor == 'nan')
+    return pd.Series(iguais[serie.cat.codes.to_numpy()], index=serie.index)
+
+def _restringir(posicoes, mascara):
+    """Posições (None = todas as linhas) que continuam selecionadas pela máscara (avaliada só nelas)"""
+    selecionadas = np.flatnonzero(mascara.to_numpy(dtype=bool))
+    return selecionadas if posicoes is None else posicoes[selecionadas]
+
+def _coluna(df, coluna, posicoes):
+    """Coluna do DataFrame restrita às posições selecionadas (None = todas)"""
+    return df[coluna] if posicoes is None else df[coluna].take(posicoes)
+
+def _selecionar(df, posicoes):
+    """Linhas selecionadas, copiadas uma única vez (sem seleção: cópia rasa, sem duplicar os dados)"""
+    return df.copy(deep=False) if posicoes is None else df.take(posicoes)
+
+@perfilado()
+def aplicar_filtros(df_caracterizacao, df_inventario, filtros_principais, filtros_inventario):
+    """
+    Aplica os filtros do dashboard e retorna (caracterização, inventário) filtrados:
+    - Filtros principais (cod_prop, tecnica, UT) valem para os dois bancos
+    - O inventário é ligado à caracterização filtrada via cod_parc
+    - Filtros específicos (origem, regeneração, idade) valem só para o inventário
+    Valores 'Todos' ou None não filtram.
+    Os filtros restringem posições de linha; cada banco é copiado uma única vez, no fim,
+    só com as linhas selecionadas.
+    """
+    # Posições selecionadas em cada banco (None = todas)
+    linhas_carac = linhas_inv = None
+
+    # Obter coluna cod_parc para ligação entre bancos
+    cod_parc_carac = encontrar_coluna(df_caracterizacao, ['cod_parc', 'parcela', 'plot'])
+    cod_parc_inv = encontrar_coluna(df_inventario, ['cod_parc', 'parcela', 'plot'])
+
+    # Aplicar filtros que afetam ambos os bancos
+    for filtro, valor in filtros_principais.items():
+        if valor != 'Todos' and valor is not None:
+            # Filtrar BD_caracterizacao primeiro
+            if filtro in df_caracterizacao.columns:
+                linhas_carac = _restringir(linhas_carac, _mascara_igual(_coluna(df_caracterizacao, filtro, linhas_carac), valor))
+
+            # Aplicar também ao BD_inventario se a coluna existir
+            if filtro in df_inventario.columns:
+                linhas_inv = _restringir(linhas_inv, _mascara_igual(_coluna(df_inventario, filtro, linhas_inv), valor))
+
+    # Sempre aplicar a conexão via cod_parc se ambas as colunas existem
+    num_carac = len(df_caracterizacao) if linhas_carac is None else len(linhas_carac)
+    if cod_parc_carac and cod_parc_inv and num_carac > 0:
+        # Obter cod_parc válidos do BD_caracterizacao filtrado
+        cod_parc_validos = _coluna(df_caracterizacao, cod_parc_carac, linhas_carac).dropna().unique()
+
+        if len(cod_parc_validos) > 0:
+            # Filtrar BD_inventario pelos cod_parc válidos
+            linhas_inv = _restringir(linhas_inv, como_texto(_coluna(df_inventario, cod_parc_inv, linhas_inv)).str.strip().isin(
+                [str(x).strip() for x in cod_parc_validos]
+            ))
+        else:
+            # Se não há cod_parc válidos, o inventário fica vazio
+            linhas_inv = np.array([], dtype=np.intp)
+
+    # Aplicar filtros específicos do inventário
+    for filtro, valor in filtros_inventario.items():
+        if valor != 'Todos' and valor is not None and filtro in COLUNAS_FILTRO_INVENTARIO:
+            coluna = encontrar_coluna(df_inventario, COLUNAS_FILTRO_INVENTARIO[filtro])
+            if coluna:
+                linhas_inv = _restringir(linhas_inv, _mascara_igual(_coluna(df_inventario, coluna, linhas_inv), valor))
+
+    return _selecionar(df_caracterizacao, linhas_carac), _selecionar(df_inventario, linhas_inv)
+
+def filtrar_inventario_por_propriedades(df_inv, propriedades):
+    """Filtra o BD_inventário para incluir apenas as propriedades especificadas"""
+    # Encontrar coluna de parcela
+    col_parc = encontrar_coluna(df_inv, ['cod_parc', 'codigo_parcela', 'parcela'])
+
+    if not col_parc:
+        return df_inv  # Retorna tudo se não conseguir filtrar
+
+    parcelas = como_texto(df_inv[col_parc])
+
+    # Extrair propriedades do cod_parc (em uma Series à parte, sem copiar o banco)
+    if '_' in str(parcelas.iloc[0]) if len(parcelas) > 0 else False:
+        # Formato PROP_UT
+        prop = parcelas.str.split('_').str[0]
+    else:
+        # Tentar colunas separadas
+        col_prop = encontrar_coluna(df_inv, ['cod_prop', 'codigo_propriedade', 'propriedade'])
+        if col_prop:
+            prop = como_texto(df_inv[col_prop])
+        else:
+            return df_inv  # Se não conseguir identificar, retorna tudo
+
+    # Filtrar por propriedades especificadas (cod_parc volta como texto)
+    propriedades_str = [str(p).lower() for p in propriedades]
+    mascara = prop.str.lower().isin(propriedades_str)
+    return df_inv[mascara].assign(**{col_parc: parcelas[mascara]})
+
+def filtrar_por_propriedades(df_caracterizacao, df_inventario, propriedades):
+    """
+    Restringe os dois bancos às propriedades indicadas (lista vazia = sem filtro).
+    O inventário é filtrado por cod_prop, ou, na falta dela, via cod_parc.
+    """
+    if not len(propriedades):
+        return df_caracterizacao, df_inventario
+
+    df_carac_filtrado = df_caracterizacao[df_caracterizacao['cod_prop'].isin(propriedades)]
+
+    # Filtrar inventário DIRETAMENTE por cod_prop se a coluna existir
+    if 'cod_prop' in df_inventario.columns:
+        return df_carac_filtrado, df_inventario[df_inventario['cod_prop'].isin(propriedades)]
+
+    # Fallback: filtrar baseado nas propriedades selecionadas via cod_parc
+    cod_parc_col = encontrar_coluna(df_inventario, ['cod_parc', 'parcela', 'plot'])
+    if not cod_parc_col:
+        # Se não encontrou cod_parc, usar todos os dados do inventário
+        return df_carac_filtrado, df_inventario
+
+    if 'cod_parc' in df_carac_filtrado.columns:
+        # Usar as parcelas da caracterização filtrada
+        parcelas_validas = df_carac_filtrado['cod_parc'].dropna().unique()
+        df_inv_filtrado = df_inventario[como_texto(df_inventario[cod_parc_col]).isin([str(p) for p in parcelas_validas])]
+    else:
+        # Extrair propriedade do cod_parc do inventário (formato PROP_UT)
+        prop_extraida = como_texto(df_inventario[cod_parc_col]).str.split('_').str[0]
+        df_inv_filtrado = df_inventario[prop_extraida.isin([str(p) for p in propriedades])]
+
+    return df_carac_filtrado, df_inv_filtrado
+
+def detectar_tecnicas(df_caracterizacao):
+    """
+    Detecta as técnicas de amostragem presentes na caracterização.
+    Retorna (coluna de técnica, tem_censo, tem_parcelas); sem coluna, assume parcelas.
+    """
+    tecnica_col = encontrar_coluna(df_caracterizacao, ['tecnica_am', 'tecnica', 'metodo'])
+
+    if not tecnica_col or len(df_caracterizacao) == 0:
+        return tecnica_col, False, True
+
+    tecnicas_unicas = df_caracterizacao[tecnica_col].str.lower().unique()
+    tem_censo = any('censo' in str(t) for t in tecnicas_unicas)
+    tem_parcelas = any('parcela' in str(t) or 'plot' in str(t) for t in tecnicas_unicas)
+
+    return tecnica_col, tem_censo, tem_parcelas
+
+def separar_por_tecnica(df_caracterizacao, tecnica_col):
+    """Separa a caracterização em (registros de censo, demais registros)"""
+    censo = df_caracterizacao[tecnica_col].str.contains('censo', case=False, na=False)
+    return df_caracterizacao[censo], df_caracterizacao[~censo]
+
+def analisar_propriedades_por_tecnica(df_caracterizacao, propriedades, tecnica):
+    """Identifica propriedades que usam uma técnica específica ('censo' ou 'parcelas')"""
+    try:
+        tecnica_col = encontrar_coluna(df_caracterizacao, ['tecnica_am', 'tecnica', 'metodo'])
+
+        if not tecnica_col:
+            return list(propriedades)  # Retorna todas se não conseguir identificar
+
+        df_tecnica = df_caracterizacao[df_caracterizacao['cod_prop'].isin(propriedades)] if 'cod_prop' in df_caracterizacao.columns else df_caracterizacao
+        dados_censo, dados_parcelas = separar_por_tecnica(df_tecnica, tecnica_col)
+
+        if tecnica.lower() == 'censo':
+            return list(dados_censo['cod_prop'].unique())
+        return list(dados_parcelas['cod_prop'].unique())
+
+    except Exception:
+        return []
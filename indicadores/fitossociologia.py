@@ -0,0 +1,230 @@
+"""
+Parâmetros fitossociológicos por espécie.
+
+- Censo: densidade e dominância relativas, valor de cobertura (VC)
+- Parcelas: acrescenta a frequência relativa, valor de importância (VI)
+
+Indivíduos são contados por plaqueta única; a área basal de um indivíduo
+é a soma de todos os seus fustes.
+"""
+import numpy as np
+import pandas as pd
+
+from .agregacao import agregacao_configuravel
+from .colunas import encontrar_coluna
+from .esquema import ampliar_medida
+from .filtros import detectar_tecnicas, filtrar_inventario_por_propriedades, separar_por_tecnica
+from .perfil import perfilado
+from .resultados import ResultadoFitossociologia
+
+COLUNAS_EXIBICAO = {
+    'frequencia': 'Frequência',
+    'num_individuos': 'N° Indivíduos',
+    'densidade_relativa': 'DR (%)',
+    'dominancia_relativa': 'DoR (%)',
+    'frequencia_relativa': 'FR (%)',
+    'valor_cobertura': 'VC (%)',
+    'valor_importancia': 'VI (%)'
+}
+
+def calcular_area_basal(daps):
+    """Área basal (m²) de cada fuste a partir do DAP (cm; valores em mm são convertidos)"""
+    daps = ampliar_medida(pd.to_numeric(daps, errors='coerce'))
+
+    # Ajustar unidade se necessário (mm para cm)
+    if daps.median() > 100:
+        daps = daps / 10
+
+    # π * (DAP/2)² em cm², convertido para m²
+    return (np.pi * (daps / 2) ** 2) / 10000
+
+def _agregar_por_especie(df_trabalho, col_especie, col_plaqueta, area_basal_disponivel):
+    """Número de indivíduos e área basal total por espécie (fustes somados por plaqueta)"""
+    if col_plaqueta:
+        if area_basal_disponivel:
+            # Somar área basal por indivíduo (todos os fustes de uma mesma plaqueta)
+            por_individuo = df_trabalho.groupby([col_especie, col_plaqueta], observed=True)['area_basal_m2'].sum().reset_index()
+            por_especie = por_individuo.groupby(col_especie, observed=True).agg(
+                num_individuos=(col_plaqueta, 'nunique'),
+                area_basal_total=('area_basal_m2', 'sum')
+            )
+        else:
+            por_especie = df_trabalho.groupby(col_especie, observed=True).agg(num_individuos=(col_plaqueta, 'nunique'))
+            por_especie['area_basal_total'] = 0.0
+    else:
+        # Sem plaqueta não há como distinguir fustes: cada registro é um indivíduo
+        por_especie = df_trabalho.groupby(col_especie, observed=True).size().to_frame('num_individuos')
+        por_especie['area_basal_total'] = df_trabalho.groupby(col_especie, observed=True)['area_basal_m2'].sum() if area_basal_disponivel else 0.0
+
+    return por_especie
+
+def _tabela_exibicao(fitossocio, col_especie, area_basal_disponivel):
+    """Renomeia as colunas para exibição e arredonda os valores"""
+    colunas = {col_especie: 'Espécie', **COLUNAS_EXIBICAO,
+               'area_basal_total': 'Área Basal (m²)' if area_basal_disponivel else 'AB (não calc.)'}
+    tabela = fitossocio.rename(columns=colunas)
+
+    for col in ['DR (%)', 'DoR (%)', 'FR (%)', 'VC (%)', 'VI (%)']:
+        if col in tabela.columns:
+            tabela[col] = tabela[col].round(2)
+
+    if area_basal_disponivel:
+        tabela['Área Basal (m²)'] = tabela['Área Basal (m²)'].round(4)
+
+    return tabela
+
+def _preparar(df_inventario, metodo):
+    """Colunas e DataFrame de trabalho (só as colunas usadas) com área basal; retorna (resultado, dados) ou (resultado com erro, None)"""
+    resultado = ResultadoFitossociologia(metodo=metodo)
+
+    if len(df_inventario) == 0:
+        resultado.avisos.append("⚠️ Nenhum dado de inventário disponível")
+        return resultado, None
+
+    colunas = {
+        'especie': encontrar_coluna(df_inventario, ['especie', 'especies', 'species', 'sp']),
+        'dap': encontrar_coluna(df_inventario, ['dap', 'dap_cm', 'diameter']),
+        'parcela': encontrar_coluna(df_inventario, ['cod_parc', 'parcela', 'plot']),
+        'plaqueta': encontrar_coluna(df_inventario, ['plaqueta', 'plaq', 'id'])
+    }
+
+    # Só as colunas usadas (o inventário não é copiado inteiro)
+    df_trabalho = df_inventario[list(dict.fromkeys(c for c in colunas.values() if c))]
+    if colunas['dap']:
+        df_trabalho = df_trabalho.assign(area_basal_m2=calcular_area_basal(df_trabalho[colunas['dap']]))
+        resultado.area_basal_disponivel = True
+
+    return resultado, (df_trabalho, colunas)
+
+def _finalizar_censo(resultado, fitossocio, col_especie):
+    """DR, DoR e VC a partir da agregação por espécie; preenche a tabela e os totais do resultado"""
+    # Calcular totais
+    total_individuos = fitossocio['num_individuos'].sum()
+    total_area_basal = fitossocio['area_basal_total'].sum() if resultado.area_basal_disponivel else 0
+
+    # Calcular parâmetros fitossociológicos
+    fitossocio['densidade_relativa'] = (fitossocio['num_individuos'] / total_individuos) * 100
+
+    if resultado.area_basal_disponivel and total_area_basal > 0:
+        fitossocio['dominancia_relativa'] = (fitossocio['area_basal_total'] / total_area_basal) * 100
+        fitossocio['valor_cobertura'] = (fitossocio['densidade_relativa'] + fitossocio['dominancia_relativa']) / 2
+    else:
+        fitossocio['dominancia_relativa'] = 0
+        fitossocio['valor_cobertura'] = fitossocio['densidade_relativa'] / 2
+
+    # Ordenar por valor de cobertura
+    fitossocio = fitossocio.sort_values('valor_cobertura', ascending=False).reset_index()
+
+    resultado.tabela = _tabela_exibicao(fitossocio, col_especie, resultado.area_basal_disponivel)
+    resultado.total_especies = len(fitossocio)
+    resultado.total_individuos = int(total_individuos)
+    resultado.area_basal_total = float(total_area_basal)
+
+def _finalizar_parcelas(resultado, fitossocio, col_especie, total_parcelas):
+    """DR, FR, DoR e VI a partir da agregação por espécie; preenche a tabela e os totais do resultado"""
+    # Calcular totais
+    total_individuos = fitossocio['num_individuos'].sum()
+    total_area_basal = fitossocio['area_basal_total'].sum() if resultado.area_basal_disponivel else 0
+    total_frequencia = fitossocio['frequencia'].sum()
+
+    # Calcular parâmetros fitossociológicos
+    fitossocio['densidade_relativa'] = (fitossocio['num_individuos'] / total_individuos) * 100
+    fitossocio['frequencia_relativa'] = (fitossocio['frequencia'] / total_frequencia) * 100
+
+    if resultado.area_basal_disponivel and total_area_basal > 0:
+        fitossocio['dominancia_relativa'] = (fitossocio['area_basal_total'] / total_area_basal) * 100
+        fitossocio['valor_importancia'] = (fitossocio['densidade_relativa'] + fitossocio['dominancia_relativa'] + fitossocio['frequencia_relativa']) / 3
+    else:
+        fitossocio['dominancia_relativa'] = 0
+        fitossocio['valor_importancia'] = (fitossocio['densidade_relativa'] + fitossocio['frequencia_relativa']) / 2
+
+    # Ordenar por valor de importância
+    fitossocio = fitossocio.sort_values('valor_importancia', ascending=False).reset_index()
+
+    resultado.tabela = _tabela_exibicao(fitossocio, col_especie, resultado.area_basal_disponivel)
+    resultado.total_especies = len(fitossocio)
+    resultado.total_individuos = int(total_individuos)
+    resultado.total_parcelas = int(total_parcelas)
+    resultado.area_basal_total = float(total_area_basal)
+
+@perfilado()
+@agregacao_configuravel
+def calcular_fitossociologia_censo(df_inventario):
+    """Calcula parâmetros fitossociológicos para método de censo"""
+    resultado, dados = _preparar(df_inventario, 'censo')
+    if dados is None:
+        return resultado
+
+    try:
+        df_trabalho, colunas = dados
+        col_especie = colunas['especie']
+
+        if not col_especie:
+            resultado.erros.append("❌ Coluna de espécie não encontrada")
+            return resultado
+
+        fitossocio = _agregar_por_especie(df_trabalho, col_especie, colunas['plaqueta'], resultado.area_basal_disponivel)
+        _finalizar_censo(resultado, fitossocio, col_especie)
+
+    except Exception as e:
+        resultado.erros.append(f"Erro no cálculo fitossociológico (censo): {e}")
+
+    return resultado
+
+@perfilado()
+@agregacao_configuravel
+def calcular_fitossociologia_parcelas(df_inventario):
+    """Calcula parâmetros fitossociológicos para método de parcelas"""
+    resultado, dados = _preparar(df_inventario, 'parcelas')
+    if dados is None:
+        return resultado
+
+    try:
+        df_trabalho, colunas = dados
+        col_especie, col_parc = colunas['especie'], colunas['parcela']
+
+        if not col_especie or not col_parc:
+            resultado.erros.append("❌ Colunas essenciais não encontradas (espécie ou parcela)")
+            return resultado
+
+        fitossocio = _agregar_por_especie(df_trabalho, col_especie, colunas['plaqueta'], resultado.area_basal_disponivel)
+
+        # Frequência por espécie (número de parcelas onde a espécie ocorre)
+        fitossocio.insert(0, 'frequencia', df_trabalho.groupby(col_especie, observed=True)[col_parc].nunique())
+
+        _finalizar_parcelas(resultado, fitossocio, col_especie, df_trabalho[col_parc].nunique())
+
+    except Exception as e:
+        resultado.erros.append(f"Erro no cálculo fitossociológico (parcelas): {e}")
+
+    return resultado
+
+def calcular_fitossociologia_por_tecnica(df_caracterizacao, df_inventario):
+    """
+    Tabelas fitossociológicas pelo método de cada técnica de amostragem presente
+    (censo → VC, parcelas → VI). Em dados mistos, o inventário é separado pelas
+    propriedades de cada técnica. Retorna {'censo'|'parcelas': ResultadoFitossociologia}.
+    """
+    tecnica_col, tem_censo, tem_parcelas = detectar_tecnicas(df_caracterizacao)
+
+    if tem_censo and not tem_parcelas:
+        return {'censo': calcular_fitossociologia_censo(df_inventario)}
+    if tem_parcelas and not tem_censo:
+        return {'parcelas': calcular_fitossociologia_parcelas(df_inventario)}
+    if not (tem_censo and tem_parcelas):
+        return {}
+
+    resultados = {}
+    dados_censo, dados_parcelas = separar_por_tecnica(df_caracterizacao, tecnica_col)
+
+    for metodo, dados, calcular in [('censo', dados_censo, calcular_fitossociologia_censo),
+                                    ('parcelas', dados_parcelas, calcular_fitossociologia_parcelas)]:
+        props = dados['cod_prop'].unique() if 'cod_prop' in dados.columns else []
+        if len(props) == 0:
+            continue
+
+        df_inv_tecnica = filtrar_inventario_por_propriedades(df_inventario, props)
+        if len(df_inv_tecnica) > 0:
+            resultados[metodo] = calcular(df_inv_tecnica)
+
+    return resultados
@@ -0,0 +1,101 @@
+"""
+Modelos hipsométricos (altura em função do DAP) ajustados por grupo,
+com resíduos padronizados para identificar medições suspeitas.
+"""
+import numpy as np
+import pandas as pd
+
+from .esquema import ampliar_medida, como_texto
+from .perfil import perfilado
+
+MODELOS_HIPSOMETRICOS = {
+    'Schumacher': ("ln(h) = a + b·ln(DAP)", np.log),
+    'Curtis': ("ln(h) = a + b·(1/DAP)", np.reciprocal)
+}
+MIN_OBSERVACOES_HIPSOMETRIA = 10
+LIMITE_RESIDUO_PADRONIZADO = 3.0
+
+def ajustar_mqo_agrupado(x, y, codigos, n_grupos):
+    """
+    Ajusta y = a + b·x por mínimos quadrados para todos os grupos de uma vez:
+    - Somas por grupo com np.bincount (uma passada por termo)
+    - Solução fechada das equações normais de cada grupo
+    - R² e erro padrão da estimativa (Syx) a partir dos resíduos
+    """
+    def somar(pesos=None):
+        return np.bincount(codigos, weights=pesos, minlength=n_grupos).astype(float)
+
+    n = somar()
+    sx, sy = somar(x), somar(y)
+    sxx, sxy = somar(x * x), somar(x * y)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denominador = n * sxx - sx ** 2
+        b = np.where(denominador > 0, (n * sxy - sx * sy) / denominador, np.nan)
+        a = (sy - b * sx) / n
+
+        residuos = y - (a[codigos] + b[codigos] * x)
+        sqr = somar(residuos ** 2)
+        sqt = somar((y - (sy / n)[codigos]) ** 2)
+        r2 = np.where(sqt > 0, 1 - sqr / sqt, np.nan)
+        syx = np.where(n > 2, np.sqrt(sqr / (n - 2)), np.nan)
+
+    return pd.DataFrame({'n': n.astype(int), 'a': a, 'b': b, 'r2': r2, 'syx': syx})
+
+def ajustar_modelo_hipsometrico(alturas, daps, grupos, modelo='Schumacher', min_obs=MIN_OBSERVACOES_HIPSOMETRIA):
+    """
+    Ajusta um modelo hipsométrico por grupo (espécie, propriedade...) e avalia os resíduos.
+    Grupos com menos de `min_obs` pares usam o ajuste global.
+
+    Retorna (coeficientes por grupo, resíduos por indivíduo).
+    """
+    alturas = ampliar_medida(pd.to_numeric(alturas, errors='coerce'))
+    daps = ampliar_medida(pd.to_numeric(daps, errors='coerce'))
+    validos = (alturas > 0) & (daps > 0) & pd.Series(grupos, index=alturas.index).notna()
+
+    h = alturas[validos]
+    d = daps[validos]
+    g = como_texto(pd.Series(grupos, index=alturas.index)[validos])
+
+    transformacao = MODELOS_HIPSOMETRICOS[modelo][1]
+    x = transformacao(d.to_numpy(dtype=float))
+    y = np.log(h.to_numpy(dtype=float))
+    codigos, nomes = pd.factorize(g, sort=True)
+
+    coeficientes = ajustar_mqo_agrupado(x, y, codigos, len(nomes))
+    coeficientes.index = pd.Index(nomes, name='grupo')
+    ajuste_global = ajustar_mqo_agrupado(x, y, np.zeros(len(x), dtype=int), 1).iloc[0]
+
+    # Grupos pequenos ou degenerados recebem os coeficientes globais
+    proprio = (coeficientes['n'] >= min_obs) & coeficientes['b'].notna() & (coeficientes['syx'] > 0)
+    coeficientes['ajuste'] = np.where(proprio, 'Próprio', 'Global')
+    for parametro in ['a', 'b', 'syx']:
+        coeficientes[parametro] = coeficientes[parametro].where(proprio, ajuste_global[parametro])
+    coeficientes['r2'] = coeficientes['r2'].where(proprio)
+
+    a = coeficientes['a'].to_numpy()[codigos]
+    b = coeficientes['b'].to_numpy()[codigos]
+    syx = coeficientes['syx'].to_numpy()[codigos]
+    residuo_padronizado = (y - (a + b * x)) / syx
+
+    residuos = pd.DataFrame({
+        'grupo': g,
+        'altura': h,
+        'dap': d,
+        'altura_estimada': np.exp(a + b * x),
+        'residuo_padronizado': residuo_padronizado,
+        'extremo': np.abs(residuo_padronizado) > LIMITE_RESIDUO_PADRONIZADO
+    }, index=h.index)
+
+    coeficientes['num_extremos'] = residuos.groupby('grupo')['extremo'].sum().reindex(coeficientes.index, fill_value=0).astype(int)
+
+    return coeficientes, residuos
+
+@perfilado()
+def ajustar_modelos_hipsometricos(df_hipsometria, col_ht, col_dap, col_grupo):
+    """Ajusta todos os modelos hipsométricos para um agrupamento: {modelo: (coeficientes, resíduos)}"""
+    return {
+        modelo: ajustar_modelo_hipsometrico(df_hipsometria[col_ht], df_hipsometria[col_dap],
+                                            df_hipsometria[col_grupo], modelo)
+        for modelo in MODELOS_HIPSOMETRICOS
+    }
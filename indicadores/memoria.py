@@ -0,0 +1,148 @@
+"""
+Contabilidade de memória: bytes por coluna e por objeto, memória do processo
+(RSS) e funções que mais alocaram entre dois snapshots do tracemalloc.
+
+O pico de memória por execução e por trecho vem do perfil (`perfil`, com
+memoria=True); este módulo traduz snapshots e objetos em tabelas.
+"""
+import ast
+import functools
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+MAIORES_ALOCACOES_PADRAO = 10
+
+# ============================================================================
+# OBJETOS E COLUNAS
+# ============================================================================
+
+def memoria_dataframe(df):
+    """Memória ocupada por um DataFrame (bytes, incluindo o conteúdo dos textos)"""
+    return int(df.memory_usage(deep=True).sum())
+
+def estimar_memoria(objeto, vistos=None):
+    """
+    Memória aproximada (bytes) de um objeto e do que ele contém:
+    DataFrames/Series pelo memory_usage, arrays pelo nbytes e coleções recursivamente.
+    Objetos referenciados mais de uma vez são contados uma vez; `vistos` (ids)
+    exclui objetos já contados em outro lugar, como os bancos compartilhados.
+    """
+    vistos = set() if vistos is None else vistos
+    if id(objeto) in vistos:
+        return 0
+    vistos.add(id(objeto))
+
+    if isinstance(objeto, pd.DataFrame):
+        return memoria_dataframe(objeto)
+    if isinstance(objeto, (pd.Series, pd.Index)):
+        return int(objeto.memory_usage(deep=True))
+    if isinstance(objeto, np.ndarray):
+        return int(objeto.nbytes)
+    if isinstance(objeto, dict):
+        return sys.getsizeof(objeto) + sum(estimar_memoria(k, vistos) + estimar_memoria(v, vistos)
+                                           for k, v in objeto.items())
+    if isinstance(objeto, (list, tuple, set, frozenset)):
+        return sys.getsizeof(objeto) + sum(estimar_memoria(item, vistos) for item in objeto)
+    if hasattr(objeto, '__dataclass_fields__'):
+        return sys.getsizeof(objeto) + sum(estimar_memoria(getattr(objeto, nome), vistos)
+                                           for nome in objeto.__dataclass_fields__)
+    return sys.getsizeof(objeto)
+
+def memoria_colunas(df):
+    """Memória (deep) de cada coluna e do índice: tipo, bytes, bytes por linha e % do total, da maior à menor"""
+    uso = df.memory_usage(deep=True)
+    total = max(int(uso.sum()), 1)
+    tipos = {'Index': str(df.index.dtype), **{coluna: str(tipo) for coluna, tipo in df.dtypes.items()}}
+    tabela = pd.DataFrame({
+        'coluna': [str(coluna) for coluna in uso.index],
+        'tipo': [tipos[coluna] for coluna in uso.index],
+        'bytes': uso.to_numpy(dtype='int64'),
+    })
+    tabela['bytes_por_linha'] = tabela['bytes'] / max(len(df), 1)
+    tabela['percentual'] = 100 * tabela['bytes'] / total
+    return tabela.sort_values('bytes', ascending=False, ignore_index=True)
+
+def memoria_objetos(objetos, excluir=None):
+    """
+    Memória estimada de cada objeto de {nome: objeto}, do maior ao menor.
+    Objetos já contados em um nome anterior (ou com id em `excluir`) não são contados de novo.
+    """
+    vistos = set(excluir or ())
+    linhas = []
+    for nome, objeto in objetos.items():
+        linhas.append({
+            'objeto': nome,
+            'tipo': type(objeto).__name__,
+            'linhas': len(objeto) if isinstance(objeto, (pd.DataFrame, pd.Series)) else None,
+            'bytes': estimar_memoria(objeto, vistos),
+        })
+    return pd.DataFrame(linhas, columns=['objeto', 'tipo', 'linhas', 'bytes']).sort_values(
+        'bytes', ascending=False, ignore_index=True
+    )
+
+# ============================================================================
+# PROCESSO E TRACEMALLOC
+# ============================================================================
+
+def rss_atual():
+    """Memória residente (RSS) atual do processo, em bytes (None fora do Linux)"""
+    try:
+        with open('/proc/self/statm') as arquivo:
+            return int(arquivo.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+def rss_pico():
+    """Maior RSS do processo desde o início, em bytes (None sem o módulo resource)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico if sys.platform == 'darwin' else pico * 1024
+
+@functools.lru_cache(maxsize=256)
+def _funcoes_do_arquivo(arquivo):
+    """(primeira linha, última linha, nome) de cada função definida no arquivo"""
+    try:
+        with open(arquivo, encoding='utf-8') as fonte:
+            arvore = ast.parse(fonte.read())
+    except (OSError, SyntaxError, ValueError):
+        return ()
+    return tuple((no.lineno, no.end_lineno, no.name) for no in ast.walk(arvore)
+                 if isinstance(no, (ast.FunctionDef, ast.AsyncFunctionDef)))
+
+def funcao_na_linha(arquivo, linha):
+    """Nome da função mais interna que contém a linha do arquivo ('<módulo>' fora de funções)"""
+    candidatas = [(fim - inicio, nome) for inicio, fim, nome in _funcoes_do_arquivo(arquivo) if inicio <= linha <= fim]
+    return min(candidatas)[1] if candidatas else '<módulo>'
+
+def _local_curto(arquivo):
+    """Últimos dois níveis do caminho (ex.: 'indicadores/area.py', 'core/frame.py')"""
+    return '/'.join(os.path.normpath(arquivo).split(os.sep)[-2:])
+
+def maiores_alocacoes(antes, depois, top=MAIORES_ALOCACOES_PADRAO):
+    """
+    Funções com mais memória alocada e ainda viva entre dois snapshots do tracemalloc:
+    função, arquivo, linha que mais alocou, bytes e blocos, da maior à menor.
+    """
+    por_funcao = {}
+    for estatistica in depois.compare_to(antes, 'lineno'):
+        if estatistica.size_diff <= 0:
+            continue
+        quadro = estatistica.traceback[0]
+        chave = (quadro.filename, funcao_na_linha(quadro.filename, quadro.lineno))
+        atual = por_funcao.setdefault(chave, {'linha': quadro.lineno, 'maior': 0, 'bytes': 0, 'blocos': 0})
+        atual['bytes'] += estatistica.size_diff
+        atual['blocos'] += max(estatistica.count_diff, 0)
+        if estatistica.size_diff > atual['maior']:
+            atual['maior'], atual['linha'] = estatistica.size_diff, quadro.lineno
+
+    linhas = [{'funcao': funcao, 'arquivo': _local_curto(arquivo), 'linha': dados['linha'],
+               'bytes': dados['bytes'], 'blocos': dados['blocos']}
+              for (arquivo, funcao), dados in por_funcao.items()]
+    tabela = pd.DataFrame(linhas, columns=['funcao', 'arquivo', 'linha', 'bytes', 'blocos'])
+    return tabela.sort_values('bytes', ascending=False, ignore_index=True).head(top)
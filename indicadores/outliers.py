@@ -0,0 +1,96 @@
+"""
+Detecção de outliers pelo critério do intervalo interquartil (IQR),
+por coluna ou dentro de grupos (espécie, UT, ...).
+"""
+import numpy as np
+import pandas as pd
+
+from .agregacao import agregacao_configuravel
+from .esquema import ampliar_medida, como_texto
+from .perfil import perfilado
+
+FATOR_IQR = 1.5
+MIN_OBSERVACOES_GRUPO = 5
+
+def converter_colunas_numericas(df, colunas):
+    """Retorna as colunas indicadas como numéricas, convertendo apenas as que não são (medidas float32 em float64)"""
+    valores = df[list(colunas)]
+    nao_numericas = [col for col in valores.columns if not pd.api.types.is_numeric_dtype(valores[col])]
+    if nao_numericas:
+        valores = valores.assign(**{col: pd.to_numeric(valores[col], errors='coerce') for col in nao_numericas})
+    medidas = [col for col in valores.columns if valores[col].dtype == 'float32']
+    if medidas:
+        valores = valores.assign(**{col: ampliar_medida(valores[col]) for col in medidas})
+    return valores
+
+@perfilado()
+def calcular_limites_iqr(df, colunas, fator=FATOR_IQR):
+    """
+    Calcula Q1, mediana, Q3, IQR e limites de outliers de várias colunas de uma vez:
+    - Conversão numérica em bloco
+    - Uma única chamada DataFrame.quantile([0.25, 0.5, 0.75])
+    """
+    valores = converter_colunas_numericas(df, colunas)
+    quartis = valores.quantile([0.25, 0.5, 0.75])
+
+    limites = pd.DataFrame({
+        'Q1': quartis.loc[0.25],
+        'Mediana': quartis.loc[0.5],
+        'Q3': quartis.loc[0.75],
+        'n_validos': valores.notna().sum()
+    })
+    limites['IQR'] = limites['Q3'] - limites['Q1']
+    limites['limite_inferior'] = limites['Q1'] - fator * limites['IQR']
+    limites['limite_superior'] = limites['Q3'] + fator * limites['IQR']
+
+    return limites
+
+def marcar_outliers(df, limites):
+    """Retorna máscara booleana (linhas × colunas) com os valores fora dos limites IQR"""
+    valores = converter_colunas_numericas(df, limites.index)
+    return valores.lt(limites['limite_inferior'], axis=1) | valores.gt(limites['limite_superior'], axis=1)
+
+def calcular_limites_iqr_por_grupo(valores, grupos, fator=FATOR_IQR, min_obs=MIN_OBSERVACOES_GRUPO):
+    """
+    Calcula limites IQR de uma variável dentro de cada grupo (espécie, UT, ...).
+    Grupos com menos de `min_obs` valores ficam sem limites (NaN).
+    """
+    valores = ampliar_medida(pd.to_numeric(valores, errors='coerce'))
+    agrupado = valores.groupby(grupos, observed=True)
+
+    quartis = agrupado.quantile([0.25, 0.5, 0.75]).unstack()
+    limites = pd.DataFrame({
+        'Q1': quartis[0.25],
+        'Mediana': quartis[0.5],
+        'Q3': quartis[0.75],
+        'n_validos': agrupado.count()
+    })
+    limites['IQR'] = limites['Q3'] - limites['Q1']
+    limites['limite_inferior'] = limites['Q1'] - fator * limites['IQR']
+    limites['limite_superior'] = limites['Q3'] + fator * limites['IQR']
+
+    poucos_dados = limites['n_validos'] < min_obs
+    limites.loc[poucos_dados, ['limite_inferior', 'limite_superior']] = np.nan
+
+    return limites
+
+def marcar_outliers_por_grupo(valores, grupos, limites):
+    """Retorna máscara booleana dos valores fora dos limites IQR do seu próprio grupo"""
+    valores = ampliar_medida(pd.to_numeric(valores, errors='coerce'))
+    grupos = pd.Series(grupos, index=valores.index)
+    inferior = grupos.map(limites['limite_inferior'])
+    superior = grupos.map(limites['limite_superior'])
+    return (valores < inferior) | (valores > superior)
+
+@perfilado()
+@agregacao_configuravel
+def calcular_outliers_por_grupo(df, coluna, coluna_grupo, fator=FATOR_IQR):
+    """Limites (com número de outliers por grupo) e máscara de outliers de `coluna` agrupada por `coluna_grupo`"""
+    grupos = como_texto(df[coluna_grupo])
+    limites = calcular_limites_iqr_por_grupo(df[coluna], grupos, fator)
+    mascara = marcar_outliers_por_grupo(df[coluna], grupos, limites)
+
+    limites['num_outliers'] = mascara.groupby(grupos).sum()
+    limites['num_outliers'] = limites['num_outliers'].fillna(0).astype(int)
+
+    return limites, mascara
@@ -0,0 +1,137 @@
+"""
+Verificação de paridade entre os motores de agregação pandas e Polars.
+
+Executa cada função configurável (ver `agregacao`) nas duas versões sobre
+os mesmos dados, compara os resultados (tabelas, dicionários, contagens e mensagens;
+números com tolerância relativa, por diferenças de ordem de soma) e mede
+o tempo de cada motor.
+
+    python -m indicadores paridade --dados .
+"""
+import dataclasses
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from .agregacao import FUNCOES_AGREGACAO, polars_disponivel
+from .armazem import carregar_dados_armazem
+from .colunas import encontrar_coluna
+from .filtros import detectar_tecnicas, filtrar_inventario_por_propriedades, separar_por_tecnica
+
+TOLERANCIA_RELATIVA = 1e-9
+
+def _comparar(a, b, caminho='resultado'):
+    """Lista de diferenças entre dois resultados (vazia se equivalentes)"""
+    if isinstance(a, pd.DataFrame) or isinstance(a, pd.Series):
+        testar = pd.testing.assert_frame_equal if isinstance(a, pd.DataFrame) else pd.testing.assert_series_equal
+        try:
+            testar(a, b, check_exact=False, rtol=TOLERANCIA_RELATIVA)
+        except AssertionError as e:
+            return [f"{caminho}: {str(e).strip().splitlines()[0]}"]
+        return []
+
+    if dataclasses.is_dataclass(a):
+        if type(a) is not type(b):
+            return [f"{caminho}: tipos diferentes ({type(a).__name__} x {type(b).__name__})"]
+        return [d for campo in dataclasses.fields(a)
+                for d in _comparar(getattr(a, campo.name), getattr(b, campo.name), f"{caminho}.{campo.name}")]
+
+    if isinstance(a, (tuple, list)):
+        if not isinstance(b, (tuple, list)) or len(a) != len(b):
+            return [f"{caminho}: tamanhos diferentes"]
+        return [d for i, (x, y) in enumerate(zip(a, b)) for d in _comparar(x, y, f"{caminho}[{i}]")]
+
+    if isinstance(a, dict):
+        if not isinstance(b, dict) or a.keys() != b.keys():
+            return [f"{caminho}: chaves diferentes"]
+        return [d for chave in a for d in _comparar(a[chave], b[chave], f"{caminho}[{chave!r}]")]
+
+    if isinstance(a, (float, np.floating)) and isinstance(b, (int, float, np.number)):
+        if not math.isclose(a, b, rel_tol=TOLERANCIA_RELATIVA) and not (math.isnan(a) and math.isnan(b)):
+            return [f"{caminho}: {a!r} x {b!r}"]
+        return []
+
+    return [] if a == b else [f"{caminho}: {a!r} x {b!r}"]
+
+def casos_paridade(df_caracterizacao, df_inventario):
+    """
+    (função, rótulo, argumentos) a verificar: conjunto completo e, na fitossociologia
+    e na área de censo, o inventário de cada técnica (como no dashboard).
+    """
+    casos = [
+        ('calcular_indicadores_restauracao', 'todas as propriedades', (df_caracterizacao, df_inventario)),
+        ('calcular_area_censo_inventario', 'inventário completo', (df_inventario,)),
+        ('calcular_fitossociologia_censo', 'inventário completo', (df_inventario,)),
+        ('calcular_fitossociologia_parcelas', 'inventário completo', (df_inventario,)),
+    ]
+
+    tecnica_col, tem_censo, tem_parcelas = detectar_tecnicas(df_caracterizacao)
+    if tecnica_col and tem_censo and tem_parcelas and 'cod_prop' in df_caracterizacao.columns:
+        dados_censo, dados_parcelas = separar_por_tecnica(df_caracterizacao, tecnica_col)
+        inv_censo = filtrar_inventario_por_propriedades(df_inventario, dados_censo['cod_prop'].unique())
+        inv_parcelas = filtrar_inventario_por_propriedades(df_inventario, dados_parcelas['cod_prop'].unique())
+        casos += [
+            ('calcular_area_censo_inventario', 'propriedades de censo', (inv_censo,)),
+            ('calcular_fitossociologia_censo', 'propriedades de censo', (inv_censo,)),
+            ('calcular_fitossociologia_parcelas', 'propriedades de parcelas', (inv_parcelas,)),
+        ]
+
+    col_especie = encontrar_coluna(df_inventario, ['especie', 'especies', 'species', 'sp'])
+    col_parc = encontrar_coluna(df_inventario, ['cod_parc', 'codigo_parcela', 'parcela'])
+    for col in [encontrar_coluna(df_inventario, ['ht', 'altura', 'height']),
+                encontrar_coluna(df_inventario, ['dap', 'dap_cm', 'diameter'])]:
+        for col_grupo in [col_especie, col_parc]:
+            if col and col_grupo:
+                casos.append(('calcular_outliers_por_grupo', f"{col} por {col_grupo}", (df_inventario, col, col_grupo)))
+
+    return casos
+
+def verificar_paridade(df_caracterizacao, df_inventario):
+    """
+    Compara as versões pandas e Polars de cada caso de `casos_paridade`.
+    Retorna uma lista de dicionários (função, caso, tempos e diferenças).
+    """
+    from . import agregacao_polars
+
+    verificacoes = []
+    for nome, rotulo, args in casos_paridade(df_caracterizacao, df_inventario):
+        inicio = time.perf_counter()
+        esperado = FUNCOES_AGREGACAO[nome].pandas(*args)
+        tempo_pandas = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        obtido = getattr(agregacao_polars, nome)(*args)
+        tempo_polars = time.perf_counter() - inicio
+
+        verificacoes.append({'funcao': nome, 'caso': rotulo, 'tempo_pandas': tempo_pandas,
+                             'tempo_polars': tempo_polars, 'diferencas': _comparar(esperado, obtido)})
+    return verificacoes
+
+def imprimir_verificacoes(verificacoes):
+    """Tabela de tempos e diferenças por caso"""
+    print(f"{'função':<36} {'caso':<28} {'pandas':>9} {'polars':>9}  resultado")
+    for v in verificacoes:
+        situacao = 'ok' if not v['diferencas'] else f"{len(v['diferencas'])} diferença(s)"
+        print(f"{v['funcao']:<36} {v['caso'][:28]:<28} {v['tempo_pandas'] * 1000:7.0f} ms "
+              f"{v['tempo_polars'] * 1000:6.0f} ms  {situacao}")
+        for diferenca in v['diferencas']:
+            print(f"    {diferenca}")
+
+def executar(args):
+    """Subcomando `paridade`"""
+    if not polars_disponivel():
+        print("Polars não instalado: instale com `pip install polars`")
+        return 1
+
+    df_caracterizacao, df_inventario = carregar_dados_armazem(args.dados)
+    verificacoes = verificar_paridade(df_caracterizacao, df_inventario)
+    imprimir_verificacoes(verificacoes)
+    return 1 if any(v['diferencas'] for v in verificacoes) else 0
+
+def configurar_parser(subparsers):
+    """Registra o subcomando `paridade`"""
+    parser = subparsers.add_parser('paridade', help='compara os resultados dos motores de agregação pandas e Polars')
+    parser.add_argument('--dados', default='.', help='pasta com as planilhas BD_*.xlsx (padrão: pasta atual)')
+    parser.set_defaults(executar=executar)
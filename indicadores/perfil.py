@@ -0,0 +1,265 @@
+"""
+Perfil de execução: tempo de cada trecho de uma execução do dashboard.
+
+Um perfil é aberto por execução (`iniciar_perfil`); dentro dele, `trecho`
+(gerenciador de contexto) e `perfilado` (decorador) registram início,
+duração, nível de aninhamento e linhas de entrada de cada seção da página,
+cálculo ou consulta ao cache (acerto ou falha, ver `marcar_falha_cache`).
+Sem perfil aberto, os dois custam uma consulta a uma ContextVar: as funções
+do núcleo ficam decoradas permanentemente.
+
+Tarefas em segundo plano (ver `tarefas`) rodam no contexto de quem as
+enviou e, dentro de `em_tarefa`, registram seus trechos no mesmo perfil,
+numa pilha própria e marcados com o nome da tarefa. Trechos que começam
+depois do fim da execução (tarefas ainda rodando) ficam de fora.
+
+Com memoria=True, o perfil também mede, pelo tracemalloc, o pico e o saldo
+de memória alocada da execução e de cada trecho (os trechos abertos recebem
+o pico dos internos) e as funções que mais alocaram. O tracemalloc deixa a
+execução bem mais lenta e é global ao processo: execuções simultâneas de
+outras sessões entram na mesma conta.
+"""
+import functools
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from .memoria import maiores_alocacoes, rss_atual
+
+CATEGORIA_CACHE = 'cache'
+ACERTO = 'acerto'
+FALHA = 'falha'
+
+_perfil_ativo = ContextVar('perfil_ativo', default=None)
+_tarefa_ativa = ContextVar('tarefa_ativa', default=None)
+_trava_tracemalloc = threading.Lock()
+_perfis_com_memoria = 0
+
+@dataclass
+class Trecho:
+    """
+    Um trecho medido: início (s desde o início do perfil), duração (s), nível de aninhamento e
+    tarefa em segundo plano em que rodou (None na execução); com memória, pico e saldo (bytes)
+    alocados durante o trecho
+    """
+    nome: str
+    categoria: str
+    inicio: float
+    nivel: int
+    duracao: float = 0.0
+    linhas: int = None
+    cache: str = None
+    memoria_pico: int = None
+    memoria_liquida: int = None
+    tarefa: str = None
+    entrada_memoria: int = field(default=0, repr=False)
+    pico_memoria: int = field(default=0, repr=False)
+
+@dataclass
+class PerfilExecucao:
+    """Trechos de uma execução, na ordem em que começaram, e contexto (sessão, página, filtros)"""
+    nome: str
+    inicio: float = field(default_factory=time.perf_counter)
+    horario: float = field(default_factory=time.time)
+    duracao: float = 0.0
+    trechos: list = field(default_factory=list)
+    contexto: dict = field(default_factory=dict)
+    memoria: bool = False
+    memoria_pico: int = None
+    memoria_liquida: int = None
+    rss: int = None
+    alocacoes: pd.DataFrame = None
+    pilhas: dict = field(default_factory=dict, repr=False)
+    encerrado: bool = field(default=False, repr=False)
+    entrada_memoria: int = field(default=0, repr=False)
+    pico_memoria: int = field(default=0, repr=False)
+
+    def tabela(self):
+        """Um trecho por linha (tempos em ms), com o tempo próprio (sem os trechos internos)"""
+        internos = [0.0] * len(self.trechos)
+        abertos_por_tarefa = {}
+        for i, registro in enumerate(self.trechos):
+            abertos = abertos_por_tarefa.setdefault(registro.tarefa, [])
+            del abertos[registro.nivel:]
+            if abertos:
+                internos[abertos[-1]] += registro.duracao
+            abertos.append(i)
+
+        return pd.DataFrame({
+            'nome': [t.nome for t in self.trechos],
+            'categoria': [t.categoria for t in self.trechos],
+            'nivel': [t.nivel for t in self.trechos],
+            'inicio_ms': [t.inicio * 1000 for t in self.trechos],
+            'duracao_ms': [t.duracao * 1000 for t in self.trechos],
+            'proprio_ms': [(t.duracao - interno) * 1000 for t, interno in zip(self.trechos, internos)],
+            'linhas': pd.array([t.linhas for t in self.trechos], dtype='Int64'),
+            'cache': [t.cache for t in self.trechos],
+            'memoria_pico': pd.array([t.memoria_pico for t in self.trechos], dtype='Int64'),
+            'memoria_liquida': pd.array([t.memoria_liquida for t in self.trechos], dtype='Int64'),
+            'tarefa': [t.tarefa for t in self.trechos],
+        })
+
+    def resumo(self):
+        """
+        Por trecho: chamadas, tempo total e próprio (ms), acertos/falhas de cache e, com memória,
+        o maior pico (bytes), do mais lento ao mais rápido
+        """
+        tabela = self.tabela()
+        agregacoes = dict(
+            chamadas=('nome', 'size'),
+            total_ms=('duracao_ms', 'sum'),
+            proprio_ms=('proprio_ms', 'sum'),
+            acertos=('cache', lambda c: int((c == ACERTO).sum())),
+            falhas=('cache', lambda c: int((c == FALHA).sum())),
+        )
+        if self.memoria:
+            agregacoes['memoria_pico'] = ('memoria_pico', 'max')
+        resumo = tabela.groupby(['nome', 'categoria'], sort=False).agg(**agregacoes).reset_index()
+        return resumo.sort_values('proprio_ms', ascending=False, ignore_index=True)
+
+def perfil_ativo():
+    """Perfil da execução em curso (None fora de `iniciar_perfil`)"""
+    return _perfil_ativo.get()
+
+def _pilha(perfil):
+    """Trechos em aberto da execução ou da tarefa em segundo plano em curso"""
+    return perfil.pilhas.setdefault(_tarefa_ativa.get(), [])
+
+def _ligar_tracemalloc():
+    """Liga o tracemalloc para mais um perfil com memória (o primeiro liga)"""
+    global _perfis_com_memoria
+    with _trava_tracemalloc:
+        if _perfis_com_memoria == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _perfis_com_memoria += 1
+
+def _desligar_tracemalloc():
+    """Libera o tracemalloc de um perfil com memória (o último desliga)"""
+    global _perfis_com_memoria
+    with _trava_tracemalloc:
+        _perfis_com_memoria -= 1
+        if _perfis_com_memoria == 0:
+            tracemalloc.stop()
+
+def _registrar_pico(perfil):
+    """
+    Leva o pico do tracemalloc desde a última leitura ao perfil e aos trechos abertos e
+    recomeça a contagem do pico. Retorna a memória alocada atual.
+    """
+    atual, pico = tracemalloc.get_traced_memory()
+    perfil.pico_memoria = max(perfil.pico_memoria, pico)
+    for pilha in list(perfil.pilhas.values()):
+        for registro in pilha:
+            registro.pico_memoria = max(registro.pico_memoria, pico)
+    tracemalloc.reset_peak()
+    return atual
+
+@contextmanager
+def iniciar_perfil(nome, memoria=False):
+    """
+    Abre o perfil de uma execução; os trechos medidos dentro do bloco entram nele.
+    Com memoria=True, mede também a memória alocada (tracemalloc).
+    """
+    perfil = PerfilExecucao(nome, memoria=memoria)
+    if memoria:
+        _ligar_tracemalloc()
+        antes = tracemalloc.take_snapshot()
+        perfil.entrada_memoria = perfil.pico_memoria = _registrar_pico(perfil)
+        perfil.inicio = time.perf_counter()
+
+    token = _perfil_ativo.set(perfil)
+    try:
+        yield perfil
+    finally:
+        perfil.duracao = time.perf_counter() - perfil.inicio
+        perfil.encerrado = True
+        _perfil_ativo.reset(token)
+        if memoria:
+            try:
+                atual = _registrar_pico(perfil)
+                perfil.memoria_pico = perfil.pico_memoria - perfil.entrada_memoria
+                perfil.memoria_liquida = atual - perfil.entrada_memoria
+                # Sem as alocações do próprio perfil (trechos registrados)
+                proprios = [tracemalloc.Filter(False, __file__), tracemalloc.Filter(False, tracemalloc.__file__)]
+                perfil.alocacoes = maiores_alocacoes(antes.filter_traces(proprios),
+                                                     tracemalloc.take_snapshot().filter_traces(proprios))
+                perfil.rss = rss_atual()
+            finally:
+                _desligar_tracemalloc()
+
+@contextmanager
+def trecho(nome, categoria='secao', linhas=None):
+    """Mede o bloco como um trecho do perfil ativo (sem perfil, não faz nada e entrega None)"""
+    perfil = _perfil_ativo.get()
+    if perfil is None or perfil.encerrado:
+        yield None
+        return
+
+    pilha = _pilha(perfil)
+    registro = Trecho(nome, categoria, time.perf_counter() - perfil.inicio, len(pilha), linhas=linhas,
+                      tarefa=_tarefa_ativa.get())
+    if perfil.memoria:
+        registro.entrada_memoria = registro.pico_memoria = _registrar_pico(perfil)
+    perfil.trechos.append(registro)
+    pilha.append(registro)
+    try:
+        yield registro
+    finally:
+        registro.duracao = time.perf_counter() - perfil.inicio - registro.inicio
+        if perfil.memoria:
+            atual = _registrar_pico(perfil)
+            registro.memoria_pico = registro.pico_memoria - registro.entrada_memoria
+            registro.memoria_liquida = atual - registro.entrada_memoria
+        pilha.pop()
+        if categoria == CATEGORIA_CACHE and registro.cache is None:
+            registro.cache = ACERTO
+
+@contextmanager
+def em_tarefa(nome):
+    """Os trechos do bloco (uma tarefa em segundo plano) vão para a pilha da tarefa `nome`"""
+    token = _tarefa_ativa.set(nome)
+    try:
+        yield
+    finally:
+        _tarefa_ativa.reset(token)
+
+def perfilado(nome=None, categoria='calculo'):
+    """
+    Decorador: cada chamada vira um trecho do perfil ativo (nome padrão: o da função),
+    com as linhas do primeiro DataFrame recebido.
+    """
+    def decorador(funcao):
+        rotulo = nome or funcao.__name__
+
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            if _perfil_ativo.get() is None:
+                return funcao(*args, **kwargs)
+            linhas = next((len(arg) for arg in args if isinstance(arg, pd.DataFrame)), None)
+            with trecho(rotulo, categoria, linhas):
+                return funcao(*args, **kwargs)
+        return medida
+    return decorador
+
+def marcar_falha_cache():
+    """
+    Chamada no corpo de uma função em cache (que só roda quando o valor não está em
+    cache): marca como falha o trecho de cache mais interno em aberto.
+    """
+    perfil = _perfil_ativo.get()
+    if perfil is None:
+        return
+    for registro in reversed(_pilha(perfil)):
+        if registro.categoria == CATEGORIA_CACHE:
+            registro.cache = FALHA
+            return
+
+def taxa_acerto_cache(perfis):
+    """(acertos, falhas) das consultas ao cache registradas nos perfis"""
+    consultas = [t.cache for perfil in perfis for t in perfil.trechos if t.categoria == CATEGORIA_CACHE]
+    return consultas.count(ACERTO), consultas.count(FALHA)
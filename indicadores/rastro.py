@@ -0,0 +1,249 @@
+"""
+Rastro de desempenho: os trechos de cada execução do dashboard (ver `perfil`)
+gravados como eventos JSON, um por linha, em arquivo local com rotação.
+
+Cada evento traz horário, sessão, execução, página, estado dos filtros,
+trecho, duração e tempo próprio (ms), linhas processadas e, se medida, a
+memória alocada (pico e saldo, bytes); o evento 'execucao' de cada execução
+traz o tempo total e, se registrado, o tempo até a primeira pintura. O
+rastro pode ser convertido para o formato Chrome trace (chrome://tracing,
+Perfetto) e resumido em percentis de latência por página, filtros ou trecho:
+
+    python -m indicadores rastro rastro.jsonl --por pagina filtros
+    python -m indicadores rastro rastro.jsonl --trecho todos --por trecho --chrome rastro_chrome.json
+"""
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .configuracao import arquivo_rastro, limites_rastro
+
+TRECHO_EXECUCAO = 'execucao'
+PERCENTIS_PADRAO = [50, 90, 95, 99]
+COLUNAS_AGRUPAMENTO = ['pagina', 'filtros', 'trecho', 'categoria', 'sessao']
+SEM_FILTROS = 'sem filtros'
+MEDIDAS = ['duracao_ms', 'memoria_pico', 'primeira_pintura_ms']
+ARGUMENTOS_CHROME = ['pagina', 'filtros', 'linhas', 'cache', 'memoria_pico', 'primeira_pintura_ms', 'execucao']
+
+_registradores = {}
+_trava = threading.Lock()
+
+# ============================================================================
+# GRAVAÇÃO
+# ============================================================================
+
+def _inteiro(valor):
+    """Inteiro ou None (valores ausentes do perfil)"""
+    return None if pd.isna(valor) else int(valor)
+
+def eventos_perfil(perfil):
+    """Eventos de um perfil: um da execução inteira e um por trecho (contexto em `perfil.contexto`)"""
+    base = {
+        'sessao': perfil.contexto.get('sessao'),
+        'execucao': uuid.uuid4().hex[:12],
+        'pagina': perfil.contexto.get('pagina', perfil.nome),
+        'filtros': perfil.contexto.get('filtros', {}),
+    }
+    eventos = [{
+        'ts': round(perfil.horario, 6), **base, 'trecho': TRECHO_EXECUCAO, 'categoria': TRECHO_EXECUCAO,
+        'execucao_nome': perfil.nome, 'nivel': None, 'inicio_ms': 0.0,
+        'duracao_ms': round(perfil.duracao * 1000, 3), 'proprio_ms': None, 'linhas': None, 'cache': None,
+        'memoria_pico': perfil.memoria_pico, 'memoria_liquida': perfil.memoria_liquida,
+        'primeira_pintura_ms': perfil.contexto.get('primeira_pintura_ms'),
+    }]
+    for linha in perfil.tabela().itertuples(index=False):
+        eventos.append({
+            'ts': round(perfil.horario + linha.inicio_ms / 1000, 6), **base,
+            'trecho': linha.nome, 'categoria': linha.categoria, 'execucao_nome': perfil.nome,
+            'nivel': int(linha.nivel), 'inicio_ms': round(linha.inicio_ms, 3),
+            'duracao_ms': round(linha.duracao_ms, 3), 'proprio_ms': round(linha.proprio_ms, 3),
+            'linhas': _inteiro(linha.linhas), 'cache': linha.cache,
+            'memoria_pico': _inteiro(linha.memoria_pico), 'memoria_liquida': _inteiro(linha.memoria_liquida),
+        })
+    return eventos
+
+def _registrador(caminho):
+    """Logger com rotação exclusivo de um arquivo de rastro (um por arquivo e processo)"""
+    caminho = os.path.abspath(caminho)
+    with _trava:
+        if caminho not in _registradores:
+            max_bytes, arquivos = limites_rastro()
+            manipulador = logging.handlers.RotatingFileHandler(
+                caminho, maxBytes=max_bytes, backupCount=arquivos, encoding='utf-8', delay=True
+            )
+            manipulador.setFormatter(logging.Formatter('%(message)s'))
+            registrador = logging.getLogger(f'indicadores.rastro.{len(_registradores)}')
+            registrador.setLevel(logging.INFO)
+            registrador.propagate = False
+            registrador.addHandler(manipulador)
+            _registradores[caminho] = registrador
+        return _registradores[caminho]
+
+def gravar_rastro(perfil, caminho=None):
+    """
+    Acrescenta os eventos do perfil ao arquivo de rastro (padrão: INDICADORES_RASTRO).
+    Retorna o número de eventos gravados (0 se o rastro estiver desligado).
+    """
+    caminho = caminho or arquivo_rastro()
+    if not caminho:
+        return 0
+    eventos = eventos_perfil(perfil)
+    _registrador(caminho).info('\n'.join(json.dumps(evento, ensure_ascii=False, default=str) for evento in eventos))
+    return len(eventos)
+
+# ============================================================================
+# LEITURA E ANÁLISE
+# ============================================================================
+
+def arquivos_rastro(caminho):
+    """Arquivo de rastro e seus antigos da rotação (caminho.1, caminho.2, ...), do mais antigo ao atual"""
+    antigos = []
+    indice = 1
+    while os.path.exists(f'{caminho}.{indice}'):
+        antigos.append(f'{caminho}.{indice}')
+        indice += 1
+    return antigos[::-1] + ([caminho] if os.path.exists(caminho) else [])
+
+def descrever_filtros(filtros):
+    """Texto do estado dos filtros (só os diferentes de 'Todos'), para agrupar execuções"""
+    if not isinstance(filtros, dict):
+        return SEM_FILTROS
+    ativos = [f"{chave}={valor}" for chave, valor in sorted(filtros.items()) if valor not in ('Todos', '', None)]
+    return ', '.join(ativos) or SEM_FILTROS
+
+def ler_rastro(caminho):
+    """
+    Eventos do rastro (com os arquivos antigos da rotação) em um DataFrame, com 'horario'
+    (datetime local) e 'filtros' como texto. Linhas inválidas (ex.: gravação interrompida)
+    são ignoradas.
+    """
+    eventos = []
+    for arquivo in arquivos_rastro(caminho):
+        with open(arquivo, encoding='utf-8') as entrada:
+            for linha in entrada:
+                try:
+                    eventos.append(json.loads(linha))
+                except ValueError:
+                    continue
+
+    df = pd.DataFrame(eventos)
+    if df.empty:
+        return df
+    df['horario'] = (pd.to_datetime(df['ts'], unit='s', utc=True)
+                     .dt.tz_convert(datetime.now().astimezone().tzinfo).dt.tz_localize(None))
+    df['filtros'] = df['filtros'].map(descrever_filtros)
+    return df
+
+def percentis_latencia(df_eventos, por=('pagina',), trecho=TRECHO_EXECUCAO, percentis=PERCENTIS_PADRAO,
+                       medida='duracao_ms'):
+    """
+    Percentis da duração (ms) por grupo, do pior p95 (ou maior percentil pedido) ao melhor.
+    trecho='todos' considera todos os trechos (sem o evento da execução inteira);
+    medida='memoria_pico' usa o pico de memória (bytes) das execuções em que foi medido e
+    medida='primeira_pintura_ms', o tempo até a primeira pintura (evento da execução).
+    """
+    if trecho == 'todos':
+        dados = df_eventos[df_eventos['trecho'] != TRECHO_EXECUCAO]
+    else:
+        dados = df_eventos[df_eventos['trecho'] == trecho]
+
+    if medida not in dados.columns:
+        dados = dados.assign(**{medida: np.nan})
+    grupos = dados.dropna(subset=[medida]).groupby(list(por), sort=False)[medida]
+    tabela = grupos.quantile([p / 100 for p in percentis]).unstack()
+    tabela.columns = [f'p{p}' for p in percentis]
+    tabela.insert(0, 'eventos', grupos.size())
+    ordem = 'p95' if 95 in percentis else tabela.columns[-1]
+    return tabela.sort_values(ordem, ascending=False).reset_index()
+
+def _definido(valor):
+    """False para None e NaN (campos vazios não entram no Chrome trace)"""
+    return isinstance(valor, (dict, str)) or (valor is not None and pd.notna(valor))
+
+def chrome_trace(df_eventos):
+    """
+    Eventos no formato Chrome trace ('X' com início e duração em µs), uma linha
+    (tid) por sessão; abrir em chrome://tracing ou https://ui.perfetto.dev.
+    """
+    df_eventos = df_eventos.assign(sessao=df_eventos['sessao'].fillna(''))
+    sessoes = {sessao: i for i, sessao in enumerate(df_eventos['sessao'].unique(), start=1)}
+    eventos = [
+        {'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': f"sessão {sessao[:8] or '?'}"}}
+        for sessao, tid in sessoes.items()
+    ]
+    for evento in df_eventos.to_dict('records'):
+        eventos.append({
+            'name': evento['execucao_nome'] if evento['trecho'] == TRECHO_EXECUCAO else evento['trecho'],
+            'cat': evento['categoria'],
+            'ph': 'X',
+            'ts': round(evento['ts'] * 1e6),
+            'dur': round(evento['duracao_ms'] * 1000),
+            'pid': 1,
+            'tid': sessoes[evento['sessao']],
+            'args': {chave: evento[chave] for chave in ARGUMENTOS_CHROME if _definido(evento.get(chave))},
+        })
+    return {'traceEvents': eventos, 'displayTimeUnit': 'ms'}
+
+def exportar_chrome_trace(df_eventos, caminho):
+    """Grava os eventos no formato Chrome trace (JSON)"""
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(chrome_trace(df_eventos), arquivo, ensure_ascii=False, default=str)
+
+# ============================================================================
+# LINHA DE COMANDO
+# ============================================================================
+
+def executar(args):
+    """Subcomando `rastro`"""
+    caminho = args.arquivo or arquivo_rastro()
+    if not caminho:
+        print("Informe o arquivo de rastro (ou defina INDICADORES_RASTRO)")
+        return 1
+
+    df = ler_rastro(caminho)
+    if df.empty:
+        print(f"Nenhum evento em {caminho}")
+        return 1
+    if args.dia:
+        df = df[df['horario'].dt.strftime('%Y-%m-%d') == args.dia]
+        if df.empty:
+            print(f"Nenhum evento em {args.dia}")
+            return 1
+
+    execucoes = df[df['trecho'] == TRECHO_EXECUCAO]
+    print(f"{len(execucoes)} execuções, {df['sessao'].nunique()} sessões, "
+          f"{df['horario'].min():%d/%m/%Y %H:%M} a {df['horario'].max():%d/%m/%Y %H:%M}")
+
+    tabela = percentis_latencia(df, args.por, args.trecho, args.percentis, args.medida)
+    with pd.option_context('display.max_rows', args.linhas, 'display.max_colwidth', 60, 'display.width', 200):
+        print(tabela.head(args.linhas).round(1).to_string(index=False))
+
+    if args.chrome:
+        exportar_chrome_trace(df, args.chrome)
+        print(f"Chrome trace gravado em {args.chrome}")
+    return 0
+
+def configurar_parser(subparsers):
+    """Registra o subcomando `rastro`"""
+    parser = subparsers.add_parser('rastro', help='percentis de latência e Chrome trace do rastro do dashboard')
+    parser.add_argument('arquivo', nargs='?', help='arquivo de rastro (padrão: INDICADORES_RASTRO)')
+    parser.add_argument('--por', nargs='+', choices=COLUNAS_AGRUPAMENTO, default=['pagina'],
+                        help='agrupamento dos percentis (padrão: pagina)')
+    parser.add_argument('--trecho', default=TRECHO_EXECUCAO,
+                        help="trecho medido (padrão: execucao, a execução inteira; 'todos' para todos os trechos)")
+    parser.add_argument('--percentis', type=int, nargs='+', default=PERCENTIS_PADRAO,
+                        help='percentis calculados (padrão: 50 90 95 99)')
+    parser.add_argument('--medida', choices=MEDIDAS, default='duracao_ms',
+                        help='duracao_ms (padrão), memoria_pico (bytes, execuções com memória medida) '
+                             'ou primeira_pintura_ms')
+    parser.add_argument('--dia', help='só eventos deste dia (AAAA-MM-DD, horário local)')
+    parser.add_argument('--linhas', type=int, default=30, help='grupos exibidos (padrão: 30)')
+    parser.add_argument('--chrome', help='grava também os eventos no formato Chrome trace neste arquivo')
+    parser.set_defaults(executar=executar)
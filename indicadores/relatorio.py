@@ -0,0 +1,189 @@
+"""
+Relatório em lote: gera os arquivos de indicadores de todas as propriedades.
+
+Os bancos são carregados uma única vez (do armazém Parquet); as propriedades
+são distribuídas entre processos (--jobs), que recebem os dados na
+inicialização do pool e gravam os arquivos por propriedade. O processo
+principal junta as tabelas nos arquivos consolidados e imprime um resumo
+de tempos. Com --campanhas, só as campanhas pedidas são lidas do armazém.
+
+    python -m indicadores relatorio --saida relatorio --formato parquet --jobs 4
+    python -m indicadores relatorio --saida relatorio_2025 --campanhas 2025-1 2025-2
+"""
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .armazem import carregar_dados_armazem
+from .diversidade import calcular_indices_diversidade
+from .exportacao import FORMATOS_POR_EXTENSAO, salvar_dataframe
+from .filtros import filtrar_por_propriedades
+from .fitossociologia import calcular_fitossociologia_por_tecnica
+from .restauracao import calcular_indicadores_propriedade, listar_propriedades
+
+# Bancos compartilhados com os processos do pool (definidos em _inicializar_worker)
+_DADOS = {}
+
+def _inicializar_worker(df_caracterizacao, df_inventario):
+    """Guarda os bancos no processo, para não reenviá-los a cada propriedade"""
+    _DADOS['caracterizacao'] = df_caracterizacao
+    _DADOS['inventario'] = df_inventario
+
+def nome_arquivo_seguro(texto):
+    """Nome de pasta/arquivo sem separadores de caminho nem caracteres especiais"""
+    return re.sub(r'[^\w.-]+', '_', str(texto)).strip('_') or 'sem_nome'
+
+def linha_diversidade(resultado):
+    """Índices de diversidade em um dicionário (uma linha da tabela consolidada)"""
+    return {
+        'riqueza': resultado.riqueza,
+        'total_individuos': resultado.total_individuos,
+        'shannon': resultado.shannon,
+        'simpson': resultado.simpson,
+        'simpson_diversidade': resultado.simpson_diversidade,
+        'pielou': resultado.pielou
+    }
+
+def processar_propriedade(cod_prop, diretorio_saida, formato):
+    """
+    Calcula e grava os indicadores de uma propriedade (mesmos cálculos do dashboard):
+    restauração, fitossociologia por técnica e diversidade.
+    Retorna um dicionário com as tabelas, avisos, erros e o tempo gasto.
+    """
+    inicio = time.perf_counter()
+    df_caracterizacao, df_inventario = _DADOS['caracterizacao'], _DADOS['inventario']
+    saida = {'cod_prop': cod_prop, 'indicadores': None, 'fitossociologia': [],
+             'diversidade': None, 'avisos': [], 'erros': []}
+
+    try:
+        linha, avisos = calcular_indicadores_propriedade(cod_prop, df_caracterizacao, df_inventario)
+        saida['indicadores'] = linha
+        saida['avisos'] += avisos
+    except Exception as e:
+        saida['erros'].append(f"Erro ao calcular indicadores: {e}")
+
+    df_carac_prop, df_inv_prop = filtrar_por_propriedades(df_caracterizacao, df_inventario, [cod_prop])
+
+    for metodo, resultado in calcular_fitossociologia_por_tecnica(df_carac_prop, df_inv_prop).items():
+        saida['avisos'] += resultado.avisos
+        saida['erros'] += resultado.erros
+        if len(resultado.tabela) > 0:
+            saida['fitossociologia'].append((metodo, resultado.tabela))
+
+    diversidade = calcular_indices_diversidade(df_inv_prop)
+    saida['avisos'] += diversidade.avisos
+    saida['erros'] += diversidade.erros
+    if diversidade.riqueza > 0:
+        saida['diversidade'] = {'cod_prop': cod_prop, **linha_diversidade(diversidade)}
+
+    # Arquivos por propriedade
+    pasta = os.path.join(diretorio_saida, 'propriedades', nome_arquivo_seguro(cod_prop))
+    os.makedirs(pasta, exist_ok=True)
+
+    if saida['indicadores'] is not None:
+        salvar_dataframe(pd.DataFrame([saida['indicadores']]), os.path.join(pasta, 'indicadores'), formato)
+    for metodo, tabela in saida['fitossociologia']:
+        salvar_dataframe(tabela, os.path.join(pasta, f'fitossociologia_{metodo}'), formato)
+    if saida['diversidade'] is not None:
+        salvar_dataframe(diversidade.abundancias.rename_axis('Espécie').reset_index(name='N° Registros'),
+                         os.path.join(pasta, 'diversidade'), formato)
+
+    saida['tempo'] = time.perf_counter() - inicio
+    return saida
+
+def _consolidar_fitossociologia(resultados):
+    """Junta as tabelas fitossociológicas com as colunas cod_prop e método"""
+    tabelas = [tabela.assign(cod_prop=r['cod_prop'], metodo=metodo)
+               for r in resultados for metodo, tabela in r['fitossociologia']]
+    if not tabelas:
+        return pd.DataFrame()
+
+    consolidada = pd.concat(tabelas, ignore_index=True)
+    colunas = ['cod_prop', 'metodo'] + [c for c in consolidada.columns if c not in ('cod_prop', 'metodo')]
+    return consolidada[colunas]
+
+def gerar_relatorio(diretorio_dados, diretorio_saida, formato='Parquet', jobs=1, campanhas=None):
+    """
+    Gera os arquivos por propriedade e consolidados em `diretorio_saida` (só com as `campanhas`
+    pedidas, se informadas). Retorna um dicionário com os tempos de cada etapa e as mensagens por propriedade.
+    """
+    tempos = {}
+    inicio_total = time.perf_counter()
+
+    inicio = time.perf_counter()
+    df_caracterizacao, df_inventario = carregar_dados_armazem(diretorio_dados, campanhas)
+    tempos['carregamento'] = time.perf_counter() - inicio
+
+    propriedades = listar_propriedades(df_caracterizacao, df_inventario)
+    os.makedirs(diretorio_saida, exist_ok=True)
+
+    inicio = time.perf_counter()
+    if jobs <= 1:
+        _inicializar_worker(df_caracterizacao, df_inventario)
+        resultados = [processar_propriedade(prop, diretorio_saida, formato) for prop in propriedades]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_inicializar_worker,
+                                 initargs=(df_caracterizacao, df_inventario)) as executor:
+            futuros = [executor.submit(processar_propriedade, prop, diretorio_saida, formato) for prop in propriedades]
+            resultados = [futuro.result() for futuro in futuros]
+    tempos['propriedades'] = time.perf_counter() - inicio
+
+    # Arquivos consolidados (mesma ordem de propriedades do dashboard)
+    inicio = time.perf_counter()
+    indicadores = pd.DataFrame([r['indicadores'] for r in resultados if r['indicadores'] is not None])
+    diversidade = pd.DataFrame([r['diversidade'] for r in resultados if r['diversidade'] is not None])
+    salvar_dataframe(indicadores, os.path.join(diretorio_saida, 'indicadores_restauracao'), formato)
+    salvar_dataframe(_consolidar_fitossociologia(resultados), os.path.join(diretorio_saida, 'fitossociologia'), formato)
+    salvar_dataframe(diversidade, os.path.join(diretorio_saida, 'diversidade'), formato)
+    tempos['consolidacao'] = time.perf_counter() - inicio
+
+    tempos['total'] = time.perf_counter() - inicio_total
+    return {'tempos': tempos, 'resultados': resultados, 'jobs': max(jobs, 1)}
+
+def imprimir_resumo(relatorio, diretorio_saida):
+    """Resumo de tempos e mensagens do relatório"""
+    tempos, resultados = relatorio['tempos'], relatorio['resultados']
+
+    print(f"Relatório gravado em {diretorio_saida} ({len(resultados)} propriedades, {relatorio['jobs']} processo(s))")
+    print(f"  Carregamento dos dados: {tempos['carregamento']:8.2f} s")
+    print(f"  Cálculo por propriedade: {tempos['propriedades']:7.2f} s")
+
+    if resultados:
+        tempos_prop = [r['tempo'] for r in resultados]
+        mais_lenta = max(resultados, key=lambda r: r['tempo'])
+        print(f"    média {sum(tempos_prop) / len(tempos_prop) * 1000:.0f} ms, "
+              f"máximo {mais_lenta['tempo'] * 1000:.0f} ms ({mais_lenta['cod_prop']})")
+
+    print(f"  Arquivos consolidados: {tempos['consolidacao']:9.2f} s")
+    print(f"  Total: {tempos['total']:25.2f} s")
+
+    for r in resultados:
+        for erro in r['erros']:
+            print(f"  [{r['cod_prop']}] {erro}")
+
+    num_avisos = sum(len(r['avisos']) for r in resultados)
+    if num_avisos:
+        print(f"  {num_avisos} aviso(s) de cálculo (ver o dashboard para detalhes)")
+
+def executar(args):
+    """Subcomando `relatorio`"""
+    relatorio = gerar_relatorio(args.dados, args.saida, FORMATOS_POR_EXTENSAO[args.formato], args.jobs,
+                                args.campanhas)
+    imprimir_resumo(relatorio, args.saida)
+    return 1 if any(r['erros'] for r in relatorio['resultados']) else 0
+
+def configurar_parser(subparsers):
+    """Registra o subcomando `relatorio`"""
+    parser = subparsers.add_parser('relatorio', help='gera os arquivos de indicadores de todas as propriedades')
+    parser.add_argument('--dados', default='.', help='pasta com as planilhas BD_*.xlsx (padrão: pasta atual)')
+    parser.add_argument('--saida', default='relatorio', help='pasta de saída (padrão: relatorio)')
+    parser.add_argument('--formato', choices=sorted(FORMATOS_POR_EXTENSAO), default='parquet',
+                        help='formato dos arquivos (padrão: parquet)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help='número de processos (padrão: número de CPUs; 1 = sem pool)')
+    parser.add_argument('--campanhas', nargs='+',
+                        help='campanhas incluídas (padrão: todas; ver python -m indicadores campanhas)')
+    parser.set_defaults(executar=executar)
@@ -0,0 +1,242 @@
+"""
+Indicadores de restauração florestal por propriedade:
+cobertura de copa, densidade de regenerantes e riqueza de espécies nativas.
+"""
+import pandas as pd
+
+from .agregacao import agregacao_configuravel
+from .colunas import encontrar_coluna
+from .densidade import calcular_densidade_regenerantes
+from .esquema import ampliar_medida, como_texto
+from .perfil import perfilado
+from .resultados import ResultadoIndicadores
+
+META_COBERTURA_COPA = 80
+METAS_DENSIDADE = {'Ativa': 1333, 'Assistida': 1500}
+META_RIQUEZA_PADRAO = 30
+ALTURA_MINIMA_RIQUEZA = 0.5
+STATUS_POR_METAS_ATINGIDAS = {3: 'Excelente', 2: 'Bom', 1: 'Regular', 0: 'Crítico'}
+
+def listar_propriedades(df_caracterizacao, df_inventario):
+    """Propriedades presentes na caracterização ou no cod_parc (PROP_UT) do inventário, ordenadas"""
+    propriedades = set()
+
+    if 'cod_prop' in df_caracterizacao.columns:
+        propriedades.update(df_caracterizacao['cod_prop'].dropna().unique())
+
+    # Extrair propriedades do inventário se necessário
+    cod_parc_col = encontrar_coluna(df_inventario, ['cod_parc', 'parcela', 'plot'])
+    if cod_parc_col:
+        for parc in df_inventario[cod_parc_col].dropna().unique():
+            if '_' in str(parc):
+                propriedades.add(str(parc).split('_')[0])
+
+    return sorted(propriedades, key=str)
+
+def selecionar_inventario_propriedade(cod_prop, df_inventario):
+    """Registros do inventário de uma propriedade (coluna cod_prop ou prefixo do cod_parc)"""
+    if 'cod_prop' in df_inventario.columns:
+        return df_inventario[df_inventario['cod_prop'] == cod_prop]
+
+    cod_parc_col = encontrar_coluna(df_inventario, ['cod_parc', 'parcela', 'plot'])
+    if not cod_parc_col:
+        return pd.DataFrame()
+
+    cod_parc = como_texto(df_inventario[cod_parc_col])
+    df_inv_prop = df_inventario[cod_parc.str.startswith(f"{cod_prop}_")]
+    if len(df_inv_prop) == 0:
+        df_inv_prop = df_inventario[cod_parc.str.contains(f"{cod_prop}", na=False, regex=False)]
+    if len(df_inv_prop) == 0:
+        df_inv_prop = df_inventario[cod_parc == str(cod_prop)]
+    return df_inv_prop
+
+def calcular_indicadores_propriedade(cod_prop, df_caracterizacao, df_inventario):
+    """
+    Calcula indicadores de restauração para uma propriedade específica.
+    Retorna (dicionário de indicadores, lista de avisos).
+    """
+    resultado = {'cod_prop': cod_prop}
+
+    # Filtrar dados da propriedade nos dois bancos
+    df_carac_prop = df_caracterizacao[df_caracterizacao['cod_prop'] == cod_prop] if 'cod_prop' in df_caracterizacao.columns else pd.DataFrame()
+    df_inv_prop = selecionar_inventario_propriedade(cod_prop, df_inventario)
+
+    # === 1. COBERTURA DE COPA ===
+    cobertura_col = encontrar_coluna(df_carac_prop, ['cobetura_nativa', 'cobertura_nativa', 'copa_nativa'])
+    if cobertura_col and len(df_carac_prop) > 0:
+        cobertura_media = ampliar_medida(pd.to_numeric(df_carac_prop[cobertura_col], errors='coerce')).mean()
+        # Converter de 0-1 para 0-100% se necessário
+        if not pd.isna(cobertura_media) and cobertura_media <= 1:
+            cobertura_media = cobertura_media * 100
+        resultado['cobertura_copa'] = cobertura_media if not pd.isna(cobertura_media) else 0
+    else:
+        resultado['cobertura_copa'] = 0
+
+    # === 2. DENSIDADE DE REGENERANTES ===
+    # Detectar método de restauração
+    metodo_col = encontrar_coluna(df_carac_prop, ['metodo_restauracao', 'metodo', 'tecnica_restauracao'])
+    metodo_restauracao = 'Ativa'  # Padrao
+
+    if metodo_col and len(df_carac_prop) > 0:
+        metodo_valor = df_carac_prop[metodo_col].iloc[0]
+        if 'assistida' in str(metodo_valor).lower():
+            metodo_restauracao = 'Assistida'
+
+    resultado['metodo_restauracao'] = metodo_restauracao
+
+    densidade = calcular_densidade_regenerantes(df_inv_prop, df_carac_prop)
+    resultado['densidade_regenerantes'] = densidade.densidade
+    resultado['meta_densidade'] = METAS_DENSIDADE[metodo_restauracao]
+    resultado['densidade_adequada'] = densidade.densidade >= resultado['meta_densidade']
+
+    # === 3. RIQUEZA DE ESPECIES ===
+    especies_col = encontrar_coluna(df_inv_prop, ['especies', 'especie', 'species', 'sp'])
+    if especies_col and len(df_inv_prop) > 0:
+        # Filtrar especies validas (remover "Morto/Morta")
+        df_especies_validas = df_inv_prop[~como_texto(df_inv_prop[especies_col]).str.contains('Morto|Morta', case=False, na=False)]
+
+        # Filtrar apenas especies nativas
+        origem_col = encontrar_coluna(df_especies_validas, ['origem', 'origin', 'procedencia'])
+        if origem_col:
+            df_nativas = df_especies_validas[como_texto(df_especies_validas[origem_col]).str.contains('Nativa', case=False, na=False)]
+        else:
+            df_nativas = df_especies_validas
+
+        # Filtrar apenas individuos com altura > 0.5m
+        ht_col = encontrar_coluna(df_nativas, ['ht', 'altura', 'height'])
+        if ht_col:
+            alturas = pd.to_numeric(df_nativas[ht_col], errors='coerce')
+            df_nativas_altura = df_nativas[alturas > ALTURA_MINIMA_RIQUEZA]
+        else:
+            df_nativas_altura = df_nativas
+
+        # Riqueza observada = especies nativas com altura > 0.5m
+        riqueza_observada = df_nativas_altura[especies_col].nunique()
+
+        # Riqueza de especies nativas (todas as alturas)
+        riqueza_nativas = df_nativas[especies_col].nunique()
+    else:
+        riqueza_observada = 0
+        riqueza_nativas = 0
+
+    resultado['riqueza_observada'] = riqueza_observada
+    resultado['riqueza_nativas'] = riqueza_nativas
+
+    # Obter meta de riqueza (baseada em espécies nativas)
+    meta_riqueza = META_RIQUEZA_PADRAO
+    meta_riqueza_col = encontrar_coluna(df_inv_prop, ['meta', 'meta_riqueza', 'riqueza_meta', 'meta_especies'])
+    if meta_riqueza_col and len(df_inv_prop) > 0:
+        metas = pd.to_numeric(df_inv_prop[meta_riqueza_col], errors='coerce').dropna()
+        if len(metas) > 0:
+            meta_riqueza = metas.iloc[0]
+
+    resultado['meta_riqueza'] = meta_riqueza
+    # Meta baseada em espécies nativas com altura > 0.5m (critério observado)
+    resultado['riqueza_adequada'] = riqueza_observada >= meta_riqueza
+
+    # === 4. STATUS GERAL ===
+    metas_atingidas = sum([
+        resultado['cobertura_copa'] >= META_COBERTURA_COPA,
+        resultado['densidade_adequada'],
+        resultado['riqueza_adequada']
+    ])
+    resultado['status_geral'] = STATUS_POR_METAS_ATINGIDAS[metas_atingidas]
+
+    return resultado, densidade.avisos
+
+@perfilado()
+@agregacao_configuravel
+def calcular_indicadores_restauracao(df_caracterizacao, df_inventario):
+    """Calcula os indicadores de restauração por propriedade"""
+    saida = ResultadoIndicadores()
+
+    try:
+        linhas = []
+        for prop in listar_propriedades(df_caracterizacao, df_inventario):
+            try:
+                linha, avisos = calcular_indicadores_propriedade(prop, df_caracterizacao, df_inventario)
+                linhas.append(linha)
+                saida.avisos += avisos
+            except Exception as e:
+                saida.erros.append(f"Erro ao calcular indicadores para propriedade {prop}: {e}")
+
+        saida.tabela = pd.DataFrame(linhas)
+    except Exception as e:
+        saida.erros.append(f"Erro ao calcular indicadores de restauração: {e}")
+
+    return saida
+
+def escolher_area_propriedade(ordem, tem_coluna_tecnica, carac, areas):
+    """
+    Área amostrada da propriedade `ordem` para os motores agrupados, escolhendo o método
+    como `calcular_area_amostrada`. `carac` é a tupla da caracterização da propriedade
+    (registros, cobertura média, primeiro método, tem censo, tem parcelas, tem não-censo)
+    e `areas` tem os ResultadoArea por ordem em 'censo', 'parcelas', 'censo_sub' e 'parcelas_sub'.
+    """
+    _, _, _, tem_censo, tem_parcelas, tem_nao_censo = carac
+    if not areas:
+        return 0.0
+
+    def area(chave):
+        return areas[chave][ordem].area_ha if ordem in areas[chave] else 0.0
+
+    if not tem_coluna_tecnica:
+        return area('parcelas')
+    if tem_censo and tem_parcelas:
+        return area('censo_sub') + (area('parcelas_sub') if tem_nao_censo else 0.0)
+    if tem_censo:
+        return area('censo')
+    return area('parcelas')
+
+def montar_linha_indicadores(cod_prop, carac, inventario, area_ha, tem_coluna_meta):
+    """
+    Monta a linha da propriedade a partir de agregações já calculadas, com as mesmas
+    regras de `calcular_indicadores_propriedade`. `inventario` é a tupla (registros,
+    registros regenerantes, regenerantes, riqueza observada, riqueza de nativas, meta)
+    ou None para propriedades sem inventário.
+    """
+    num_carac, cobertura_media, metodo_valor, _, _, _ = carac
+    num_inv, num_linhas_regenerantes, num_regenerantes, riqueza_observada, riqueza_nativas, meta = (
+        inventario if inventario is not None else (0, 0, 0, 0, 0, None))
+
+    resultado = {'cod_prop': cod_prop}
+
+    # === 1. COBERTURA DE COPA ===
+    if cobertura_media is not None and num_carac > 0:
+        if cobertura_media <= 1:
+            cobertura_media = cobertura_media * 100
+        resultado['cobertura_copa'] = cobertura_media
+    else:
+        resultado['cobertura_copa'] = 0
+
+    # === 2. DENSIDADE DE REGENERANTES ===
+    metodo_restauracao = 'Assistida' if metodo_valor and 'assistida' in metodo_valor.lower() else 'Ativa'
+    resultado['metodo_restauracao'] = metodo_restauracao
+
+    densidade = 0.0
+    if num_inv > 0 and num_carac > 0 and num_linhas_regenerantes > 0 and area_ha > 0:
+        densidade = num_regenerantes / area_ha
+
+    resultado['densidade_regenerantes'] = densidade
+    resultado['meta_densidade'] = METAS_DENSIDADE[metodo_restauracao]
+    resultado['densidade_adequada'] = densidade >= resultado['meta_densidade']
+
+    # === 3. RIQUEZA DE ESPECIES ===
+    resultado['riqueza_observada'] = riqueza_observada
+    resultado['riqueza_nativas'] = riqueza_nativas
+
+    meta_riqueza = META_RIQUEZA_PADRAO
+    if tem_coluna_meta and meta is not None:
+        meta_riqueza = pd.to_numeric(pd.Series([meta])).iloc[0]
+    resultado['meta_riqueza'] = meta_riqueza
+    resultado['riqueza_adequada'] = riqueza_observada >= meta_riqueza
+
+    # === 4. STATUS GERAL ===
+    metas_atingidas = sum([
+        resultado['cobertura_copa'] >= META_COBERTURA_COPA,
+        resultado['densidade_adequada'],
+        resultado['riqueza_adequada']
+    ])
+    resultado['status_geral'] = STATUS_POR_METAS_ATINGIDAS[metas_atingidas]
+
+    return resultado
@@ -0,0 +1,87 @@
+"""
+Objetos de resultado retornados pelo núcleo de cálculo.
+
+Mensagens que a interface deve mostrar ficam em `avisos` (alertas) e
+`erros` (falhas que impediram o cálculo), em vez de serem exibidas aqui.
+"""
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+@dataclass
+class ResultadoArea:
+    """Área amostrada (ha) e descrição do método de cálculo"""
+    area_ha: float = 0.0
+    metodo: str = ""
+    avisos: list = field(default_factory=list)
+    erros: list = field(default_factory=list)
+
+@dataclass
+class ResultadoDensidade:
+    """Densidade (ind/ha) com os números usados no cálculo"""
+    densidade: float = 0.0
+    metodo: str = ""
+    num_individuos: int = 0
+    area_ha: float = 0.0
+    avisos: list = field(default_factory=list)
+    erros: list = field(default_factory=list)
+
+@dataclass
+class ResultadoIndicadores:
+    """Indicadores de restauração (uma linha por propriedade)"""
+    tabela: pd.DataFrame = field(default_factory=pd.DataFrame)
+    avisos: list = field(default_factory=list)
+    erros: list = field(default_factory=list)
+
+@dataclass
+class ResultadoFitossociologia:
+    """Tabela fitossociológica (colunas já com nomes de exibição) e totais"""
+    metodo: str = ""
+    tabela: pd.DataFrame = field(default_factory=pd.DataFrame)
+    total_especies: int = 0
+    total_individuos: int = 0
+    total_parcelas: int = 0
+    area_basal_total: float = 0.0
+    area_basal_disponivel: bool = False
+    avisos: list = field(default_factory=list)
+    erros: list = field(default_factory=list)
+
+@dataclass
+class ResultadoDiversidade:
+    """Índices de diversidade e abundância por espécie (ordem decrescente)"""
+    riqueza: int = 0
+    total_individuos: int = 0
+    shannon: float = 0.0
+    simpson: float = 0.0
+    simpson_diversidade: float = 0.0
+    pielou: float = 0.0
+    abundancias: pd.Series = field(default_factory=lambda: pd.Series(dtype=int))
+    avisos: list = field(default_factory=list)
+    erros: list = field(default_factory=list)
+
+@dataclass
+class ResultadoEspecies:
+    """Nomes de espécies do inventário: contagens (ordem decrescente) e pares de nomes suspeitos"""
+    coluna: str = None
+    contagens: pd.Series = field(default_factory=lambda: pd.Series(dtype=int))
+    suspeitas: list = field(default_factory=list)
+    avisos: list = field(default_factory=list)
+    erros: list = field(default_factory=list)
+
+@dataclass
+class ResultadoCubo:
+    """
+    Métricas de uma combinação de filtros somadas no cubo de agregados. Médias, máximos,
+    contagens de valores não nulos e de valores 1 são dicionários por coluna; riquezas e
+    número de parcelas ficam None quando a coluna não existe.
+    """
+    registros_caracterizacao: int = 0
+    num_parcelas: int = None
+    medias_caracterizacao: dict = field(default_factory=dict)
+    uns_caracterizacao: dict = field(default_factory=dict)
+    registros_inventario: int = 0
+    medias_inventario: dict = field(default_factory=dict)
+    maximos_inventario: dict = field(default_factory=dict)
+    contagens_inventario: dict = field(default_factory=dict)
+    riqueza: int = None
+    riqueza_nativas: int = None
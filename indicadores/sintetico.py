@@ -0,0 +1,363 @@
+"""
+Bancos sintéticos (caracterização e inventário) para testes de escala.
+
+Reproduz o esquema das planilhas: as 47 colunas do BD_caracterizacao
+(coberturas em metros e em %, distúrbios simplificados como 1/vazio) e as
+colunas do BD_inventario usadas pelos cálculos. Propriedades de censo têm
+uma linha de caracterização por UT (cod_parc PROP_UT, com a área da UT em
+area_ha); as de parcelas, uma por parcela de 100 m² (cod_parc PROP_UT_n).
+Cada linha do inventário é um fuste: indivíduos multifuste repetem a
+plaqueta, a espécie e a altura. Os textos têm as variações de
+maiúsculas das planilhas reais, tratadas por `limpar_e_padronizar_dados`.
+
+A mesma semente gera sempre os mesmos dados.
+
+    python -m indicadores gerar-dados --fustes 100000 --saida dados_teste --formato xlsx
+"""
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from .area import AREA_PARCELA_M2
+from .dados import CAMPANHA_PADRAO, arquivo_planilha
+from .exportacao import FORMATOS_POR_EXTENSAO, salvar_dataframe
+
+COLUNAS_CARACTERIZACAO_PLANILHA = [
+    'Cod_geo_UT - original', 'cod_ref', 'cod_prop', 'UT', 'unido', 'tecnica', 'metodo', 'cod_parc',
+    'X (SIRGAS 2000 UTM 23s)', 'Y (SIRGAS 2000 UTM 23s)', 'Município', 'tecnica_am', 'data_exe', 'Equipe',
+    'Cobertura de gramíneas (m)', 'Cobertura de herbáceas/ruderais', 'Solo exposto', 'Cobertura de palhada',
+    'Cobertura de serapilheira (m)', 'Soma das coberturas do solo', '(%)graminea', '(%) herbacea',
+    ' (%) Solo exposto', '(%) palhada', '(%) serapilheira (m)', '(%)cobetura_total', '(%)cobetura_nativa',
+    '(%)cobetura_exotica', 'Cobertura de dossel (m)', 'Cobertura de nativas - dossel (m)',
+    'Cobertura de exóticas- dossel (m)', 'Altura de serapilheira - início (cm)',
+    'Altura de serapilheira - fim (cm)', 'Decomposição serapilheira', 'Presença de processos erosivos (qual?)',
+    'Presença de animais domésticos (qual?)', 'Formigas Cortadeiras ou Cupins', 'Erosao_simplificada', 'Fogo',
+    'Corte de madeira', 'Inundação', 'Animais_simplificado', 'Formigas(simplificado)',
+    'Presença de animais silvestres (qual?)', 'Arbóreas não Amostradas', 'Lianas, Arbustos, Herbáceas notáveis',
+    'Observação'
+]
+COLUNAS_INVENTARIO_PLANILHA = ['cod_parc', 'plaqueta', 'especie', 'ht', 'dap', 'origem', 'idade',
+                               'regeneracao', 'area_ha', 'meta']
+
+FUSTES_PADRAO = 10_000
+FRACAO_CENSO_PADRAO = 0.57          # proporção de propriedades de censo nas planilhas reais
+LIMITE_LINHAS_XLSX = 1_048_575      # linhas de dados em uma planilha do Excel
+COMPRIMENTO_TRANSECTO_M = 25        # coberturas em metros medidas em transecto de 25 m
+DENSIDADE_MEDIANA_HA = 2500         # fustes por hectare (mediana entre propriedades)
+FRACAO_NOVO_INDIVIDUO = 0.8         # 20% dos fustes são fustes adicionais de um indivíduo
+FRACAO_MORTOS = 0.04
+FRACAO_EXOTICAS = 0.08
+NUM_ESPECIES_NATIVAS = 240
+FUSTES_POR_PROPRIEDADE = 280        # média aproximada, para sortear propriedades em blocos
+
+GENEROS_NATIVOS = [
+    'Inga', 'Schinus', 'Cecropia', 'Anadenanthera', 'Piptadenia', 'Guazuma', 'Trema', 'Solanum', 'Croton',
+    'Senna', 'Mimosa', 'Handroanthus', 'Cedrela', 'Ceiba', 'Cariniana', 'Cordia', 'Machaerium', 'Dalbergia',
+    'Tapirira', 'Myrsine', 'Eugenia', 'Myrcia', 'Casearia', 'Luehea', 'Apuleia', 'Enterolobium',
+    'Peltophorum', 'Hymenaea', 'Copaifera', 'Alchornea', 'Sapium', 'Vernonanthura', 'Zanthoxylum',
+    'Cupania', 'Allophylus', 'Nectandra', 'Ocotea', 'Miconia'
+]
+EPITETOS = ['ferruginea', 'glabra', 'pubescens', 'brasiliensis', 'grandiflora', 'tomentosa', 'velutina',
+            'lanceolata', 'speciosa', 'guianensis', 'sellowiana', 'floribunda']
+ESPECIES_EXOTICAS = ['Leucaena leucocephala', 'Mangifera indica', 'Eucalyptus grandis', 'Psidium guajava',
+                     'Citrus limon', 'Ricinus communis', 'Melia azedarach', 'Syzygium cumini',
+                     'Persea americana', 'Tecoma stans']
+
+MUNICIPIOS = (['MARIANA', 'BARRA LONGA', 'SANTA CRUZ DO ESCALVADO', 'RIO DOCE', 'PONTE NOVA'],
+              [0.49, 0.42, 0.03, 0.02, 0.04])
+CODIGOS_REFERENCIA = (['APP ≤ 5m', '5m < APP ≤ 8 m', '2 ha > APP > 8 m', 'APP > 8 m'], [0.47, 0.25, 0.18, 0.10])
+EQUIPES = ['Diogo', 'Cévio', 'Allan', 'Vitor', 'Vitor e Will', 'William']
+METODOS = (['Restauração Ativa', 'Restauração Assistida'], [0.8, 0.2])
+METAS_RIQUEZA = ([20, 30, 40], [0.2, 0.6, 0.2])
+
+# Distúrbio: (coluna descritiva, coluna simplificada, frequência, descrições quando presente, texto se ausente)
+DISTURBIOS = [
+    ('Presença de processos erosivos (qual?)', 'Erosao_simplificada', 0.40,
+     ['Erosão Laminar', 'Ravina', 'Sulco', 'Solapamento'], 'Ausente'),
+    ('Presença de animais domésticos (qual?)', 'Animais_simplificado', 0.36,
+     ['esterco gado', 'esterco cavalo', 'cerca cortada, esterco gado', 'pisoteio de gado'], 'Ausentes'),
+    ('Formigas Cortadeiras ou Cupins', 'Formigas(simplificado)', 0.07,
+     ['formiga cortadeira', 'cupinzeiro', 'formiga cortadeira (quenquen)'], 'Ausentes'),
+    (None, 'Fogo', 0.006, None, None),
+    (None, 'Corte de madeira', 0.018, None, None),
+    (None, 'Inundação', 0.064, None, None),
+]
+TEXTOS_LIVRES = {
+    'Decomposição serapilheira': ['Ausente', 'Baixa', 'Media', 'Alta'],
+    'Presença de animais silvestres (qual?)': ['Ausentes', 'aves nativas vocalizando no entorno', 'toca de tatu',
+                                               'beija flor, rolinha', 'rastro de capivara'],
+    'Arbóreas não Amostradas': ['Ausentes', 'capixingui', 'leucena', 'tapiá, camboatá', 'embaúba'],
+    'Lianas, Arbustos, Herbáceas notáveis': ['lantana camara', 'ludwigia, sida', 'clidemia hirta',
+                                             'pteridofitas, borreria', 'Ausentes'],
+    'Observação': ['capim alto abafando as mudas', 'palhada rala com rebrota de gramineas',
+                   'pastagem degradada', 'boa regeneração natural', 'coroas sem cobertura'],
+}
+
+# ============================================================================
+# ESPÉCIES
+# ============================================================================
+
+def _lista_especies(rng):
+    """Espécies nativas (combinações gênero-epíteto) e exóticas com probabilidades (abundância de Zipf)"""
+    nativas = [f"{genero} {epiteto}" for genero in GENEROS_NATIVOS for epiteto in EPITETOS]
+    nativas = list(rng.choice(nativas, size=NUM_ESPECIES_NATIVAS, replace=False))
+
+    def zipf(n):
+        pesos = 1.0 / np.arange(1, n + 1)
+        return pesos / pesos.sum()
+
+    especies = np.array(nativas + ESPECIES_EXOTICAS, dtype=object)
+    probabilidades = np.concatenate([zipf(len(nativas)) * (1 - FRACAO_EXOTICAS),
+                                     zipf(len(ESPECIES_EXOTICAS)) * FRACAO_EXOTICAS])
+    exotica = np.arange(len(especies)) >= len(nativas)
+    return especies, probabilidades, exotica
+
+def _rotulos(opcoes, indices):
+    """Textos por índice, compartilhando um objeto por opção (milhões de linhas sem milhões de strings)"""
+    return np.array(opcoes, dtype=object)[np.asarray(indices, dtype=np.intp)]
+
+def _variar_maiusculas(rng, valores, fracao, variantes):
+    """Troca uma fração dos textos por variantes de maiúsculas (como nas planilhas digitadas)"""
+    valores = valores.copy()
+    trocar = np.flatnonzero(rng.random(len(valores)) < fracao)
+    for i, j in zip(trocar, rng.integers(0, len(variantes), len(trocar))):
+        valores[i] = variantes[j](valores[i])
+    return valores
+
+# ============================================================================
+# PROPRIEDADES, UTS E PARCELAS
+# ============================================================================
+
+def _sortear_unidades(rng, primeira, quantidade, fracao_censo):
+    """
+    Propriedades `primeira`..`primeira + quantidade - 1` e suas unidades amostrais
+    (UT no censo, parcela nas demais): uma linha por unidade, com o número esperado de fustes.
+    """
+    prop = pd.DataFrame({
+        'cod_prop': [f"{'BDM'[i % 3]}{i + 1:03d}" for i in range(primeira, primeira + quantidade)],
+        'censo': rng.random(quantidade) < fracao_censo,
+        'num_uts': 1 + np.minimum(rng.poisson(1.2, quantidade), 8),
+        'densidade': DENSIDADE_MEDIANA_HA * rng.lognormal(0, 0.5, quantidade),
+        'municipio': rng.choice(MUNICIPIOS[0], quantidade, p=MUNICIPIOS[1]),
+        'cod_ref': rng.choice(CODIGOS_REFERENCIA[0], quantidade, p=CODIGOS_REFERENCIA[1]),
+        'equipe': rng.choice(EQUIPES, quantidade),
+        'data_exe': pd.Timestamp('2024-08-01') + pd.to_timedelta(rng.integers(0, 75, quantidade), unit='D'),
+        'metodo': rng.choice(METODOS[0], quantidade, p=METODOS[1]),
+        'meta': rng.choice(METAS_RIQUEZA[0], quantidade, p=METAS_RIQUEZA[1]),
+        'x': rng.integers(640_000, 700_000, quantidade),
+        'y': rng.integers(7_740_000, 7_780_000, quantidade),
+    })
+
+    uts = prop.loc[prop.index.repeat(prop['num_uts'])].reset_index(drop=True)
+    uts['UT'] = [f"UT{n:02d}" for n in uts.groupby('cod_prop').cumcount() + 1]
+    uts['area_ut'] = rng.uniform(0.02, 0.12, len(uts)).round(4)
+    uts['num_parcelas'] = np.where(uts['censo'], 1, 1 + np.minimum(rng.poisson(1.5, len(uts)), 8))
+
+    unidades = uts.loc[uts.index.repeat(uts['num_parcelas'])].reset_index(drop=True)
+    n_parcela = unidades.groupby(['cod_prop', 'UT']).cumcount() + 1
+    prop_ut = unidades['cod_prop'] + '_' + unidades['UT']
+    unidades['cod_parc'] = np.where(unidades['censo'], prop_ut, prop_ut + '_' + n_parcela.astype(str))
+    unidades['area_ha'] = np.where(unidades['censo'], unidades['area_ut'], AREA_PARCELA_M2 / 10000)
+    unidades['fustes'] = rng.poisson(unidades['densidade'] * unidades['area_ha'])
+    return unidades
+
+def _caracterizacao(rng, unidades):
+    """Uma linha de caracterização por unidade, com as 47 colunas da planilha"""
+    n = len(unidades)
+    df = pd.DataFrame(index=range(n))
+    prop_ut = (unidades['cod_prop'] + '_' + unidades['UT']).to_numpy()
+
+    df['Cod_geo_UT - original'] = prop_ut
+    df['cod_ref'] = unidades['cod_ref'].to_numpy()
+    df['cod_prop'] = unidades['cod_prop'].to_numpy()
+    df['UT'] = unidades['UT'].to_numpy()
+    df['unido'] = (unidades['cod_prop'] + '-' + unidades['UT']).to_numpy()
+    df['tecnica'] = unidades['metodo'].to_numpy()
+    df['metodo'] = unidades['metodo'].to_numpy()
+    df['cod_parc'] = unidades['cod_parc'].to_numpy()
+    df['X (SIRGAS 2000 UTM 23s)'] = (unidades['x'] + rng.normal(0, 150, n)).round()
+    df['Y (SIRGAS 2000 UTM 23s)'] = (unidades['y'] + rng.normal(0, 150, n)).round()
+    df['Município'] = _variar_maiusculas(rng, unidades['municipio'].to_numpy(dtype=object), 0.05, [str.title])
+    df['tecnica_am'] = _variar_maiusculas(rng, np.where(unidades['censo'], 'censo', 'parcela').astype(object),
+                                          0.04, [str.capitalize, str.upper])
+    df['data_exe'] = unidades['data_exe'].to_numpy()
+    df['Equipe'] = unidades['equipe'].to_numpy()
+
+    # Coberturas do solo: partes de um transecto de 25 m (em metros e em fração)
+    solo = rng.dirichlet([3.0, 0.6, 0.8, 1.2, 1.0], n) * COMPRIMENTO_TRANSECTO_M
+    colunas_solo_m = ['Cobertura de gramíneas (m)', 'Cobertura de herbáceas/ruderais', 'Solo exposto',
+                      'Cobertura de palhada', 'Cobertura de serapilheira (m)']
+    colunas_solo_pct = ['(%)graminea', '(%) herbacea', ' (%) Solo exposto', '(%) palhada', '(%) serapilheira (m)']
+    for i, (col_m, col_pct) in enumerate(zip(colunas_solo_m, colunas_solo_pct)):
+        df[col_m] = solo[:, i].round(1)
+    df['Soma das coberturas do solo'] = df[colunas_solo_m].sum(axis=1)
+    for col_m, col_pct in zip(colunas_solo_m, colunas_solo_pct):
+        df[col_pct] = df[col_m] / COMPRIMENTO_TRANSECTO_M
+
+    # Dossel: trechos do transecto sob copa nativa e exótica
+    nativas_m = (rng.beta(1.5, 2.0, n) * COMPRIMENTO_TRANSECTO_M).round(1)
+    exoticas_m = np.where(rng.random(n) < 0.3, rng.beta(1.0, 6.0, n) * COMPRIMENTO_TRANSECTO_M, 0).round(1)
+    dossel_m = np.minimum(nativas_m + exoticas_m, COMPRIMENTO_TRANSECTO_M)
+    df['(%)cobetura_total'] = dossel_m / COMPRIMENTO_TRANSECTO_M
+    df['(%)cobetura_nativa'] = nativas_m / COMPRIMENTO_TRANSECTO_M
+    df['(%)cobetura_exotica'] = exoticas_m / COMPRIMENTO_TRANSECTO_M
+    df['Cobertura de dossel (m)'] = dossel_m
+    df['Cobertura de nativas - dossel (m)'] = nativas_m
+    df['Cobertura de exóticas- dossel (m)'] = exoticas_m
+    df['Altura de serapilheira - início (cm)'] = rng.integers(0, 7, n).astype(float)
+    df['Altura de serapilheira - fim (cm)'] = rng.integers(0, 9, n).astype(float)
+    df['Decomposição serapilheira'] = rng.choice(TEXTOS_LIVRES['Decomposição serapilheira'], n)
+
+    # Distúrbios: descrição e indicador simplificado (1 quando presente, vazio quando ausente)
+    for col_descricao, col_simplificada, frequencia, descricoes, ausente in DISTURBIOS:
+        presente = rng.random(n) < frequencia
+        if col_descricao:
+            df[col_descricao] = np.where(presente, rng.choice(descricoes, n), ausente)
+        df[col_simplificada] = np.where(presente, 1.0, np.nan)
+
+    for coluna in ['Presença de animais silvestres (qual?)', 'Arbóreas não Amostradas',
+                   'Lianas, Arbustos, Herbáceas notáveis', 'Observação']:
+        df[coluna] = rng.choice(TEXTOS_LIVRES[coluna], n)
+
+    return df[COLUNAS_CARACTERIZACAO_PLANILHA]
+
+# ============================================================================
+# INVENTÁRIO
+# ============================================================================
+
+def _inventario(rng, unidades, num_fustes):
+    """Uma linha por fuste, distribuídos pelas unidades conforme o número esperado de cada uma"""
+    unidade = np.repeat(np.arange(len(unidades)), unidades['fustes'].to_numpy())[:num_fustes]
+
+    # Plaqueta: fustes seguidos da mesma unidade formam um indivíduo multifuste
+    novo = rng.random(num_fustes) < FRACAO_NOVO_INDIVIDUO
+    novo[0] = True
+    novo[1:] |= unidade[1:] != unidade[:-1]
+    plaqueta = np.cumsum(novo)
+    num_individuos = int(plaqueta[-1])
+    unidade_individuo = unidade[novo]
+
+    # Atributos do indivíduo (repetidos em todos os seus fustes)
+    especies, probabilidades, exotica = _lista_especies(rng)
+    sorteio = rng.choice(len(especies), num_individuos, p=probabilidades)
+    morto = rng.random(num_individuos) < FRACAO_MORTOS
+    especie = especies[sorteio]
+    especie[morto] = 'Morto'
+    especie = _variar_maiusculas(rng, especie, 0.02, [str.lower])
+    origem = _rotulos(['Nativa', 'Exótica', None], np.where(morto, 2, exotica[sorteio]))
+
+    jovem = rng.random(num_individuos) < 0.6
+    idade = _rotulos(['Adulto', 'Jovem'], jovem)
+    altura = np.where(jovem, rng.lognormal(np.log(1.0), 0.6, num_individuos),
+                      rng.lognormal(np.log(4.0), 0.5, num_individuos)).round(2)
+
+    fracao_plantio = np.where(unidades['metodo'].to_numpy() == 'Restauração Ativa', 0.6, 0.15)
+    regeneracao = _rotulos(['Regenerante', 'Plantio'], rng.random(num_individuos) < fracao_plantio[unidade_individuo])
+
+    # DAP do fuste (cm, a 1,30 m): relação hipsométrica com ruído; fustes adicionais mais finos
+    indice = plaqueta - 1
+    ht = altura[indice]
+    dap = np.exp((np.log(ht) - 0.3) / 0.5 + rng.normal(0, 0.25, num_fustes))
+    dap = np.where(novo, dap, dap * rng.uniform(0.4, 1.0, num_fustes))
+    dap = np.where(ht >= 1.3, dap.round(1), np.nan)
+
+    return pd.DataFrame({
+        'cod_parc': unidades['cod_parc'].to_numpy()[unidade],
+        'plaqueta': plaqueta,
+        'especie': especie[indice],
+        'ht': ht,
+        'dap': dap,
+        'origem': origem[indice],
+        'idade': idade[indice],
+        'regeneracao': regeneracao[indice],
+        'area_ha': unidades['area_ha'].to_numpy()[unidade],
+        'meta': unidades['meta'].to_numpy()[unidade],
+    }, columns=COLUNAS_INVENTARIO_PLANILHA)
+
+def gerar_dados_sinteticos(num_fustes=FUSTES_PADRAO, semente=0, fracao_censo=FRACAO_CENSO_PADRAO):
+    """
+    Gera (caracterização, inventário) com `num_fustes` linhas no inventário, no formato das
+    planilhas (antes de `limpar_e_padronizar_dados`). Propriedades são sorteadas até somar
+    os fustes pedidos; a última pode ficar com menos fustes que o esperado.
+    """
+    if num_fustes < 1:
+        raise ValueError("O número de fustes deve ser positivo")
+
+    rng = np.random.default_rng(semente)
+    blocos = []
+    num_propriedades = 0
+    total = 0
+    while total < num_fustes:
+        # Propriedades suficientes, em média, para os fustes que faltam
+        quantidade = max(8, int((num_fustes - total) / FUSTES_POR_PROPRIEDADE) + 1)
+        bloco = _sortear_unidades(rng, num_propriedades, quantidade, fracao_censo)
+        blocos.append(bloco)
+        num_propriedades += quantidade
+        total += int(bloco['fustes'].sum())
+
+    unidades = pd.concat(blocos, ignore_index=True)
+
+    # Descartar as propriedades sorteadas além dos fustes pedidos
+    fustes_antes = unidades['fustes'].cumsum() - unidades['fustes']
+    ultima = unidades.loc[fustes_antes < num_fustes, 'cod_prop'].iloc[-1]
+    unidades = unidades.iloc[:unidades.index[unidades['cod_prop'] == ultima][-1] + 1]
+
+    return _caracterizacao(rng, unidades), _inventario(rng, unidades, num_fustes)
+
+def salvar_dados_sinteticos(df_caracterizacao, df_inventario, diretorio, formato='XLSX', campanha=CAMPANHA_PADRAO):
+    """
+    Grava os bancos com os nomes das planilhas (BD_caracterizacao, BD_inventario; com o sufixo da
+    campanha, se não for a base) no formato pedido. Retorna os caminhos.
+    XLSX tem limite de linhas: para volumes maiores, use Parquet ou CSV.
+    """
+    if formato == 'XLSX' and max(len(df_caracterizacao), len(df_inventario)) > LIMITE_LINHAS_XLSX:
+        raise ValueError(f"XLSX comporta até {LIMITE_LINHAS_XLSX} linhas; use --formato parquet ou csv")
+
+    os.makedirs(diretorio, exist_ok=True)
+    caminhos = []
+    for banco, df in [('caracterizacao', df_caracterizacao), ('inventario', df_inventario)]:
+        nome = os.path.splitext(arquivo_planilha(banco, campanha))[0]
+        caminhos.append(salvar_dataframe(df, os.path.join(diretorio, nome), formato))
+    return caminhos
+
+def executar(args):
+    """Subcomando `gerar-dados`"""
+    inicio = time.perf_counter()
+    df_caracterizacao, df_inventario = gerar_dados_sinteticos(args.fustes, args.semente, args.fracao_censo)
+    tempo_geracao = time.perf_counter() - inicio
+
+    try:
+        inicio = time.perf_counter()
+        caminhos = salvar_dados_sinteticos(df_caracterizacao, df_inventario, args.saida,
+                                           FORMATOS_POR_EXTENSAO[args.formato], args.campanha)
+    except ValueError as e:
+        print(e)
+        return 1
+    tempo_gravacao = time.perf_counter() - inicio
+
+    censo = df_caracterizacao['tecnica_am'].str.lower() == 'censo'
+    print(f"{df_caracterizacao['cod_prop'].nunique()} propriedades "
+          f"({df_caracterizacao.loc[censo, 'cod_prop'].nunique()} de censo), "
+          f"{len(df_caracterizacao)} linhas de caracterização, {len(df_inventario)} fustes "
+          f"({df_inventario['plaqueta'].nunique()} indivíduos, {df_inventario['especie'].nunique()} espécies)")
+    print(f"Geração {tempo_geracao:.1f} s, gravação {tempo_gravacao:.1f} s (semente {args.semente})")
+    for caminho in caminhos:
+        print(f"  {caminho}")
+    return 0
+
+def configurar_parser(subparsers):
+    """Registra o subcomando `gerar-dados`"""
+    parser = subparsers.add_parser('gerar-dados', help='gera bancos sintéticos no formato das planilhas')
+    parser.add_argument('--fustes', type=int, default=FUSTES_PADRAO,
+                        help=f'linhas do inventário (fustes) (padrão: {FUSTES_PADRAO})')
+    parser.add_argument('--saida', default='.', help='pasta de saída (padrão: pasta atual)')
+    parser.add_argument('--formato', choices=sorted(FORMATOS_POR_EXTENSAO), default='xlsx',
+                        help='formato dos arquivos (padrão: xlsx, lido pelo dashboard)')
+    parser.add_argument('--semente', type=int, default=0, help='semente do gerador (padrão: 0)')
+    parser.add_argument('--fracao-censo', type=float, default=FRACAO_CENSO_PADRAO,
+                        help=f'fração de propriedades de censo (padrão: {FRACAO_CENSO_PADRAO})')
+    parser.add_argument('--campanha', default=CAMPANHA_PADRAO,
+                        help='campanha dos arquivos: sufixo do nome, BD_inventario_<campanha> (padrão: base, sem sufixo)')
+    parser.set_defaults(executar=executar)
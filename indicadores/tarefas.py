@@ -0,0 +1,107 @@
+"""
+Tarefas em segundo plano: cálculos de uma página adiantados em threads
+enquanto as seções de cima são exibidas.
+
+Cada sessão do dashboard tem um `AgendadorTarefas`, com as tarefas de um
+estado (versão dos dados e filtros), sobre um pool de threads compartilhado
+pelo processo (`criar_executor`). A seção que precisa de um resultado
+espera só o que ainda falta dele; reexecuções com o mesmo estado recebem
+os resultados prontos. Quando o estado muda, as tarefas do anterior que
+ainda não começaram são canceladas. As em andamento não são interrompidas
+(um cálculo do pandas não tem ponto seguro de parada): terminam no pool e
+o resultado é descartado.
+
+As funções agendadas rodam fora da execução do Streamlit: recebem os dados
+prontos (DataFrames, motor de consulta) e não podem chamar `st`. Rodam numa
+cópia do contexto (contextvars) de quem as enviou, então os trechos medidos
+nelas entram no perfil da execução que as agendou (ver `perfil.em_tarefa`).
+"""
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from .configuracao import trabalhadores_tarefas
+from .perfil import em_tarefa
+
+@dataclass
+class Tarefa:
+    """Uma tarefa agendada: futuro, horário de envio e, depois de rodar, início e duração (s)"""
+    nome: str
+    futuro: object
+    enviada: float = field(default_factory=time.perf_counter)
+    inicio: float = None
+    duracao: float = None
+
+def criar_executor(trabalhadores=None):
+    """Pool de threads das tarefas (padrão: INDICADORES_TAREFAS threads)"""
+    return ThreadPoolExecutor(max_workers=trabalhadores or trabalhadores_tarefas(),
+                              thread_name_prefix='indicadores-tarefa')
+
+class AgendadorTarefas:
+    """Tarefas de uma sessão para o estado atual, executadas no pool compartilhado"""
+    def __init__(self, executor):
+        self.executor = executor
+        self.estado = None
+        self.tarefas = {}
+        self.canceladas = 0
+        self._trava = threading.Lock()
+
+    def mudar_estado(self, estado):
+        """
+        Passa a trabalhar para `estado`: se ele mudou, cancela as tarefas do anterior
+        que não começaram e descarta as demais. Retorna o número de tarefas canceladas.
+        """
+        with self._trava:
+            if estado == self.estado:
+                return 0
+            canceladas = sum(tarefa.futuro.cancel() for tarefa in self.tarefas.values())
+            self.canceladas += canceladas
+            self.estado = estado
+            self.tarefas = {}
+            return canceladas
+
+    def enviar(self, nome, funcao, *args):
+        """Agenda funcao(*args) como `nome` no estado atual (a tarefa já agendada é reaproveitada)"""
+        with self._trava:
+            if nome not in self.tarefas:
+                tarefa = Tarefa(nome, None)
+                contexto = contextvars.copy_context()
+                tarefa.futuro = self.executor.submit(contexto.run, self._executar, tarefa, funcao, args)
+                self.tarefas[nome] = tarefa
+            return self.tarefas[nome]
+
+    @staticmethod
+    def _executar(tarefa, funcao, args):
+        """Roda a função registrando início e duração na tarefa (e seus trechos no perfil)"""
+        tarefa.inicio = time.perf_counter()
+        try:
+            with em_tarefa(tarefa.nome):
+                return funcao(*args)
+        finally:
+            tarefa.duracao = time.perf_counter() - tarefa.inicio
+
+    def resultado(self, nome):
+        """Resultado da tarefa (espera o fim; exceções da função são relançadas aqui)"""
+        with self._trava:
+            tarefa = self.tarefas[nome]
+        return tarefa.futuro.result()
+
+    def cancelar(self):
+        """Cancela as tarefas que não começaram e esquece o estado atual"""
+        return self.mudar_estado(None)
+
+    def resumo(self):
+        """Uma tarefa por linha: situação, espera na fila e duração (ms)"""
+        with self._trava:
+            tarefas = list(self.tarefas.values())
+        return pd.DataFrame({
+            'tarefa': [t.nome for t in tarefas],
+            'situacao': ['concluída' if t.futuro.done() else 'em andamento' if t.inicio is not None else 'na fila'
+                         for t in tarefas],
+            'fila_ms': [(t.inicio - t.enviada) * 1000 if t.inicio is not None else None for t in tarefas],
+            'duracao_ms': [t.duracao * 1000 if t.duracao is not None else None for t in tarefas],
+        })
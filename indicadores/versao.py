@@ -0,0 +1,103 @@
+"""
+Versão dos dados: impressão digital do conteúdo de cada planilha.
+
+A versão entra na chave de todo artefato derivado (bancos limpos, armazém
+Parquet, cubo de agregados, exportações): quando uma planilha muda, tudo o
+que depende dela é refeito, e só isso. Conferir a versão é barato: o hash
+de um arquivo só é recalculado quando o tamanho ou a data de modificação
+mudam (um arquivo salvo sem alterações mantém a versão).
+
+Com várias campanhas (ver `dados.planilhas_diretorio`), a versão de um
+banco combina as das planilhas de todas as campanhas; uma versão pode ser
+restrita às campanhas selecionadas (`VersaoDados.selecionar`), com chave
+própria para os artefatos derivados só delas.
+"""
+import functools
+import hashlib
+import os
+from dataclasses import dataclass, replace
+
+from .dados import BANCOS, CAMPANHA_PADRAO, arquivo_planilha, planilhas_diretorio
+
+TAMANHO_BLOCO_HASH = 1024 * 1024
+AUSENTE = 'ausente'
+
+@functools.lru_cache(maxsize=64)
+def _hash_conteudo(caminho, tamanho, modificado_ns):
+    """Hash do conteúdo do arquivo (tamanho e data de modificação fazem parte da chave do cache)"""
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(TAMANHO_BLOCO_HASH), b''):
+            sha.update(bloco)
+    return sha.hexdigest()[:16]
+
+def hash_arquivo(caminho):
+    """Hash do conteúdo de um arquivo (AUSENTE se ele não existir)"""
+    try:
+        info = os.stat(caminho)
+    except OSError:
+        return AUSENTE
+    return _hash_conteudo(os.path.abspath(caminho), info.st_size, info.st_mtime_ns)
+
+def limpar_cache_versao():
+    """Esquece os hashes calculados: a próxima consulta relê todas as planilhas"""
+    _hash_conteudo.cache_clear()
+
+def hash_combinado(hashes):
+    """Hash de um banco a partir dos hashes (campanha, hash) das suas planilhas"""
+    hashes = list(hashes)
+    if len(hashes) == 1 and hashes[0][0] == CAMPANHA_PADRAO:
+        return hashes[0][1]
+    return hashlib.sha256(repr(hashes).encode('utf-8')).hexdigest()[:16]
+
+@dataclass(frozen=True)
+class VersaoDados:
+    """
+    Hash de cada banco (banco -> hash combinado das planilhas), de cada planilha
+    ((banco, campanha, hash)), campanhas selecionadas (vazio: todas) e chave combinada
+    """
+    bancos: tuple
+    planilhas: tuple = ()
+    selecao: tuple = ()
+
+    @property
+    def chave(self):
+        """Chave única da versão de todos os bancos (e da seleção de campanhas, se houver)"""
+        partes = (self.bancos, self.selecao) if self.selecao else self.bancos
+        return hashlib.sha256(repr(partes).encode('utf-8')).hexdigest()[:12]
+
+    @property
+    def campanhas(self):
+        """Campanhas com planilhas nesta versão (base primeiro)"""
+        return list(dict.fromkeys(campanha for _, campanha, _ in self.planilhas))
+
+    def do_banco(self, banco):
+        """Hash da planilha de um banco (combinado, com mais de uma campanha)"""
+        return dict(self.bancos)[banco]
+
+    def da_planilha(self, banco, campanha):
+        """Hash da planilha de um banco em uma campanha (AUSENTE se ela não existir)"""
+        return {(b, c): valor for b, c, valor in self.planilhas}.get((banco, campanha), AUSENTE)
+
+    def selecionar(self, campanhas):
+        """Versão restrita às campanhas (a própria versão, se nenhuma ou todas forem selecionadas)"""
+        selecao = tuple(campanha for campanha in self.campanhas if campanha in set(campanhas or ()))
+        if not selecao or len(selecao) == len(self.campanhas):
+            return replace(self, selecao=())
+        return replace(self, selecao=selecao)
+
+    def descricao(self):
+        """Texto curto para exibição (ex.: 'caracterizacao 1a2b3c4d · inventario 5e6f7a8b · 2 campanhas')"""
+        texto = ' · '.join(f"{banco} {valor[:8]}" for banco, valor in self.bancos)
+        if len(self.campanhas) > 1:
+            texto += f" · {len(self.campanhas)} campanhas"
+        if self.selecao:
+            texto += f" (selecionadas: {', '.join(self.selecao)})"
+        return texto
+
+def versao_dados(diretorio_dados='.'):
+    """Versão atual das planilhas (de todas as campanhas) de `diretorio_dados`"""
+    planilhas = tuple((banco, campanha, hash_arquivo(os.path.join(diretorio_dados, arquivo_planilha(banco, campanha))))
+                      for banco, campanha in planilhas_diretorio(diretorio_dados))
+    bancos = tuple((banco, hash_combinado((c, valor) for b, c, valor in planilhas if b == banco)) for banco in BANCOS)
+    return VersaoDados(bancos, planilhas)
@@ -0,0 +1,24 @@
+"""
+Bancos sintéticos (ver `indicadores.sintetico`) limpos e com o esquema de tipos, como saem da
+leitura das planilhas; os testes rodam com o Copy-on-Write ligado, como o dashboard e a linha
+de comando.
+"""
+import pandas as pd
+import pytest
+
+from indicadores import BANCOS, aplicar_esquema, gerar_dados_sinteticos, limpar_e_padronizar_dados
+
+# Tamanho e semente dos bancos sintéticos (mesmos resultados a cada execução)
+NUM_FUSTES = 3000
+SEMENTE = 7
+
+@pytest.fixture(autouse=True)
+def copy_on_write():
+    with pd.option_context('mode.copy_on_write', True):
+        yield
+
+@pytest.fixture(scope='session')
+def bancos():
+    """(caracterização, inventário) sintéticos, com colunas category como nas planilhas reais"""
+    brutos = gerar_dados_sinteticos(NUM_FUSTES, SEMENTE)
+    return tuple(aplicar_esquema(limpar_e_padronizar_dados(df), banco) for banco, df in zip(BANCOS, brutos))
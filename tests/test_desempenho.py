@@ -0,0 +1,20 @@
+import argparse
+
+from indicadores import desempenho
+
+def _args(base):
+    return argparse.Namespace(base=str(base), tamanhos=[1000], repeticoes=1, semente=0, casos=None,
+                              app=desempenho.ARQUIVO_APP, detalhar=0, salvar_base=None,
+                              tolerancia_tempo=0.1, tolerancia_memoria=0.1)
+
+def test_base_invalida_falha_antes_de_medir(tmp_path, capsys, monkeypatch):
+    def medir(*args):
+        raise AssertionError('mediu com a base inválida')
+    monkeypatch.setattr(desempenho, 'executar_desempenho', medir)
+    invalida = tmp_path / 'base.json'
+    invalida.write_text('{quebrado', encoding='utf-8')
+
+    assert desempenho.executar(_args(tmp_path / 'ausente.json')) == 1
+    assert desempenho.executar(_args(invalida)) == 1
+    saida = capsys.readouterr().out
+    assert 'ausente.json não pôde ser lida' in saida and 'base.json não pôde ser lida' in saida
@@ -0,0 +1,44 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from indicadores import ampliar_medida, como_texto, converter_coluna
+from indicadores.esquema import ERRO_RELATIVO_MEDIDA, executar
+
+def test_como_texto_igual_ao_astype_str():
+    serie = pd.Series(['b', None, 'a', 'b', np.nan], index=[4, 3, 2, 1, 0], name='especie', dtype='category')
+
+    pd.testing.assert_series_equal(como_texto(serie), serie.astype(object).astype(str))
+    pd.testing.assert_series_equal(como_texto(serie.astype(object)), serie.astype(object).astype(str))
+
+def test_como_texto_de_category_vazia():
+    with pd.option_context('mode.copy_on_write', True):
+        serie = pd.Series(['a', 'b'], dtype='category').take([])
+
+        resultado = como_texto(serie)
+
+    assert resultado.empty
+    assert resultado.dtype == object
+
+def test_comando_esquema_com_planilha_ausente(tmp_path, capsys):
+    assert executar(argparse.Namespace(dados=str(tmp_path), bancos=None)) == 1
+    assert 'BD_inventario.xlsx: não encontrado' in capsys.readouterr().out
+
+def test_codigo_so_vira_category_com_valores_repetidos():
+    repetidos = pd.Series(['a', 'b', 'a', None], dtype=object)
+    quase_unicos = pd.Series(['a', 'b', 'c', 'a'], dtype=object)
+
+    assert isinstance(converter_coluna(repetidos, 'codigo').dtype, pd.CategoricalDtype)
+    assert converter_coluna(quase_unicos, 'codigo') is None
+
+def test_medida_em_float32_dentro_da_tolerancia():
+    originais = pd.Series([0.4, 0.564, 24.999999999999996, 1234.5678, np.nan])
+
+    medida = converter_coluna(originais, 'medida')
+
+    assert medida.dtype == 'float32'
+    ampliada = ampliar_medida(medida)
+    assert ampliada.dtype == 'float64'
+    np.testing.assert_allclose(ampliada, originais, rtol=ERRO_RELATIVO_MEDIDA)
+    assert converter_coluna(pd.Series(['0.4', 'sem dado']), 'medida') is None
@@ -0,0 +1,74 @@
+import pandas as pd
+import pytest
+
+from indicadores import (
+    aplicar_filtros,
+    calcular_area_amostrada,
+    calcular_densidade_geral,
+    calcular_densidade_regenerantes,
+    calcular_indicadores_restauracao,
+)
+
+def _sem_category(df):
+    """Mesmo banco com as colunas category como texto (como antes do esquema de tipos)"""
+    return df.astype({col: object for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+
+def _filtros_sem_linhas(df_carac):
+    """Propriedade com uma técnica que ela não tem, seguida de uma UT: a cadeia esvazia a seleção"""
+    prop = df_carac['cod_prop'].iloc[0]
+    propria = df_carac.loc[df_carac['cod_prop'] == prop, 'tecnica'].iloc[0]
+    outra = next(t for t in df_carac['tecnica'].dropna().unique() if t != propria)
+    return {'cod_prop': prop, 'tecnica': outra, 'UT': df_carac['UT'].iloc[0]}
+
+def test_filtros_que_esvaziam_a_selecao(bancos):
+    df_carac, df_inv = bancos
+    filtros = _filtros_sem_linhas(df_carac)
+
+    carac, inv = aplicar_filtros(df_carac, df_inv, filtros, {'origem': 'Nativa', 'idade': 'Adulto'})
+
+    # Sem parcelas selecionadas, o inventário não é ligado à caracterização (só aos seus filtros)
+    assert carac.empty and not inv.empty
+    assert (carac.dtypes == df_carac.dtypes).all() and (inv.dtypes == df_inv.dtypes).all()
+
+    # Os cálculos da página principal aceitam a seleção vazia
+    for inventario in (inv, inv.iloc[:0]):
+        for resultado in (
+            calcular_area_amostrada(carac, inventario),
+            calcular_densidade_geral(inventario, carac),
+            calcular_densidade_regenerantes(inventario, carac),
+            calcular_indicadores_restauracao(carac, inventario),
+        ):
+            assert not resultado.erros
+
+def test_filtro_de_inventario_que_esvazia_a_selecao(bancos):
+    df_carac, df_inv = bancos
+    prop = df_carac['cod_prop'].iloc[0]
+
+    # Regenerantes adultos exóticos não existem nos bancos sintéticos de uma propriedade só
+    carac, inv = aplicar_filtros(
+        df_carac, df_inv, {'cod_prop': prop},
+        {'origem': 'Exótica', 'regeneracao': 'Regenerante', 'idade': 'Adulto', 'inexistente': 'x'},
+    )
+    carac, inv = aplicar_filtros(carac, inv, {'UT': df_carac['UT'].iloc[0]}, {'origem': 'Nativa'})
+
+    assert not carac.empty
+    assert inv.empty
+
+@pytest.mark.parametrize('filtros_principais, filtros_inventario', [
+    ({}, {}),
+    ({'cod_prop': 'Todos', 'tecnica': None}, {'origem': 'Todos'}),
+    ({'cod_prop': ' b001 '}, {}),
+    ({'tecnica': 'restauração ativa'}, {'origem': 'NATIVA', 'regeneracao': 'Regenerante'}),
+    ({'UT': 'Ut02'}, {'idade': 'Jovem'}),
+    ({'cod_prop': 'nan'}, {}),
+])
+def test_filtros_iguais_com_e_sem_category(bancos, filtros_principais, filtros_inventario):
+    df_carac, df_inv = bancos
+
+    carac, inv = aplicar_filtros(df_carac, df_inv, filtros_principais, filtros_inventario)
+    carac_texto, inv_texto = aplicar_filtros(
+        _sem_category(df_carac), _sem_category(df_inv), filtros_principais, filtros_inventario
+    )
+
+    pd.testing.assert_index_equal(carac.index, carac_texto.index)
+    pd.testing.assert_index_equal(inv.index, inv_texto.index)
@@ -0,0 +1,99 @@
+"""
+Paridade dos motores sobre os bancos sintéticos: DuckDB e Polars devem dar os resultados do pandas
+(números dentro de `paridade.TOLERANCIA_RELATIVA`), e o cubo de agregados as métricas que se obtêm
+filtrando as linhas.
+"""
+import pandas as pd
+import pytest
+
+from indicadores import (
+    ResultadoCubo,
+    ampliar_medida,
+    aplicar_filtros,
+    como_texto,
+    construir_cubo,
+    consultar_cubo,
+    obter_motor,
+    verificar_paridade,
+)
+from indicadores.paridade import _comparar
+from indicadores.restauracao import ALTURA_MINIMA_RIQUEZA
+
+# (filtros principais, filtros do inventário), como os da barra lateral; a última esvazia a seleção
+COMBINACOES = [
+    ({}, {}),
+    ({'cod_prop': 'B001'}, {}),
+    ({'tecnica': 'Restauração ativa'}, {'origem': 'Nativa'}),
+    ({'UT': 'Ut02'}, {'regeneracao': 'Regenerante', 'idade': 'Jovem'}),
+    ({'cod_prop': 'M003', 'tecnica': 'Todos', 'UT': 'Ut01'}, {'origem': 'Exótica', 'idade': None}),
+    ({'cod_prop': 'B001', 'tecnica': 'Restauração ativa', 'UT': 'Ut01'}, {}),
+]
+
+@pytest.fixture(scope='module')
+def cubo(bancos):
+    return construir_cubo(*bancos)
+
+@pytest.mark.parametrize('filtros_principais, filtros_inventario', COMBINACOES)
+def test_duckdb_igual_ao_pandas(bancos, filtros_principais, filtros_inventario):
+    pytest.importorskip('duckdb')
+    pandas_, duckdb_ = obter_motor('pandas'), obter_motor('duckdb')
+
+    filtrados = pandas_.aplicar_filtros(*bancos, filtros_principais, filtros_inventario)
+    assert _comparar(filtrados, duckdb_.aplicar_filtros(*bancos, filtros_principais, filtros_inventario)) == []
+
+    carac, inv = filtrados
+    for funcao, args in [
+        ('calcular_area_amostrada', (carac, inv)),
+        ('calcular_densidade_geral', (inv, carac)),
+        ('calcular_densidade_regenerantes', (inv, carac)),
+        ('calcular_indicadores_restauracao', (carac, inv)),
+    ]:
+        assert _comparar(getattr(pandas_, funcao)(*args), getattr(duckdb_, funcao)(*args), funcao) == []
+
+@pytest.mark.parametrize('filtros_principais, filtros_inventario', COMBINACOES[:3])
+def test_polars_igual_ao_pandas(bancos, filtros_principais, filtros_inventario):
+    pytest.importorskip('polars')
+
+    verificacoes = verificar_paridade(*aplicar_filtros(*bancos, filtros_principais, filtros_inventario))
+
+    assert verificacoes
+    assert [(v['funcao'], v['caso'], v['diferencas']) for v in verificacoes if v['diferencas']] == []
+
+def _medidas(df_completo, df):
+    """Colunas com algum número no banco completo (as medidas do cubo), em float, nas linhas de `df`"""
+    medidas = {}
+    for col in df_completo.columns:
+        if pd.api.types.is_datetime64_any_dtype(df_completo[col]):
+            continue
+        if pd.to_numeric(df_completo[col], errors='coerce').notna().any():
+            medidas[col] = ampliar_medida(pd.to_numeric(df[col], errors='coerce')).astype(float)
+    return pd.DataFrame(medidas, index=df.index)
+
+def _resultado_das_linhas(df_carac_completo, df_inv_completo, carac, inv):
+    """Métricas do cubo calculadas sobre as linhas filtradas"""
+    medidas_carac = _medidas(df_carac_completo, carac)
+    medidas_inv = _medidas(df_inv_completo, inv)
+
+    validas = ~como_texto(inv['especie']).str.contains('Morto|Morta', case=False, na=False) & (inv['ht'] > ALTURA_MINIMA_RIQUEZA)
+    nativas = validas & como_texto(inv['origem']).str.contains('Nativa', case=False, na=False)
+
+    return ResultadoCubo(
+        registros_caracterizacao=len(carac),
+        num_parcelas=carac['cod_parc'].nunique(),
+        medias_caracterizacao=medidas_carac.mean().to_dict(),
+        uns_caracterizacao=medidas_carac.eq(1).sum().to_dict(),
+        registros_inventario=len(inv),
+        medias_inventario=medidas_inv.mean().to_dict(),
+        maximos_inventario=medidas_inv.max().to_dict(),
+        contagens_inventario=medidas_inv.count().to_dict(),
+        riqueza=inv.loc[validas, 'especie'].nunique(),
+        riqueza_nativas=inv.loc[nativas, 'especie'].nunique(),
+    )
+
+@pytest.mark.parametrize('filtros_principais, filtros_inventario', COMBINACOES)
+def test_cubo_igual_as_linhas_filtradas(bancos, cubo, filtros_principais, filtros_inventario):
+    carac, inv = aplicar_filtros(*bancos, filtros_principais, filtros_inventario)
+
+    esperado = _resultado_das_linhas(*bancos, carac, inv)
+
+    assert _comparar(esperado, consultar_cubo(cubo, filtros_principais, filtros_inventario)) == []
@@ -0,0 +1,38 @@
+import threading
+
+from indicadores import AgendadorTarefas, criar_executor, iniciar_perfil, perfilado, trecho
+
+@perfilado()
+def _calcular(liberar=None):
+    if liberar is not None:
+        liberar.wait(5)
+    with trecho('interno'):
+        return 42
+
+def test_trechos_das_tarefas_entram_no_perfil():
+    agendador = AgendadorTarefas(criar_executor(2))
+    agendador.mudar_estado('filtros')
+
+    with iniciar_perfil('execução') as perfil:
+        with trecho('página'):
+            agendador.enviar('calculo', _calcular)
+            with trecho('Aguardando: calculo', 'tarefa'):
+                assert agendador.resultado('calculo') == 42
+
+    tabela = perfil.tabela().set_index('nome')
+    assert tabela.loc['_calcular', 'tarefa'] == 'calculo' and tabela.loc['_calcular', 'nivel'] == 0
+    assert tabela.loc['interno', 'tarefa'] == 'calculo' and tabela.loc['interno', 'nivel'] == 1
+    assert tabela.loc['Aguardando: calculo', 'tarefa'] is None and tabela.loc['Aguardando: calculo', 'nivel'] == 1
+
+def test_tarefa_que_comeca_depois_da_execucao_fica_fora_do_perfil():
+    agendador = AgendadorTarefas(criar_executor(1))
+    agendador.mudar_estado('filtros')
+    liberar = threading.Event()
+
+    with iniciar_perfil('execução') as perfil:
+        agendador.enviar('ocupando', _calcular, liberar)
+        agendador.enviar('na fila', _calcular)
+    liberar.set()
+
+    assert agendador.resultado('na fila') == 42
+    assert perfil.trechos and all(t.tarefa == 'ocupando' for t in perfil.trechos)